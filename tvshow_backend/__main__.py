@@ -2,9 +2,28 @@ import uvicorn
 
 from tvshow_backend.settings import settings
 
+# Features reading the catalog from the main database file only.
+UNSHARDED_FEATURES = (
+    "db_in_memory",
+    "analytics_snapshot",
+    "autocomplete_index",
+    "similar_shows",
+)
+
 
 def main() -> None:
-    """Entrypoint of the application."""
+    """
+    Entrypoint of the application.
+
+    :raises SystemExit: if the in-memory database is served by several
+        workers or shards are enabled together with features reading
+        the catalog from the main database file.
+    """
+    if settings.db_in_memory and settings.workers_count > 1:
+        raise SystemExit("The in-memory database can only be served by one worker")
+    enabled = [name for name in UNSHARDED_FEATURES if getattr(settings, name)]
+    if settings.db_shards > 1 and enabled:
+        raise SystemExit(f"A sharded catalog doesn't support {', '.join(enabled)}")
     uvicorn.run(
         "tvshow_backend.web.application:get_app",
         workers=settings.workers_count,
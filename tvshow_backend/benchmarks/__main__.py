@@ -0,0 +1,144 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from tvshow_backend.benchmarks.dataset import (
+    DATASETS,
+    DEFAULT_SEED,
+    dataset_size,
+    load_genres,
+    prepare_dataset,
+)
+from tvshow_backend.benchmarks.report import (
+    compare_with_baseline,
+    format_report,
+    summarize,
+)
+from tvshow_backend.benchmarks.runner import (
+    inprocess_client,
+    run_load,
+    uvicorn_client,
+    working_copy,
+)
+from tvshow_backend.benchmarks.workload import Workload
+from tvshow_backend.settings import DbBackend
+
+
+def _parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m tvshow_backend.benchmarks",
+        description="Load benchmark for the /api/tvshow endpoints.",
+    )
+    parser.add_argument("--dataset", choices=list(DATASETS), default="10k")
+    parser.add_argument("--mode", choices=["inprocess", "uvicorn"], default="inprocess")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument(
+        "--db-backend",
+        type=DbBackend,
+        choices=list(DbBackend),
+        default=DbBackend.AIOSQLITE,
+        help="backend running queries of requests",
+    )
+    parser.add_argument(
+        "--in-memory",
+        action="store_true",
+        help="serve the database from memory",
+    )
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--data-dir", type=Path, default=Path(".benchmarks"))
+    parser.add_argument("--output", type=Path, help="write report JSON here")
+    parser.add_argument("--baseline", type=Path, help="baseline report to compare")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="allowed relative regression, 0.1 means 10%%",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="store this run as the new baseline instead of comparing",
+    )
+    return parser.parse_args(argv)
+
+
+async def _benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    dataset = prepare_dataset(args.data_dir, args.dataset, args.seed)
+    db_file = working_copy(dataset, args.data_dir / "scratch")
+    workload = Workload(
+        dataset_rows=dataset_size(args.dataset),
+        genres=load_genres(dataset),
+        write_ratio=args.write_ratio,
+        seed=args.seed,
+    )
+    if args.mode == "uvicorn":
+        client_context = uvicorn_client(
+            db_file,
+            args.concurrency,
+            args.workers,
+            db_backend=args.db_backend,
+            in_memory=args.in_memory,
+        )
+    else:
+        client_context = inprocess_client(db_file, args.db_backend, args.in_memory)
+
+    async with client_context as client:
+        await run_load(client, workload, args.warmup, args.concurrency)
+        started = time.perf_counter()
+        samples = await run_load(client, workload, args.requests, args.concurrency)
+        elapsed = time.perf_counter() - started
+
+    db_file.unlink()
+    return summarize(
+        samples,
+        elapsed,
+        meta={
+            "dataset": args.dataset,
+            "mode": args.mode,
+            "workers": args.workers,
+            "db_backend": args.db_backend.value,
+            "in_memory": args.in_memory,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "write_ratio": args.write_ratio,
+            "seed": args.seed,
+        },
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Entrypoint of the benchmark.
+
+    :param argv: command line arguments.
+    :return: exit code, 1 if a regression against the baseline was found.
+    """
+    args = _parse_args(argv)
+    report = asyncio.run(_benchmark(args))
+    print(format_report(report))  # noqa: WPS421
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.baseline is None:
+        return 0
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2))
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())
+    regressions = compare_with_baseline(report, baseline, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION: {regression}", file=sys.stderr)  # noqa: WPS421
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+Latency of analytics queries over the columnar catalog snapshot.
+
+Builds a snapshot from synthetic rows and times typical dashboard queries::
+
+    python -m tvshow_backend.benchmarks.analytics --rows 1000000
+"""
+import argparse
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from tvshow_backend.db.models.tvshow_model import TvShowModel
+from tvshow_backend.db.seed import DEFAULT_SEED, generate_rows
+from tvshow_backend.services.analytics.snapshot import SOURCE_COLUMNS, CatalogSnapshot
+
+# Name and arguments of ``select`` and ``group_count`` of every query.
+QUERIES: List[Tuple[str, Dict[str, Any], List[str]]] = [
+    ("count all", {}, []),
+    ("release year histogram", {}, ["release_year"]),
+    ("genre by country", {}, ["genre", "country"]),
+    (
+        "movies since 2015 by genre",
+        {"filters": {"type": ["Movie"]}, "ranges": {"release_year": (2015, None)}},
+        ["genre"],
+    ),
+    (
+        "comedies by country and year added",
+        {"filters": {"genre": ["Comedy", "Romance"]}},
+        ["country", "year_added"],
+    ),
+]
+
+
+def _best_of(repeat: int, func: Callable[[], Any]) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def build_snapshot(rows: int, seed: int = DEFAULT_SEED) -> CatalogSnapshot:
+    """
+    Build a snapshot of a synthetic catalog.
+
+    :param rows: amount of shows.
+    :param seed: seed of the generator.
+    :return: snapshot.
+    """
+    names = [column.name for column in TvShowModel.__table__.columns]
+    positions = [names.index(name) for name in SOURCE_COLUMNS]
+    snapshot = CatalogSnapshot()
+    for chunk in generate_rows(rows, seed=seed):
+        snapshot.append([tuple(row[index] for index in positions) for row in chunk])
+    return snapshot
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Entrypoint of the analytics benchmark.
+
+    :param argv: command line arguments.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m tvshow_backend.benchmarks.analytics",
+        description="Measure latency of analytics queries.",
+    )
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    snapshot = build_snapshot(args.rows, args.seed)
+    print(  # noqa: WPS421
+        f"built snapshot of {len(snapshot)} rows "
+        f"in {time.perf_counter() - started:.1f}s",
+    )
+    print(f"{'query':<36} {'best ms':>10}")  # noqa: WPS421
+    for name, selection, group_by in QUERIES:
+        duration = _best_of(
+            args.repeat,
+            lambda: snapshot.group_count(  # noqa: WPS430
+                snapshot.select(**selection),
+                group_by,
+            ),
+        )
+        print(f"{name:<36} {duration:>10.2f}")  # noqa: WPS421
+
+
+if __name__ == "__main__":
+    main()
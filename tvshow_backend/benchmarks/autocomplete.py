@@ -0,0 +1,73 @@
+"""
+Latency and memory of the title autocomplete index.
+
+Builds the index from synthetic titles and looks up prefixes of random
+titles, as typed one character at a time::
+
+    python -m tvshow_backend.benchmarks.autocomplete --rows 1000000
+"""
+import argparse
+import random
+import time
+import tracemalloc
+from typing import List, Optional
+
+from tvshow_backend.benchmarks.report import percentile
+from tvshow_backend.db.seed import DEFAULT_SEED, generate_rows
+from tvshow_backend.services.autocomplete.index import ORDERS, TitleIndex
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Entrypoint of the autocomplete benchmark.
+
+    :param argv: command line arguments.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m tvshow_backend.benchmarks.autocomplete",
+        description="Measure latency and memory of title autocomplete.",
+    )
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    args = parser.parse_args(argv)
+
+    rows = [
+        (row[0], row[3], row[7])
+        for chunk in generate_rows(args.rows, seed=args.seed)
+        for row in chunk
+    ]
+    tracemalloc.start()
+    started = time.perf_counter()
+    index = TitleIndex.from_rows(rows)
+    build = time.perf_counter() - started
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(  # noqa: WPS421
+        f"built index of {len(index)} titles in {build:.1f}s, "
+        f"{traced / 2**20:.1f} MiB traced, "
+        f"{index.memory_bytes() / 2**20:.1f} MiB estimated",
+    )
+
+    rnd = random.Random(args.seed)
+    prefixes = []
+    while len(prefixes) < args.lookups:
+        title = rnd.choice(rows)[1]
+        prefixes.extend(title[:end] for end in range(1, len(title) + 1))
+    for order in ORDERS:
+        latencies = []
+        for prefix in prefixes[: args.lookups]:
+            started = time.perf_counter()
+            index.search(prefix, args.limit, order)
+            latencies.append((time.perf_counter() - started) * 1000)
+        latencies.sort()
+        print(  # noqa: WPS421
+            f"{order:<8} p50={percentile(latencies, 50):.3f}ms "
+            f"p99={percentile(latencies, 99):.3f}ms "
+            f"max={latencies[-1]:.3f}ms",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, List
+
+from tvshow_backend.db.migrate import migrate_catalog
+from tvshow_backend.db.seed import DEFAULT_SEED, seed_catalog
+
+# Named dataset sizes accepted by the benchmark CLI.
+DATASETS: Dict[str, int] = {
+    "10k": 10_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+}
+
+
+def dataset_size(name: str) -> int:
+    """
+    Resolve dataset name into the amount of rows.
+
+    :param name: one of the names from ``DATASETS``.
+    :raises ValueError: if dataset name is unknown.
+    :return: amount of rows in the dataset.
+    """
+    try:
+        return DATASETS[name.lower()]
+    except KeyError:
+        raise ValueError(
+            f"Unknown dataset {name!r}, expected one of {', '.join(DATASETS)}",
+        )
+
+
+def dataset_path(data_dir: Path, name: str, seed: int) -> Path:
+    """
+    Get location of the database file for a dataset.
+
+    :param data_dir: directory where datasets are stored.
+    :param name: dataset name.
+    :param seed: seed the dataset was generated with.
+    :return: path to the sqlite file.
+    """
+    return data_dir / f"tvshow_{name.lower()}_{seed}.sqlite3"
+
+
+def count_rows(path: Path) -> int:
+    """
+    Count TV shows stored in the database file.
+
+    :param path: path to the sqlite file.
+    :return: amount of rows, or -1 if the file is not a valid dataset.
+    """
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute("SELECT COUNT(*) FROM tvshow_model").fetchone()[0]
+    except sqlite3.DatabaseError:
+        return -1
+    finally:
+        connection.close()
+
+
+def prepare_dataset(data_dir: Path, name: str, seed: int = DEFAULT_SEED) -> Path:
+    """
+    Get a seeded database file for a dataset, generating it when needed.
+
+    Generated files are reused between runs, so the dataset is built only once
+    per name and seed. Reused files are migrated to the current schema.
+
+    :param data_dir: directory where datasets are stored.
+    :param name: dataset name.
+    :param seed: seed for the random generator.
+    :return: path to the seeded sqlite file.
+    """
+    count = dataset_size(name)
+    path = dataset_path(data_dir, name, seed)
+    if path.exists() and count_rows(path) == count:
+        migrate_catalog(path)
+        return path
+
+    data_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+    seed_catalog(tmp_path, count, seed, jobs=os.cpu_count() or 1)
+    tmp_path.replace(path)
+    return path
+
+
+def load_genres(path: Path) -> List[str]:
+    """
+    Get all distinct genres stored in the dataset.
+
+    :param path: path to the sqlite file.
+    :return: list of genres.
+    """
+    connection = sqlite3.connect(path)
+    try:
+        rows = connection.execute("SELECT DISTINCT genre FROM tvshow_model")
+        return sorted(row[0] for row in rows)
+    finally:
+        connection.close()
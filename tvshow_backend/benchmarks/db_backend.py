@@ -0,0 +1,127 @@
+"""
+Latency and throughput of DAO calls with both database backends.
+
+Runs the same DAO calls, each in a session of its own like a request,
+with the aiosqlite engine and with the threadpool backend::
+
+    python -m tvshow_backend.benchmarks.db_backend --dataset 100k --concurrency 16
+"""
+import argparse
+import asyncio
+import random
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from tvshow_backend.benchmarks.dataset import (
+    DATASETS,
+    DEFAULT_SEED,
+    dataset_size,
+    prepare_dataset,
+)
+from tvshow_backend.benchmarks.report import percentile
+from tvshow_backend.db.dao.tvshow_dao import TvShowDAO
+from tvshow_backend.db.threaded import ThreadedSessionMaker
+
+SessionFactory = Callable[[], AsyncSession]
+
+
+async def _request(sessions: SessionFactory, show_ids: List[int]) -> float:
+    """
+    Make DAO calls of a typical request.
+
+    :param sessions: factory of sessions.
+    :param show_ids: ids of shows to read.
+    :return: latency in milliseconds.
+    """
+    started = time.perf_counter()
+    session = sessions()
+    try:
+        dao = TvShowDAO(session)
+        await dao.get_tv_show_by_id(show_ids[0])
+        await dao.get_titles(show_ids)
+    finally:
+        await session.commit()
+        await session.close()
+    return (time.perf_counter() - started) * 1000
+
+
+async def _run(
+    sessions: SessionFactory,
+    requests: List[List[int]],
+    concurrency: int,
+) -> Tuple[List[float], float]:
+    """
+    Make requests with a fixed amount of concurrent clients.
+
+    :param sessions: factory of sessions.
+    :param requests: ids of shows read by every request.
+    :param concurrency: amount of concurrent clients.
+    :return: sorted latencies and elapsed seconds.
+    """
+    pending: Iterator[List[int]] = iter(requests)
+    latencies: List[float] = []
+
+    async def client() -> None:  # noqa: WPS430
+        for show_ids in pending:
+            latencies.append(await _request(sessions, show_ids))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return sorted(latencies), time.perf_counter() - started
+
+
+async def _benchmark(args: argparse.Namespace) -> None:
+    db_file = prepare_dataset(args.data_dir, args.dataset, args.seed)
+    rows = dataset_size(args.dataset)
+    rnd = random.Random(args.seed)
+    requests = [
+        [rnd.randint(1, rows) for _ in range(args.titles)] for _ in range(args.requests)
+    ]
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_file}")
+    threaded = ThreadedSessionMaker(f"sqlite:///{db_file}", args.threads)
+    backends: Dict[str, SessionFactory] = {
+        "aiosqlite": async_sessionmaker(engine, expire_on_commit=False),
+        "threadpool": threaded,
+    }
+    try:
+        for name, sessions in backends.items():
+            await _run(sessions, requests[: args.warmup], args.concurrency)
+            latencies, elapsed = await _run(sessions, requests, args.concurrency)
+            print(  # noqa: WPS421
+                f"{name:<10} {len(latencies) / elapsed:8.0f} req/s "
+                f"p50={percentile(latencies, 50):.3f}ms "
+                f"p95={percentile(latencies, 95):.3f}ms "
+                f"p99={percentile(latencies, 99):.3f}ms",
+            )
+    finally:
+        await engine.dispose()
+        threaded.dispose()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Entrypoint of the database backend benchmark.
+
+    :param argv: command line arguments.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m tvshow_backend.benchmarks.db_backend",
+        description="Compare DAO calls with the aiosqlite and threadpool backends.",
+    )
+    parser.add_argument("--dataset", choices=list(DATASETS), default="10k")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--titles", type=int, default=10, help="titles per request")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--data-dir", type=Path, default=Path(".benchmarks"))
+    args = parser.parse_args(argv)
+    asyncio.run(_benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Size and speed of response formats.
+
+Encodes pages of synthetic shows with every format offered by content
+negotiation, like the server does, and decodes them like a client::
+
+    python -m tvshow_backend.benchmarks.encoding --pages 10 100 1000
+"""
+import argparse
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+import ujson
+from fastapi import Response
+from fastapi.responses import UJSONResponse
+
+from tvshow_backend.db.models.tvshow_model import TvShowModel
+from tvshow_backend.db.seed import DEFAULT_SEED, generate_rows
+from tvshow_backend.web.api.tvshow.schema import TvShowDTO
+from tvshow_backend.web.negotiation import ColumnsResponse, MsgPackResponse, msgpack
+
+# Name, response class and decoder of every measured format.
+FORMATS: List[Tuple[str, Type[Response], Callable[[bytes], Any]]] = [
+    ("json", UJSONResponse, ujson.loads),
+    ("columns", ColumnsResponse, ujson.loads),
+]
+if msgpack is not None:
+    FORMATS.append(("msgpack", MsgPackResponse, msgpack.unpackb))
+
+
+def _shows(count: int, seed: int) -> List[Dict[str, Any]]:
+    names = [column.name for column in TvShowModel.__table__.columns]
+    fields = set(TvShowDTO.model_fields)
+    return [
+        {name: value for name, value in zip(names, row) if name in fields}
+        for chunk in generate_rows(count, seed=seed)
+        for row in chunk
+    ]
+
+
+def measure(
+    response_class: Type[Response],
+    decode: Callable[[bytes], Any],
+    page: List[Dict[str, Any]],
+    repeat: int,
+) -> Dict[str, float]:
+    """
+    Encode and decode a page of shows.
+
+    :param response_class: response class encoding the page.
+    :param decode: function decoding the body.
+    :param page: shows to encode.
+    :param repeat: amount of measured rounds.
+    :return: size of the body and microseconds per encoding and decoding.
+    """
+    body = response_class(page).body
+    started = time.perf_counter()
+    for _ in range(repeat):
+        response_class(page)
+    encoded = time.perf_counter() - started
+    started = time.perf_counter()
+    for _ in range(repeat):
+        decode(body)
+    decoded = time.perf_counter() - started
+    return {
+        "bytes": len(body),
+        "encode_us": encoded / repeat * 1_000_000,
+        "decode_us": decoded / repeat * 1_000_000,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Entrypoint of the encoding benchmark.
+
+    :param argv: command line arguments.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m tvshow_backend.benchmarks.encoding",
+        description="Compare size and speed of response formats.",
+    )
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    args = parser.parse_args(argv)
+
+    shows = _shows(max(args.pages), args.seed)
+    print(  # noqa: WPS421
+        f"{'shows':>6} {'format':<8} {'bytes':>9} {'encode us':>10} {'decode us':>10}",
+    )
+    for size in args.pages:
+        for name, response_class, decode in FORMATS:
+            result = measure(response_class, decode, shows[:size], args.repeat)
+            print(  # noqa: WPS421
+                f"{size:>6} {name:<8} {result['bytes']:>9.0f} "
+                f"{result['encode_us']:>10.1f} {result['decode_us']:>10.1f}",
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Per-request overhead of the logging pipeline.
+
+Every request served by uvicorn emits one access log record, and the
+application logs through loguru. This benchmark measures how long the
+event loop spends on an access record and on an application message in
+different logging configurations::
+
+    python -m tvshow_backend.benchmarks.logging_overhead --records 20000
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from loguru import logger
+
+from tvshow_backend.logging import _stop_listener, configure_logging
+from tvshow_backend.settings import settings
+
+# Name and settings overrides of every measured configuration.
+SCENARIOS: List[Tuple[str, Dict[str, Any]]] = [
+    ("text", {}),
+    ("text+enqueue", {"log_enqueue": True}),
+    ("json", {"log_json": True}),
+    ("json+enqueue", {"log_json": True, "log_enqueue": True}),
+    ("sampled 10%", {"access_log_sample_rate": 0.1}),
+    ("rate limit 1000/s", {"access_log_rate_limit": 1000}),
+]
+
+
+@contextmanager
+def _configured(overrides: Dict[str, Any], sink: TextIO) -> Iterator[None]:
+    previous = {name: getattr(settings, name) for name in overrides}
+    previous_stdout = sys.stdout
+    for name, override in overrides.items():
+        setattr(settings, name, override)
+    sys.stdout = sink
+    try:
+        configure_logging()
+        yield
+    finally:
+        # Stopping the listener waits until queued records are written.
+        _stop_listener()
+        sys.stdout = previous_stdout
+        for name, value in previous.items():
+            setattr(settings, name, value)
+
+
+def _access_record(index: int) -> None:
+    logging.getLogger("uvicorn.access").info(
+        '%s - "%s %s HTTP/%s" %d',
+        "127.0.0.1:53412",
+        "GET",
+        f"/api/tvshow/detail/{index}",
+        "1.1",
+        200,
+    )
+
+
+def _app_message(index: int) -> None:
+    logger.info("Built {} in {:.1f}ms", "title index", index / 1000)
+
+
+# Name and function emitting a single record of every measured source.
+SOURCES: List[Tuple[str, Callable[[int], None]]] = [
+    ("access", _access_record),
+    ("app", _app_message),
+]
+
+
+def measure(
+    overrides: Dict[str, Any],
+    records: int,
+    sink: TextIO,
+    emit: Callable[[int], None] = _access_record,
+) -> Dict[str, float]:
+    """
+    Emit log records with the given settings.
+
+    :param overrides: settings to change for the measurement.
+    :param records: amount of records to emit.
+    :param sink: stream logs are written to.
+    :param emit: function emitting a single record.
+    :return: microseconds per record spent by the caller and in total.
+    """
+    # Uvicorn doesn't propagate access logs to the root logger.
+    logging.getLogger("uvicorn.access").propagate = False
+    with _configured(overrides, sink):
+        started = time.perf_counter()
+        for index in range(records):
+            emit(index)
+        caller = time.perf_counter() - started
+    total = time.perf_counter() - started
+    return {
+        "caller_us": caller / records * 1_000_000,
+        "total_us": total / records * 1_000_000,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Entrypoint of the logging benchmark.
+
+    :param argv: command line arguments.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m tvshow_backend.benchmarks.logging_overhead",
+        description="Measure per-record cost of access and application logging.",
+    )
+    parser.add_argument("--records", type=int, default=20_000)
+    parser.add_argument(
+        "--sink",
+        default=os.devnull,
+        help="file to write logs to, defaults to the null device",
+    )
+    args = parser.parse_args(argv)
+
+    header = f"{'source':<8} {'scenario':<20} {'caller us':>10} {'total us':>10}"
+    print(header)  # noqa: WPS421
+    with open(args.sink, "w") as sink:
+        for source, emit in SOURCES:
+            for name, overrides in SCENARIOS:
+                result = measure(overrides, args.records, sink, emit)
+                print(  # noqa: WPS421
+                    f"{source:<8} {name:<20} "
+                    f"{result['caller_us']:>10.2f} {result['total_us']:>10.2f}",
+                )
+    configure_logging()
+
+
+if __name__ == "__main__":
+    main()
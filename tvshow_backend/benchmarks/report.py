@@ -0,0 +1,151 @@
+import math
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Sequence
+
+# Metrics where a bigger value means a slower server.
+LATENCY_METRICS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+@dataclass
+class Sample:
+    """Latency of a single request."""
+
+    endpoint: str
+    latency: float
+    ok: bool
+
+
+@dataclass
+class EndpointStats:
+    """Aggregated measurements for one endpoint."""
+
+    requests: int
+    errors: int
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+def percentile(sorted_values: Sequence[float], percent: float) -> float:
+    """
+    Nearest-rank percentile of already sorted values.
+
+    :param sorted_values: values in ascending order.
+    :param percent: percentile to compute, from 0 to 100.
+    :return: percentile value, 0 for an empty sequence.
+    """
+    if not sorted_values:
+        return 0
+    rank = math.ceil(percent / 100 * len(sorted_values))
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+
+def _stats(samples: List[Sample], elapsed: float) -> EndpointStats:
+    latencies = sorted(sample.latency * 1000 for sample in samples)
+    return EndpointStats(
+        requests=len(samples),
+        errors=sum(1 for sample in samples if not sample.ok),
+        throughput=len(samples) / elapsed if elapsed > 0 else 0,
+        p50_ms=percentile(latencies, 50),
+        p95_ms=percentile(latencies, 95),
+        p99_ms=percentile(latencies, 99),
+    )
+
+
+def summarize(
+    samples: List[Sample],
+    elapsed: float,
+    meta: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Build a JSON-serializable report from raw samples.
+
+    :param samples: all collected samples.
+    :param elapsed: wall time of the run in seconds.
+    :param meta: parameters of the run.
+    :return: report with per-endpoint and total statistics.
+    """
+    by_endpoint: Dict[str, List[Sample]] = defaultdict(list)
+    for sample in samples:
+        by_endpoint[sample.endpoint].append(sample)
+    return {
+        "meta": meta,
+        "endpoints": {
+            endpoint: asdict(_stats(endpoint_samples, elapsed))
+            for endpoint, endpoint_samples in sorted(by_endpoint.items())
+        },
+        "total": asdict(_stats(samples, elapsed)),
+    }
+
+
+def compare_with_baseline(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float,
+    comparable_keys: Sequence[str] = ("dataset", "mode", "concurrency"),
+) -> List[str]:
+    """
+    Find regressions of the current run against a stored baseline.
+
+    Latency percentiles regress when they grow by more than ``threshold``,
+    throughput regresses when it drops by more than ``threshold``.
+
+    :param current: report of the current run.
+    :param baseline: stored report to compare with.
+    :param threshold: allowed relative change, e.g. 0.1 for 10%.
+    :param comparable_keys: run parameters that must match the baseline.
+    :return: human-readable descriptions of regressions.
+    """
+    problems = []
+    for key in comparable_keys:
+        expected = baseline["meta"].get(key)
+        actual = current["meta"].get(key)
+        if expected != actual:
+            problems.append(
+                f"baseline {key} is {expected!r}, current run has {actual!r}"
+            )
+    if problems:
+        return problems
+
+    for endpoint, base in baseline["endpoints"].items():
+        stats = current["endpoints"].get(endpoint)
+        if stats is None:
+            continue
+        for metric in LATENCY_METRICS:
+            limit = base[metric] * (1 + threshold)
+            if stats[metric] > limit:
+                problems.append(
+                    f"{endpoint} {metric}: {stats[metric]:.2f} > {limit:.2f} "
+                    f"(baseline {base[metric]:.2f})",
+                )
+        floor = base["throughput"] * (1 - threshold)
+        if stats["throughput"] < floor:
+            problems.append(
+                f"{endpoint} throughput: {stats['throughput']:.1f} < {floor:.1f} "
+                f"(baseline {base['throughput']:.1f})",
+            )
+    return problems
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """
+    Render report as a text table.
+
+    :param report: report built by ``summarize``.
+    :return: table with one line per endpoint.
+    """
+    header = (
+        f"{'endpoint':<10} {'requests':>9} {'errors':>7} {'req/s':>9} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    )
+    rows = [header, "-" * len(header)]
+    endpoints = list(report["endpoints"].items()) + [("total", report["total"])]
+    for endpoint, stats in endpoints:
+        rows.append(
+            f"{endpoint:<10} {stats['requests']:>9} {stats['errors']:>7} "
+            f"{stats['throughput']:>9.1f} {stats['p50_ms']:>8.2f} "
+            f"{stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f}",
+        )
+    return "\n".join(rows)
@@ -0,0 +1,118 @@
+"""
+Latency of hot list and genre pages with and without the response cache.
+
+Requests a few pages of ``/api/tvshow/all`` and a few genres over and over
+through the application, like clients browsing the first pages of the
+catalog::
+
+    python -m tvshow_backend.benchmarks.response_cache --dataset 100k --pages 20
+"""
+import argparse
+import asyncio
+import random
+import time
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from tvshow_backend.benchmarks.dataset import (
+    DATASETS,
+    DEFAULT_SEED,
+    load_genres,
+    prepare_dataset,
+)
+from tvshow_backend.benchmarks.report import percentile
+from tvshow_backend.benchmarks.runner import inprocess_client, working_copy
+from tvshow_backend.settings import settings
+
+
+async def _run(
+    db_file: Path,
+    urls: List[str],
+    concurrency: int,
+    cache_bytes: int,
+) -> Tuple[List[float], float, float]:
+    """
+    Request pages with a fixed amount of concurrent clients.
+
+    :param db_file: database file.
+    :param urls: pages to request in order.
+    :param concurrency: amount of concurrent clients.
+    :param cache_bytes: budget of the response cache, 0 disables it.
+    :return: sorted latencies, elapsed seconds and hit ratio.
+    """
+    previous = settings.response_cache_bytes
+    settings.response_cache_bytes = cache_bytes
+    latencies: List[float] = []
+    pending: Iterator[str] = iter(urls)
+    try:
+        async with inprocess_client(db_file) as client:
+
+            async def browse() -> None:  # noqa: WPS430
+                for url in pending:
+                    started = time.perf_counter()
+                    response = await client.get(url)
+                    response.raise_for_status()
+                    latencies.append((time.perf_counter() - started) * 1000)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(browse() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - started
+            stats = (await client.get("/api/monitoring/response-cache")).json()
+    finally:
+        settings.response_cache_bytes = previous
+    return sorted(latencies), elapsed, stats["hit_ratio"]
+
+
+async def _benchmark(args: argparse.Namespace) -> None:
+    dataset = prepare_dataset(args.data_dir, args.dataset, args.seed)
+    rnd = random.Random(args.seed)
+    genres = rnd.sample(load_genres(dataset), args.genres)
+    hot = [
+        f"/api/tvshow/all?limit=10&offset={page * 10}" for page in range(args.pages)
+    ] + [f"/api/tvshow/genre/{genre}" for genre in genres]
+    urls = [rnd.choice(hot) for _ in range(args.requests)]
+    for name, cache_bytes in (("no cache", 0), ("cache", args.cache_bytes)):
+        db_file = working_copy(dataset, args.data_dir / "scratch")
+        latencies, elapsed, hit_ratio = await _run(
+            db_file,
+            urls,
+            args.concurrency,
+            cache_bytes,
+        )
+        db_file.unlink()
+        print(  # noqa: WPS421
+            f"{name:<10} {len(latencies) / elapsed:8.0f} req/s "
+            f"p50={percentile(latencies, 50):.3f}ms "
+            f"p99={percentile(latencies, 99):.3f}ms "
+            f"hit ratio={hit_ratio:.2f}",
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Entrypoint of the response cache benchmark.
+
+    :param argv: command line arguments.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m tvshow_backend.benchmarks.response_cache",
+        description="Compare hot pages served with and without the response cache.",
+    )
+    parser.add_argument("--dataset", choices=list(DATASETS), default="10k")
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--pages", type=int, default=20, help="hot list pages")
+    parser.add_argument("--genres", type=int, default=5, help="hot genres")
+    parser.add_argument(
+        "--cache-bytes",
+        type=int,
+        default=settings.response_cache_bytes,
+    )
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--data-dir", type=Path, default=Path(".benchmarks"))
+    args = parser.parse_args(argv)
+    asyncio.run(_benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import asyncio
+import os
+import shutil
+import socket
+import subprocess  # noqa: S404
+import sys
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, List, Optional
+
+from httpx import AsyncClient, Limits
+
+from tvshow_backend.benchmarks.report import Sample
+from tvshow_backend.benchmarks.workload import Workload
+from tvshow_backend.settings import DbBackend, settings
+
+SERVER_START_TIMEOUT = 30
+
+
+def working_copy(dataset: Path, scratch_dir: Path) -> Path:
+    """
+    Copy seeded dataset, so writes of a run don't leak into the next one.
+
+    :param dataset: seeded sqlite file.
+    :param scratch_dir: directory for the copy.
+    :return: path to the copy.
+    """
+    scratch_dir.mkdir(parents=True, exist_ok=True)
+    target = scratch_dir / f"run_{dataset.name}"
+    shutil.copyfile(dataset, target)
+    return target
+
+
+@asynccontextmanager
+async def inprocess_client(
+    db_file: Path,
+    db_backend: DbBackend = DbBackend.AIOSQLITE,
+    in_memory: bool = False,
+) -> AsyncIterator[AsyncClient]:
+    """
+    Client that calls the ASGI application directly.
+
+    Application is built with ``get_app()`` and its startup and shutdown
+    events are executed, so it behaves like a real worker.
+
+    :param db_file: database file the application should use.
+    :param db_backend: backend running queries of requests.
+    :param in_memory: serve the database from memory.
+    :yield: client bound to the application.
+    """
+    from tvshow_backend.web.application import get_app  # noqa: WPS433
+
+    previous_db_file = settings.db_file
+    previous_db_backend = settings.db_backend
+    previous_in_memory = settings.db_in_memory
+    settings.db_file = db_file
+    settings.db_backend = db_backend
+    settings.db_in_memory = in_memory
+    app = get_app()
+    await app.router.startup()
+    try:
+        async with AsyncClient(app=app, base_url="http://bench") as client:
+            yield client
+    finally:
+        await app.router.shutdown()
+        settings.db_file = previous_db_file
+        settings.db_backend = previous_db_backend
+        settings.db_in_memory = previous_in_memory
+
+
+def _free_port(host: str) -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_for_server(client: AsyncClient, process: subprocess.Popen) -> None:
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+        try:
+            response = await client.get("/api/health")
+        except Exception:
+            await asyncio.sleep(0.1)
+            continue
+        if response.status_code == 200:
+            return
+    raise RuntimeError("uvicorn did not start in time")
+
+
+@asynccontextmanager
+async def uvicorn_client(
+    db_file: Path,
+    concurrency: int,
+    workers: int = 1,
+    host: str = "127.0.0.1",
+    port: Optional[int] = None,
+    db_backend: DbBackend = DbBackend.AIOSQLITE,
+    in_memory: bool = False,
+) -> AsyncIterator[AsyncClient]:
+    """
+    Client that talks to a real uvicorn server over TCP.
+
+    The server runs in a subprocess with the same factory that
+    ``python -m tvshow_backend`` uses.
+
+    :param db_file: database file the server should use.
+    :param concurrency: maximum amount of open connections.
+    :param workers: amount of uvicorn workers.
+    :param host: host to bind the server to.
+    :param port: port to bind to, a free one is picked by default.
+    :param db_backend: backend running queries of requests.
+    :param in_memory: serve the database from memory.
+    :yield: client bound to the server.
+    """
+    port = port or _free_port(host)
+    env = dict(
+        os.environ,
+        TVSHOW_BACKEND_DB_FILE=str(db_file),
+        TVSHOW_BACKEND_DB_BACKEND=db_backend.value,
+        TVSHOW_BACKEND_DB_IN_MEMORY=str(in_memory),
+        TVSHOW_BACKEND_LOG_LEVEL="WARNING",
+    )
+    process = subprocess.Popen(  # noqa: S603
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "tvshow_backend.web.application:get_app",
+            "--factory",
+            "--host",
+            host,
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ],
+        env=env,
+    )
+    limits = Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    try:
+        async with AsyncClient(
+            base_url=f"http://{host}:{port}",
+            limits=limits,
+        ) as client:
+            await _wait_for_server(client, process)
+            yield client
+    finally:
+        process.terminate()
+        process.wait(timeout=SERVER_START_TIMEOUT)
+
+
+async def run_load(
+    client: AsyncClient,
+    workload: Workload,
+    requests: int,
+    concurrency: int,
+) -> List[Sample]:
+    """
+    Issue requests from the workload with a fixed amount of concurrent users.
+
+    :param client: client bound to the application.
+    :param workload: generator of requests.
+    :param requests: total amount of requests to issue.
+    :param concurrency: amount of concurrent users.
+    :return: collected samples.
+    """
+    samples: List[Sample] = []
+    remaining = requests
+
+    async def user() -> None:  # noqa: WPS430
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            operation = workload.next_operation()
+            started = time.perf_counter()
+            try:
+                response = await client.request(
+                    operation.method,
+                    operation.url,
+                    json=operation.json,
+                )
+            except Exception:
+                ok = False
+            else:
+                ok = response.is_success
+            samples.append(
+                Sample(operation.endpoint, time.perf_counter() - started, ok),
+            )
+            workload.complete(operation, ok)
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    return samples
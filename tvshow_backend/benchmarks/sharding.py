@@ -0,0 +1,229 @@
+"""
+Write throughput and read latency of the catalog split into shards.
+
+Worker processes create shows through the sharded DAO with concurrent
+clients, each show in a transaction of its own like a request. Then pages
+of genres are read, scattered to every shard. Both are measured with every
+amount of shards::
+
+    python -m tvshow_backend.benchmarks.sharding --shards 1,2,4 --processes 4
+
+Throughput of writes is measured from the first write of any process to
+the last one, so starting processes is not counted.
+"""
+import argparse
+import asyncio
+import functools
+import multiprocessing
+import random
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+from tvshow_backend.benchmarks.report import percentile
+from tvshow_backend.db.dao.sharded_tvshow_dao import ShardedTvShowDAO
+from tvshow_backend.db.meta import meta
+from tvshow_backend.db.models import load_all_models
+from tvshow_backend.db.seed import GENRES
+from tvshow_backend.db.sharding import ShardSet, shard_files
+
+Operation = Callable[[], Awaitable[Any]]
+
+
+def _show(show_id: int, rnd: random.Random) -> Dict[str, Any]:
+    return {
+        "show_id": show_id,
+        "type": "TV Show",
+        "genre": ", ".join(rnd.sample(GENRES, 2)),
+        "title": f"Show {show_id}",
+        "director": "",
+        "cast": "",
+        "country": "",
+        "date_added": "January 1, 2020",
+        "release_year": rnd.randint(1990, 2024),
+        "rating": "TV-14",
+        "duration": "1 Season",
+    }
+
+
+async def _run(
+    operations: List[Operation],
+    concurrency: int,
+) -> Tuple[List[float], float]:
+    """
+    Run operations with a fixed amount of concurrent clients.
+
+    :param operations: operations to run.
+    :param concurrency: amount of concurrent clients.
+    :return: sorted latencies in milliseconds and elapsed seconds.
+    """
+    pending: Iterator[Operation] = iter(operations)
+    latencies: List[float] = []
+
+    async def client() -> None:  # noqa: WPS430
+        for operation in pending:
+            started = time.perf_counter()
+            await operation()
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return sorted(latencies), time.perf_counter() - started
+
+
+async def _create_tables(files: List[Path]) -> None:
+    shards = ShardSet(files)
+    try:
+        await shards.create_tables(meta, load_models=load_all_models)
+    finally:
+        await shards.dispose()
+
+
+async def _write(
+    files: List[Path],
+    shows: List[Dict[str, Any]],
+    concurrency: int,
+) -> Tuple[List[float], float, float]:
+    """
+    Create shows with concurrent clients.
+
+    :param files: files of the shards.
+    :param shows: shows to create.
+    :param concurrency: amount of concurrent clients.
+    :return: latencies, start and end of the writes as wall clock time.
+    """
+    shards = ShardSet(files)
+    dao = ShardedTvShowDAO(shards)
+    try:
+        started = time.time()
+        latencies, _ = await _run(
+            [functools.partial(dao.create_tv_show_model, **show) for show in shows],
+            concurrency,
+        )
+    finally:
+        await shards.dispose()
+    return latencies, started, time.time()
+
+
+def _write_in_process(
+    files: List[Path],
+    shows: List[Dict[str, Any]],
+    concurrency: int,
+) -> Tuple[List[float], float, float]:
+    return asyncio.run(_write(files, shows, concurrency))
+
+
+async def _read(
+    files: List[Path],
+    genres: List[str],
+    offset: int,
+    concurrency: int,
+) -> List[float]:
+    shards = ShardSet(files)
+    dao = ShardedTvShowDAO(shards)
+    try:
+        latencies, _ = await _run(
+            [
+                functools.partial(
+                    dao.search_tv_show_by_genre,
+                    [genre],
+                    offset=offset,
+                    sort="release_year",
+                )
+                for genre in genres
+            ],
+            concurrency,
+        )
+    finally:
+        await shards.dispose()
+    return latencies
+
+
+def _benchmark_shards(
+    args: argparse.Namespace,
+    count: int,
+) -> Tuple[float, List[float], List[float]]:
+    """
+    Measure writes and reads with an amount of shards.
+
+    :param args: command line arguments.
+    :param count: amount of shards.
+    :return: writes per second, sorted latencies of writes and of reads.
+    """
+    data_dir = args.data_dir / f"sharding-{count}"
+    shutil.rmtree(data_dir, ignore_errors=True)
+    data_dir.mkdir(parents=True)
+    files = shard_files(data_dir / "db.sqlite3", count)
+    asyncio.run(_create_tables(files))
+    rnd = random.Random(args.seed)
+    shows = [_show(show_id, rnd) for show_id in range(1, args.writes + 1)]
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(args.processes, mp_context=context) as executor:
+        written = list(
+            executor.map(
+                _write_in_process,
+                *zip(
+                    *(
+                        (files, shows[index :: args.processes], args.concurrency)
+                        for index in range(args.processes)
+                    ),
+                ),
+            ),
+        )
+    elapsed = max(end for _, _, end in written) - min(start for _, start, _ in written)
+    writes = sorted(latency for latencies, _, _ in written for latency in latencies)
+    genres = [rnd.choice(GENRES) for _ in range(args.reads)]
+    reads = asyncio.run(_read(files, genres, args.offset, args.concurrency))
+    return len(writes) / elapsed, writes, reads
+
+
+def _benchmark(args: argparse.Namespace) -> None:
+    baseline: Optional[float] = None
+    for count in args.shards:
+        throughput, writes, reads = _benchmark_shards(args, count)
+        baseline = baseline or throughput
+        print(  # noqa: WPS421
+            f"{count:>2} shards {throughput:7.0f} writes/s "
+            f"(x{throughput / baseline:.2f}) "
+            f"p50={percentile(writes, 50):.2f}ms p95={percentile(writes, 95):.2f}ms "
+            f"| genre page p50={percentile(reads, 50):.2f}ms "
+            f"p95={percentile(reads, 95):.2f}ms",
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Entrypoint of the sharding benchmark.
+
+    :param argv: command line arguments.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m tvshow_backend.benchmarks.sharding",
+        description="Measure writes and scattered reads with several shards.",
+    )
+    parser.add_argument(
+        "--shards",
+        type=lambda value: [int(count) for count in value.split(",")],
+        default=[1, 2, 4],
+        help="comma separated amounts of shards",
+    )
+    parser.add_argument("--writes", type=int, default=5000)
+    parser.add_argument("--reads", type=int, default=500)
+    parser.add_argument("--offset", type=int, default=100, help="offset of pages")
+    parser.add_argument("--processes", type=int, default=4, help="writing processes")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="concurrent clients per process",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", type=Path, default=Path(".benchmarks"))
+    args = parser.parse_args(argv)
+    _benchmark(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Latency of similar shows lookups.
+
+Builds the TF-IDF model from synthetic shows and looks up similar shows of
+random shows, first computing and then from the cache::
+
+    python -m tvshow_backend.benchmarks.similarity --rows 1000000
+"""
+import argparse
+import random
+import time
+from typing import List, Optional
+
+from tvshow_backend.benchmarks.report import percentile
+from tvshow_backend.db.models.tvshow_model import TvShowModel
+from tvshow_backend.db.seed import DEFAULT_SEED, generate_rows
+from tvshow_backend.services.similarity.model import SimilarityModel
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Entrypoint of the similarity benchmark.
+
+    :param argv: command line arguments.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m tvshow_backend.benchmarks.similarity",
+        description="Measure latency of similar shows lookups.",
+    )
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    args = parser.parse_args(argv)
+
+    names = [column.name for column in TvShowModel.__table__.columns]
+    started = time.perf_counter()
+    model = SimilarityModel.from_rows(
+        dict(zip(names, row))
+        for chunk in generate_rows(args.rows, seed=args.seed)
+        for row in chunk
+    )
+    print(  # noqa: WPS421
+        f"built model of {len(model)} shows and {len(model.vocabulary)} tokens "
+        f"in {time.perf_counter() - started:.1f}s",
+    )
+
+    rnd = random.Random(args.seed)
+    show_ids = [rnd.randint(1, args.rows) for _ in range(args.lookups)]
+    for name in ("computed", "cached"):
+        latencies = []
+        for show_id in show_ids:
+            started = time.perf_counter()
+            model.similar(show_id, args.k)
+            latencies.append((time.perf_counter() - started) * 1000)
+        latencies.sort()
+        print(  # noqa: WPS421
+            f"{name:<9} p50={percentile(latencies, 50):.3f}ms "
+            f"p99={percentile(latencies, 99):.3f}ms",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import random
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+# Relative weights of endpoints inside read and write parts of the mix.
+READ_WEIGHTS: Dict[str, float] = {"all": 0.4, "detail": 0.4, "genre": 0.2}
+WRITE_WEIGHTS: Dict[str, float] = {"create": 0.5, "update": 0.3, "delete": 0.2}
+
+_PREFIX = "/api/tvshow"
+
+
+@dataclass
+class Operation:
+    """Single request issued by the benchmark."""
+
+    endpoint: str
+    method: str
+    url: str
+    json: Optional[Dict[str, Any]] = None
+    show_id: Optional[int] = None
+
+
+def _choose(rnd: random.Random, weights: Dict[str, float]) -> str:
+    names: Sequence[str] = list(weights)
+    return rnd.choices(names, weights=[weights[name] for name in names])[0]
+
+
+class Workload:
+    """
+    Deterministic generator of mixed read/write requests.
+
+    Created shows get ids above the seeded range, and only shows created
+    by the benchmark itself are deleted, so the seeded dataset stays intact
+    and repeated runs against the same file are comparable.
+    """
+
+    def __init__(
+        self,
+        dataset_rows: int,
+        genres: List[str],
+        write_ratio: float = 0.0,
+        seed: int = 0,
+        page_size: int = 10,
+    ):
+        if not 0 <= write_ratio <= 1:
+            raise ValueError("write_ratio must be between 0 and 1.")
+        self.dataset_rows = dataset_rows
+        self.genres = genres
+        self.write_ratio = write_ratio
+        self.page_size = page_size
+        self._rnd = random.Random(seed)
+        self._next_id = dataset_rows + 1
+        self._created: List[int] = []
+
+    def next_operation(self) -> Operation:
+        """
+        Pick the next request of the mix.
+
+        :return: operation to perform.
+        """
+        if self._rnd.random() < self.write_ratio:
+            return self._write(_choose(self._rnd, WRITE_WEIGHTS))
+        return self._read(_choose(self._rnd, READ_WEIGHTS))
+
+    def complete(self, operation: Operation, ok: bool) -> None:
+        """
+        Report the outcome of an operation.
+
+        :param operation: finished operation.
+        :param ok: whether the server accepted the request.
+        """
+        if not ok or operation.show_id is None:
+            return
+        if operation.endpoint == "create":
+            self._created.append(operation.show_id)
+
+    def _read(self, endpoint: str) -> Operation:
+        if endpoint == "detail":
+            show_id = self._rnd.randint(1, self.dataset_rows)
+            return Operation(endpoint, "GET", f"{_PREFIX}/detail/{show_id}")
+        if endpoint == "genre" and self.genres:
+            genre = self._rnd.choice(self.genres)
+            return Operation(endpoint, "GET", f"{_PREFIX}/genre/{genre}")
+        offset = self._rnd.randint(0, max(self.dataset_rows - self.page_size, 0))
+        return Operation(
+            "all",
+            "GET",
+            f"{_PREFIX}/all?limit={self.page_size}&offset={offset}",
+        )
+
+    def _write(self, endpoint: str) -> Operation:
+        if endpoint == "delete" and self._created:
+            show_id = self._created.pop(self._rnd.randrange(len(self._created)))
+            return Operation(
+                endpoint,
+                "DELETE",
+                f"{_PREFIX}/delete/{show_id}",
+                show_id=show_id,
+            )
+        if endpoint == "create":
+            show_id = self._next_id
+            self._next_id += 1
+            return Operation(
+                endpoint,
+                "POST",
+                f"{_PREFIX}/create",
+                json=self._payload(show_id),
+                show_id=show_id,
+            )
+        show_id = self._rnd.randint(1, self.dataset_rows)
+        return Operation(
+            "update",
+            "PUT",
+            f"{_PREFIX}/update/{show_id}",
+            json=self._payload(show_id),
+            show_id=show_id,
+        )
+
+    def _payload(self, show_id: int) -> Dict[str, Any]:
+        genre = self._rnd.choice(self.genres) if self.genres else "Drama"
+        return {
+            "show_id": show_id,
+            "type": "TV Show",
+            "genre": genre,
+            "title": f"Benchmark Show {show_id}",
+            "director": "Benchmark Director",
+            "cast": "Benchmark Actor",
+            "country": "United States",
+            "date_added": "2023-01-01",
+            "release_year": 2023,
+            "rating": "TV-14",
+            "duration": "1 season",
+        }
@@ -1,5 +1,6 @@
 import random
-from typing import Any, AsyncGenerator, Generator
+from types import SimpleNamespace
+from typing import Any, AsyncGenerator, Callable, Generator
 
 import pytest
 from fastapi import FastAPI
@@ -116,6 +117,23 @@ def fastapi_app(
     return application  # noqa: WPS331
 
 
+@pytest.fixture
+def install_replica(fastapi_app: FastAPI) -> Callable[[str, Any], None]:
+    """
+    Fixture for serving a prebuilt structure instead of a running replica.
+
+    Replicas are started by startup events, which don't run in tests.
+
+    :param fastapi_app: the application.
+    :return: function that takes a state attribute name and the structure.
+    """
+
+    def install(name: str, current: Any) -> None:
+        setattr(fastapi_app.state, name, SimpleNamespace(current=current))
+
+    return install
+
+
 @pytest.fixture
 async def client(
     fastapi_app: FastAPI,
@@ -0,0 +1,170 @@
+"""
+Tracking of committed writes to the TV show table.
+
+DAO methods record every change in the session. Each change gets its own
+generation: a number from a per-table counter stored in the database and
+bumped in the same transaction as the change. The change is appended to
+the changelog table with its generation as sequence number, so clients can
+fetch changes made after a generation they have seen. After the transaction
+is committed, recorded changes are passed to registered listeners, which
+keep in-process caches and indexes up to date.
+"""
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import ujson
+from sqlalchemy import event
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from tvshow_backend.db.models.changelog_model import ChangeLogModel
+from tvshow_backend.db.models.generation_model import TableGenerationModel
+
+TVSHOW_TABLE = "tvshow_model"
+# Counter holding the generation up to which changes may be missing from
+# the changelog, because they were removed by retention or bulk-loaded.
+CHANGELOG_FLOOR = "tvshow_changelog_floor"
+
+CREATE = "create"
+UPDATE = "update"
+DELETE = "delete"
+
+# Sessions committing outside the event loop thread set this flag in
+# their info, their changes are passed to listeners later by
+# ``dispatch_deferred_changes`` called in the event loop.
+DEFER_DISPATCH = "defer_change_dispatch"
+
+_CHANGES_KEY = "tvshow_changes"
+_COMMITTED_KEY = "tvshow_committed_changes"
+
+
+class TvShowChange(NamedTuple):
+    """Single committed change of a TV show."""
+
+    operation: str
+    show_id: int
+    generation: int
+    # Column values after the change, None for deletes.
+    values: Optional[Dict[str, Any]] = None
+
+
+ChangeListener = Callable[[List[TvShowChange]], None]
+
+_listeners: List[ChangeListener] = []
+
+
+def add_change_listener(listener: ChangeListener) -> None:
+    """
+    Register a function called with changes of every committed transaction.
+
+    Listeners are called synchronously right after the commit,
+    so they must be fast and must not raise.
+
+    :param listener: function to call.
+    """
+    _listeners.append(listener)
+
+
+def remove_change_listener(listener: ChangeListener) -> None:
+    """
+    Unregister a change listener.
+
+    :param listener: previously registered function.
+    """
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+async def bump_generation(session: AsyncSession, table_name: str, amount: int) -> int:
+    """
+    Increase generation counter of a table in the current transaction.
+
+    :param session: current session.
+    :param table_name: name of the changed table.
+    :param amount: amount of changes.
+    :return: new value of the counter.
+    """
+    statement = (
+        insert(TableGenerationModel)
+        .values(table_name=table_name, generation=amount)
+        .on_conflict_do_update(
+            index_elements=[TableGenerationModel.table_name],
+            set_={"generation": TableGenerationModel.generation + amount},
+        )
+        .returning(TableGenerationModel.generation)
+    )
+    generation = await session.execute(statement)
+    return generation.scalar_one()
+
+
+async def record_changes(
+    session: AsyncSession,
+    operation: str,
+    rows: Sequence[Tuple[int, Optional[Dict[str, Any]]]],
+) -> List[TvShowChange]:
+    """
+    Record changes of TV shows made in the current transaction.
+
+    :param session: current session.
+    :param operation: one of ``CREATE``, ``UPDATE`` or ``DELETE``.
+    :param rows: changed show ids with their new values.
+    :return: recorded changes.
+    """
+    if not rows:
+        return []
+    last_generation = await bump_generation(session, TVSHOW_TABLE, len(rows))
+    first_generation = last_generation - len(rows) + 1
+    changes = [
+        TvShowChange(operation, show_id, first_generation + index, values)
+        for index, (show_id, values) in enumerate(rows)
+    ]
+    changed_at = time.time()
+    await session.execute(
+        insert(ChangeLogModel),
+        [
+            {
+                "seq": change.generation,
+                "operation": operation,
+                "show_id": int(change.show_id),
+                "values": None if values is None else ujson.dumps(values),
+                "changed_at": changed_at,
+            }
+            for change, (_, values) in zip(changes, rows)
+        ],
+    )
+    session.info.setdefault(_CHANGES_KEY, []).extend(changes)
+    return changes
+
+
+def dispatch_deferred_changes(session: Session) -> None:
+    """
+    Pass changes committed by a session with deferred dispatch to listeners.
+
+    :param session: synchronous session.
+    """
+    changes = session.info.pop(_COMMITTED_KEY, None)
+    if changes:
+        _notify(changes)
+
+
+def _notify(changes: List[TvShowChange]) -> None:
+    for listener in list(_listeners):
+        listener(changes)
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_changes(session: Session) -> None:
+    changes = session.info.pop(_CHANGES_KEY, None)
+    if not changes:
+        return
+    if session.info.get(DEFER_DISPATCH):
+        session.info.setdefault(_COMMITTED_KEY, []).extend(changes)
+        return
+    _notify(changes)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_changes(session: Session, previous_transaction: Any) -> None:
+    if previous_transaction.parent is None:
+        session.info.pop(_CHANGES_KEY, None)
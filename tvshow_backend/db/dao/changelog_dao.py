@@ -0,0 +1,104 @@
+from typing import Any, List, Tuple, cast
+
+from fastapi import Depends
+from sqlalchemy import CursorResult, delete, func, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tvshow_backend.db.changes import CHANGELOG_FLOOR
+from tvshow_backend.db.dependencies import get_db_session
+from tvshow_backend.db.models.changelog_model import ChangeLogModel
+from tvshow_backend.db.models.generation_model import TableGenerationModel
+
+
+class ChangeLogDAO:
+    """Class for accessing the TV show changelog."""
+
+    def __init__(self, session: AsyncSession = Depends(get_db_session)):
+        self.session = session
+
+    async def get_changes(
+        self,
+        since: int,
+        limit: int,
+    ) -> Tuple[int, List[ChangeLogModel]]:
+        """
+        Get changes made after a generation.
+
+        :param since: last generation known to the caller.
+        :param limit: maximum amount of changes.
+        :return: generation up to which changes may be missing
+            and changes ordered by sequence number.
+        """
+        floor = await self.get_floor()
+        changes = await self.session.execute(
+            select(ChangeLogModel)
+            .where(ChangeLogModel.seq > max(since, floor))
+            .order_by(ChangeLogModel.seq)
+            .limit(limit),
+        )
+        return floor, list(changes.scalars())
+
+    async def get_floor(self) -> int:
+        """
+        Get the generation up to which changes may be missing.
+
+        :return: generation, 0 if the changelog is complete.
+        """
+        floor = await self.session.scalar(
+            select(TableGenerationModel.generation).where(
+                TableGenerationModel.table_name == CHANGELOG_FLOOR,
+            ),
+        )
+        return floor or 0
+
+    async def compact(self, before: float) -> int:
+        """
+        Remove changes superseded by a later change of the same show.
+
+        Clients reading a compacted range still end up with the same
+        catalog, they just skip intermediate versions of shows.
+
+        :param before: only changes made before this time are removed.
+        :return: amount of removed changes.
+        """
+        latest = select(func.max(ChangeLogModel.seq)).group_by(ChangeLogModel.show_id)
+        removed = await self.session.execute(
+            delete(ChangeLogModel).where(
+                ChangeLogModel.changed_at < before,
+                ChangeLogModel.seq.not_in(latest),
+            ),
+        )
+        return cast(CursorResult[Any], removed).rowcount
+
+    async def prune(self, before: float) -> int:
+        """
+        Remove all changes made before a time.
+
+        Clients that have not seen the removed changes have to fetch
+        the whole catalog again.
+
+        :param before: changes made before this time are removed.
+        :return: amount of removed changes.
+        """
+        last_seq = await self.session.scalar(
+            select(func.max(ChangeLogModel.seq)).where(
+                ChangeLogModel.changed_at < before,
+            ),
+        )
+        if last_seq is None:
+            return 0
+        removed = await self.session.execute(
+            delete(ChangeLogModel).where(ChangeLogModel.seq <= last_seq),
+        )
+        await self.session.execute(
+            insert(TableGenerationModel)
+            .values(table_name=CHANGELOG_FLOOR, generation=last_seq)
+            .on_conflict_do_update(
+                index_elements=[TableGenerationModel.table_name],
+                set_={
+                    "generation": func.max(TableGenerationModel.generation, last_seq),
+                },
+            ),
+        )
+        return cast(CursorResult[Any], removed).rowcount
@@ -0,0 +1,178 @@
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, cast
+
+import ujson
+from sqlalchemy import CursorResult, select, update
+from sqlalchemy.exc import NoResultFound
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tvshow_backend.db.models.job_model import JobModel
+from tvshow_backend.services.jobs import JobStatus
+
+# Jobs that are being executed by some process.
+ACTIVE = (JobStatus.RUNNING, JobStatus.CANCELLING)
+
+
+class JobDAO:
+    """Class for accessing the job table."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def create_job(self, kind: str, params: Dict[str, Any]) -> JobModel:
+        """
+        Add a queued job.
+
+        :param kind: kind of the job.
+        :param params: parameters of the job.
+        :return: new job with its id.
+        """
+        now = time.time()
+        job = JobModel(
+            kind=kind,
+            status=JobStatus.QUEUED.value,
+            params=ujson.dumps(params),
+            done=0,
+            created_at=now,
+            updated_at=now,
+        )
+        self.session.add(job)
+        await self.session.flush()
+        return job
+
+    async def get_job(self, job_id: int) -> JobModel:
+        """
+        Get a job.
+
+        :param job_id: id of the job.
+        :raises NoResultFound: if there is no such job.
+        :return: job.
+        """
+        job = await self.session.get(JobModel, job_id)
+        if job is None:
+            raise NoResultFound(f"No job found with ID {job_id}")
+        return job
+
+    async def claim_job(self, job_id: int) -> bool:
+        """
+        Mark a queued job as running.
+
+        Several processes may try to claim the same job, only one succeeds.
+
+        :param job_id: id of the job.
+        :return: whether the job was claimed.
+        """
+        now = time.time()
+        claimed = await self.session.execute(
+            update(JobModel)
+            .where(JobModel.id == job_id, JobModel.status == JobStatus.QUEUED.value)
+            .values(status=JobStatus.RUNNING.value, started_at=now, updated_at=now),
+        )
+        return bool(cast(CursorResult[Any], claimed).rowcount)
+
+    async def finish_job(
+        self,
+        job_id: int,
+        status: JobStatus,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """
+        Record the outcome of a job.
+
+        :param job_id: id of the job.
+        :param status: final status.
+        :param result: result of a succeeded job.
+        :param error: description of a failure.
+        """
+        now = time.time()
+        await self.session.execute(
+            update(JobModel)
+            .where(JobModel.id == job_id)
+            .values(
+                status=status.value,
+                result=None if result is None else ujson.dumps(result),
+                error=error,
+                finished_at=now,
+                updated_at=now,
+            ),
+        )
+
+    async def requeue_jobs(self, job_ids: Iterable[int]) -> None:
+        """
+        Put interrupted jobs back to the queue.
+
+        :param job_ids: ids of the jobs.
+        """
+        await self.session.execute(
+            update(JobModel)
+            .where(JobModel.id.in_(list(job_ids)), JobModel.status.in_(ACTIVE))
+            .values(status=JobStatus.QUEUED.value, started_at=None, done=0),
+        )
+
+    async def cancel_job(self, job_id: int) -> JobModel:
+        """
+        Request cancellation of a job.
+
+        Queued jobs are cancelled right away, running ones are cancelled
+        by the process executing them.
+
+        :param job_id: id of the job.
+        :return: job with its new status.
+        """
+        job = await self.get_job(job_id)
+        if job.status == JobStatus.QUEUED.value:
+            job.status = JobStatus.CANCELLED.value
+            job.finished_at = time.time()
+        elif job.status == JobStatus.RUNNING.value:
+            job.status = JobStatus.CANCELLING.value
+        await self.session.flush()
+        return job
+
+    async def save_progress(
+        self,
+        progress: Dict[int, Tuple[int, Optional[int]]],
+    ) -> Set[int]:
+        """
+        Store progress of running jobs.
+
+        :param progress: amount of processed items and total by job id.
+        :return: ids of the jobs whose cancellation was requested.
+        """
+        now = time.time()
+        for job_id, (done, total) in progress.items():
+            await self.session.execute(
+                update(JobModel)
+                .where(JobModel.id == job_id)
+                .values(done=done, total=total, updated_at=now),
+            )
+        cancelling = await self.session.execute(
+            select(JobModel.id).where(
+                JobModel.id.in_(list(progress)),
+                JobModel.status == JobStatus.CANCELLING.value,
+            ),
+        )
+        return set(cancelling.scalars())
+
+    async def recover_jobs(self, stale_before: float) -> List[int]:
+        """
+        Fail jobs of crashed processes and find queued jobs.
+
+        :param stale_before: running jobs not updated since then are failed.
+        :return: ids of queued jobs, oldest first.
+        """
+        await self.session.execute(
+            update(JobModel)
+            .where(JobModel.status.in_(ACTIVE), JobModel.updated_at < stale_before)
+            .values(
+                status=JobStatus.FAILED.value,
+                error="Interrupted",
+                finished_at=time.time(),
+            ),
+        )
+        queued = await self.session.execute(
+            select(JobModel.id)
+            .where(JobModel.status == JobStatus.QUEUED.value)
+            .order_by(JobModel.id),
+        )
+        return list(queued.scalars())
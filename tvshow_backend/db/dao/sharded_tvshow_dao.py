@@ -0,0 +1,408 @@
+"""
+Access to TV shows stored in several shards.
+
+Calls for a single show go to its shard. Other reads are scattered to
+every shard concurrently and their results gathered: counts are added up
+and pages are merge-sorted. A page at ``offset`` is found among the first
+``offset + limit`` shows of every shard, which each shard reads from an
+index in the same order. Writes take the writer lock of their shard and
+commit right away, bulk writes hold the locks of all shards and commit
+only when every shard succeeded.
+"""
+import asyncio
+import heapq
+import itertools
+from collections import defaultdict
+from contextlib import AsyncExitStack
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    TypeVar,
+)
+
+from fastapi import Depends
+from sqlalchemy import select, text
+from sqlalchemy.exc import NoResultFound
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
+
+from tvshow_backend.db.dao.tvshow_dao import TooManyRowsError, TvShowDAO, TvShowFilter
+from tvshow_backend.db.dependencies import get_db_session
+from tvshow_backend.db.models.tvshow_model import TvShowModel
+from tvshow_backend.db.sharding import ShardSet
+
+ReturnType = TypeVar("ReturnType")
+ShardCall = Callable[[TvShowDAO], Awaitable[ReturnType]]
+
+
+def _sort_key(sort: str) -> Callable[[TvShowModel], Any]:
+    def key(show: TvShowModel) -> Any:  # noqa: WPS430
+        value = getattr(show, sort)
+        # SQLite sorts NULL before any other value.
+        return (value is not None, value, show.show_id)
+
+    return key
+
+
+def _page(
+    pages: Iterable[List[TvShowModel]],
+    offset: int,
+    limit: int,
+    sort: str = "show_id",
+    descending: bool = False,
+) -> List[TvShowModel]:
+    """
+    Merge sorted pages of shards into a page of the whole catalog.
+
+    :param pages: first ``offset + limit`` shows of every shard.
+    :param offset: offset of TV Shows.
+    :param limit: limit of TV Shows.
+    :param sort: name of the column pages are sorted by.
+    :param descending: whether pages are sorted in descending order.
+    :return: page of TV Shows.
+    """
+    merged = heapq.merge(*pages, key=_sort_key(sort), reverse=descending)
+    return list(itertools.islice(merged, offset, offset + limit))
+
+
+async def _first_shows(
+    dao: TvShowDAO,
+    amount: Optional[int] = None,
+) -> List[TvShowModel]:
+    query = select(TvShowModel).order_by(TvShowModel.show_id)
+    if amount is not None:
+        query = query.limit(amount)
+    raw_tv_shows = await dao.session.execute(query)
+    return list(raw_tv_shows.scalars().fetchall())
+
+
+def _titles(show_ids: List[int]) -> ShardCall[Dict[int, str]]:
+    return lambda dao: dao.get_titles(show_ids)
+
+
+class ShardedTvShowDAO(TvShowDAO):
+    """Class for accessing the TV Show table split into shards."""
+
+    def __init__(self, shards: ShardSet) -> None:
+        self.shards = shards
+
+    async def create_tv_show_model(  # noqa: WPS211
+        self,
+        show_id: int,
+        type: str,
+        genre: str,
+        title: str,
+        director: str,
+        cast: str,
+        country: str,
+        date_added: str,
+        release_year: int,
+        rating: str,
+        duration: str,
+    ) -> None:
+        """
+        Add single TV Show to its shard.
+
+        :param show_id: Unique ID for every Movie / Tv Show
+        :param type: Identifier - A Movie or TV Show
+        :param genre: Genre of the Movie / Tv Show
+        :param title: Title of the Movie / Tv Show
+        :param director: Director of the Movie
+        :param cast: Actors involved in the movie / show
+        :param country: Country where the movie / show was produced
+        :param date_added: Date it was released
+        :param release_year: Actual Release year of the move / show
+        :param rating: TV Rating of the movie / show
+        :param duration: Total Duration - in minutes or number of seasons
+        """
+        values: Dict[str, Any] = {
+            "show_id": show_id,
+            "type": type,
+            "genre": genre,
+            "title": title,
+            "director": director,
+            "cast": cast,
+            "country": country,
+            "date_added": date_added,
+            "release_year": release_year,
+            "rating": rating,
+            "duration": duration,
+        }
+        await self._write(
+            show_id,
+            lambda dao: dao.create_tv_show_model(**values),
+        )
+
+    async def get_all_tv_shows(self, limit: int, offset: int) -> List[TvShowModel]:
+        """
+        Get all TV Show models with limit/offset pagination.
+
+        :param limit: limit of TV Shows.
+        :param offset: offset of TV Shows.
+        :raises NoResultFound: if the page is empty.
+        :return: TV Shows ordered by id.
+        """
+        pages = await self._scatter(
+            lambda dao: _first_shows(dao, offset + limit),
+        )
+        found_tv_shows = _page(pages, offset, limit)
+        if not found_tv_shows:
+            raise NoResultFound("No TV shows found in the database.")
+        return found_tv_shows
+
+    async def get_tv_show_by_id(self, show_id: int) -> TvShowModel:
+        """
+        Get specific TV Show model from its shard.
+
+        :param show_id: show_id of TV Show instance.
+        :return: TV Show model.
+        """
+        return await self._read(
+            self.shards.shard_of(show_id),
+            lambda dao: dao.get_tv_show_by_id(show_id),
+        )
+
+    async def get_titles(self, show_ids: List[int]) -> Dict[int, str]:
+        """
+        Get titles of several TV Shows from their shards.
+
+        :param show_ids: ids of TV Shows.
+        :return: titles by show id, missing shows are skipped.
+        """
+        by_shard: Dict[int, List[int]] = defaultdict(list)
+        for show_id in show_ids:
+            by_shard[self.shards.shard_of(show_id)].append(show_id)
+        found = await asyncio.gather(
+            *(self._read(index, _titles(ids)) for index, ids in by_shard.items()),
+        )
+        titles: Dict[int, str] = {}
+        for shard_titles in found:
+            titles.update(shard_titles)
+        return titles
+
+    async def search_tv_show_by_genre(  # noqa: WPS211
+        self,
+        genres: Sequence[str],
+        match_all: bool = False,
+        limit: int = 20,
+        offset: int = 0,
+        sort: str = "show_id",
+        descending: bool = False,
+    ) -> List[TvShowModel]:
+        """
+        Get a page of TV Shows having any or all of several genres.
+
+        :param genres: genres to look for.
+        :param match_all: whether shows must have all of the genres.
+        :param limit: limit of TV Shows.
+        :param offset: offset of TV Shows.
+        :param sort: name of the column to sort by, one of ``SORT_COLUMNS``.
+        :param descending: whether to sort in descending order.
+        :return: page of TV Shows, empty if none match.
+        """
+        pages = await self._scatter(
+            lambda dao: dao.search_tv_show_by_genre(
+                genres,
+                match_all=match_all,
+                limit=offset + limit,
+                sort=sort,
+                descending=descending,
+            ),
+        )
+        return _page(pages, offset, limit, sort, descending)
+
+    async def update_tv_show_model(  # noqa: WPS211
+        self,
+        show_id: int,
+        type: str,
+        genre: str,
+        title: str,
+        director: str,
+        cast: str,
+        country: str,
+        date_added: str,
+        release_year: int,
+        rating: str,
+        duration: str,
+    ) -> None:
+        """
+        Update specific TV Show model in its shard.
+
+        :param show_id: show_id of TV Show instance.
+        :param type: Identifier - A Movie or TV Show
+        :param genre: Genre of the Movie / Tv Show
+        :param title: Title of the Movie / Tv Show
+        :param director: Director of the Movie
+        :param cast: Actors involved in the movie / show
+        :param country: Country where the movie / show was produced
+        :param date_added: Date it was released
+        :param release_year: Actual Release year of the move / show
+        :param rating: TV Rating of the movie / show
+        :param duration: Total Duration - in minutes or number of seasons
+        """
+        values: Dict[str, Any] = {
+            "show_id": show_id,
+            "type": type,
+            "genre": genre,
+            "title": title,
+            "director": director,
+            "cast": cast,
+            "country": country,
+            "date_added": date_added,
+            "release_year": release_year,
+            "rating": rating,
+            "duration": duration,
+        }
+        await self._write(
+            show_id,
+            lambda dao: dao.update_tv_show_model(**values),
+        )
+
+    async def delete_tv_show_model(self, show_id: int) -> None:
+        """
+        Delete specific TV Show model from its shard.
+
+        :param show_id: show_id of TV Show instance.
+        """
+        await self._write(
+            show_id,
+            lambda dao: dao.delete_tv_show_model(show_id=show_id),
+        )
+
+    async def filter(self, show_id: Optional[int] = None) -> List[TvShowModel]:
+        """
+        Get specific TV Show model, or all of them.
+
+        :param show_id: show_id of TV Show instance.
+        :return: TV Show models ordered by id.
+        """
+        if show_id:
+            return await self._read(
+                self.shards.shard_of(show_id),
+                lambda dao: dao.filter(show_id=show_id),
+            )
+        shows = await self._scatter(_first_shows)
+        return list(heapq.merge(*shows, key=_sort_key("show_id")))
+
+    async def count_matching(self, show_filter: TvShowFilter) -> int:
+        """
+        Count TV Shows matching a filter in every shard.
+
+        :param show_filter: conditions selecting shows.
+        :return: amount of matching shows.
+        """
+        return sum(await self._scatter(lambda dao: dao.count_matching(show_filter)))
+
+    async def bulk_update(
+        self,
+        show_filter: TvShowFilter,
+        values: Dict[str, Any],
+        max_rows: int,
+    ) -> int:
+        """
+        Update all TV Shows matching a filter in every shard.
+
+        :param show_filter: conditions selecting shows.
+        :param values: new values of columns.
+        :param max_rows: maximum amount of updated shows.
+        :return: amount of updated shows.
+        """
+        return await self._write_all(
+            lambda dao: dao.bulk_update(show_filter, values, max_rows),
+            max_rows,
+        )
+
+    async def bulk_delete(self, show_filter: TvShowFilter, max_rows: int) -> int:
+        """
+        Delete all TV Shows matching a filter in every shard.
+
+        :param show_filter: conditions selecting shows.
+        :param max_rows: maximum amount of deleted shows.
+        :return: amount of deleted shows.
+        """
+        return await self._write_all(
+            lambda dao: dao.bulk_delete(show_filter, max_rows),
+            max_rows,
+        )
+
+    async def _read(self, index: int, call: ShardCall[ReturnType]) -> ReturnType:
+        async with self.shards.sessions[index]() as session:
+            return await call(TvShowDAO(session))
+
+    async def _scatter(self, call: ShardCall[ReturnType]) -> List[ReturnType]:
+        return list(
+            await asyncio.gather(
+                *(self._read(index, call) for index in range(len(self.shards))),
+            ),
+        )
+
+    async def _write(self, show_id: int, call: ShardCall[ReturnType]) -> ReturnType:
+        index = self.shards.shard_of(show_id)
+        async with self.shards.writer(index):
+            async with self.shards.sessions[index]() as session:
+                written = await call(TvShowDAO(session))
+                await session.commit()
+        return written
+
+    async def _write_all(self, call: ShardCall[int], max_rows: int) -> int:
+        """
+        Run a bulk write in every shard and commit it if it succeeded in all.
+
+        Commits of shards are not atomic, a shard failing to commit leaves
+        the other shards changed.
+
+        :param call: bulk write of a single shard.
+        :param max_rows: maximum amount of changed shows in all shards.
+        :raises TooManyRowsError: if more shows match, nothing is changed then.
+        :return: amount of changed shows.
+        """
+        async with AsyncExitStack() as stack:
+            sessions: List[AsyncSession] = []
+            # Locks are taken in the same order by everyone, so they never
+            # wait for each other.
+            for index in range(len(self.shards)):
+                await stack.enter_async_context(self.shards.writer(index))
+                session = await stack.enter_async_context(
+                    self.shards.sessions[index](),
+                )
+                # pysqlite starts no transaction for a savepoint, releasing
+                # the savepoint of a bulk write would commit it right away.
+                await session.execute(text("BEGIN IMMEDIATE"))
+                sessions.append(session)
+            results = await asyncio.gather(
+                *(call(TvShowDAO(session)) for session in sessions),
+                return_exceptions=True,
+            )
+            changed = 0
+            for shard_result in results:
+                if isinstance(shard_result, BaseException):
+                    raise shard_result
+                changed += shard_result
+            if changed > max_rows:
+                raise TooManyRowsError(changed)
+            for shard_session in sessions:
+                await shard_session.commit()
+        return changed
+
+
+def get_tvshow_dao(
+    request: Request,
+    session: AsyncSession = Depends(get_db_session),
+) -> TvShowDAO:
+    """
+    Returns the DAO of TV shows, routing to shards when the catalog has them.
+
+    :param request: current request.
+    :param session: database session of the request.
+    :return: DAO for tvshow models.
+    """
+    shards: Optional[ShardSet] = getattr(request.app.state, "db_shards", None)
+    if shards is None:
+        return TvShowDAO(session)
+    return ShardedTvShowDAO(shards)
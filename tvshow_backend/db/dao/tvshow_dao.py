@@ -1,20 +1,130 @@
-from typing import List, Optional
+import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
 
 from fastapi import Depends
-from sqlalchemy import delete, func, select, update
+from sqlalchemy import ColumnElement, delete, func, literal, select, update
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
+from tvshow_backend.db.changes import CREATE, DELETE, UPDATE, record_changes
 from tvshow_backend.db.dependencies import get_db_session
-from tvshow_backend.db.models.tvshow_model import TvShowModel
+from tvshow_backend.db.models.tvshow_genre_model import TvShowGenreModel
+from tvshow_backend.db.models.tvshow_model import TvShowModel, parse_date_added
+from tvshow_backend.db.threaded import batched, batched_write
+
+# Columns exposed by the API and stored in the changelog.
+API_COLUMNS = [
+    column for column in TvShowModel.__table__.columns if column.name != "added_on"
+]
+
+# Columns pages of TV shows can be sorted by, ties are broken by show_id.
+SORT_COLUMNS = {
+    "show_id": TvShowModel.show_id,
+    "title": TvShowModel.title,
+    "release_year": TvShowModel.release_year,
+    "added_on": TvShowModel.added_on,
+}
+
+
+class TooManyRowsError(Exception):
+    """A bulk operation matched more shows than allowed."""
+
+    def __init__(self, matched: int) -> None:
+        super().__init__(f"{matched} TV shows match the filter")
+        self.matched = matched
+
+
+def _contains_item(column: Any, item: str) -> ColumnElement[bool]:
+    """
+    Check that a comma separated list contains an item, ignoring case.
+
+    :param column: column with a list like ``"Drama, Comedy"``.
+    :param item: item to look for.
+    :return: SQL condition.
+    """
+    escaped = item.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    padded = literal(", ") + column + literal(", ")
+    return padded.like(f"%, {escaped}, %", escape="\\")
+
+
+def _has_genre(show_id: Any, genre: str) -> ColumnElement[bool]:
+    """
+    Check in the genre index that a show has a genre.
+
+    :param show_id: column with ids of shows.
+    :param genre: normalized genre.
+    :return: SQL condition.
+    """
+    other = aliased(TvShowGenreModel)
+    return (
+        select(other.show_id)
+        .where(other.genre == genre, other.show_id == show_id)
+        .exists()
+    )
+
+
+def normalize_genre(genre: str) -> str:
+    """
+    Normalize a genre like the triggers filling the genre index.
+
+    SQLite ``trim`` only removes spaces and ``lower`` only folds ASCII letters.
+
+    :param genre: genre as written by a client.
+    :return: genre as stored in the index.
+    """
+    return "".join(
+        char.lower() if char.isascii() else char for char in genre.strip(" ")
+    )
+
+
+class TvShowFilter(NamedTuple):
+    """Conditions selecting TV shows, unset conditions match every show."""
+
+    genre: Optional[str] = None
+    type: Optional[str] = None
+    country: Optional[str] = None
+    release_year_from: Optional[int] = None
+    release_year_to: Optional[int] = None
+    added_from: Optional[datetime.date] = None
+    added_to: Optional[datetime.date] = None
+
+    def clauses(self) -> List[ColumnElement[bool]]:
+        """
+        Build SQL conditions of the filter.
+
+        :return: conditions that must all hold.
+        """
+        clauses = []
+        if self.genre is not None:
+            clauses.append(_contains_item(TvShowModel.genre, self.genre))
+        if self.country is not None:
+            clauses.append(_contains_item(TvShowModel.country, self.country))
+        if self.type is not None:
+            clauses.append(func.lower(TvShowModel.type) == self.type.lower())
+        if self.release_year_from is not None:
+            clauses.append(TvShowModel.release_year >= self.release_year_from)
+        if self.release_year_to is not None:
+            clauses.append(TvShowModel.release_year <= self.release_year_to)
+        if self.added_from is not None:
+            clauses.append(TvShowModel.added_on >= self.added_from)
+        if self.added_to is not None:
+            clauses.append(TvShowModel.added_on <= self.added_to)
+        return clauses
 
 
 class TvShowDAO:
-    """Class for accessing TV Show table."""
+    """
+    Class for accessing TV Show table.
+
+    Every method runs in a single hop to the pool of threads
+    when the session is threaded.
+    """
 
     def __init__(self, session: AsyncSession = Depends(get_db_session)):
         self.session = session
 
+    @batched_write
     async def create_tv_show_model(
         self,
         show_id: int,
@@ -51,22 +161,25 @@ class TvShowDAO:
         if existing_show.scalars().first():
             raise ValueError("A TV show with this ID already exists.")
 
+        values: Dict[str, Any] = {
+            "show_id": show_id,
+            "type": type,
+            "genre": genre,
+            "title": title,
+            "director": director,
+            "cast": cast,
+            "country": country,
+            "date_added": date_added,
+            "release_year": release_year,
+            "rating": rating,
+            "duration": duration,
+        }
         self.session.add(
-            TvShowModel(
-                show_id=show_id,
-                type=type,
-                genre=genre,
-                title=title,
-                director=director,
-                cast=cast,
-                country=country,
-                date_added=date_added,
-                release_year=release_year,
-                rating=rating,
-                duration=duration,
-            ),
+            TvShowModel(**values, added_on=parse_date_added(date_added)),
         )
+        await record_changes(self.session, CREATE, [(show_id, values)])
 
+    @batched
     async def get_all_tv_shows(self, limit: int, offset: int) -> List[TvShowModel]:
         """
         Get all TV Show models with limit/offset pagination.
@@ -93,6 +206,7 @@ class TvShowDAO:
             raise NoResultFound("No TV shows found in the database.")
         return found_tv_shows
 
+    @batched
     async def get_tv_show_by_id(self, show_id: int) -> TvShowModel:
         """
         Get specific TV Show model.
@@ -108,21 +222,78 @@ class TvShowDAO:
             raise NoResultFound(f"No TV show found with ID {show_id}")
         return found_tv_show
 
-    async def search_tv_show_by_genre(self, genre: str) -> List[TvShowModel]:
+    @batched
+    async def get_titles(self, show_ids: List[int]) -> Dict[int, str]:
         """
-        Get specific TV Show model.
+        Get titles of several TV Shows.
 
-        :param genre: genre of TV Show instance.
-        :return: TV Show model.
+        :param show_ids: ids of TV Shows.
+        :return: titles by show id, missing shows are skipped.
         """
-        raw_tv_show = await self.session.execute(
-            select(TvShowModel).where(TvShowModel.genre == genre),
+        rows = await self.session.execute(
+            select(TvShowModel.show_id, TvShowModel.title).where(
+                TvShowModel.show_id.in_(show_ids),
+            ),
         )
-        found_tv_show = list(raw_tv_show.scalars().fetchall())
-        if not found_tv_show:
-            raise NoResultFound(f"No TV shows found with genre {genre}")
-        return found_tv_show
+        return {show_id: title for show_id, title in rows}
+
+    @batched
+    async def search_tv_show_by_genre(
+        self,
+        genres: Sequence[str],
+        match_all: bool = False,
+        limit: int = 20,
+        offset: int = 0,
+        sort: str = "show_id",
+        descending: bool = False,
+    ) -> List[TvShowModel]:
+        """
+        Get a page of TV Shows having any or all of several genres.
+
+        Genres are compared ignoring case and looked up in the genre index.
+
+        :param genres: genres to look for.
+        :param match_all: whether shows must have all of the genres.
+        :param limit: limit of TV Shows.
+        :param offset: offset of TV Shows.
+        :param sort: name of the column to sort by, one of ``SORT_COLUMNS``.
+        :param descending: whether to sort in descending order.
+        :return: page of TV Shows, empty if none match.
+        """
+        names = sorted({normalize_genre(genre) for genre in genres} - {""})
+        if not names:
+            return []
+        show_id: Any = TvShowModel.show_id
+        if match_all or len(names) == 1:
+            # Walks the index of the first genre in show_id order.
+            show_id = TvShowGenreModel.show_id
+            query = (
+                select(TvShowModel)
+                .join(TvShowGenreModel, show_id == TvShowModel.show_id)
+                .where(TvShowGenreModel.genre == names[0])
+                .where(*(_has_genre(show_id, name) for name in names[1:]))
+            )
+        else:
+            query = select(TvShowModel).where(
+                TvShowModel.show_id.in_(
+                    select(TvShowGenreModel.show_id).where(
+                        TvShowGenreModel.genre.in_(names),
+                    ),
+                ),
+            )
+        order = [show_id]
+        if sort != "show_id":
+            order.insert(0, SORT_COLUMNS[sort])
+        raw_tv_shows = await self.session.execute(
+            query.order_by(
+                *(column.desc() if descending else column for column in order),
+            )
+            .limit(limit)
+            .offset(offset),
+        )
+        return list(raw_tv_shows.scalars().fetchall())
 
+    @batched_write
     async def update_tv_show_model(
         self,
         show_id: int,
@@ -162,23 +333,30 @@ class TvShowDAO:
                 f"Could not update, TV show with ID {show_id} not found",
             )
 
+        values: Dict[str, Any] = {
+            "type": type,
+            "genre": genre,
+            "title": title,
+            "director": director,
+            "cast": cast,
+            "country": country,
+            "date_added": date_added,
+            "release_year": release_year,
+            "rating": rating,
+            "duration": duration,
+        }
         await self.session.execute(
             update(TvShowModel)
             .where(TvShowModel.show_id == show_id)
-            .values(
-                type=type,
-                genre=genre,
-                title=title,
-                director=director,
-                cast=cast,
-                country=country,
-                date_added=date_added,
-                release_year=release_year,
-                rating=rating,
-                duration=duration,
-            ),
+            .values(**values, added_on=parse_date_added(date_added)),
+        )
+        await record_changes(
+            self.session,
+            UPDATE,
+            [(show_id, {"show_id": show_id, **values})],
         )
 
+    @batched_write
     async def delete_tv_show_model(self, show_id: int) -> None:
         """
         Delete specific TV Show model.
@@ -193,7 +371,9 @@ class TvShowDAO:
         # If no rows were deleted, it means no TV show with the given ID exists
         if found_tv_show.rowcount == 0:
             raise NoResultFound(f"No TV show found with ID {show_id}")
+        await record_changes(self.session, DELETE, [(show_id, None)])
 
+    @batched
     async def filter(self, show_id: Optional[int] = None) -> List[TvShowModel]:
         """
         Get specific TV Show model.
@@ -206,3 +386,77 @@ class TvShowDAO:
             query = query.where(TvShowModel.show_id == show_id)
         found_tv_shows = await self.session.execute(query)
         return list(found_tv_shows.scalars().fetchall())
+
+    @batched
+    async def count_matching(self, show_filter: TvShowFilter) -> int:
+        """
+        Count TV Shows matching a filter.
+
+        :param show_filter: conditions selecting shows.
+        :return: amount of matching shows.
+        """
+        matched = await self.session.execute(
+            select(func.count()).select_from(TvShowModel).where(*show_filter.clauses()),
+        )
+        return matched.scalar_one()
+
+    @batched_write
+    async def bulk_update(
+        self,
+        show_filter: TvShowFilter,
+        values: Dict[str, Any],
+        max_rows: int,
+    ) -> int:
+        """
+        Update all TV Shows matching a filter with one statement.
+
+        :param show_filter: conditions selecting shows.
+        :param values: new values of columns.
+        :param max_rows: maximum amount of updated shows.
+        :raises TooManyRowsError: if more shows match, nothing is updated then.
+        :return: amount of updated shows.
+        """
+        if "date_added" in values:
+            values = {**values, "added_on": parse_date_added(values["date_added"])}
+        async with self.session.begin_nested():
+            updated = await self.session.execute(
+                update(TvShowModel)
+                .where(*show_filter.clauses())
+                .values(**values)
+                .returning(*API_COLUMNS),
+            )
+            rows = updated.mappings().all()
+            if len(rows) > max_rows:
+                raise TooManyRowsError(len(rows))
+        await record_changes(
+            self.session,
+            UPDATE,
+            [(row["show_id"], dict(row)) for row in rows],
+        )
+        return len(rows)
+
+    @batched_write
+    async def bulk_delete(self, show_filter: TvShowFilter, max_rows: int) -> int:
+        """
+        Delete all TV Shows matching a filter with one statement.
+
+        :param show_filter: conditions selecting shows.
+        :param max_rows: maximum amount of deleted shows.
+        :raises TooManyRowsError: if more shows match, nothing is deleted then.
+        :return: amount of deleted shows.
+        """
+        async with self.session.begin_nested():
+            deleted = await self.session.execute(
+                delete(TvShowModel)
+                .where(*show_filter.clauses())
+                .returning(TvShowModel.show_id),
+            )
+            show_ids = list(deleted.scalars())
+            if len(show_ids) > max_rows:
+                raise TooManyRowsError(len(show_ids))
+        await record_changes(
+            self.session,
+            DELETE,
+            [(show_id, None) for show_id in show_ids],
+        )
+        return len(show_ids)
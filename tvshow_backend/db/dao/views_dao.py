@@ -0,0 +1,47 @@
+from typing import Dict, List, Mapping, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tvshow_backend.db.models.tvshow_views_model import TvShowViewsModel
+
+
+class TvShowViewsDAO:
+    """Class for accessing view counts of TV shows."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def add_views(self, views: Mapping[int, int]) -> Dict[int, int]:
+        """
+        Add views to several TV shows with a batched upsert.
+
+        :param views: new views by show id.
+        :return: total views of the same shows.
+        """
+        if not views:
+            return {}
+        statement = insert(TvShowViewsModel)
+        rows = await self.session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[TvShowViewsModel.show_id],
+                set_={"views": TvShowViewsModel.views + statement.excluded.views},
+            ).returning(TvShowViewsModel.show_id, TvShowViewsModel.views),
+            [{"show_id": show_id, "views": count} for show_id, count in views.items()],
+        )
+        return {show_id: total for show_id, total in rows}
+
+    async def get_most_viewed(self, limit: int) -> List[Tuple[int, int]]:
+        """
+        Get the most viewed TV shows.
+
+        :param limit: maximum amount of shows.
+        :return: show ids with their views, most viewed first.
+        """
+        rows = await self.session.execute(
+            select(TvShowViewsModel.show_id, TvShowViewsModel.views)
+            .order_by(TvShowViewsModel.views.desc(), TvShowViewsModel.show_id)
+            .limit(limit),
+        )
+        return [(show_id, views) for show_id, views in rows]
@@ -11,7 +11,7 @@ async def get_db_session(request: Request) -> AsyncGenerator[AsyncSession, None]
     :param request: current request.
     :yield: database session.
     """
-    session: AsyncSession = request.app.state.db_session_factory()
+    session: AsyncSession = request.app.state.db_request_session_factory()
 
     try:  # noqa: WPS501
         yield session
@@ -0,0 +1,47 @@
+"""
+Interrupting queries of cancelled tasks.
+
+Queries run in other threads than the event loop, so cancelling the task
+awaiting a query leaves the query running. aiosqlite only closes the
+connection SQLAlchemy invalidates on cancellation after the query finished,
+and the threadpool backend keeps its thread busy until then. Interrupted
+queries fail right away instead and release their connection:
+
+* aiosqlite connections are interrupted as soon as SQLAlchemy sees the
+  cancellation. ``sqlite3.Connection.interrupt`` may be called from any
+  thread and only stops statements of its own connection.
+* Connections of the threadpool backend run a progress handler checking
+  whether the call running in their thread was cancelled.
+"""
+import asyncio
+
+from sqlalchemy import Engine, event
+from sqlalchemy.engine import ExceptionContext
+
+
+class QueryInterrupts:
+    """Queries interrupted because their task was cancelled."""
+
+    count = 0
+
+
+interrupts = QueryInterrupts()
+
+
+@event.listens_for(Engine, "handle_error")
+def _interrupt_cancelled_query(context: ExceptionContext) -> None:
+    """
+    Interrupt the query of an aiosqlite connection whose task was cancelled.
+
+    :param context: context of the exception raised by the query.
+    """
+    cancelled = isinstance(context.original_exception, asyncio.CancelledError)
+    if not cancelled or context.connection is None:
+        return
+    driver_connection = context.connection.connection.driver_connection
+    # aiosqlite passes calls to a sqlite3 connection in a thread of its own.
+    sqlite_connection = getattr(driver_connection, "_conn", None)
+    if sqlite_connection is None:
+        return
+    sqlite_connection.interrupt()
+    interrupts.count += 1
@@ -0,0 +1,168 @@
+"""
+Serving the database from memory.
+
+With ``db_in_memory`` the database is loaded from ``db_file`` into an
+in-memory SQLite database at startup and every query of the process runs
+against it. ``MemoryDatabase`` keeps the in-memory database alive with a
+connection of its own and writes snapshots of it to ``db_file`` with the
+online backup API: every ``interval`` seconds when something was committed
+since the previous snapshot, and on shutdown. A crash loses at most the
+writes committed during the last ``interval`` seconds.
+
+The in-memory database is copied into a second one first, which only
+takes a moment, so writers are not blocked while the snapshot is written
+to disk. The snapshot is written to a temporary file next to ``db_file``
+and renamed over it, so ``db_file`` always holds a complete snapshot.
+A temporary file left by a crash is removed on the next start.
+"""
+import asyncio
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from loguru import logger
+
+# Databases of the memdb VFS are shared by connections of the process
+# and, unlike shared cache ones, wait for locks with the busy timeout.
+MEMORY_URI = "file:/tvshow_backend?vfs=memdb"
+
+
+class MemoryDatabase:
+    """In-memory copy of a database file with periodic snapshots."""
+
+    def __init__(
+        self,
+        db_file: Path,
+        interval: float,
+        uri: str = MEMORY_URI,
+    ) -> None:
+        self.db_file = db_file
+        # Seconds between snapshots, 0 only takes one on shutdown.
+        self.interval = interval
+        self.uri = uri
+        self.snapshots = 0
+        self._connection: Optional[sqlite3.Connection] = None
+        self._data_version: Optional[int] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    @property
+    def snapshot_file(self) -> Path:
+        """
+        Temporary file a snapshot is written to.
+
+        :return: path next to the database file.
+        """
+        return self.db_file.with_name(f"{self.db_file.name}.snapshot")
+
+    async def start(self) -> None:
+        """Load the database file into memory and start taking snapshots."""
+        await asyncio.to_thread(self.load)
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop taking snapshots, take the last one and free the memory."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass  # noqa: WPS420
+            self._task = None
+        await asyncio.to_thread(self.close)
+
+    def load(self) -> None:
+        """Recover from an interrupted snapshot and load the database file."""
+        for leftover in self._temporary_files():
+            if leftover.exists():
+                logger.warning("Removing incomplete snapshot {}", leftover)
+                leftover.unlink()
+        started = time.perf_counter()
+        connection = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+        if self.db_file.exists():
+            source = sqlite3.connect(self.db_file)
+            try:
+                source.backup(connection)
+            finally:
+                source.close()
+        self._connection = connection
+        self._data_version = self._read_data_version()
+        logger.info(
+            "Loaded {} into memory in {:.1f}ms",
+            self.db_file,
+            (time.perf_counter() - started) * 1000,
+        )
+
+    def snapshot(self) -> bool:
+        """
+        Write the in-memory database to the database file if it changed.
+
+        :raises RuntimeError: if the database is not loaded.
+        :return: whether a snapshot was written.
+        """
+        if self._connection is None:
+            raise RuntimeError("The in-memory database is not loaded")
+        data_version = self._read_data_version()
+        if data_version == self._data_version:
+            return False
+        copy = sqlite3.connect(":memory:")
+        try:
+            self._connection.backup(copy)
+            target = sqlite3.connect(self.snapshot_file)
+            try:
+                copy.backup(target)
+            finally:
+                target.close()
+        finally:
+            copy.close()
+        os.replace(self.snapshot_file, self.db_file)
+        _sync_directory(self.db_file.parent)
+        self._data_version = data_version
+        self.snapshots += 1
+        return True
+
+    def close(self) -> None:
+        """Take the last snapshot and close the in-memory database."""
+        if self._connection is None:
+            return
+        try:
+            self.snapshot()
+        finally:
+            self._connection.close()
+            self._connection = None
+
+    def _read_data_version(self) -> int:
+        # Changes whenever another connection commits.
+        row = self._connection.execute(  # type: ignore[union-attr]
+            "PRAGMA data_version",
+        ).fetchone()
+        return int(row[0])
+
+    def _temporary_files(self) -> List[Path]:
+        journal = self.snapshot_file.with_name(f"{self.snapshot_file.name}-journal")
+        return [self.snapshot_file, journal]
+
+    async def _run(self) -> None:
+        while True:  # noqa: WPS457
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.snapshot)
+            except (sqlite3.Error, OSError) as exc:
+                logger.warning("Cannot write a snapshot of the database: {}", exc)
+
+
+def _sync_directory(directory: Path) -> None:
+    """
+    Make a rename in the directory durable.
+
+    :param directory: directory of the renamed file.
+    """
+    if os.name != "posix":
+        return
+    descriptor = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
@@ -0,0 +1,264 @@
+"""
+Online migration of the TV show table to typed columns.
+
+Databases created before ``show_id`` became an integer primary key store
+it as text and have no ``added_on`` column. SQLite can't change the type
+of a primary key in place, so the table is rebuilt::
+
+    python -m tvshow_backend.db.migrate
+
+Shows are copied to a new table in small transactions, so running workers
+keep serving reads and writes during the copy. Shows written meanwhile are
+found in the changelog and copied again in the final transaction, which
+also replaces the old table with the new one.
+"""
+import argparse
+import sqlite3
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional, Sequence
+
+from sqlalchemy import MetaData, Table
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from tvshow_backend.db.changes import CHANGELOG_FLOOR, TVSHOW_TABLE
+from tvshow_backend.db.models.changelog_model import ChangeLogModel
+from tvshow_backend.db.models.generation_model import TableGenerationModel
+from tvshow_backend.db.models.tvshow_model import TvShowModel, parse_date_added
+from tvshow_backend.settings import settings
+
+BATCH_SIZE = 10_000
+# Seconds to wait for locks held by running workers.
+BUSY_TIMEOUT = 30
+_NEW_TABLE = f"{TVSHOW_TABLE}_new"
+# Quoted columns of the old table, in the order of the new one.
+_OLD_COLUMNS = [
+    f'"{column.name}"'
+    for column in TvShowModel.__table__.columns
+    if column.name != "added_on"
+]
+# Maximum amount of ids in a single IN clause.
+_MAX_IDS = 500
+
+
+class LegacySchemaError(RuntimeError):
+    """The TV show table has to be migrated before the application starts."""
+
+    def __init__(self) -> None:
+        super().__init__(
+            f"Table {TVSHOW_TABLE} has a legacy schema, "
+            + "migrate it with `python -m tvshow_backend.db.migrate`",
+        )
+
+
+def _is_legacy(table_info: Iterable[Sequence[Any]]) -> bool:
+    columns = {row[1]: str(row[2]).upper() for row in table_info}
+    return bool(columns) and (
+        columns.get("show_id") != "INTEGER" or "added_on" not in columns
+    )
+
+
+def check_schema(connection: Connection) -> None:
+    """
+    Refuse to create tables next to a TV show table that was not migrated.
+
+    :param connection: connection to the database.
+    :raises LegacySchemaError: if the table has to be migrated.
+    """
+    table_info = connection.exec_driver_sql(f"PRAGMA table_info({TVSHOW_TABLE})")
+    if _is_legacy(table_info):
+        raise LegacySchemaError()
+
+
+@contextmanager
+def _transaction(connection: sqlite3.Connection, mode: str = "") -> Iterator[None]:
+    connection.execute(f"BEGIN {mode}")
+    try:
+        yield
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+    connection.execute("COMMIT")
+
+
+def _generation(connection: sqlite3.Connection, name: str) -> Optional[int]:
+    try:
+        row = connection.execute(
+            f"SELECT generation FROM {TableGenerationModel.__tablename__} "
+            + "WHERE table_name = ?",
+            (name,),
+        ).fetchone()
+    except sqlite3.OperationalError:
+        # Databases created before generations were tracked.
+        return None
+    return row[0] if row else 0
+
+
+def _copy(
+    connection: sqlite3.Connection,
+    condition: str,
+    params: Sequence[Any],
+    limit: int = -1,
+) -> List[Any]:
+    """
+    Copy shows from the old table to the new one.
+
+    :param connection: connection to the database.
+    :param condition: SQL condition selecting shows of the old table.
+    :param params: parameters of the condition.
+    :param limit: maximum amount of shows, -1 for all of them.
+    :return: copied rows, starting with their rowid in the old table.
+    """
+    rows = connection.execute(
+        f"SELECT rowid, {', '.join(_OLD_COLUMNS)} FROM {TVSHOW_TABLE} "
+        + f"WHERE {condition} ORDER BY rowid LIMIT ?",
+        (*params, limit),
+    ).fetchall()
+    date_added = _OLD_COLUMNS.index('"date_added"') + 1
+    converted = []
+    for row in rows:
+        added_on = parse_date_added(row[date_added])
+        converted.append(
+            (
+                int(row[1]),
+                *row[2:],
+                None if added_on is None else added_on.isoformat(),
+            ),
+        )
+    columns = [*_OLD_COLUMNS, '"added_on"']
+    connection.executemany(
+        f"INSERT OR REPLACE INTO {_NEW_TABLE} ({', '.join(columns)}) "
+        + f"VALUES ({', '.join('?' for _ in columns)})",
+        converted,
+    )
+    return rows
+
+
+def _copy_all(
+    connection: sqlite3.Connection,
+    batch_size: int,
+    in_transactions: bool,
+) -> None:
+    """
+    Copy all shows from the old table in batches.
+
+    :param connection: connection to the database.
+    :param batch_size: amount of shows in a batch.
+    :param in_transactions: copy every batch in its own transaction.
+    """
+    last_rowid = 0
+    while True:  # noqa: WPS457
+        with _transaction(connection) if in_transactions else nullcontext():
+            rows = _copy(connection, "rowid > ?", (last_rowid,), batch_size)
+        if not rows:
+            return
+        last_rowid = rows[-1][0]
+
+
+def _copy_changed(
+    connection: sqlite3.Connection,
+    since: Optional[int],
+    batch_size: int,
+) -> None:
+    """
+    Copy again shows written after the copy started.
+
+    :param connection: connection to the database.
+    :param since: generation of the table when the copy started.
+    :param batch_size: amount of shows in a batch.
+    """
+    generation = _generation(connection, TVSHOW_TABLE)
+    if since is not None and generation == since:
+        return
+    floor = _generation(connection, CHANGELOG_FLOOR) or 0
+    if since is None or floor > since:
+        # Changes are unknown, so every show is copied again.
+        connection.execute(f"DELETE FROM {_NEW_TABLE}")
+        _copy_all(connection, batch_size, in_transactions=False)
+        return
+    changed = [
+        row[0]
+        for row in connection.execute(
+            f"SELECT DISTINCT show_id FROM {ChangeLogModel.__tablename__} "
+            + "WHERE seq > ?",
+            (since,),
+        )
+    ]
+    for start in range(0, len(changed), _MAX_IDS):
+        show_ids = changed[start : start + _MAX_IDS]
+        placeholders = ", ".join("?" for _ in show_ids)
+        connection.execute(
+            f"DELETE FROM {_NEW_TABLE} WHERE show_id IN ({placeholders})",
+            show_ids,
+        )
+        # Old ids are text, so the primary key index is used with text values.
+        _copy(
+            connection,
+            f"show_id IN ({placeholders})",
+            [str(show_id) for show_id in show_ids],
+        )
+
+
+def migrate_catalog(db_file: Path, batch_size: int = BATCH_SIZE) -> bool:
+    """
+    Rebuild the TV show table with typed columns.
+
+    Running the migration again after an interruption starts it over,
+    running it on a migrated database does nothing.
+
+    :param db_file: sqlite file to migrate.
+    :param batch_size: amount of shows copied in a single transaction.
+    :return: whether the table was migrated.
+    """
+    connection = sqlite3.connect(db_file, timeout=BUSY_TIMEOUT, isolation_level=None)
+    try:
+        if not _is_legacy(connection.execute(f"PRAGMA table_info({TVSHOW_TABLE})")):
+            return False
+        table: Table = TvShowModel.__table__  # type: ignore[assignment]
+        dialect = sqlite.dialect()
+        new_table = table.to_metadata(MetaData(), name=_NEW_TABLE)
+        connection.execute(f"DROP TABLE IF EXISTS {_NEW_TABLE}")
+        connection.execute(str(CreateTable(new_table).compile(dialect=dialect)))
+
+        since = _generation(connection, TVSHOW_TABLE)
+        _copy_all(connection, batch_size, in_transactions=True)
+        with _transaction(connection, "IMMEDIATE"):
+            _copy_changed(connection, since, batch_size)
+            connection.execute(f"DROP TABLE {TVSHOW_TABLE}")
+            connection.execute(f"ALTER TABLE {_NEW_TABLE} RENAME TO {TVSHOW_TABLE}")
+            for index in table.indexes:
+                connection.execute(str(CreateIndex(index).compile(dialect=dialect)))
+    finally:
+        connection.close()
+    return True
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Entrypoint of the migration command.
+
+    :param argv: command line arguments.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m tvshow_backend.db.migrate",
+        description="Migrate the TV show table to typed columns.",
+    )
+    parser.add_argument("--db-file", type=Path, default=settings.db_file)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    migrated = migrate_catalog(args.db_file, args.batch_size)
+    elapsed = time.perf_counter() - started
+    print(  # noqa: WPS421
+        f"Migrated {args.db_file} in {elapsed:.1f}s"
+        if migrated
+        else f"{args.db_file} is already migrated",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+from typing import Optional
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql.sqltypes import Float, Integer, String
+
+from tvshow_backend.db.base import Base
+
+
+class ChangeLogModel(Base):
+    """Committed change of a TV show, sequenced by the table generation."""
+
+    __tablename__ = "tvshow_changelog"
+
+    seq: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    operation: Mapped[str] = mapped_column(String)
+    show_id: Mapped[int] = mapped_column(Integer, index=True)
+    # JSON encoded column values after the change, None for deletes.
+    values: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    # Seconds since the epoch.
+    changed_at: Mapped[float] = mapped_column(Float)
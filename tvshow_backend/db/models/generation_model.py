@@ -0,0 +1,13 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql.sqltypes import Integer, String
+
+from tvshow_backend.db.base import Base
+
+
+class TableGenerationModel(Base):
+    """Counter of committed writes per table, used to invalidate caches."""
+
+    __tablename__ = "table_generation"
+
+    table_name: Mapped[str] = mapped_column(String, primary_key=True)
+    generation: Mapped[int] = mapped_column(Integer, default=0)
@@ -0,0 +1,27 @@
+from typing import Optional
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql.sqltypes import Float, Integer, String
+
+from tvshow_backend.db.base import Base
+
+
+class JobModel(Base):
+    """Record of a background job, timestamps are in seconds since the epoch."""
+
+    __tablename__ = "job"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    kind: Mapped[str] = mapped_column(String)
+    status: Mapped[str] = mapped_column(String, index=True)
+    # JSON encoded parameters and result.
+    params: Mapped[str] = mapped_column(String, default="{}")
+    result: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    done: Mapped[int] = mapped_column(Integer, default=0)
+    total: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    created_at: Mapped[float] = mapped_column(Float)
+    started_at: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    finished_at: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    # Refreshed while the job runs, tells interrupted jobs from running ones.
+    updated_at: Mapped[float] = mapped_column(Float)
@@ -0,0 +1,68 @@
+from sqlalchemy import DDL, ForeignKey, event
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql.sqltypes import Integer, String
+
+from tvshow_backend.db.base import Base
+
+# Genres of NEW.genre, a list like "Drama, Comedy", as a JSON array.
+# Escape sequences of json_quote never contain commas.
+_NEW_GENRES = "json_each('[' || replace(json_quote(NEW.genre), ',', '\",\"') || ']')"
+_INSERT_GENRES = f"""
+    DELETE FROM tvshow_genre WHERE show_id = NEW.show_id;
+    INSERT OR IGNORE INTO tvshow_genre (genre, show_id)
+    SELECT lower(trim(value)), NEW.show_id FROM {_NEW_GENRES}
+    WHERE trim(value) != '';
+"""
+
+
+class TvShowGenreModel(Base):
+    """
+    Genre of a TV show, lowercased, kept in sync by triggers.
+
+    Every writer of the TV show table, including seeding and raw SQL,
+    keeps the index up to date. The table is filled from existing shows
+    when it is created.
+    """
+
+    __tablename__ = "tvshow_genre"
+
+    genre: Mapped[str] = mapped_column(String, primary_key=True)
+    # The foreign key makes the table be created after the TV show table.
+    show_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("tvshow_model.show_id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    )
+
+
+for _statement in (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tvshow_genre_insert
+    AFTER INSERT ON tvshow_model BEGIN {_INSERT_GENRES} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tvshow_genre_update
+    AFTER UPDATE OF show_id, genre ON tvshow_model BEGIN
+        DELETE FROM tvshow_genre WHERE show_id = OLD.show_id;
+        {_INSERT_GENRES}
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tvshow_genre_delete
+    AFTER DELETE ON tvshow_model BEGIN
+        DELETE FROM tvshow_genre WHERE show_id = OLD.show_id;
+    END
+    """,
+    f"""
+    INSERT OR IGNORE INTO tvshow_genre (genre, show_id)
+    SELECT lower(trim(value)), NEW.show_id
+    FROM (SELECT show_id, genre FROM tvshow_model) AS NEW, {_NEW_GENRES}
+    WHERE trim(value) != ''
+    """,
+):
+    event.listen(
+        TvShowGenreModel.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="sqlite"),
+    )
@@ -1,20 +1,53 @@
+import calendar
+import datetime
+from typing import Optional
+
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql.sqltypes import Date, Integer, String
 
 from tvshow_backend.db.base import Base
 
+_MONTHS = {name.lower(): index for index, name in enumerate(calendar.month_name)}
+
+
+def parse_date_added(date_added: Optional[str]) -> Optional[datetime.date]:
+    """
+    Parse the date a show was added to the catalog.
+
+    :param date_added: date like ``"August 11, 2014"`` or ``"2014-08-11"``.
+    :return: parsed date, None if it is not recognized.
+    """
+    text = (date_added or "").strip()
+    if len(text) == 10 and text[4] == "-" and text[7] == "-":
+        parts = [text[:4], text[5:7], text[8:]]
+    else:
+        words = text.replace(",", " ").split()
+        if len(words) != 3:
+            return None
+        month = _MONTHS.get(words[0].lower())
+        parts = [words[2], str(month or ""), words[1]]
+    if not all(part.isdigit() for part in parts):
+        return None
+    try:
+        return datetime.date(*map(int, parts))
+    except ValueError:
+        return None
+
 
 class TvShowModel(Base):
     __tablename__ = "tvshow_model"
 
-    show_id: Mapped[int] = mapped_column(String, primary_key=True)
+    # Integer primary key is an alias of the sqlite rowid.
+    show_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
     type: Mapped[str] = mapped_column(String)
     genre: Mapped[str] = mapped_column(String)
     title: Mapped[str] = mapped_column(String)
     director: Mapped[str] = mapped_column(String)
     cast: Mapped[str] = mapped_column(String)
     country: Mapped[str] = mapped_column(String)
-    date_added: Mapped[Date] = mapped_column(String)
+    date_added: Mapped[str] = mapped_column(String)
     release_year: Mapped[int] = mapped_column(Integer)
     rating: Mapped[str] = mapped_column(String)
     duration: Mapped[str] = mapped_column(String)
+    # date_added parsed by the application, None if it is not recognized.
+    added_on: Mapped[Optional[datetime.date]] = mapped_column(Date, index=True)
@@ -0,0 +1,38 @@
+from sqlalchemy import DDL, ForeignKey, event
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql.sqltypes import Integer
+
+from tvshow_backend.db.base import Base
+
+
+class TvShowViewsModel(Base):
+    """
+    Views of a TV show.
+
+    Workers count views in memory and add them here in batches. Rows of
+    deleted shows are removed by a trigger.
+    """
+
+    __tablename__ = "tvshow_views"
+
+    # The foreign key makes the table be created after the TV show table.
+    show_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("tvshow_model.show_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    views: Mapped[int] = mapped_column(Integer, default=0, index=True)
+
+
+event.listen(
+    TvShowViewsModel.__table__,
+    "after_create",
+    DDL(
+        """
+        CREATE TRIGGER IF NOT EXISTS tvshow_views_delete
+        AFTER DELETE ON tvshow_model BEGIN
+            DELETE FROM tvshow_views WHERE show_id = OLD.show_id;
+        END
+        """,
+    ).execute_if(dialect="sqlite"),
+)
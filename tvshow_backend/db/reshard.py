@@ -0,0 +1,250 @@
+"""
+Moving the TV show catalog to another amount of shards.
+
+Workers have to be stopped first, the catalog is moved with::
+
+    python -m tvshow_backend.db.reshard --shards 4
+
+Shows are read in batches from the current layout, the main database
+file or its shards, and written to files of the new layout, which never
+clash with the current ones. The amount of shards stored in the main
+database is switched in a single transaction, which also deletes the
+shows from the main database or inserts them into it when the catalog
+leaves or enters it. An interrupted run leaves the current layout in
+place. Files of the old layout are removed afterwards, leftovers of an
+interrupted run by the next run.
+"""
+import argparse
+import sqlite3
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy import create_engine
+
+from tvshow_backend.db.changes import CHANGELOG_FLOOR, TVSHOW_TABLE
+from tvshow_backend.db.models.generation_model import TableGenerationModel
+from tvshow_backend.db.models.tvshow_model import TvShowModel
+from tvshow_backend.db.models.tvshow_views_model import TvShowViewsModel
+from tvshow_backend.db.seed import create_schema
+from tvshow_backend.db.sharding import SHARDS_KEY, shard_files, shard_of
+from tvshow_backend.db.utils import SCHEMA_METADATA_TABLE
+from tvshow_backend.settings import settings
+
+BATCH_SIZE = 10_000
+# Seconds to wait for locks held by other connections.
+BUSY_TIMEOUT = 30
+_COLUMNS = ", ".join(f'"{column.name}"' for column in TvShowModel.__table__.columns)
+_INSERT = (
+    f"INSERT INTO {TVSHOW_TABLE} ({_COLUMNS}) "
+    + f"VALUES ({', '.join('?' for _ in TvShowModel.__table__.columns)})"
+)
+_GENERATIONS = TableGenerationModel.__tablename__
+_VIEWS = TvShowViewsModel.__tablename__
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    return sqlite3.connect(path, timeout=BUSY_TIMEOUT, isolation_level=None)
+
+
+def _stored_shards(connection: sqlite3.Connection) -> int:
+    """
+    Read the amount of shards the catalog is stored in.
+
+    :param connection: connection to the main database.
+    :return: amount of shards, 1 when the catalog is in the main database.
+    """
+    try:
+        row = connection.execute(
+            f"SELECT value FROM {SCHEMA_METADATA_TABLE} WHERE name = ?",
+            (SHARDS_KEY,),
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return 1
+    return int(row[0]) if row else 1
+
+
+def _remove(path: Path) -> None:
+    for suffix in ("", "-journal", "-wal", "-shm"):
+        path.with_name(f"{path.name}{suffix}").unlink(missing_ok=True)
+
+
+def _remove_other_layouts(db_file: Path, current: int) -> None:
+    keep = set(shard_files(db_file, current))
+    for path in db_file.parent.glob(f"{db_file.stem}.shard-*-of-*{db_file.suffix}"):
+        if path not in keep:
+            _remove(path)
+
+
+def _read_shows(path: Path, batch_size: int) -> Iterator[List[Any]]:
+    """
+    Read all TV shows of a database in batches ordered by id.
+
+    :param path: database file.
+    :param batch_size: amount of shows in a batch.
+    :yield: batches of rows.
+    """
+    connection = _connect(path)
+    try:
+        rows = connection.execute(
+            f"SELECT {_COLUMNS} FROM {TVSHOW_TABLE} ORDER BY show_id LIMIT ?",
+            (batch_size,),
+        ).fetchall()
+        while rows:
+            yield rows
+            rows = connection.execute(
+                f"SELECT {_COLUMNS} FROM {TVSHOW_TABLE} WHERE show_id > ? "
+                + "ORDER BY show_id LIMIT ?",
+                (rows[-1][0], batch_size),
+            ).fetchall()
+    finally:
+        connection.close()
+
+
+def _copy(
+    sources: Sequence[Path],
+    targets: Sequence[sqlite3.Connection],
+    batch_size: int,
+) -> int:
+    """
+    Copy all TV shows to the shards they belong to.
+
+    :param sources: database files with shows.
+    :param targets: connections to the shards in a transaction.
+    :param batch_size: amount of shows in a batch.
+    :return: amount of copied shows.
+    """
+    copied = 0
+    for source in sources:
+        for rows in _read_shows(source, batch_size):
+            by_shard: Dict[int, List[Any]] = defaultdict(list)
+            for row in rows:
+                by_shard[shard_of(row[0], len(targets))].append(row)
+            for index, shard_rows in by_shard.items():
+                targets[index].executemany(_INSERT, shard_rows)
+            copied += len(rows)
+    return copied
+
+
+def _delete_shows(connection: sqlite3.Connection) -> None:
+    """
+    Delete all TV shows of the main database, keeping their views.
+
+    :param connection: connection to the main database in a transaction.
+    """
+    connection.execute(f"CREATE TEMP TABLE saved_views AS SELECT * FROM {_VIEWS}")
+    connection.execute(f"DELETE FROM {TVSHOW_TABLE}")
+    connection.execute(f"INSERT INTO {_VIEWS} SELECT * FROM saved_views")
+    connection.execute("DROP TABLE saved_views")
+
+
+def _switch(connection: sqlite3.Connection, shards: int, moved: int) -> None:
+    """
+    Store the new amount of shards.
+
+    Moved shows count as changes, so caches of the catalog are rebuilt and
+    clients of the change feed start over.
+
+    :param connection: connection to the main database in a transaction.
+    :param shards: new amount of shards.
+    :param moved: amount of moved shows.
+    """
+    connection.execute(
+        f"INSERT OR REPLACE INTO {SCHEMA_METADATA_TABLE} VALUES (?, ?)",
+        (SHARDS_KEY, str(shards)),
+    )
+    connection.execute(
+        f"INSERT INTO {_GENERATIONS} VALUES (?, ?) ON CONFLICT (table_name) "
+        + "DO UPDATE SET generation = generation + excluded.generation",
+        (TVSHOW_TABLE, moved),
+    )
+    connection.execute(
+        f"INSERT OR REPLACE INTO {_GENERATIONS} "
+        + f"SELECT ?, generation FROM {_GENERATIONS} WHERE table_name = ?",
+        (CHANGELOG_FLOOR, TVSHOW_TABLE),
+    )
+
+
+def reshard_catalog(
+    db_file: Path,
+    shards: int,
+    batch_size: int = BATCH_SIZE,
+) -> Optional[int]:
+    """
+    Move the TV show catalog to another amount of shards.
+
+    :param db_file: main database file, created by the application.
+    :param shards: new amount of shards, 1 moves shows to the main database.
+    :param batch_size: amount of shows read at once.
+    :return: amount of moved shows, None if the catalog already has
+        that many shards.
+    """
+    main = _connect(db_file)
+    try:
+        current = _stored_shards(main)
+        _remove_other_layouts(db_file, current)
+        if current == shards:
+            return None
+        new_files = shard_files(db_file, shards)
+        targets = [main]
+        if shards > 1:
+            for path in new_files:
+                engine = create_engine(f"sqlite:///{path}")
+                try:
+                    create_schema(engine)
+                finally:
+                    engine.dispose()
+            targets = [_connect(path) for path in new_files]
+        try:
+            for target in targets:
+                target.execute("BEGIN")
+            moved = _copy(shard_files(db_file, current), targets, batch_size)
+            if shards > 1:
+                for shard in targets:
+                    shard.execute("COMMIT")
+                main.execute("BEGIN IMMEDIATE")
+            if current == 1:
+                _delete_shows(main)
+            _switch(main, shards, moved)
+            main.execute("COMMIT")
+        finally:
+            for connection in targets:
+                if connection is not main:
+                    connection.close()
+    finally:
+        main.close()
+    _remove_other_layouts(db_file, shards)
+    return moved
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Entrypoint of the resharding command.
+
+    :param argv: command line arguments.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m tvshow_backend.db.reshard",
+        description="Move the TV show catalog to another amount of shards.",
+    )
+    parser.add_argument("--db-file", type=Path, default=settings.db_file)
+    parser.add_argument("--shards", type=int, required=True)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+    if args.shards < 1:
+        parser.error("--shards must be at least 1")
+
+    started = time.perf_counter()
+    moved = reshard_catalog(args.db_file, args.shards, args.batch_size)
+    elapsed = time.perf_counter() - started
+    print(  # noqa: WPS421
+        f"{args.db_file} already has {args.shards} shards"
+        if moved is None
+        else f"Moved {moved} shows of {args.db_file} to {args.shards} shards "
+        + f"in {elapsed:.1f}s",
+    )
+
+
+if __name__ == "__main__":
+    main()
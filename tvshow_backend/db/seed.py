@@ -0,0 +1,501 @@
+"""
+Synthetic TV show catalog generator.
+
+Generates realistic-looking rows for ``tvshow_model`` and bulk-loads them
+into the configured database::
+
+    python -m tvshow_backend.db.seed --rows 1000000 --seed 42
+"""
+import argparse
+import datetime
+import itertools
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Table, create_engine, func, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.engine import Connection, Engine
+
+from tvshow_backend.db.changes import CHANGELOG_FLOOR, TVSHOW_TABLE
+from tvshow_backend.db.meta import meta
+from tvshow_backend.db.migrate import migrate_catalog
+from tvshow_backend.db.models import load_all_models
+from tvshow_backend.db.models.generation_model import TableGenerationModel
+from tvshow_backend.db.models.tvshow_model import TvShowModel
+from tvshow_backend.settings import settings
+
+Row = Tuple[object, ...]
+# show_id of the first row of a chunk and amount of rows.
+ChunkSpec = Tuple[int, int]
+
+DEFAULT_SEED = 42
+CHUNK_SIZE = 50_000
+
+GENRES = (
+    "Drama",
+    "Comedy",
+    "Documentary",
+    "Action",
+    "Thriller",
+    "Romance",
+    "Crime",
+    "Kids",
+    "Horror",
+    "Science Fiction",
+    "Anime",
+    "Reality",
+    "Fantasy",
+    "Mystery",
+    "Music",
+    "Sports",
+    "Stand-Up Comedy",
+    "History",
+    "War",
+    "Western",
+)
+COUNTRIES = (
+    "United States",
+    "India",
+    "United Kingdom",
+    "Japan",
+    "South Korea",
+    "Canada",
+    "Spain",
+    "France",
+    "Mexico",
+    "Germany",
+    "Brazil",
+    "Australia",
+    "Turkey",
+    "Egypt",
+    "Nigeria",
+    "Italy",
+    "Argentina",
+    "Indonesia",
+    "Philippines",
+    "Sweden",
+)
+RATINGS = (
+    ("TV-MA", 36),
+    ("TV-14", 25),
+    ("TV-PG", 10),
+    ("R", 9),
+    ("PG-13", 6),
+    ("TV-Y7", 4),
+    ("TV-Y", 3),
+    ("PG", 3),
+    ("TV-G", 2.5),
+    ("NR", 1),
+    ("G", 0.5),
+)
+MONTHS = (
+    "January",
+    "February",
+    "March",
+    "April",
+    "May",
+    "June",
+    "July",
+    "August",
+    "September",
+    "October",
+    "November",
+    "December",
+)
+
+_FIRST_NAMES = (
+    "Anna James Maria John Aiko Raj Sofia Omar Li Emma Carlos Yuki Priya Lucas "
+    "Fatima Noah Olga Ahmed Mia Diego Hana Ivan Chloe Kwame Lena Mateo Sara Ali "
+    "Nora Kenji Amara Leo Isabel Tomas Zara Victor Elena Hugo Aisha Pablo"
+).split()
+_LAST_NAMES = (
+    "Smith Garcia Kim Patel Tanaka Müller Rossi Silva Nguyen Johnson Okafor "
+    "Khan Lopez Ivanova Sato Brown Dubois Haddad Cohen Novak Park Andersson "
+    "Mendes Chen Yilmaz Kowalski Reyes Moreau Ito Costa Hughes Fischer Singh "
+    "Rahman Wright Romero Bakker Lee Sharma Ortiz"
+).split()
+_TITLE_HEADS = (
+    "Dark Lost Silent Broken Golden Hidden Last Wild Secret Endless Burning "
+    "Little Crimson Frozen Midnight Forgotten Eternal Savage Quiet Electric"
+).split()
+_TITLE_TAILS = (
+    "Empire River Kingdom Garden Promise Signal Horizon City Witness Summer "
+    "Station Island Heart Frontier Legacy Shadows Game Road Crown Storm"
+).split()
+
+# Weights of the amount of actors per show, from 0 to 10.
+_CAST_SIZE_WEIGHTS = (4, 4, 6, 8, 10, 12, 12, 12, 12, 10, 10)
+
+ACTOR_POOL_SIZE = 50_000
+DIRECTOR_POOL_SIZE = 8_000
+FIRST_YEAR = 1925
+LAST_YEAR = 2023
+FIRST_ADDED_YEAR = 2008
+
+
+def _zipf_cum_weights(size: int, exponent: float) -> List[float]:
+    """
+    Cumulative weights of a Zipf distribution over ``size`` ranks.
+
+    :param size: amount of ranks.
+    :param exponent: skew of the distribution.
+    :return: cumulative weights usable with ``random.choices``.
+    """
+    return list(
+        itertools.accumulate(1 / rank**exponent for rank in range(1, size + 1))
+    )
+
+
+def _people(size: int, rnd: random.Random) -> List[str]:
+    return [
+        f"{rnd.choice(_FIRST_NAMES)} {rnd.choice(_LAST_NAMES)}" for _ in range(size)
+    ]
+
+
+class CatalogGenerator:
+    """
+    Deterministic generator of TV show rows.
+
+    Categorical columns follow skewed (Zipf-like) distributions, so a few
+    genres, countries and actors dominate the catalog like in real ones.
+    Columns are generated in bulk per chunk and every chunk has its own
+    random stream derived from the seed and its first show_id, so chunks
+    can be generated in parallel, the output does not depend on the amount
+    of workers and appended rows do not repeat earlier ones.
+    """
+
+    def __init__(self, seed: int = DEFAULT_SEED):
+        self.seed = seed
+        rnd = random.Random(seed)
+        self.actors = _people(ACTOR_POOL_SIZE, rnd)
+        self.directors = _people(DIRECTOR_POOL_SIZE, rnd)
+        self._actor_weights = _zipf_cum_weights(ACTOR_POOL_SIZE, 1.05)
+        self._director_weights = _zipf_cum_weights(DIRECTOR_POOL_SIZE, 0.9)
+        self._genre_weights = _zipf_cum_weights(len(GENRES), 1.1)
+        self._country_weights = _zipf_cum_weights(len(COUNTRIES), 1.3)
+        self._rating_weights = list(itertools.accumulate(rate for _, rate in RATINGS))
+        self._ratings = [name for name, _ in RATINGS]
+        # Release years decay exponentially into the past.
+        self._years = list(range(LAST_YEAR, FIRST_YEAR - 1, -1))
+        self._year_weights = list(
+            itertools.accumulate(0.87**age for age in range(len(self._years))),
+        )
+        # Movie runtimes are roughly normal around 100 minutes.
+        self._minutes = [f"{minutes} min" for minutes in range(3, 301)]
+        self._minute_weights = list(
+            itertools.accumulate(
+                math.exp(-(((minutes - 100) / 25) ** 2) / 2)
+                for minutes in range(3, 301)
+            ),
+        )
+        # Most shows have a single season.
+        self._seasons = ["1 Season"] + [f"{count} Seasons" for count in range(2, 21)]
+        self._season_weights = list(
+            itertools.accumulate(0.5**count for count in range(len(self._seasons))),
+        )
+
+    def _multi(
+        self,
+        rnd: random.Random,
+        pool: Sequence[str],
+        cum_weights: List[float],
+        counts: List[int],
+    ) -> List[str]:
+        """
+        Build multi-valued, comma separated cells like ``"Drama, Comedy"``.
+
+        :param rnd: random stream of the chunk.
+        :param pool: values to pick from.
+        :param cum_weights: cumulative weights of the values.
+        :param counts: amount of values for every cell.
+        :return: cells with distinct values.
+        """
+        picked = iter(rnd.choices(pool, cum_weights=cum_weights, k=sum(counts)))
+        return [
+            ", ".join(dict.fromkeys(itertools.islice(picked, amount)))
+            for amount in counts
+        ]
+
+    def chunk(self, spec: ChunkSpec) -> List[Row]:
+        """
+        Generate a single chunk of rows.
+
+        :param spec: position of the chunk in the catalog.
+        :return: rows in ``tvshow_model`` column order.
+        """
+        first_id, size = spec
+        rnd = random.Random(f"{self.seed}:{first_id}")
+        types = rnd.choices(("Movie", "TV Show"), weights=(70, 30), k=size)
+        genres = self._multi(
+            rnd,
+            GENRES,
+            self._genre_weights,
+            rnd.choices((1, 2, 3), weights=(55, 35, 10), k=size),
+        )
+        casts = self._multi(
+            rnd,
+            self.actors,
+            self._actor_weights,
+            rnd.choices(range(11), weights=_CAST_SIZE_WEIGHTS, k=size),
+        )
+        directors = self._multi(
+            rnd,
+            self.directors,
+            self._director_weights,
+            rnd.choices((0, 1, 2), weights=(20, 75, 5), k=size),
+        )
+        countries = self._multi(
+            rnd,
+            COUNTRIES,
+            self._country_weights,
+            rnd.choices((1, 2), weights=(85, 15), k=size),
+        )
+        ratings = rnd.choices(self._ratings, cum_weights=self._rating_weights, k=size)
+        titles = [
+            f"{head} {tail}"
+            for head, tail in zip(
+                rnd.choices(_TITLE_HEADS, k=size),
+                rnd.choices(_TITLE_TAILS, k=size),
+            )
+        ]
+        years = rnd.choices(self._years, cum_weights=self._year_weights, k=size)
+        movie_durations = rnd.choices(
+            self._minutes,
+            cum_weights=self._minute_weights,
+            k=size,
+        )
+        show_durations = rnd.choices(
+            self._seasons,
+            cum_weights=self._season_weights,
+            k=size,
+        )
+        months = rnd.choices(range(1, 13), k=size)
+        days = rnd.choices(range(1, 29), k=size)
+        fractions = [rnd.random() for _ in range(size)]
+        dates_added = [
+            _date_added(months[offset], days[offset], years[offset], fractions[offset])
+            for offset in range(size)
+        ]
+
+        return [
+            (
+                first_id + offset,
+                types[offset],
+                genres[offset],
+                f"{titles[offset]} {first_id + offset}",
+                directors[offset],
+                casts[offset],
+                countries[offset],
+                _format_date(dates_added[offset]),
+                years[offset],
+                ratings[offset],
+                (
+                    movie_durations[offset]
+                    if types[offset] == "Movie"
+                    else show_durations[offset]
+                ),
+                dates_added[offset].isoformat(),
+            )
+            for offset in range(size)
+        ]
+
+
+def _date_added(
+    month: int,
+    day: int,
+    release_year: int,
+    fraction: float,
+) -> datetime.date:
+    # Shows are added to the catalog after release, not earlier than 2008.
+    first_year = max(release_year, FIRST_ADDED_YEAR)
+    year = first_year + int(fraction * (LAST_YEAR - first_year + 1))
+    return datetime.date(year, month, day)
+
+
+def _format_date(date: datetime.date) -> str:
+    return f"{MONTHS[date.month - 1]} {date.day}, {date.year}"
+
+
+_worker_generator: Optional[CatalogGenerator] = None
+
+
+def _init_worker(seed: int) -> None:
+    global _worker_generator  # noqa: WPS420
+    _worker_generator = CatalogGenerator(seed)  # noqa: WPS442
+
+
+def _generate_in_worker(spec: ChunkSpec) -> List[Row]:
+    return _worker_generator.chunk(spec)  # type: ignore
+
+
+def generate_rows(
+    count: int,
+    start_id: int = 1,
+    seed: int = DEFAULT_SEED,
+    jobs: int = 1,
+) -> Iterator[List[Row]]:
+    """
+    Generate catalog rows in chunks.
+
+    With ``jobs > 1`` chunks are generated by a pool of processes while
+    the caller consumes already finished ones.
+
+    :param count: total amount of rows.
+    :param start_id: show_id of the first row.
+    :param seed: seed of the generator.
+    :param jobs: amount of generating processes.
+    :yield: chunks of rows in ``tvshow_model`` column order.
+    """
+    specs = [
+        (start_id + chunk_start, min(CHUNK_SIZE, count - chunk_start))
+        for chunk_start in range(0, count, CHUNK_SIZE)
+    ]
+    if jobs <= 1 or len(specs) <= 1:
+        generator = CatalogGenerator(seed)
+        yield from map(generator.chunk, specs)
+        return
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(seed,),
+    ) as executor:
+        yield from executor.map(_generate_in_worker, specs)
+
+
+def create_schema(engine: Engine) -> None:
+    """
+    Create all application tables.
+
+    :param engine: engine of the target database.
+    """
+    load_all_models()
+    meta.create_all(engine)
+
+
+def seed_catalog(
+    db_file: Path,
+    rows: int,
+    seed: int = DEFAULT_SEED,
+    replace: bool = False,
+    jobs: int = 1,
+) -> int:
+    """
+    Bulk-load generated TV shows into a database file.
+
+    Rows are inserted with ``executemany`` inside a single transaction.
+    A new file is filled with journaling disabled, which is the fastest
+    way to do it; an existing database keeps its journal, so an
+    interrupted run is rolled back. New ids continue after the biggest
+    existing one. The table generation is bumped in the same transaction,
+    so running workers rebuild their caches after seeding. Loaded shows are
+    not written to the changelog, so clients of the change feed are told
+    to fetch the whole catalog again. Tables of an existing database
+    are migrated to the current schema first.
+
+    :param db_file: sqlite file to fill.
+    :param rows: amount of rows to generate.
+    :param seed: seed of the generator.
+    :param replace: delete existing shows before loading.
+    :param jobs: amount of processes generating rows.
+    :return: show_id of the first generated row.
+    """
+    table: Table = TvShowModel.__table__  # type: ignore[assignment]
+    columns = ", ".join(f'"{column.name}"' for column in table.columns)
+    placeholders = ", ".join("?" for _ in table.columns)
+    insert_sql = f"INSERT INTO {table.name} ({columns}) VALUES ({placeholders})"
+
+    fresh = not db_file.exists() or db_file.stat().st_size == 0
+    if not fresh:
+        migrate_catalog(db_file)
+    engine = create_engine(f"sqlite:///{db_file}")
+    try:
+        create_schema(engine)
+        with engine.begin() as connection:
+            if fresh:
+                connection.exec_driver_sql("PRAGMA journal_mode=OFF")
+                connection.exec_driver_sql("PRAGMA synchronous=OFF")
+            changed = connection.execute(table.delete()).rowcount if replace else 0
+            max_id = connection.execute(
+                select(func.max(TvShowModel.show_id)),
+            ).scalar()
+            start_id = (max_id or 0) + 1
+            for chunk in generate_rows(rows, start_id, seed, jobs):
+                connection.exec_driver_sql(insert_sql, chunk)
+            _bump_generation(connection, changed + rows)
+    finally:
+        engine.dispose()
+    return start_id
+
+
+def _bump_generation(connection: Connection, amount: int) -> None:
+    connection.execute(
+        insert(TableGenerationModel)
+        .values(table_name=TVSHOW_TABLE, generation=amount)
+        .on_conflict_do_update(
+            index_elements=[TableGenerationModel.table_name],
+            set_={"generation": TableGenerationModel.generation + amount},
+        ),
+    )
+    generation = (
+        select(TableGenerationModel.generation)
+        .where(TableGenerationModel.table_name == TVSHOW_TABLE)
+        .scalar_subquery()
+    )
+    connection.execute(
+        insert(TableGenerationModel)
+        .values(table_name=CHANGELOG_FLOOR, generation=generation)
+        .on_conflict_do_update(
+            index_elements=[TableGenerationModel.table_name],
+            set_={"generation": generation},
+        ),
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Entrypoint of the seeding command.
+
+    :param argv: command line arguments.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m tvshow_backend.db.seed",
+        description="Fill the database with a synthetic TV show catalog.",
+    )
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--db-file", type=Path, default=settings.db_file)
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="processes generating rows",
+    )
+    parser.add_argument(
+        "--replace",
+        action="store_true",
+        help="delete existing shows before seeding",
+    )
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    start_id = seed_catalog(
+        args.db_file,
+        args.rows,
+        args.seed,
+        args.replace,
+        args.jobs,
+    )
+    elapsed = time.perf_counter() - started
+    print(  # noqa: WPS421
+        f"Inserted {args.rows} shows (ids {start_id}..{start_id + args.rows - 1}) "
+        f"into {args.db_file} in {elapsed:.1f}s",
+    )
+
+
+if __name__ == "__main__":
+    main()
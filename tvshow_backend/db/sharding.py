@@ -0,0 +1,202 @@
+"""
+Hash-sharded storage of TV shows.
+
+A single SQLite file has a single writer. With ``db_shards`` above 1 the
+TV show table is split into that many database files next to ``db_file``,
+so writes of different shows commit in parallel. A show is stored in the
+shard chosen by a hash of its id. Every shard has the whole schema, so
+the genre index and the changelog of its shows live next to them, and an
+engine of its own with a writer lock serializing its write transactions.
+
+The main database file keeps everything else: jobs, views, maintenance
+and the amount of shards the catalog is stored in. Workers refuse to start
+with another amount, the catalog is moved between layouts with::
+
+    python -m tvshow_backend.db.reshard --shards 4
+"""
+import asyncio
+import zlib
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence
+
+from sqlalchemy import MetaData
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from tvshow_backend.db.changes import TVSHOW_TABLE
+from tvshow_backend.db.utils import SCHEMA_METADATA_TABLE, create_tables
+
+# Key in the schema metadata table of the main database
+# with the amount of shards the catalog is stored in.
+SHARDS_KEY = "catalog_shards"
+
+
+class ShardLayoutError(RuntimeError):
+    """The catalog is stored in another amount of shards than configured."""
+
+    def __init__(self, stored: int, configured: int) -> None:
+        super().__init__(
+            f"The catalog is stored in {stored} shards, not {configured}, "
+            + "reshard it with `python -m tvshow_backend.db.reshard --shards "
+            + f"{configured}`",
+        )
+        self.stored = stored
+        self.configured = configured
+
+
+def shard_of(show_id: int, count: int) -> int:
+    """
+    Choose the shard of a show.
+
+    CRC-32 of the id spreads consecutive ids evenly and, unlike ``hash``,
+    is the same in every process.
+
+    :param show_id: id of the show.
+    :param count: amount of shards.
+    :return: index of the shard.
+    """
+    return zlib.crc32(show_id.to_bytes(8, "little", signed=True)) % count
+
+
+def shard_files(db_file: Path, count: int) -> List[Path]:
+    """
+    Files of the shards of a catalog.
+
+    Names include the amount of shards, so files of another layout never
+    clash with them while the catalog is resharded.
+
+    :param db_file: main database file.
+    :param count: amount of shards.
+    :return: paths next to the main database file, ``[db_file]`` for one shard.
+    """
+    if count <= 1:
+        return [db_file]
+    return [
+        db_file.with_name(f"{db_file.stem}.shard-{index}-of-{count}{db_file.suffix}")
+        for index in range(count)
+    ]
+
+
+async def stored_shards(connection: AsyncConnection) -> int:
+    """
+    Read the amount of shards the catalog is stored in.
+
+    :param connection: connection to the main database.
+    :return: amount of shards, 1 when the catalog is in the main database.
+    """
+    try:
+        stored = await connection.exec_driver_sql(
+            f"SELECT value FROM {SCHEMA_METADATA_TABLE} WHERE name = ?",
+            (SHARDS_KEY,),
+        )
+    except OperationalError:
+        return 1
+    return int(stored.scalar() or 1)
+
+
+async def check_layout(engine: AsyncEngine, shards: int) -> None:
+    """
+    Check that the catalog is stored in the configured amount of shards.
+
+    An empty catalog of the main database is taken over by the shards.
+
+    :param engine: engine of the main database.
+    :param shards: configured amount of shards.
+    :raises ShardLayoutError: if the catalog is stored in another amount.
+    """
+    async with engine.begin() as connection:
+        stored = await stored_shards(connection)
+        if stored == shards:
+            return
+        if stored == 1:
+            shows = await connection.exec_driver_sql(
+                f"SELECT 1 FROM {TVSHOW_TABLE} LIMIT 1",
+            )
+            if shows.first() is None:
+                await connection.exec_driver_sql(
+                    f"INSERT OR REPLACE INTO {SCHEMA_METADATA_TABLE} VALUES (?, ?)",
+                    (SHARDS_KEY, str(shards)),
+                )
+                return
+        raise ShardLayoutError(stored, shards)
+
+
+class ShardSet:
+    """Engines, sessions and writer locks of the shards of a catalog."""
+
+    def __init__(self, files: Sequence[Path], echo: bool = False) -> None:
+        self.files = list(files)
+        self.engines = [
+            create_async_engine(f"sqlite+aiosqlite:///{path}", echo=echo)
+            for path in self.files
+        ]
+        self.sessions = [
+            async_sessionmaker(engine, expire_on_commit=False)
+            for engine in self.engines
+        ]
+        self._writers: Optional[List[asyncio.Lock]] = None
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def shard_of(self, show_id: int) -> int:
+        """
+        Choose the shard of a show.
+
+        :param show_id: id of the show.
+        :return: index of the shard.
+        """
+        return shard_of(show_id, len(self.files))
+
+    def writer(self, index: int) -> asyncio.Lock:
+        """
+        Lock held by write transactions of a shard.
+
+        A transaction reading before it writes can't wait for the database
+        lock of another one without a deadlock, SQLite fails it instead.
+        Writers of a shard take turns in the event loop instead.
+
+        :param index: index of the shard.
+        :return: lock of the shard.
+        """
+        # Locks are created lazily to bind them to the running event loop.
+        if self._writers is None:
+            self._writers = [asyncio.Lock() for _ in self.files]
+        return self._writers[index]
+
+    async def create_tables(
+        self,
+        metadata: MetaData,
+        load_models: Optional[Callable[[], None]] = None,
+        incremental_vacuum: bool = False,
+    ) -> bool:
+        """
+        Create missing tables in every shard.
+
+        :param metadata: metadata with all tables.
+        :param load_models: function registering all models in the metadata.
+        :param incremental_vacuum: create new shards with incremental
+            auto-vacuum.
+        :return: whether DDL was executed in any shard.
+        """
+        executed = await asyncio.gather(
+            *(
+                create_tables(
+                    engine,
+                    metadata,
+                    load_models=load_models,
+                    incremental_vacuum=incremental_vacuum,
+                )
+                for engine in self.engines
+            ),
+        )
+        return any(executed)
+
+    async def dispose(self) -> None:
+        """Close connections of every shard."""
+        await asyncio.gather(*(engine.dispose() for engine in self.engines))
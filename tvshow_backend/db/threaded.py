@@ -0,0 +1,385 @@
+"""
+Database sessions running synchronous sqlite3 work on a pool of threads.
+
+aiosqlite runs every connection in a thread of its own and passes every
+call through a queue, so each query costs a round trip between threads.
+``ThreadedSession`` wraps a synchronous session of a ``sqlite://`` engine
+and runs it on a bounded pool of threads. A DAO method decorated with
+``batched`` runs as a whole in a pool thread: awaiting the session there
+completes without suspending, so a DAO call costs a single hop to the
+pool and back however many queries it executes.
+
+SQLite has a single writer. A writer blocked on the database lock would
+hold a pool thread that the session owning the lock may need to commit,
+so DAO methods decorated with ``batched_write`` first take a writer lock
+in the event loop and keep it until their session commits, rolls back or
+closes. The connection pool is unbounded for the same reason: a thread
+must never wait for a connection held by a session waiting for a thread.
+
+Change listeners expect to be called in the event loop, so changes
+committed in a pool thread are dispatched after the hop returns.
+
+A call abandoned by a cancelled request is interrupted by a progress
+handler of the connection, so its thread and connection are free again
+right away.
+"""
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Coroutine, Optional, TypeVar, cast
+
+from sqlalchemy import CursorResult, Executable, Result, create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, SessionTransaction, sessionmaker
+
+from tvshow_backend.db.changes import DEFER_DISPATCH, dispatch_deferred_changes
+from tvshow_backend.db.interrupt import interrupts
+
+# Virtual machine instructions between checks for cancelled calls.
+PROGRESS_STEPS = 10_000
+
+ReturnType = TypeVar("ReturnType")
+DAOMethod = TypeVar("DAOMethod", bound=Callable[..., Coroutine[Any, Any, Any]])
+
+
+class _Batch(threading.local):
+    """Session whose batch is running in the current thread."""
+
+    session: Optional["ThreadedSession"] = None
+
+
+_batch = _Batch()
+
+
+class _Call(threading.local):
+    """Cancellation of the call running in the current thread."""
+
+    cancelled: Optional[threading.Event] = None
+
+
+_call = _Call()
+
+
+def _call_cancelled() -> bool:
+    return _call.cancelled is not None and _call.cancelled.is_set()
+
+
+def _set_progress_handler(dbapi_connection: Any, _: Any) -> None:
+    dbapi_connection.set_progress_handler(_call_cancelled, PROGRESS_STEPS)
+
+
+class ThreadPool(ThreadPoolExecutor):
+    """Pool of threads counting calls waiting for or running in it."""
+
+    calls = 0
+
+
+class ThreadedSession:
+    """
+    Asynchronous facade of a synchronous session.
+
+    It implements the part of ``AsyncSession`` used by DAOs. Calls made
+    outside of a batch run in the pool one by one. Calls of a session are
+    serialized, so a call never overlaps one abandoned by a cancelled
+    request.
+    """
+
+    def __init__(
+        self,
+        sync_session: Session,
+        executor: ThreadPool,
+        writer: asyncio.Lock,
+    ) -> None:
+        self.sync_session = sync_session
+        self._executor = executor
+        self._lock = threading.Lock()
+        self._writer = writer
+        self._writing = False
+        sync_session.info[DEFER_DISPATCH] = True
+
+    @property
+    def info(self) -> Any:
+        """
+        Information stored in the session.
+
+        :return: info dictionary of the synchronous session.
+        """
+        return self.sync_session.info
+
+    def add(self, instance: object) -> None:
+        """
+        Add an instance to the session.
+
+        :param instance: model instance.
+        """
+        self.sync_session.add(instance)
+
+    async def execute(self, statement: Executable, params: Any = None) -> Any:
+        """
+        Execute a statement.
+
+        :param statement: statement to execute.
+        :param params: parameters of the statement.
+        :return: result, buffered when it is returned to the event loop.
+        """
+        if _batch.session is self:
+            return self.sync_session.execute(statement, params)
+        return await self._call(self._execute_buffered, statement, params)
+
+    async def scalar(self, statement: Executable, params: Any = None) -> Any:
+        """
+        Execute a statement and return the first column of the first row.
+
+        :param statement: statement to execute.
+        :param params: parameters of the statement.
+        :return: value or None.
+        """
+        return await self._call(self.sync_session.scalar, statement, params)
+
+    async def get(self, entity: Any, ident: Any) -> Any:
+        """
+        Get an instance by primary key.
+
+        :param entity: model class.
+        :param ident: primary key.
+        :return: instance or None.
+        """
+        return await self._call(self.sync_session.get, entity, ident)
+
+    async def flush(self) -> None:
+        """Flush pending changes."""
+        await self._call(self.sync_session.flush)
+
+    async def commit(self) -> None:
+        """Commit the current transaction."""
+        await self._end(self.sync_session.commit)
+
+    async def rollback(self) -> None:
+        """Roll back the current transaction."""
+        await self._end(self.sync_session.rollback)
+
+    async def close(self) -> None:
+        """Close the session and release its connection."""
+        await self._end(self.sync_session.close)
+
+    def begin_nested(self) -> "NestedTransaction":
+        """
+        Begin a savepoint.
+
+        :return: asynchronous context manager of the savepoint.
+        """
+        return NestedTransaction(self)
+
+    async def run(
+        self,
+        function: Callable[..., Coroutine[Any, Any, ReturnType]],
+        *args: Any,
+        write: bool = False,
+    ) -> ReturnType:
+        """
+        Run a coroutine function as a single batch in the pool.
+
+        :param function: function using only this session.
+        :param args: arguments of the function.
+        :param write: whether the function writes, it then waits for
+            the writer lock and holds it until the transaction ends.
+        :return: result of the function.
+        """
+        if _batch.session is self:
+            return await function(*args)
+        if write and not self._writing:
+            await self._writer.acquire()
+            self._writing = True
+        return await self._call(self._drive, function, *args)
+
+    async def _end(self, function: Callable[[], None]) -> None:
+        try:
+            await self._call(function)
+        finally:
+            if self._writing:
+                self._writing = False
+                self._writer.release()
+
+    async def _call(
+        self,
+        function: Callable[..., ReturnType],
+        *args: Any,
+    ) -> ReturnType:
+        if _batch.session is self:
+            return function(*args)
+        loop = asyncio.get_running_loop()
+        cancelled = threading.Event()
+        self._executor.calls += 1
+        try:
+            return await loop.run_in_executor(
+                self._executor,
+                functools.partial(self._locked, cancelled, function, *args),
+            )
+        except asyncio.CancelledError:
+            cancelled.set()
+            interrupts.count += 1
+            raise
+        finally:
+            self._executor.calls -= 1
+            dispatch_deferred_changes(self.sync_session)
+
+    def _locked(
+        self,
+        cancelled: threading.Event,
+        function: Callable[..., ReturnType],
+        *args: Any,
+    ) -> ReturnType:
+        with self._lock:
+            _call.cancelled = cancelled
+            try:
+                return function(*args)
+            finally:
+                _call.cancelled = None
+
+    def _execute_buffered(self, statement: Executable, params: Any) -> Any:
+        result: Result[Any] = self.sync_session.execute(statement, params)
+        if isinstance(result, CursorResult) and not result.returns_rows:
+            return result
+        return result.freeze()()
+
+    def _drive(
+        self,
+        function: Callable[..., Coroutine[Any, Any, ReturnType]],
+        *args: Any,
+    ) -> ReturnType:
+        """
+        Run a coroutine function to completion in the current thread.
+
+        :param function: function using only this session.
+        :param args: arguments of the function.
+        :raises RuntimeError: if the function awaited something else.
+        :return: result of the function.
+        """
+        coroutine = function(*args)
+        _batch.session = self
+        try:
+            coroutine.send(None)
+        except StopIteration as stop:
+            return cast(ReturnType, stop.value)
+        finally:
+            _batch.session = None
+        coroutine.close()
+        raise RuntimeError("A batch awaited something besides its session")
+
+
+class NestedTransaction:
+    """Savepoint of a threaded session."""
+
+    def __init__(self, session: ThreadedSession) -> None:
+        self.session = session
+        self._transaction: Optional[SessionTransaction] = None
+
+    async def __aenter__(self) -> "NestedTransaction":
+        self._transaction = await self.session._call(self._begin)  # noqa: WPS437
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        if self._transaction is not None:
+            await self.session._call(  # noqa: WPS437
+                self._transaction.__exit__,
+                *exc_info,
+            )
+
+    def _begin(self) -> SessionTransaction:
+        return self.session.sync_session.begin_nested().__enter__()
+
+
+class ThreadedSessionMaker:
+    """Factory of threaded sessions sharing an engine and a pool of threads."""
+
+    def __init__(self, url: str, threads: int, echo: bool = False) -> None:
+        self.engine = create_engine(
+            url,
+            echo=echo,
+            pool_size=threads,
+            max_overflow=-1,
+            connect_args={"check_same_thread": False},
+        )
+        event.listen(self.engine, "connect", _set_progress_handler)
+        self._sessions = sessionmaker(self.engine, expire_on_commit=False)
+        self.threads = threads
+        self._executor = ThreadPool(
+            max_workers=threads,
+            thread_name_prefix="db",
+        )
+        self._writer: Optional[asyncio.Lock] = None
+
+    def __call__(self) -> AsyncSession:
+        """
+        Create a session.
+
+        :return: threaded session, typed as the session it stands in for.
+        """
+        # The lock is created lazily to bind it to the running event loop.
+        if self._writer is None:
+            self._writer = asyncio.Lock()
+        return cast(
+            AsyncSession,
+            ThreadedSession(self._sessions(), self._executor, self._writer),
+        )
+
+    async def open_connections(self) -> None:
+        """Open a pooled connection for every thread."""
+        await asyncio.get_running_loop().run_in_executor(
+            self._executor,
+            self._open_connections,
+        )
+
+    def utilization(self) -> float:
+        """
+        Demand for the pool of threads.
+
+        :return: calls waiting for or running in the pool per thread.
+        """
+        return self._executor.calls / self.threads
+
+    def dispose(self) -> None:
+        """Wait for running calls and close all connections."""
+        self._executor.shutdown()
+        self.engine.dispose()
+
+    def _open_connections(self) -> None:
+        # Held together, so each checkout opens a new connection.
+        connections = [self.engine.connect() for _ in range(self.threads)]
+        for connection in connections:
+            connection.close()
+
+
+def _batched(method: DAOMethod, write: bool) -> DAOMethod:
+    @functools.wraps(method)
+    async def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:  # noqa: WPS430
+        session = self.session
+        if isinstance(session, ThreadedSession):
+            return await session.run(
+                functools.partial(method, self, *args, **kwargs),
+                write=write,
+            )
+        return await method(self, *args, **kwargs)
+
+    return cast(DAOMethod, wrapper)
+
+
+def batched(method: DAOMethod) -> DAOMethod:
+    """
+    Run a reading DAO method in a single hop when its session is threaded.
+
+    :param method: asynchronous method of a DAO with a ``session``.
+    :return: wrapped method.
+    """
+    return _batched(method, write=False)
+
+
+def batched_write(method: DAOMethod) -> DAOMethod:
+    """
+    Run a writing DAO method in a single hop when its session is threaded.
+
+    :param method: asynchronous method of a DAO with a ``session``.
+    :return: wrapped method.
+    """
+    return _batched(method, write=True)
@@ -1,7 +1,20 @@
+import hashlib
 import os
+from typing import Callable, Optional
 
+from sqlalchemy import MetaData
+from sqlalchemy.engine import Dialect
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from tvshow_backend.db.migrate import check_schema
 from tvshow_backend.settings import settings
 
+# Key-value table with facts about the database kept by the application.
+SCHEMA_METADATA_TABLE = "schema_metadata"
+_FINGERPRINT_KEY = "schema_fingerprint"
+
 
 async def create_database() -> None:
     """Create a database."""
@@ -11,3 +24,86 @@ async def drop_database() -> None:
     """Drop current database."""
     if settings.db_file.exists():
         os.remove(settings.db_file)
+
+
+def schema_fingerprint(metadata: MetaData, dialect: Dialect) -> str:
+    """
+    Compute fingerprint of the DDL for all tables.
+
+    :param metadata: metadata with all tables.
+    :param dialect: dialect to compile DDL with.
+    :return: fingerprint of the schema.
+    """
+    statements = []
+    for table in metadata.sorted_tables:
+        statements.append(str(CreateTable(table).compile(dialect=dialect)))
+        for index in sorted(table.indexes, key=lambda idx: str(idx.name)):
+            statements.append(str(CreateIndex(index).compile(dialect=dialect)))
+    return hashlib.sha256("\n".join(statements).encode()).hexdigest()
+
+
+async def _stored_fingerprint(connection: AsyncConnection) -> Optional[str]:
+    try:
+        stored = await connection.exec_driver_sql(
+            f"SELECT value FROM {SCHEMA_METADATA_TABLE} WHERE name = ?",
+            (_FINGERPRINT_KEY,),
+        )
+    except OperationalError:
+        # The table is created together with the first schema.
+        return None
+    return stored.scalar()
+
+
+async def create_tables(
+    engine: AsyncEngine,
+    metadata: MetaData,
+    skip_if_unchanged: bool = True,
+    load_models: Optional[Callable[[], None]] = None,
+    incremental_vacuum: bool = False,
+) -> bool:
+    """
+    Create missing tables, skipping DDL when the schema is unchanged.
+
+    Fingerprint of the schema is stored in the ``schema_metadata`` table
+    after tables are created. When the stored fingerprint matches the
+    current one, the database already has every table and index,
+    so no DDL or table introspection is needed. Otherwise the TV show
+    table is checked to have been migrated to typed columns.
+
+    :param engine: engine of the database.
+    :param metadata: metadata with all tables.
+    :param skip_if_unchanged: compare fingerprints before running DDL.
+    :param load_models: function registering all models in the metadata.
+        It is called only when the fingerprint of already registered
+        models doesn't match, since they are usually imported by routes.
+    :param incremental_vacuum: create a new database with incremental
+        auto-vacuum, so free pages can be returned to the filesystem
+        without a full ``VACUUM``. Existing databases are not changed.
+    :return: whether DDL was executed.
+    """
+    async with engine.begin() as connection:
+        stored = await _stored_fingerprint(connection) if skip_if_unchanged else None
+        fingerprint = schema_fingerprint(metadata, engine.dialect)
+        if stored is not None and stored == fingerprint:
+            return False
+        if load_models is not None:
+            load_models()
+            fingerprint = schema_fingerprint(metadata, engine.dialect)
+            if stored is not None and stored == fingerprint:
+                return False
+        if incremental_vacuum:
+            pages = await connection.exec_driver_sql("PRAGMA page_count")
+            # Only takes effect before the first table is created.
+            if not pages.scalar():
+                await connection.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+        await connection.run_sync(check_schema)
+        await connection.run_sync(metadata.create_all)
+        await connection.exec_driver_sql(
+            f"CREATE TABLE IF NOT EXISTS {SCHEMA_METADATA_TABLE} "
+            + "(name VARCHAR PRIMARY KEY, value VARCHAR NOT NULL)",
+        )
+        await connection.exec_driver_sql(
+            f"INSERT OR REPLACE INTO {SCHEMA_METADATA_TABLE} VALUES (?, ?)",
+            (_FINGERPRINT_KEY, fingerprint),
+        )
+    return True
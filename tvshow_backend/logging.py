@@ -1,11 +1,21 @@
+import atexit
 import logging
+import queue
+import random
 import sys
-from typing import Union
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import TYPE_CHECKING, Any, Dict, Optional, Union
 
+import ujson
 from loguru import logger
 
 from tvshow_backend.settings import settings
 
+if TYPE_CHECKING:
+    from loguru import Record
+
 
 class InterceptHandler(logging.Handler):
     """
@@ -14,50 +24,273 @@ class InterceptHandler(logging.Handler):
     This handler intercepts all log requests and
     passes them to loguru.
 
+    Instead of walking stack frames to find the caller, which the loguru
+    example does for every record, caller information is taken from
+    the ``LogRecord`` itself, where the logging module already put it.
+
     For more info see:
     https://loguru.readthedocs.io/en/stable/overview.html#entirely-compatible-with-standard-logging
     """
 
+    def __init__(self, level: Union[int, str] = logging.NOTSET) -> None:
+        super().__init__(level)
+        self._record: Optional[logging.LogRecord] = None
+        self._levels: Dict[str, Union[str, int]] = {}
+        self._logger = logger.patch(self._patch_caller)
+
     def emit(self, record: logging.LogRecord) -> None:  # pragma: no cover
         """
         Propagates logs to loguru.
 
         :param record: record to log.
         """
+        level = self._levels.get(record.levelname)
+        if level is None:
+            try:
+                level = logger.level(record.levelname).name
+            except ValueError:
+                level = record.levelno
+            self._levels[record.levelname] = level
+
+        # Handler lock is held during emit, so the record
+        # can be safely passed to the patcher through the instance.
+        self._record = record
         try:
-            level: Union[str, int] = logger.level(record.levelname).name
-        except ValueError:
-            level = record.levelno
-
-        # Find caller from where originated the logged message
-        frame, depth = logging.currentframe(), 2
-        while frame.f_code.co_filename == logging.__file__:
-            frame = frame.f_back  # type: ignore
-            depth += 1
-
-        logger.opt(depth=depth, exception=record.exc_info).log(
-            level,
-            record.getMessage(),
-        )
+            self._logger.opt(exception=record.exc_info).log(
+                level,
+                record.getMessage(),
+            )
+        finally:
+            self._record = None
+
+    def _patch_caller(self, loguru_record: "Record") -> None:
+        record = self._record
+        if record is None:
+            return
+        loguru_record["name"] = record.name
+        loguru_record["function"] = record.funcName
+        loguru_record["line"] = record.lineno
+        loguru_record["module"] = record.module
+
+
+class AccessLogFilter(logging.Filter):
+    """
+    Sampling and rate limiting for access logs.
+
+    Every request produces an access log record, so under load they are
+    the biggest source of log volume. This filter keeps only a share of
+    them and caps how many are let through per second. Records are dropped
+    before they are formatted, so dropping is cheap.
+    """
+
+    def __init__(self, sample_rate: float = 1, rate_limit: int = 0) -> None:
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.rate_limit = rate_limit
+        self.dropped = 0
+        self._window_start = 0.0
+        self._window_count = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """
+        Decide whether the record should be logged.
+
+        :param record: access log record.
+        :return: True if the record should be logged.
+        """
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:  # noqa: S311
+            self.dropped += 1
+            return False
+        if self.rate_limit > 0:
+            now = time.monotonic()
+            if now - self._window_start >= 1:
+                self._window_start = now
+                self._window_count = 0
+            if self._window_count >= self.rate_limit:
+                self.dropped += 1
+                return False
+            self._window_count += 1
+        return True
+
+
+def _json_sink(message: Any) -> None:  # pragma: no cover
+    """
+    Writes a log message as a single JSON line.
+
+    :param message: loguru message.
+    """
+    record = message.record
+    payload: Dict[str, Any] = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "logger": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        "message": record["message"],
+    }
+    if record["extra"]:
+        payload["extra"] = record["extra"]
+    if record["exception"] is not None:
+        # Loguru appends the formatted traceback after the message.
+        payload["exception"] = message[len(record["message"]) + 1 :].rstrip()
+    sys.stdout.write(ujson.dumps(payload, default=str) + "\n")
+
+
+# Loguru default format without colors, applied by the logging thread.
+_TEXT_PREFIX = (
+    "{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {name}:{function}:{line} - "
+)
+
+
+def _text_sink(message: Any) -> None:  # pragma: no cover
+    """
+    Formats a log message like loguru does by default and writes it.
+
+    The handler only renders the message itself, the rest of the line is
+    formatted here, in the logging thread.
+
+    :param message: loguru message rendered with ``"{message}"`` format.
+    """
+    sys.stdout.write(_TEXT_PREFIX.format_map(message.record) + message)
+    sys.stdout.flush()
+
+
+class _QueueSink:
+    """
+    Loguru sink handing formatted messages over to the logging thread.
+
+    Messages logged by the logging thread itself, like converted records
+    of standard loggers, and messages logged after the thread stopped
+    are written right away.
+    """
+
+    def __init__(self, log_queue: "queue.SimpleQueue[Any]", sink: Any) -> None:
+        self.queue = log_queue
+        self.sink = sink
+        self.thread: Optional[threading.Thread] = None
+
+    def __call__(self, message: Any) -> None:
+        thread = self.thread
+        if thread is None or not thread.is_alive():
+            self.sink(message)
+        elif threading.current_thread() is thread:
+            self.sink(message)
+        else:
+            self.queue.put(message)
+
+
+class _QueueDispatcher(logging.Handler):
+    """
+    Handler of the logging thread.
+
+    Standard library records are converted to loguru, loguru messages
+    queued by ``_QueueSink`` are formatted and written to the sink.
+    """
+
+    def __init__(self, intercept_handler: InterceptHandler, sink: Any) -> None:
+        super().__init__()
+        self.intercept_handler = intercept_handler
+        self.sink = sink
+
+    def handle(self, record: Any) -> bool:  # pragma: no cover
+        """
+        Process an item taken from the queue.
+
+        :param record: standard library record or loguru message.
+        :return: True, items are never filtered here.
+        """
+        if isinstance(record, logging.LogRecord):
+            self.intercept_handler.handle(record)
+        else:
+            self.sink(record)
+        return True
+
+
+class _LocalQueueHandler(QueueHandler):
+    """
+    Queue handler for a queue consumed in the same process.
+
+    Records are put into the queue as is. Default implementation formats
+    them first so they can be pickled, which is wasted work here.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Prepare record for queuing.
+
+        :param record: record to enqueue.
+        :return: same record.
+        """
+        return record
+
+
+_listener: Optional[QueueListener] = None
+
+
+def _stop_listener() -> None:  # pragma: no cover
+    global _listener  # noqa: WPS420
+    if _listener is not None:
+        # Stopping the listener writes all records left in the queue.
+        _listener.stop()
+        _listener = None  # noqa: WPS442
 
 
 def configure_logging() -> None:  # pragma: no cover
-    """Configures logging."""
+    """
+    Configures logging.
+
+    With ``log_enqueue`` enabled, the event loop only puts records of
+    standard loggers (uvicorn, sqlalchemy, etc.) and messages of the
+    application loguru logger into a queue. Conversion to loguru,
+    formatting of log lines and writing happen in a background thread.
+    """
+    _stop_listener()
+    # Options of the loguru handler writing the output.
+    output: Dict[str, Any] = {"sink": sys.stdout}
+    if settings.log_json:
+        output = {"sink": _json_sink, "format": "{message}"}
     intercept_handler = InterceptHandler()
+    handler: logging.Handler = intercept_handler
+    if settings.log_enqueue:
+        log_queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        handler = _LocalQueueHandler(log_queue)
+        write = _json_sink if settings.log_json else _text_sink
+        queue_sink = _QueueSink(log_queue, write)
+        global _listener  # noqa: WPS420
+        _listener = QueueListener(  # noqa: WPS442
+            log_queue,
+            _QueueDispatcher(intercept_handler, write),
+        )
+        _listener.start()
+        queue_sink.thread = _listener._thread  # noqa: WPS437
+        output = {"sink": queue_sink, "format": "{message}"}
 
-    logging.basicConfig(handlers=[intercept_handler], level=logging.NOTSET)
+    logging.basicConfig(handlers=[handler], level=logging.NOTSET, force=True)
 
     for logger_name in logging.root.manager.loggerDict:
         if logger_name.startswith("uvicorn."):
             logging.getLogger(logger_name).handlers = []
 
     # change handler for default uvicorn logger
-    logging.getLogger("uvicorn").handlers = [intercept_handler]
-    logging.getLogger("uvicorn.access").handlers = [intercept_handler]
+    logging.getLogger("uvicorn").handlers = [handler]
+    access_logger = logging.getLogger("uvicorn.access")
+    access_logger.handlers = [handler]
+    access_logger.filters = [
+        log_filter
+        for log_filter in access_logger.filters
+        if not isinstance(log_filter, AccessLogFilter)
+    ]
+    if settings.access_log_sample_rate < 1 or settings.access_log_rate_limit > 0:
+        access_logger.addFilter(
+            AccessLogFilter(
+                sample_rate=settings.access_log_sample_rate,
+                rate_limit=settings.access_log_rate_limit,
+            ),
+        )
 
     # set logs output, level and format
     logger.remove()
-    logger.add(
-        sys.stdout,
-        level=settings.log_level.value,
-    )
+    logger.add(level=settings.log_level.value, **output)
+
+
+atexit.register(_stop_listener)
@@ -0,0 +1 @@
+"""In-memory analytics over the TV show catalog."""
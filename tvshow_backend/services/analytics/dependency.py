@@ -0,0 +1,24 @@
+from typing import TYPE_CHECKING
+
+from fastapi import HTTPException, status
+from starlette.requests import Request
+
+if TYPE_CHECKING:
+    from tvshow_backend.services.analytics.snapshot import CatalogSnapshot
+
+
+def get_catalog_snapshot(request: Request) -> "CatalogSnapshot":
+    """
+    Returns the current catalog snapshot.
+
+    :param request: current request.
+    :raises HTTPException: if the snapshot is disabled or not built yet.
+    :return: catalog snapshot.
+    """
+    replica = getattr(request.app.state, "catalog_replica", None)
+    if replica is None or replica.current is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Analytics snapshot is not available.",
+        )
+    return replica.current
@@ -0,0 +1,45 @@
+from fastapi import FastAPI
+from loguru import logger
+
+from tvshow_backend.services.coherence.replica import LocalReplica
+from tvshow_backend.settings import settings
+
+
+async def init_analytics(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Start building the columnar catalog snapshot.
+
+    The snapshot is built in the background, analytics requests
+    are rejected until it is ready.
+
+    :param app: current fastapi application.
+    """
+    app.state.catalog_replica = None
+    if not settings.analytics_snapshot:
+        return
+    try:
+        from tvshow_backend.services.analytics.snapshot import (  # noqa: WPS433
+            CatalogSnapshot,
+        )
+    except ImportError:
+        logger.warning("NumPy is not installed, analytics snapshot is disabled")
+        return
+
+    replica = LocalReplica(
+        "catalog snapshot",
+        settings.db_location,
+        build=CatalogSnapshot.load,
+        apply=CatalogSnapshot.apply,
+    )
+    await replica.start(app.state.generation_watcher)
+    app.state.catalog_replica = replica
+
+
+async def shutdown_analytics(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Stop updating the catalog snapshot.
+
+    :param app: current fastapi application.
+    """
+    if app.state.catalog_replica is not None:
+        await app.state.catalog_replica.stop()
@@ -0,0 +1,423 @@
+"""
+Columnar in-memory snapshot of the TV show catalog.
+
+Every column needed for analytics is stored in a NumPy array indexed by
+slot. Categorical columns are dictionary encoded: an array keeps integer
+codes and a dictionary maps them back to strings. Multi-valued columns
+(genres and countries are comma separated lists) are stored as parallel
+arrays of ``(slot, code)`` pairs ordered by slot.
+
+Updates never move data: an updated show gets a new slot and the old one
+is marked dead, dead slots are dropped by an occasional compaction.
+"""
+import re
+import sqlite3
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+
+from tvshow_backend.db.changes import DELETE, TvShowChange
+
+CATEGORICAL = ("type", "rating")
+MULTI_VALUED = ("genre", "country")
+NUMERIC = ("release_year", "year_added")
+
+# Columns of a source row, in order.
+SOURCE_COLUMNS = (
+    "show_id",
+    "type",
+    "genre",
+    "country",
+    "release_year",
+    "rating",
+    "date_added",
+)
+
+# Value of numeric columns when it is unknown.
+MISSING = -1
+# bincount is used for grouping while the key space is not bigger than this.
+_MAX_DENSE_GROUPS = 1 << 24
+_YEAR = re.compile(r"\b(\d{4})\b")
+
+GroupKey = Tuple[Any, ...]
+
+
+def _year_added(date_added: Optional[str]) -> int:
+    match = _YEAR.search(date_added or "")
+    return int(match.group(1)) if match else MISSING
+
+
+def _split(cell: Optional[str]) -> List[str]:
+    if not cell:
+        return []
+    return list(dict.fromkeys(part.strip() for part in cell.split(",") if part.strip()))
+
+
+class Dictionary:
+    """Dictionary encoding of a categorical column."""
+
+    def __init__(self) -> None:
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def encode(self, value: str) -> int:
+        """
+        Get code of a value, adding it if needed.
+
+        :param value: value to encode.
+        :return: its code.
+        """
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(value)
+        return code
+
+    def membership(self, values: Iterable[str]) -> np.ndarray:
+        """
+        Build a lookup table telling which codes belong to given values.
+
+        Indexing the table with a column of codes is a single gather,
+        which is faster than ``np.isin`` for any amount of values.
+
+        :param values: values to look up, unknown ones are ignored.
+        :return: boolean array indexed by code.
+        """
+        table = np.zeros(max(len(self.values), 1), dtype=np.bool_)
+        for value in values:
+            code = self._codes.get(value)
+            if code is not None:
+                table[code] = True
+        return table
+
+
+class _Growable:
+    """Array with amortized appends."""
+
+    def __init__(self, dtype: Any, capacity: int = 1024) -> None:
+        self.data = np.empty(capacity, dtype=dtype)
+        self.size = 0
+
+    @property
+    def view(self) -> np.ndarray:
+        return self.data[: self.size]
+
+    def extend(self, values: Sequence[Any]) -> None:
+        end = self.size + len(values)
+        if end > len(self.data):
+            grown = np.empty(max(end, len(self.data) * 2), dtype=self.data.dtype)
+            grown[: self.size] = self.view
+            self.data = grown
+        self.data[self.size : end] = values
+        self.size = end
+
+    def replace(self, values: np.ndarray) -> None:
+        self.data = np.array(values, dtype=self.data.dtype)
+        self.size = len(values)
+
+
+class CatalogSnapshot:
+    """Columnar copy of the TV show table answering filter and group-by queries."""
+
+    def __init__(self) -> None:
+        self.dictionaries = {name: Dictionary() for name in CATEGORICAL + MULTI_VALUED}
+        self.dead = 0
+        self._show_ids = _Growable(np.int64)
+        self._alive = _Growable(np.bool_)
+        self._columns = {name: _Growable(np.int32) for name in CATEGORICAL + NUMERIC}
+        self._pairs = {
+            name: (_Growable(np.int32), _Growable(np.int32)) for name in MULTI_VALUED
+        }
+        self._slots: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence[Any]]) -> "CatalogSnapshot":
+        """
+        Build a snapshot from source rows.
+
+        :param rows: rows with values of ``SOURCE_COLUMNS``.
+        :return: new snapshot.
+        """
+        snapshot = cls()
+        snapshot.append(rows)
+        return snapshot
+
+    @classmethod
+    def load(cls, connection: sqlite3.Connection) -> "CatalogSnapshot":
+        """
+        Build a snapshot from the database.
+
+        :param connection: connection to the database.
+        :return: new snapshot.
+        """
+        columns = ", ".join(f'"{name}"' for name in SOURCE_COLUMNS)
+        cursor = connection.execute(f"SELECT {columns} FROM tvshow_model")
+        cursor.arraysize = 10_000
+        snapshot = cls()
+        while True:  # noqa: WPS457
+            rows = cursor.fetchmany()
+            if not rows:
+                return snapshot
+            snapshot.append(rows)
+
+    def append(self, rows: Iterable[Sequence[Any]]) -> None:
+        """
+        Add or replace shows.
+
+        :param rows: rows with values of ``SOURCE_COLUMNS``.
+        """
+        first_slot = self._show_ids.size
+        show_ids: List[int] = []
+        alive: List[bool] = []
+        values: Dict[str, List[int]] = {name: [] for name in self._columns}
+        pair_slots: Dict[str, List[int]] = {name: [] for name in MULTI_VALUED}
+        pair_codes: Dict[str, List[int]] = {name: [] for name in MULTI_VALUED}
+        encoders: Dict[str, Callable[[str], int]] = {
+            name: dictionary.encode for name, dictionary in self.dictionaries.items()
+        }
+        for slot, row in enumerate(rows, start=first_slot):
+            show_id, type_, genre, country, release_year, rating, date_added = row
+            show_id = int(show_id)
+            previous = self._slots.get(show_id)
+            if previous is not None:
+                self._kill(previous, alive, first_slot)
+            self._slots[show_id] = slot
+            show_ids.append(show_id)
+            alive.append(True)
+            values["type"].append(encoders["type"](type_ or ""))
+            values["rating"].append(encoders["rating"](rating or ""))
+            values["release_year"].append(
+                MISSING if release_year is None else int(release_year),
+            )
+            values["year_added"].append(_year_added(date_added))
+            for name, cell in (("genre", genre), ("country", country)):
+                for part in _split(cell):
+                    pair_slots[name].append(slot)
+                    pair_codes[name].append(encoders[name](part))
+
+        self._show_ids.extend(show_ids)
+        self._alive.extend(alive)
+        for name, column in self._columns.items():
+            column.extend(values[name])
+        for name, (slots, codes) in self._pairs.items():
+            slots.extend(pair_slots[name])
+            codes.extend(pair_codes[name])
+
+    def upsert(self, values: Mapping[str, Any]) -> None:
+        """
+        Add or replace a single show.
+
+        :param values: column values of the show.
+        """
+        self.append([tuple(values.get(name) for name in SOURCE_COLUMNS)])
+
+    def delete(self, show_id: int) -> None:
+        """
+        Remove a show if it is present.
+
+        :param show_id: id of the show.
+        """
+        slot = self._slots.pop(int(show_id), None)
+        if slot is not None:
+            self._kill(slot)
+
+    def apply(self, changes: List[TvShowChange]) -> None:
+        """
+        Apply committed changes.
+
+        :param changes: changes to apply.
+        """
+        for change in changes:
+            if change.operation == DELETE or change.values is None:
+                self.delete(change.show_id)
+            else:
+                self.upsert(change.values)
+        if self.dead > max(len(self), 1024):
+            self.compact()
+
+    def compact(self) -> None:
+        """Drop slots of deleted and replaced shows."""
+        alive = self._alive.view
+        new_slots = np.cumsum(alive, dtype=np.int64) - 1
+        for name, (slots, codes) in self._pairs.items():
+            keep = alive[slots.view]
+            codes.replace(codes.view[keep])
+            slots.replace(new_slots[slots.view[keep]])
+        for column in self._columns.values():
+            column.replace(column.view[alive])
+        self._show_ids.replace(self._show_ids.view[alive])
+        self._alive.replace(np.ones(len(self._show_ids.view), dtype=np.bool_))
+        self._slots = {
+            show_id: slot for slot, show_id in enumerate(self._show_ids.view.tolist())
+        }
+        self.dead = 0
+
+    def select(
+        self,
+        filters: Optional[Mapping[str, Sequence[str]]] = None,
+        ranges: Optional[Mapping[str, Tuple[Optional[int], Optional[int]]]] = None,
+    ) -> np.ndarray:
+        """
+        Find shows matching all conditions.
+
+        :param filters: allowed values of categorical columns. A show
+            matches if it has any of them.
+        :param ranges: inclusive bounds of numeric columns.
+        :return: boolean mask over slots.
+        """
+        mask = self._alive.view.copy()
+        for name, allowed in (filters or {}).items():
+            table = self.dictionaries[name].membership(allowed)
+            if name in MULTI_VALUED:
+                slots, codes = self._pair_views(name)
+                matched = np.zeros(len(mask), dtype=np.bool_)
+                matched[slots[table[codes]]] = True
+                mask &= matched
+            else:
+                mask &= table[self._columns[name].view]
+        for name, (low, high) in (ranges or {}).items():
+            column = self._columns[name].view
+            if low is not None:
+                mask &= column >= low
+            if high is not None:
+                mask &= (column <= high) & (column != MISSING)
+        return mask
+
+    def group_count(
+        self,
+        mask: np.ndarray,
+        group_by: Sequence[str],
+        limit: Optional[int] = None,
+    ) -> List[Tuple[GroupKey, int]]:
+        """
+        Count selected shows by combinations of column values.
+
+        A show with several genres or countries is counted in each of them.
+        Shows with unknown numeric values are not counted.
+
+        :param mask: selected slots.
+        :param group_by: columns to group by.
+        :param limit: return only this amount of the biggest groups.
+        :return: group keys with amounts of shows, biggest first.
+        """
+        slots = np.flatnonzero(mask)
+        keys = np.zeros(len(slots), dtype=np.int64)
+        decoders: List[Tuple[int, Callable[[int], Any]]] = []
+        unique = True
+        for name in group_by:
+            if name in MULTI_VALUED:
+                slots, keys, codes = self._expand(name, slots, keys, unique)
+                unique = False
+                cardinality = len(self.dictionaries[name])
+                decode: Callable[[int], Any] = self.dictionaries[
+                    name
+                ].values.__getitem__
+            elif name in CATEGORICAL:
+                codes = self._columns[name].view[slots]
+                cardinality = len(self.dictionaries[name])
+                decode = self.dictionaries[name].values.__getitem__
+            else:
+                column = self._columns[name].view[slots]
+                known = column != MISSING
+                slots, keys, column = slots[known], keys[known], column[known]
+                low = int(column.min()) if len(column) else 0
+                codes = column - low
+                cardinality = int(codes.max()) + 1 if len(codes) else 1
+                decode = low.__add__
+            keys = keys * cardinality + codes
+            decoders.append((max(cardinality, 1), decode))
+
+        groups, counts = self._count_keys(keys, decoders)
+        order = np.argsort(-counts, kind="stable")[:limit]
+        result = []
+        for index in order.tolist():
+            key = int(groups[index])
+            parts = []
+            for cardinality, decoder in reversed(decoders):
+                key, code = divmod(key, cardinality)
+                parts.append(decoder(code))
+            result.append((tuple(reversed(parts)), int(counts[index])))
+        return result
+
+    def _pair_views(self, name: str) -> Tuple[np.ndarray, np.ndarray]:
+        slots, codes = self._pairs[name]
+        return slots.view, codes.view
+
+    def _expand(
+        self,
+        name: str,
+        slots: np.ndarray,
+        keys: np.ndarray,
+        unique: bool,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Join selected slots with values of a multi-valued column.
+
+        When every slot is selected once, pairs of selected slots are picked
+        with a single gather. Otherwise pairs are ordered by slot, so the
+        values of every slot form a range found from per-slot pair counts.
+
+        :param name: multi-valued column.
+        :param slots: selected slots.
+        :param keys: group keys of selected slots.
+        :param unique: whether no slot is repeated in ``slots``.
+        :return: slots and keys repeated once per value, and value codes.
+        """
+        pair_slots, pair_codes = self._pair_views(name)
+        size = len(self._alive.view)
+        if unique:
+            key_by_slot = np.full(size, -1, dtype=np.int64)
+            key_by_slot[slots] = keys
+            pair_keys = key_by_slot[pair_slots]
+            selected = pair_keys >= 0
+            return pair_slots[selected], pair_keys[selected], pair_codes[selected]
+
+        counts = np.bincount(pair_slots, minlength=size)
+        lengths = counts[slots]
+        starts = (np.cumsum(counts) - counts)[slots]
+        shifts = starts - (np.cumsum(lengths) - lengths)
+        index = np.repeat(shifts, lengths) + np.arange(int(lengths.sum()))
+        return np.repeat(slots, lengths), np.repeat(keys, lengths), pair_codes[index]
+
+    @staticmethod
+    def _count_keys(
+        keys: np.ndarray,
+        decoders: List[Tuple[int, Callable[[int], Any]]],
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        space = 1
+        for cardinality, _ in decoders:
+            space *= cardinality
+        if space <= _MAX_DENSE_GROUPS:
+            counts = np.bincount(keys, minlength=1)
+            groups = np.flatnonzero(counts)
+            return groups, counts[groups]
+        return np.unique(keys, return_counts=True)
+
+    def _kill(
+        self,
+        slot: int,
+        batch: Optional[List[bool]] = None,
+        first_slot: int = 0,
+    ) -> None:
+        if batch is not None and slot >= first_slot:
+            batch[slot - first_slot] = False
+        else:
+            self._alive.data[slot] = False
+        self.dead += 1
@@ -0,0 +1 @@
+"""Title autocomplete."""
@@ -0,0 +1,21 @@
+from fastapi import HTTPException, status
+from starlette.requests import Request
+
+from tvshow_backend.services.autocomplete.index import TitleIndex
+
+
+def get_title_index(request: Request) -> TitleIndex:
+    """
+    Returns the current title index.
+
+    :param request: current request.
+    :raises HTTPException: if the index is disabled or not built yet.
+    :return: title index.
+    """
+    replica = getattr(request.app.state, "title_replica", None)
+    if replica is None or replica.current is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Title index is not available.",
+        )
+    return replica.current
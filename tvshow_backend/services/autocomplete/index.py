@@ -0,0 +1,333 @@
+"""
+In-memory prefix index of TV show titles.
+
+Titles are folded (accents removed, case folded) and kept in a sorted list,
+so titles starting with a prefix form a contiguous range found with two
+binary searches. Small ranges are ranked on the fly. For prefixes matching
+many titles the best ``MAX_LIMIT`` shows are precomputed when the index is
+built and kept up to date on every change, so a lookup never scans more
+than ``SCAN_LIMIT`` titles.
+"""
+import heapq
+import sqlite3
+import sys
+import unicodedata
+from array import array
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from loguru import logger
+
+from tvshow_backend.db.changes import DELETE, TvShowChange
+from tvshow_backend.db.models.tvshow_model import parse_date_added
+
+RECENT = "recent"
+POPULAR = "popular"
+ORDERS = (RECENT, POPULAR)
+
+# Maximum amount of suggestions for a single prefix.
+MAX_LIMIT = 50
+# Ranges of at most this size are ranked on every lookup.
+SCAN_LIMIT = 512
+
+# Separates the folded title from the show id in index keys.
+_SEPARATOR = "\0"
+_MAX_CHAR = "\U0010ffff"
+
+Suggestion = Tuple[int, str]
+
+
+def fold(text: str) -> str:
+    """
+    Normalize text for case and accent insensitive matching.
+
+    :param text: text to fold.
+    :return: folded text.
+    """
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(
+        char for char in decomposed if not unicodedata.combining(char)
+    ).casefold()
+
+
+def recency(date_added: Optional[str]) -> int:
+    """
+    Convert the date a show was added to a sortable number.
+
+    :param date_added: date like ``"August 11, 2014"`` or ``"2014-08-11"``.
+    :return: date as ``YYYYMMDD``, 0 if it is unknown.
+    """
+    added_on = parse_date_added(date_added)
+    if added_on is None:
+        return 0
+    return added_on.year * 10000 + added_on.month * 100 + added_on.day
+
+
+class TitleIndex:
+    """Prefix index of titles with top-k lookups by recency or popularity."""
+
+    def __init__(self) -> None:
+        self.popularity: Dict[int, float] = {}
+        self._keys: List[str] = []
+        self._ids = array("q")
+        # Title and recency of every show.
+        self._shows: Dict[int, Tuple[str, int]] = {}
+        # Best shows of prefixes matching more than SCAN_LIMIT titles.
+        self._top: Dict[str, Dict[str, List[int]]] = {order: {} for order in ORDERS}
+
+    def __len__(self) -> int:
+        return len(self._shows)
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Iterable[Tuple[Any, str, Optional[str]]],
+        popularity: Optional[Mapping[int, float]] = None,
+    ) -> "TitleIndex":
+        """
+        Build an index.
+
+        :param rows: show ids with titles and dates they were added.
+        :param popularity: popularity of shows.
+        :return: new index.
+        """
+        index = cls()
+        index.popularity.update(popularity or {})
+        entries = []
+        for show_id, title, date_added in rows:
+            show_id = int(show_id)
+            index._shows[show_id] = (title, recency(date_added))
+            entries.append((f"{fold(title)}{_SEPARATOR}{show_id}", show_id))
+        entries.sort()
+        index._keys = [key for key, _ in entries]
+        index._ids = array("q", [show_id for _, show_id in entries])
+        for order in ORDERS:
+            index._collect(order, 0, len(index._keys), "")
+        return index
+
+    @classmethod
+    def load(cls, connection: sqlite3.Connection) -> "TitleIndex":
+        """
+        Build an index from the database, with views of shows as popularity.
+
+        :param connection: connection to the database.
+        :return: new index.
+        """
+        try:
+            popularity = dict(
+                connection.execute("SELECT show_id, views FROM tvshow_views"),
+            )
+        except sqlite3.OperationalError:
+            # Databases created before views were counted.
+            popularity = {}
+        cursor = connection.execute(
+            "SELECT show_id, title, date_added FROM tvshow_model",
+        )
+        index = cls.from_rows(cursor, popularity)
+        logger.info(
+            "Title index holds {} titles in about {:.1f} MiB",
+            len(index),
+            index.memory_bytes() / 2**20,
+        )
+        return index
+
+    def search(
+        self,
+        prefix: str,
+        limit: int = 10,
+        order: str = RECENT,
+    ) -> List[Suggestion]:
+        """
+        Find the best titles starting with a prefix.
+
+        :param prefix: beginning of the title.
+        :param limit: maximum amount of suggestions, at most ``MAX_LIMIT``.
+        :param order: ``RECENT`` or ``POPULAR``.
+        :return: show ids and titles, best first.
+        """
+        folded = fold(prefix)
+        low, high = self._range(folded)
+        if high - low <= SCAN_LIMIT:
+            show_ids = self._scan(order, low, high, limit)
+        else:
+            top = self._top[order].get(folded)
+            # Lists get shorter when their shows are deleted.
+            if top is None or len(top) < min(limit, high - low):
+                top = self._scan(order, low, high, MAX_LIMIT)
+                self._top[order][folded] = top
+            show_ids = top[:limit]
+        return [(show_id, self._shows[show_id][0]) for show_id in show_ids]
+
+    def upsert(self, show_id: int, title: str, date_added: Optional[str]) -> None:
+        """
+        Add or replace a show.
+
+        :param show_id: id of the show.
+        :param title: title of the show.
+        :param date_added: date the show was added.
+        """
+        show_id = int(show_id)
+        self.delete(show_id)
+        self._shows[show_id] = (title, recency(date_added))
+        folded = fold(title)
+        key = f"{folded}{_SEPARATOR}{show_id}"
+        position = bisect_left(self._keys, key)
+        self._keys.insert(position, key)
+        self._ids.insert(position, show_id)
+        for order in ORDERS:
+            self._reposition(order, folded, show_id)
+
+    def delete(self, show_id: int) -> None:
+        """
+        Remove a show if it is present.
+
+        :param show_id: id of the show.
+        """
+        show = self._shows.pop(int(show_id), None)
+        if show is None:
+            return
+        folded = fold(show[0])
+        position = bisect_left(self._keys, f"{folded}{_SEPARATOR}{show_id}")
+        del self._keys[position]  # noqa: WPS420
+        del self._ids[position]  # noqa: WPS420
+        for order in ORDERS:
+            for top in self._tops(order, folded):
+                if show_id in top:
+                    top.remove(show_id)
+
+    def apply(self, changes: List[TvShowChange]) -> None:
+        """
+        Apply committed changes.
+
+        :param changes: changes to apply.
+        """
+        for change in changes:
+            if change.operation == DELETE or change.values is None:
+                self.delete(change.show_id)
+            else:
+                self.upsert(
+                    change.show_id,
+                    change.values["title"],
+                    change.values.get("date_added"),
+                )
+
+    def set_popularity(self, scores: Mapping[int, float]) -> None:
+        """
+        Update popularity of shows.
+
+        :param scores: new popularity of changed shows.
+        """
+        for show_id, score in scores.items():
+            self.popularity[show_id] = score
+            show = self._shows.get(show_id)
+            if show is not None:
+                self._reposition(POPULAR, fold(show[0]), show_id)
+
+    def memory_bytes(self) -> int:
+        """
+        Estimate memory used by the index.
+
+        :return: approximate size in bytes.
+        """
+        size = sys.getsizeof(self._keys) + sys.getsizeof(self._ids)
+        size += sum(map(sys.getsizeof, self._keys))
+        size += sys.getsizeof(self._shows) + sys.getsizeof(self.popularity)
+        for show_id, (title, added) in self._shows.items():
+            size += sys.getsizeof(show_id) + sys.getsizeof(title)
+            size += sys.getsizeof(added) + sys.getsizeof((title, added))
+        for tops in self._top.values():
+            size += sys.getsizeof(tops)
+            size += sum(
+                sys.getsizeof(prefix) + sys.getsizeof(top)
+                for prefix, top in tops.items()
+            )
+        return size
+
+    def _score(self, order: str) -> Callable[[int], Tuple[Any, ...]]:
+        shows = self._shows
+        if order == POPULAR:
+            popularity = self.popularity
+            return lambda show_id: (
+                popularity.get(show_id, 0),
+                shows[show_id][1],
+                show_id,
+            )
+        return lambda show_id: (shows[show_id][1], show_id)
+
+    def _range(self, folded: str) -> Tuple[int, int]:
+        low = bisect_left(self._keys, folded)
+        return low, bisect_left(self._keys, folded + _MAX_CHAR, low)
+
+    def _scan(self, order: str, low: int, high: int, limit: int) -> List[int]:
+        return heapq.nlargest(limit, self._ids[low:high], key=self._score(order))
+
+    def _tops(self, order: str, folded: str) -> Iterable[List[int]]:
+        tops = self._top[order]
+        for end in range(1, len(folded) + 1):
+            top = tops.get(folded[:end])
+            if top is not None:
+                yield top
+
+    def _collect(self, order: str, low: int, high: int, prefix: str) -> List[int]:
+        """
+        Precompute best shows of all large ranges inside a range.
+
+        The best shows of a prefix are merged from the best shows of its
+        one character longer prefixes, so every title is ranked only once.
+
+        :param order: ranking to use.
+        :param low: first position of the range.
+        :param high: position after the range.
+        :param prefix: common prefix of keys in the range.
+        :return: best shows of the range.
+        """
+        if high - low <= SCAN_LIMIT:
+            return self._scan(order, low, high, MAX_LIMIT)
+        depth = len(prefix)
+        candidates: List[int] = []
+        position = low
+        while position < high:
+            child = prefix + self._keys[position][depth]
+            end = bisect_left(self._keys, child + _MAX_CHAR, position, high)
+            if child.endswith(_SEPARATOR):
+                # Same title, keys differ only by show id.
+                candidates.extend(self._scan(order, position, end, MAX_LIMIT))
+            else:
+                candidates.extend(self._collect(order, position, end, child))
+            position = end
+        top = heapq.nlargest(MAX_LIMIT, candidates, key=self._score(order))
+        if prefix:
+            self._top[order][prefix] = top
+        return top
+
+    def _reposition(self, order: str, folded: str, show_id: int) -> None:
+        """
+        Update precomputed lists after the score of a show changed.
+
+        A show is put back into a list only when it surely belongs there:
+        its score is not lower than the last one, or the list holds every
+        show of the prefix. Otherwise the list just gets shorter.
+
+        :param order: ranking to update.
+        :param folded: folded title of the show.
+        :param show_id: id of the show.
+        """
+        score = self._score(order)
+        new_score = score(show_id)
+        for end in range(1, len(folded) + 1):
+            top = self._top[order].get(folded[:end])
+            if top is None:
+                continue
+            if show_id in top:
+                top.remove(show_id)
+            if not top or new_score < score(top[-1]):
+                low, high = self._range(folded[:end])
+                if high - low > len(top) + 1:
+                    continue
+            position = 0
+            while position < len(top) and score(top[position]) > new_score:
+                position += 1
+            top.insert(position, show_id)
+            del top[MAX_LIMIT:]  # noqa: WPS420
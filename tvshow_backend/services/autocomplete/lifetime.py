@@ -0,0 +1,35 @@
+from fastapi import FastAPI
+
+from tvshow_backend.services.autocomplete.index import TitleIndex
+from tvshow_backend.services.coherence.replica import LocalReplica
+from tvshow_backend.settings import settings
+
+
+async def init_autocomplete(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Start building the title index.
+
+    :param app: current fastapi application.
+    """
+    app.state.title_replica = None
+    if not settings.autocomplete_index:
+        return
+    replica = LocalReplica(
+        "title index",
+        settings.db_location,
+        build=TitleIndex.load,
+        apply=TitleIndex.apply,
+        min_interval=settings.autocomplete_refresh_interval,
+    )
+    await replica.start(app.state.generation_watcher)
+    app.state.title_replica = replica
+
+
+async def shutdown_autocomplete(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Stop updating the title index.
+
+    :param app: current fastapi application.
+    """
+    if app.state.title_replica is not None:
+        await app.state.title_replica.stop()
@@ -0,0 +1 @@
+"""Feed of committed catalog changes for client synchronization."""
@@ -0,0 +1,21 @@
+from fastapi import HTTPException, status
+from starlette.requests import Request
+
+from tvshow_backend.services.changefeed.notifier import ChangeNotifier
+
+
+def get_change_notifier(request: Request) -> ChangeNotifier:
+    """
+    Returns the notifier of catalog changes.
+
+    :param request: current request.
+    :raises HTTPException: if the application has not started yet.
+    :return: change notifier.
+    """
+    notifier = getattr(request.app.state, "change_notifier", None)
+    if notifier is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Change feed is not available.",
+        )
+    return notifier
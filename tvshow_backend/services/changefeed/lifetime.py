@@ -0,0 +1,63 @@
+import asyncio
+
+from fastapi import FastAPI
+from loguru import logger
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from tvshow_backend.services.changefeed.notifier import ChangeNotifier
+from tvshow_backend.services.changefeed.retention import trim_changelog
+from tvshow_backend.settings import settings
+
+
+async def _trim_periodically(
+    session_factory: "async_sessionmaker[AsyncSession]",
+    interval: float,
+) -> None:  # pragma: no cover
+    while True:  # noqa: WPS457
+        await asyncio.sleep(interval)
+        try:
+            trimmed = await trim_changelog(session_factory)
+        except SQLAlchemyError as exc:
+            logger.warning("Cannot trim the changelog: {}", exc)
+            continue
+        logger.info("Trimmed the changelog: {}", trimmed)
+
+
+async def init_changefeed(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Start notifying long polls and trimming the changelog.
+
+    Every shard numbers changes of its shows on its own, so a sharded
+    catalog has no single feed of changes and the feed is not available.
+
+    :param app: current fastapi application.
+    """
+    app.state.change_notifier = None
+    app.state.changelog_trimmer = None
+    if settings.db_shards > 1:
+        return
+    notifier = ChangeNotifier()
+    app.state.generation_watcher.add_listener(notifier.notify)
+    app.state.change_notifier = notifier
+    if settings.changelog_trim_interval > 0:
+        app.state.changelog_trimmer = asyncio.create_task(
+            _trim_periodically(
+                app.state.db_session_factory,
+                settings.changelog_trim_interval,
+            ),
+        )
+
+
+async def shutdown_changefeed(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Stop trimming the changelog and wake up long polls.
+
+    :param app: current fastapi application.
+    """
+    if app.state.changelog_trimmer is not None:
+        app.state.changelog_trimmer.cancel()
+    notifier = app.state.change_notifier
+    if notifier is not None:
+        app.state.generation_watcher.remove_listener(notifier.notify)
+        notifier.notify(None)
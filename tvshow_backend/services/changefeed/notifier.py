@@ -0,0 +1,36 @@
+import asyncio
+from typing import List, Optional
+
+from tvshow_backend.db.changes import TvShowChange
+
+
+class ChangeNotifier:
+    """
+    Wakes up long polls when the catalog changes.
+
+    It is registered as a listener of the generation watcher, so both
+    local commits and writes of other workers wake waiting requests.
+    """
+
+    def __init__(self) -> None:
+        self._event = asyncio.Event()
+
+    def changed(self) -> asyncio.Event:
+        """
+        Get an event set on the next change.
+
+        The event must be taken before reading the changelog,
+        so a change committed in between is not missed.
+
+        :return: event.
+        """
+        return self._event
+
+    def notify(self, changes: Optional[List[TvShowChange]]) -> None:
+        """
+        Wake up everybody waiting for a change.
+
+        :param changes: committed changes, None for writes of other workers.
+        """
+        self._event.set()
+        self._event = asyncio.Event()
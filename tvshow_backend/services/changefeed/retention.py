@@ -0,0 +1,25 @@
+import time
+from typing import Dict
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from tvshow_backend.db.dao.changelog_dao import ChangeLogDAO
+from tvshow_backend.settings import settings
+
+
+async def trim_changelog(
+    session_factory: "async_sessionmaker[AsyncSession]",
+) -> Dict[str, int]:
+    """
+    Apply compaction and retention to the changelog.
+
+    :param session_factory: factory of database sessions.
+    :return: amounts of compacted and pruned changes.
+    """
+    now = time.time()
+    async with session_factory() as session:
+        dao = ChangeLogDAO(session)
+        compacted = await dao.compact(now - settings.changelog_compact_after)
+        pruned = await dao.prune(now - settings.changelog_retention)
+        await session.commit()
+    return {"compacted": compacted, "pruned": pruned}
@@ -0,0 +1 @@
+"""Cache coherence between worker processes."""
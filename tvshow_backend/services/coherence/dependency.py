@@ -0,0 +1,13 @@
+from starlette.requests import Request
+
+from tvshow_backend.services.coherence.watcher import GenerationWatcher
+
+
+def get_generation_watcher(request: Request) -> GenerationWatcher:  # pragma: no cover
+    """
+    Returns the generation watcher of the application.
+
+    :param request: current request.
+    :return: generation watcher.
+    """
+    return request.app.state.generation_watcher
@@ -0,0 +1,32 @@
+from fastapi import FastAPI
+
+from tvshow_backend.db.sharding import shard_files
+from tvshow_backend.services.coherence.watcher import GenerationWatcher
+from tvshow_backend.settings import settings
+
+
+async def init_coherence(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Start watching for writes of other worker processes.
+
+    :param app: current fastapi application.
+    """
+    shards = []
+    if settings.db_shards > 1:
+        shards = shard_files(settings.db_file, settings.db_shards)
+    watcher = GenerationWatcher(
+        settings.db_location,
+        settings.cache_coherence_interval,
+        shards=shards,
+    )
+    await watcher.start()
+    app.state.generation_watcher = watcher
+
+
+async def shutdown_coherence(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Stop the generation watcher.
+
+    :param app: current fastapi application.
+    """
+    await app.state.generation_watcher.stop()
@@ -0,0 +1,137 @@
+import asyncio
+import sqlite3
+import time
+from pathlib import Path
+from typing import Callable, Generic, List, Optional, TypeVar, Union
+
+from loguru import logger
+
+from tvshow_backend.db.changes import TvShowChange
+from tvshow_backend.services.coherence.watcher import GenerationWatcher
+
+T = TypeVar("T")  # noqa: WPS111
+
+
+class LocalReplica(Generic[T]):
+    """
+    In-process structure built from the database and kept up to date.
+
+    The structure is built in a worker thread with a dedicated connection.
+    Changes committed by this process are applied to it incrementally,
+    writes of other processes reported by the generation watcher trigger
+    a rebuild in the background while the previous version keeps serving.
+    Changes committed during a build are applied to its result again,
+    so ``apply`` must be idempotent. Builds can be throttled with
+    ``min_interval`` when they are expensive.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        db_file: Union[Path, str],
+        build: Callable[[sqlite3.Connection], T],
+        apply: Callable[[T, List[TvShowChange]], None],
+        min_interval: float = 0,
+    ) -> None:
+        self.name = name
+        self.db_file = db_file
+        self.build = build
+        self.apply = apply
+        # Minimum seconds between the end of a build and the next one.
+        self.min_interval = min_interval
+        self.current: Optional[T] = None
+        self.builds = 0
+        self._stale = False
+        self._pending: Optional[List[TvShowChange]] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._built_at: Optional[float] = None
+        self._watcher: Optional[GenerationWatcher] = None
+
+    async def start(self, watcher: GenerationWatcher) -> None:
+        """
+        Subscribe to changes and start the first build.
+
+        :param watcher: generation watcher of the application.
+        """
+        self._watcher = watcher
+        watcher.add_listener(self._on_invalidate)
+        self._schedule_build()
+
+    async def stop(self) -> None:
+        """Unsubscribe from changes and cancel a running build."""
+        if self._watcher is not None:
+            self._watcher.remove_listener(self._on_invalidate)
+            self._watcher = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass  # noqa: WPS420
+            self._task = None
+
+    async def wait_built(self) -> Optional[T]:
+        """
+        Wait for the running build to finish.
+
+        :return: current version of the structure.
+        """
+        if self._task is not None:
+            await asyncio.shield(self._task)
+        return self.current
+
+    def refresh(self) -> None:
+        """Rebuild the structure in the background."""
+        self._stale = True
+        self._schedule_build()
+
+    def _on_invalidate(self, changes: Optional[List[TvShowChange]]) -> None:
+        if changes is None:
+            self.refresh()
+            return
+        if self._pending is not None:
+            self._pending.extend(changes)
+        if self.current is not None:
+            self.apply(self.current, changes)
+
+    def _schedule_build(self) -> None:
+        # A running build notices the stale flag and starts over.
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._rebuild())
+
+    async def _rebuild(self) -> None:
+        self._stale = True
+        while self._stale:
+            if self._built_at is not None:
+                delay = self._built_at + self.min_interval - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            self._stale = False
+            self._pending = []
+            started = time.perf_counter()
+            try:
+                built = await asyncio.to_thread(self._load)
+            except Exception:
+                logger.exception("Cannot build {}", self.name)
+                return
+            finally:
+                pending, self._pending = self._pending, None
+            self._built_at = time.monotonic()
+            # Even when another write happened meanwhile, the new version
+            # is fresher than the current one, so it is installed anyway.
+            if pending:
+                self.apply(built, pending)
+            self.current = built
+            self.builds += 1
+            logger.info(
+                "Built {} in {:.1f}ms",
+                self.name,
+                (time.perf_counter() - started) * 1000,
+            )
+
+    def _load(self) -> T:
+        connection = sqlite3.connect(self.db_file, uri=True)
+        try:
+            return self.build(connection)
+        finally:
+            connection.close()
@@ -0,0 +1,199 @@
+import asyncio
+import sqlite3
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Set, Union
+
+from loguru import logger
+
+from tvshow_backend.db.changes import (
+    TVSHOW_TABLE,
+    TvShowChange,
+    add_change_listener,
+    remove_change_listener,
+)
+from tvshow_backend.db.sharding import shard_of
+
+# Called with committed changes for local writes
+# and with None when another process changed the table.
+InvalidationListener = Callable[[Optional[List[TvShowChange]]], None]
+
+
+class _WatchedFile:
+    """Database file polled for the generation counter of a table."""
+
+    def __init__(self, location: Union[Path, str]) -> None:
+        self.location = location
+        self.connection: Optional[sqlite3.Connection] = None
+        self.data_version: Optional[int] = None
+        self.generation = 0
+        # Generations produced by this process and not polled yet.
+        self.local_generations: Set[int] = set()
+
+    def read_generation(self, table_name: str) -> Optional[int]:
+        """
+        Read the generation counter if the database was changed.
+
+        :param table_name: name of the watched table.
+        :return: current generation or None if nothing was committed
+            by other connections since the previous read.
+        """
+        connection = self.connection
+        if connection is None:
+            return None
+        data_version = connection.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self.data_version:
+            return None
+        row = connection.execute(
+            "SELECT generation FROM table_generation WHERE table_name = ?",
+            (table_name,),
+        ).fetchone()
+        self.data_version = data_version
+        return row[0] if row else 0
+
+    def advance(self, generation: int) -> bool:
+        """
+        Take a newer generation.
+
+        :param generation: generation read by a poll.
+        :return: True if generations besides the local ones were produced.
+        """
+        local = {value for value in self.local_generations if value <= generation}
+        self.local_generations -= local
+        remote = generation - self.generation > len(local)
+        self.generation = generation
+        return remote
+
+
+class GenerationWatcher:
+    """
+    Detects writes to the TV show table made by other processes.
+
+    Every DAO write bumps the table generation counter in the database in
+    the same transaction. The watcher polls it with its own connection:
+    ``PRAGMA data_version`` tells without reading any table whether
+    another connection committed since the last poll, and only then the
+    counter is read. Generations produced by this process are known from
+    committed changes, so any other new generation means a write of another
+    worker. Caches are notified about local writes right after commit and
+    about remote writes at most ``interval`` seconds after them. A sharded
+    table is watched in every shard, each counting generations of its own.
+
+    ``epoch`` is increased on every invalidation. Caches can store it
+    with cached values and treat values from an older epoch as stale.
+    """
+
+    def __init__(
+        self,
+        db_file: Union[Path, str],
+        interval: float,
+        table_name: str = TVSHOW_TABLE,
+        shards: Sequence[Union[Path, str]] = (),
+    ) -> None:
+        self.db_file = db_file
+        self.interval = interval
+        self.table_name = table_name
+        self.epoch = 0
+        self.local_invalidations = 0
+        self.remote_invalidations = 0
+        self._files = [_WatchedFile(location) for location in shards or [db_file]]
+        self._listeners: List[InvalidationListener] = []
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    @property
+    def generation(self) -> int:
+        """
+        Generation of the table seen by the last poll.
+
+        :return: sum of generations of all shards.
+        """
+        return sum(watched.generation for watched in self._files)
+
+    def add_listener(self, listener: InvalidationListener) -> None:
+        """
+        Register a function called on every invalidation.
+
+        :param listener: function to call.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: InvalidationListener) -> None:
+        """
+        Unregister an invalidation listener.
+
+        :param listener: previously registered function.
+        """
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    async def start(self) -> None:
+        """Open the polling connections and start watching."""
+        for watched in self._files:
+            watched.connection = await asyncio.to_thread(
+                sqlite3.connect,
+                watched.location,
+                check_same_thread=False,
+                uri=True,
+            )
+        for watched, generation in zip(  # noqa: WPS352
+            self._files,
+            await asyncio.to_thread(self._read_generations),
+        ):
+            watched.generation = generation or 0
+        add_change_listener(self._on_local_changes)
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        """Stop watching and close the connection."""
+        remove_change_listener(self._on_local_changes)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass  # noqa: WPS420
+            self._task = None
+        for watched in self._files:
+            if watched.connection is not None:
+                watched.connection.close()
+                watched.connection = None
+
+    async def poll(self) -> bool:
+        """
+        Check for writes of other processes.
+
+        :return: True if the table was changed by another process.
+        """
+        generations = await asyncio.to_thread(self._read_generations)
+        remote = False
+        for watched, generation in zip(self._files, generations):
+            if generation is not None and generation > watched.generation:
+                remote = watched.advance(generation) or remote
+        if remote:
+            self.remote_invalidations += 1
+            self._invalidate(None)
+        return remote
+
+    def _read_generations(self) -> List[Optional[int]]:
+        return [watched.read_generation(self.table_name) for watched in self._files]
+
+    async def _watch(self) -> None:
+        while True:  # noqa: WPS457
+            await asyncio.sleep(self.interval)
+            try:
+                await self.poll()
+            except sqlite3.Error as exc:
+                logger.warning("Cannot check table generation: {}", exc)
+
+    def _on_local_changes(self, changes: List[TvShowChange]) -> None:
+        for change in changes:
+            watched = self._files[shard_of(change.show_id, len(self._files))]
+            if change.generation > watched.generation:
+                watched.local_generations.add(change.generation)
+        self.local_invalidations += 1
+        self._invalidate(changes)
+
+    def _invalidate(self, changes: Optional[List[TvShowChange]]) -> None:
+        self.epoch += 1
+        for listener in list(self._listeners):
+            listener(changes)
@@ -0,0 +1 @@
+"""Readiness of the worker for load balancers."""
@@ -0,0 +1,21 @@
+from fastapi import HTTPException, status
+from starlette.requests import Request
+
+from tvshow_backend.services.health.probe import ReadinessProbe
+
+
+def get_readiness_probe(request: Request) -> ReadinessProbe:
+    """
+    Returns the readiness probe of the application.
+
+    :param request: current request.
+    :raises HTTPException: if the application didn't start yet.
+    :return: readiness probe.
+    """
+    probe = getattr(request.app.state, "readiness_probe", None)
+    if probe is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Starting.",
+        )
+    return probe
@@ -0,0 +1,46 @@
+import functools
+
+from fastapi import FastAPI
+
+from tvshow_backend.services.health.probe import (
+    LoopLagMonitor,
+    ReadinessProbe,
+    pool_utilization,
+)
+from tvshow_backend.settings import settings
+
+
+async def init_health(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Start measuring event loop lag and create the readiness probe.
+
+    :param app: current fastapi application.
+    """
+    lag_monitor = LoopLagMonitor(settings.readiness_loop_lag_interval)
+    await lag_monitor.start()
+    app.state.loop_lag_monitor = lag_monitor
+    threaded_sessions = app.state.db_threaded_sessions
+    if threaded_sessions is not None:
+        pool_usage = threaded_sessions.utilization
+    else:
+        pool_usage = functools.partial(pool_utilization, app.state.db_engine.pool)
+    app.state.readiness_probe = ReadinessProbe(
+        session_factory=app.state.db_request_session_factory,
+        pool_usage=pool_usage,
+        lag_monitor=lag_monitor,
+        limiters=app.state.admission_limiters,
+        drain=app.state.request_drain,
+        db_timeout=settings.readiness_db_timeout,
+        max_pool_utilization=settings.readiness_max_pool_utilization,
+        max_loop_lag=settings.readiness_max_loop_lag,
+        max_in_flight=settings.readiness_max_in_flight,
+    )
+
+
+async def shutdown_health(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Stop measuring event loop lag.
+
+    :param app: current fastapi application.
+    """
+    await app.state.loop_lag_monitor.stop()
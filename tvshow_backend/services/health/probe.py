@@ -0,0 +1,165 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.pool import Pool, QueuePool
+
+from tvshow_backend.web.admission import AdmissionLimiter
+from tvshow_backend.web.drain import RequestDrain
+
+# A real table is read, so the probe waits for locks held by writers.
+PROBE_QUERY = text("SELECT 1 FROM tvshow_model LIMIT 1")
+
+
+def pool_utilization(pool: Pool) -> float:
+    """
+    Share of connections of a pool in use.
+
+    :param pool: connection pool of an engine.
+    :return: checked out connections per available one, 0 for unbounded pools.
+    """
+    if not isinstance(pool, QueuePool):
+        return 0
+    max_overflow = pool._max_overflow  # noqa: WPS437
+    if max_overflow < 0:
+        return 0
+    return pool.checkedout() / (pool.size() + max_overflow)
+
+
+class LoopLagMonitor:
+    """
+    Measures how late the event loop runs scheduled callbacks.
+
+    A task sleeps for ``interval`` seconds over and over, every wakeup
+    later than requested is the lag of that moment. Blocking calls and
+    long CPU work delay every request by about as much.
+    """
+
+    def __init__(self, interval: float, window: int = 10) -> None:
+        self.interval = interval
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    @property
+    def lag(self) -> float:
+        """
+        Highest lag of recent measurements.
+
+        :return: seconds.
+        """
+        return max(self._samples, default=0)
+
+    async def start(self) -> None:
+        """Start measuring."""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop measuring."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass  # noqa: WPS420
+        self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:  # noqa: WPS457
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            late = loop.time() - started - self.interval
+            self._samples.append(max(late, 0))
+
+
+class ReadinessProbe:  # noqa: WPS230
+    """
+    Decides whether a worker should get new requests.
+
+    The worker is not ready when the database doesn't answer a query in
+    time, when connections, the event loop or admitted requests are
+    saturated beyond their thresholds, or when it is shutting down. A
+    single database query runs at a time: while one is stuck, later checks
+    wait for it instead of piling up more queries.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        session_factory: Callable[[], AsyncSession],
+        pool_usage: Callable[[], float],
+        lag_monitor: Optional[LoopLagMonitor],
+        limiters: Dict[str, AdmissionLimiter],
+        db_timeout: float,
+        max_pool_utilization: float,
+        max_loop_lag: float,
+        max_in_flight: int,
+        drain: Optional[RequestDrain] = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.pool_usage = pool_usage
+        self.lag_monitor = lag_monitor
+        self.limiters = limiters
+        self.db_timeout = db_timeout
+        self.max_pool_utilization = max_pool_utilization
+        self.max_loop_lag = max_loop_lag
+        self.max_in_flight = max_in_flight
+        self.drain = drain
+        self._query: Optional["asyncio.Task[Optional[float]]"] = None
+
+    async def check(self) -> Dict[str, Any]:
+        """
+        Measure the worker.
+
+        :return: readiness, reasons for not being ready and measurements.
+        """
+        reasons: List[str] = []
+        if self.drain is not None and self.drain.draining:
+            reasons.append("shutting down")
+        db_latency = await self._probe_database()
+        if db_latency is None:
+            reasons.append(f"database did not answer within {self.db_timeout}s")
+        utilization = self.pool_usage()
+        if utilization > self.max_pool_utilization:
+            reasons.append(f"database pool utilization {utilization:.2f}")
+        lag = self.lag_monitor.lag if self.lag_monitor is not None else 0
+        if lag > self.max_loop_lag:
+            reasons.append(f"event loop lag {lag:.3f}s")
+        in_flight = sum(
+            limiter.in_flight + limiter.queued for limiter in self.limiters.values()
+        )
+        if self.max_in_flight and in_flight > self.max_in_flight:
+            reasons.append(f"{in_flight} requests in flight")
+        return {
+            "ready": not reasons,
+            "reasons": reasons,
+            "db_latency_ms": None if db_latency is None else db_latency * 1000,
+            "pool_utilization": utilization,
+            "loop_lag_ms": lag * 1000,
+            "in_flight": in_flight,
+        }
+
+    async def _probe_database(self) -> Optional[float]:
+        if self._query is None or self._query.done():
+            self._query = asyncio.create_task(self._run_query())
+        try:
+            # Shielded, so a stuck query still closes its session later.
+            return await asyncio.wait_for(asyncio.shield(self._query), self.db_timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def _run_query(self) -> Optional[float]:
+        started = time.perf_counter()
+        session = self.session_factory()
+        try:
+            await session.execute(PROBE_QUERY)
+        except Exception as error:
+            logger.warning("Readiness query failed: {}", error)
+            return None
+        finally:
+            await session.close()
+        return time.perf_counter() - started
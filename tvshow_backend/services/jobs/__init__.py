@@ -0,0 +1,17 @@
+"""Background jobs for long-running catalog operations."""
+import enum
+
+
+class JobStatus(str, enum.Enum):  # noqa: WPS600
+    """Possible states of a job."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    CANCELLING = "cancelling"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+# Jobs in these states never change again.
+FINISHED = frozenset((JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED))
@@ -0,0 +1,21 @@
+from fastapi import HTTPException, status
+from starlette.requests import Request
+
+from tvshow_backend.services.jobs.runner import JobRunner
+
+
+def get_job_runner(request: Request) -> JobRunner:
+    """
+    Returns the background job runner.
+
+    :param request: current request.
+    :raises HTTPException: if background jobs are disabled.
+    :return: job runner.
+    """
+    runner = getattr(request.app.state, "job_runner", None)
+    if runner is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Background jobs are not available.",
+        )
+    return runner
@@ -0,0 +1,162 @@
+"""Built-in kinds of background jobs."""
+import asyncio
+import csv
+from contextlib import AsyncExitStack
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tvshow_backend.db.models.tvshow_model import TvShowModel
+from tvshow_backend.services.changefeed.retention import trim_changelog
+from tvshow_backend.services.jobs.runner import JobContext, JobHandler
+from tvshow_backend.services.maintenance.tasks import run_maintenance
+from tvshow_backend.settings import settings
+
+EXPORT_PAGE_SIZE = 5000
+# Application state attributes holding in-memory replicas of the catalog.
+REPLICAS = ("catalog_replica", "title_replica", "similarity_replica")
+
+
+def _append_rows(path: Path, rows: Sequence[Sequence[Any]], header: bool) -> None:
+    with path.open("a", newline="", encoding="utf-8") as export_file:
+        writer = csv.writer(export_file)
+        if header:
+            writer.writerow(TvShowModel.__table__.columns.keys())
+        writer.writerows(rows)
+
+
+async def export_catalog(
+    context: JobContext,
+    params: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Write all TV shows to a CSV file.
+
+    Shows are read in pages ordered by id, so the export never holds
+    the whole catalog in memory. A sharded catalog is exported one shard
+    after another.
+
+    :param context: context of the job.
+    :param params: unused.
+    :return: path of the file and amount of exported shows.
+    """
+    settings.jobs_export_dir.mkdir(parents=True, exist_ok=True)
+    path = settings.jobs_export_dir / f"tvshows-{context.job_id}.csv"
+    path.unlink(missing_ok=True)
+    shards = getattr(context.state, "db_shards", None)
+    session_factories = [context.session_factory]
+    if shards is not None:
+        session_factories = shards.sessions
+    async with AsyncExitStack() as stack:
+        sessions = [
+            await stack.enter_async_context(session_factory())
+            for session_factory in session_factories
+        ]
+        total = 0
+        for session in sessions:
+            total += await session.scalar(
+                select(func.count()).select_from(TvShowModel),
+            )
+        context.report(0, total)
+        await asyncio.to_thread(_append_rows, path, [], True)
+        exported = 0
+        for session in sessions:  # noqa: WPS440
+            exported = await _export_shows(context, session, path, exported)
+    return {"path": str(path), "rows": exported}
+
+
+async def _export_shows(
+    context: JobContext,
+    session: AsyncSession,
+    path: Path,
+    exported: int,
+) -> int:
+    """
+    Append all TV shows of a database to a CSV file.
+
+    :param context: context of the job.
+    :param session: session of the database.
+    :param path: CSV file.
+    :param exported: amount of shows already in the file.
+    :return: amount of shows in the file.
+    """
+    last_id: Optional[int] = None
+    while True:  # noqa: WPS457
+        query = select(TvShowModel.__table__).order_by(TvShowModel.show_id)
+        if last_id is not None:
+            query = query.where(TvShowModel.show_id > last_id)
+        page: List[Any] = list(
+            await session.execute(query.limit(EXPORT_PAGE_SIZE)),
+        )
+        if not page:
+            return exported
+        await asyncio.to_thread(_append_rows, path, page, False)
+        exported += len(page)
+        last_id = page[-1].show_id
+        context.report(exported)
+
+
+async def reindex_catalog(
+    context: JobContext,
+    params: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Rebuild in-memory replicas of the catalog.
+
+    :param context: context of the job.
+    :param params: unused.
+    :return: names of rebuilt replicas.
+    """
+    replicas = [
+        replica
+        for replica in (getattr(context.state, name, None) for name in REPLICAS)
+        if replica is not None
+    ]
+    context.report(0, len(replicas))
+    for done, replica in enumerate(replicas, start=1):
+        replica.refresh()
+        await replica.wait_built()
+        context.report(done)
+    return {"replicas": [rebuilt.name for rebuilt in replicas]}
+
+
+async def trim_catalog_changelog(
+    context: JobContext,
+    params: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Apply compaction and retention to the changelog.
+
+    :param context: context of the job.
+    :param params: unused.
+    :return: amounts of compacted and pruned changes.
+    """
+    return await trim_changelog(context.session_factory)
+
+
+async def maintain_database(
+    context: JobContext,
+    params: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Run database maintenance right away.
+
+    :param context: context of the job.
+    :param params: unused.
+    :return: measurements of the maintenance steps.
+    """
+    return await asyncio.to_thread(
+        run_maintenance,
+        settings.db_location,
+        settings.maintenance_step_budget,
+    )
+
+
+HANDLERS: Dict[str, JobHandler] = {
+    "export": export_catalog,
+    "reindex": reindex_catalog,
+    "trim_changelog": trim_catalog_changelog,
+    "maintenance": maintain_database,
+}
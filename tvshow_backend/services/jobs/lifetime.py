@@ -0,0 +1,35 @@
+from fastapi import FastAPI
+
+from tvshow_backend.services.jobs.handlers import HANDLERS
+from tvshow_backend.services.jobs.runner import JobRunner
+from tvshow_backend.settings import settings
+
+
+async def init_jobs(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Start the background job runner.
+
+    :param app: current fastapi application.
+    """
+    app.state.job_runner = None
+    if settings.jobs_concurrency <= 0:
+        return
+    runner = JobRunner(
+        app.state.db_session_factory,
+        HANDLERS,
+        concurrency=settings.jobs_concurrency,
+        heartbeat=settings.jobs_heartbeat_interval,
+        state=app.state,
+    )
+    await runner.start()
+    app.state.job_runner = runner
+
+
+async def shutdown_jobs(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Stop the background job runner.
+
+    :param app: current fastapi application.
+    """
+    if app.state.job_runner is not None:
+        await app.state.job_runner.stop()
@@ -0,0 +1,238 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Coroutine,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+import ujson
+from loguru import logger
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from tvshow_backend.db.dao.job_dao import JobDAO
+from tvshow_backend.db.models.job_model import JobModel
+from tvshow_backend.services.jobs import JobStatus
+
+# Heartbeats a running job may miss before it is considered interrupted.
+MISSED_HEARTBEATS = 3
+
+
+class JobContext:
+    """Handle given to a running job."""
+
+    def __init__(
+        self,
+        job_id: int,
+        session_factory: "async_sessionmaker[AsyncSession]",
+        state: Any,
+    ) -> None:
+        self.job_id = job_id
+        self.session_factory = session_factory
+        # State of the application, gives access to its services.
+        self.state = state
+        self.done = 0
+        self.total: Optional[int] = None
+
+    def report(self, done: int, total: Optional[int] = None) -> None:
+        """
+        Report progress.
+
+        Progress is stored with the next heartbeat of the runner,
+        so it can be reported as often as convenient.
+
+        :param done: amount of processed items.
+        :param total: amount of items to process, if known.
+        """
+        self.done = done
+        if total is not None:
+            self.total = total
+
+
+JobHandler = Callable[
+    [JobContext, Dict[str, Any]],
+    Coroutine[Any, Any, Optional[Dict[str, Any]]],
+]
+
+
+class JobRunner:
+    """
+    Runs jobs in the background of the application.
+
+    Jobs are stored in the database and executed by a fixed amount of
+    worker tasks, so heavy operations never run more than ``concurrency``
+    at a time and requests only insert or read a job record. Running jobs
+    store their progress every ``heartbeat`` seconds. Jobs interrupted by
+    shutdown are queued again and resumed on the next start, jobs of a
+    process that stopped sending heartbeats are failed.
+    """
+
+    def __init__(
+        self,
+        session_factory: "async_sessionmaker[AsyncSession]",
+        handlers: Dict[str, JobHandler],
+        concurrency: int,
+        heartbeat: float = 1.0,
+        state: Any = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.handlers = handlers
+        self.concurrency = concurrency
+        self.heartbeat = heartbeat
+        self.state = state
+        self._queue: "asyncio.Queue[int]" = asyncio.Queue()
+        self._tasks: List["asyncio.Task[None]"] = []
+        self._running: Dict[int, Tuple["asyncio.Task[Any]", JobContext]] = {}
+        self._stopping = False
+
+    async def start(self) -> None:
+        """Resume queued jobs and start the workers."""
+        self._stopping = False
+        async with self._dao() as dao:
+            queued = await dao.recover_jobs(
+                time.time() - self.heartbeat * MISSED_HEARTBEATS,
+            )
+        for job_id in queued:
+            self._queue.put_nowait(job_id)
+        self._tasks = [
+            asyncio.create_task(self._work()) for _ in range(self.concurrency)
+        ]
+        self._tasks.append(asyncio.create_task(self._beat()))
+
+    async def stop(self) -> None:
+        """Stop the workers, running jobs are queued again."""
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, kind: str, params: Dict[str, Any]) -> JobModel:
+        """
+        Queue a job.
+
+        :param kind: kind of the job.
+        :param params: parameters passed to its handler.
+        :raises ValueError: if there is no handler for the kind.
+        :return: new job.
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind {kind}")
+        async with self._dao() as dao:
+            job = await dao.create_job(kind, params)
+        self._queue.put_nowait(job.id)
+        return job
+
+    async def get(self, job_id: int) -> JobModel:
+        """
+        Get a job with its latest progress.
+
+        :param job_id: id of the job.
+        :return: job.
+        """
+        async with self._dao() as dao:
+            job = await dao.get_job(job_id)
+        running = self._running.get(job_id)
+        if running is not None:
+            job.done = running[1].done
+            job.total = running[1].total
+        return job
+
+    async def cancel(self, job_id: int) -> JobModel:
+        """
+        Cancel a job.
+
+        :param job_id: id of the job.
+        :return: job with its new status.
+        """
+        async with self._dao() as dao:
+            job = await dao.cancel_job(job_id)
+        self._cancel_running([job_id])
+        return job
+
+    @asynccontextmanager
+    async def _dao(self) -> AsyncIterator[JobDAO]:
+        async with self.session_factory() as session:
+            yield JobDAO(session)
+            await session.commit()
+
+    async def _work(self) -> None:
+        while True:  # noqa: WPS457
+            job_id = await self._queue.get()
+            async with self._dao() as dao:
+                if not await dao.claim_job(job_id):
+                    continue
+                job = await dao.get_job(job_id)
+            await self._run(job)
+
+    async def _run(self, job: JobModel) -> None:
+        context = JobContext(job.id, self.session_factory, self.state)
+        handler = self.handlers.get(job.kind)
+        if handler is None:
+            await self._finish(job.id, JobStatus.FAILED, error="Unknown job kind")
+            return
+        task = asyncio.create_task(handler(context, ujson.loads(job.params)))
+        self._running[job.id] = (task, context)
+        logger.info("Started job {} ({})", job.id, job.kind)
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            if self._stopping:
+                task.cancel()
+                async with self._dao() as dao:
+                    await dao.requeue_jobs([job.id])
+                raise
+            await self._finish(job.id, JobStatus.CANCELLED)
+        except Exception as exc:
+            logger.exception("Job {} ({}) failed", job.id, job.kind)
+            await self._finish(job.id, JobStatus.FAILED, error=str(exc))
+        else:
+            await self._finish(job.id, JobStatus.SUCCEEDED, result=result)
+        finally:
+            self._running.pop(job.id, None)
+
+    async def _finish(
+        self,
+        job_id: int,
+        status: JobStatus,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        async with self._dao() as dao:
+            running = self._running.get(job_id)
+            if running is not None:
+                await dao.save_progress({job_id: (running[1].done, running[1].total)})
+            await dao.finish_job(job_id, status, result, error)
+        logger.info("Job {} {}", job_id, status.value)
+
+    async def _beat(self) -> None:
+        while True:  # noqa: WPS457
+            await asyncio.sleep(self.heartbeat)
+            if not self._running:
+                continue
+            progress = {
+                job_id: (context.done, context.total)
+                for job_id, (_, context) in self._running.items()
+            }
+            try:
+                async with self._dao() as dao:
+                    cancelling = await dao.save_progress(progress)
+            except SQLAlchemyError as exc:
+                logger.warning("Cannot store progress of jobs: {}", exc)
+                continue
+            # Cancellation requested through another process.
+            self._cancel_running(cancelling)
+
+    def _cancel_running(self, job_ids: Iterable[int]) -> None:
+        for job_id in job_ids:
+            running = self._running.get(job_id)
+            if running is not None:
+                running[0].cancel()
@@ -0,0 +1 @@
+"""Scheduled maintenance of the database file."""
@@ -0,0 +1,35 @@
+from fastapi import FastAPI
+
+from tvshow_backend.services.maintenance.scheduler import MaintenanceScheduler
+from tvshow_backend.settings import settings
+
+
+async def init_maintenance(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Start scheduling database maintenance.
+
+    :param app: current fastapi application.
+    """
+    app.state.maintenance_scheduler = None
+    if settings.maintenance_interval <= 0:
+        return
+    drain = app.state.request_drain
+    scheduler = MaintenanceScheduler(
+        settings.db_location,
+        interval=settings.maintenance_interval,
+        step_budget=settings.maintenance_step_budget,
+        is_idle=lambda: drain.in_flight <= settings.maintenance_max_in_flight,
+        max_delay=settings.maintenance_max_delay,
+    )
+    await scheduler.start()
+    app.state.maintenance_scheduler = scheduler
+
+
+async def shutdown_maintenance(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Stop scheduling database maintenance.
+
+    :param app: current fastapi application.
+    """
+    if app.state.maintenance_scheduler is not None:
+        await app.state.maintenance_scheduler.stop()
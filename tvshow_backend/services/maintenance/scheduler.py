@@ -0,0 +1,114 @@
+import asyncio
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+from loguru import logger
+
+from tvshow_backend.services.maintenance.tasks import run_maintenance
+
+# Seconds between checks for a moment of low traffic.
+IDLE_CHECK_INTERVAL = 1.0
+
+
+class MaintenanceScheduler:  # noqa: WPS230
+    """
+    Runs database maintenance periodically at moments of low traffic.
+
+    A run is due every ``interval`` seconds. It starts as soon as
+    ``is_idle`` tells that the worker has little to do, or after
+    ``max_delay`` seconds anyway, so the database is maintained even under
+    constant load. Every worker has a scheduler, the first one starting a
+    due run records it in the database and the others skip it.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        location: Union[Path, str],
+        interval: float,
+        step_budget: float,
+        is_idle: Callable[[], bool],
+        max_delay: float,
+    ) -> None:
+        self.location = location
+        self.interval = interval
+        self.step_budget = step_budget
+        self.is_idle = is_idle
+        self.max_delay = max_delay
+        self.runs = 0
+        self.skipped = 0
+        self.failures = 0
+        self.last_run_at: Optional[float] = None
+        self.last_report: Optional[Dict[str, Any]] = None
+        self.next_run_at: Optional[float] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    async def start(self) -> None:
+        """Start scheduling runs."""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop scheduling runs."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass  # noqa: WPS420
+        self._task = None
+
+    async def run_once(self) -> Optional[Dict[str, Any]]:
+        """
+        Run maintenance unless another worker just did.
+
+        :return: measurements of the steps, None if the run was skipped.
+        """
+        report = await asyncio.to_thread(
+            run_maintenance,
+            self.location,
+            self.step_budget,
+            # Runs of other workers started in the last half interval count.
+            self.interval / 2,
+        )
+        if not report:
+            self.skipped += 1
+            return None
+        self.runs += 1
+        self.last_run_at = time.time()
+        self.last_report = report
+        logger.info("Database maintenance finished: {}", report)
+        return report
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report runs of this worker.
+
+        :return: statistics of runs and measurements of the last one.
+        """
+        return {
+            "runs": self.runs,
+            "skipped": self.skipped,
+            "failures": self.failures,
+            "last_run_at": self.last_run_at,
+            "next_run_at": self.next_run_at,
+            "last_report": self.last_report,
+        }
+
+    async def _wait_for_low_traffic(self) -> None:
+        waited: float = 0
+        while waited < self.max_delay and not self.is_idle():
+            await asyncio.sleep(IDLE_CHECK_INTERVAL)
+            waited += IDLE_CHECK_INTERVAL
+
+    async def _run(self) -> None:
+        while True:  # noqa: WPS457
+            self.next_run_at = time.time() + self.interval
+            await asyncio.sleep(self.interval)
+            await self._wait_for_low_traffic()
+            try:
+                await self.run_once()
+            except sqlite3.Error as exc:
+                self.failures += 1
+                logger.warning("Database maintenance failed: {}", exc)
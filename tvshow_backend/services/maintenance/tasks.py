@@ -0,0 +1,228 @@
+"""
+Steps of database maintenance.
+
+Every step runs on a connection of its own in a worker thread and has a
+time budget. Statements running past it are interrupted by a progress
+handler, so a step never holds locks much longer than its budget:
+
+* ``ANALYZE`` refreshes statistics of the query planner. With
+  ``analysis_limit`` it samples a bounded amount of rows per index, so it
+  takes about as long on a large catalog as on a small one.
+* ``PRAGMA incremental_vacuum`` returns free pages left by deletes to the
+  filesystem in small steps, each in its own transaction, so writers run
+  in between. It needs a database created with incremental auto-vacuum.
+* ``PRAGMA wal_checkpoint`` copies the write-ahead log into the database.
+  A passive checkpoint doesn't wait for anyone. Only when it copied the
+  whole log, the log is truncated, waiting for readers at most the budget.
+"""
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Union
+
+from tvshow_backend.db.utils import SCHEMA_METADATA_TABLE
+
+# Rows per index read by ANALYZE.
+ANALYSIS_LIMIT = 1000
+# Pages freed by a single incremental vacuum statement.
+VACUUM_STEP_PAGES = 256
+# Virtual machine instructions between checks of the time budget.
+PROGRESS_STEPS = 10_000
+# Value of PRAGMA auto_vacuum for incremental auto-vacuum.
+AUTO_VACUUM_INCREMENTAL = 2
+# Key in the schema metadata table with the start of the last run.
+LAST_RUN_KEY = "maintenance_started_at"
+
+
+def _elapsed_ms(started: float) -> float:
+    return (time.perf_counter() - started) * 1000
+
+
+def _pragma(connection: sqlite3.Connection, pragma: str) -> Any:
+    return connection.execute(f"PRAGMA {pragma}").fetchone()[0]
+
+
+@contextmanager
+def time_budget(
+    connection: sqlite3.Connection,
+    seconds: float,
+) -> Iterator[Callable[[], bool]]:
+    """
+    Interrupt statements of a connection running past a deadline.
+
+    Interrupted statements raise ``sqlite3.OperationalError``.
+
+    :param connection: connection to limit.
+    :param seconds: time budget.
+    :yield: function telling whether the budget is exhausted.
+    """
+    deadline = time.monotonic() + seconds
+
+    def exhausted() -> bool:  # noqa: WPS430
+        return time.monotonic() > deadline
+
+    connection.set_progress_handler(exhausted, PROGRESS_STEPS)
+    try:
+        yield exhausted
+    finally:
+        connection.set_progress_handler(None, PROGRESS_STEPS)
+
+
+def analyze(connection: sqlite3.Connection, budget: float) -> Dict[str, Any]:
+    """
+    Refresh statistics of the query planner.
+
+    :param connection: connection to the database.
+    :param budget: seconds the step may take.
+    :return: duration and whether the step was interrupted.
+    """
+    started = time.perf_counter()
+    interrupted = False
+    with time_budget(connection, budget):
+        try:
+            connection.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+            connection.execute("ANALYZE")
+        except sqlite3.OperationalError:
+            interrupted = True
+    return {"analyze_ms": _elapsed_ms(started), "analyze_interrupted": interrupted}
+
+
+def incremental_vacuum(
+    connection: sqlite3.Connection,
+    budget: float,
+) -> Dict[str, Any]:
+    """
+    Return free pages to the filesystem.
+
+    :param connection: connection to the database.
+    :param budget: seconds the step may take.
+    :return: duration, free pages found and pages freed.
+    """
+    started = time.perf_counter()
+    free_pages = _pragma(connection, "freelist_count")
+    available = _pragma(connection, "auto_vacuum") == AUTO_VACUUM_INCREMENTAL
+    remaining = free_pages
+    if available:
+        with time_budget(connection, budget) as exhausted:
+            try:
+                while remaining and not exhausted():
+                    connection.execute(
+                        f"PRAGMA incremental_vacuum({VACUUM_STEP_PAGES})",
+                    ).fetchall()
+                    remaining = _pragma(connection, "freelist_count")
+            except sqlite3.OperationalError:
+                remaining = _pragma(connection, "freelist_count")
+    return {
+        "incremental_vacuum": available,
+        "free_pages": free_pages,
+        "pages_freed": free_pages - remaining,
+        "vacuum_ms": _elapsed_ms(started),
+    }
+
+
+def checkpoint(connection: sqlite3.Connection, budget: float) -> Dict[str, Any]:
+    """
+    Copy the write-ahead log into the database and truncate it.
+
+    :param connection: connection to the database.
+    :param budget: seconds the step may wait for readers.
+    :return: duration, pages in the log and pages copied,
+        all None when the database doesn't use a write-ahead log.
+    """
+    started = time.perf_counter()
+    if _pragma(connection, "journal_mode") != "wal":
+        return {
+            "wal_pages": None,
+            "checkpointed_pages": None,
+            "checkpoint_busy": False,
+            "checkpoint_ms": None,
+        }
+    busy, log_pages, copied = connection.execute(
+        "PRAGMA wal_checkpoint(PASSIVE)",
+    ).fetchone()
+    if not busy and log_pages == copied:
+        busy_timeout = int(budget * 1000)
+        connection.execute(f"PRAGMA busy_timeout = {busy_timeout}")
+        busy = connection.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()[0]
+    return {
+        "wal_pages": log_pages,
+        "checkpointed_pages": copied,
+        "checkpoint_busy": bool(busy),
+        "checkpoint_ms": _elapsed_ms(started),
+    }
+
+
+def connect(location: Union[Path, str], timeout: float) -> sqlite3.Connection:
+    """
+    Open a connection for maintenance.
+
+    :param location: database file or URI.
+    :param timeout: seconds to wait for locks.
+    :return: connection in autocommit mode.
+    """
+    return sqlite3.connect(
+        location,
+        timeout=timeout,
+        uri=True,
+        isolation_level=None,
+        check_same_thread=False,
+    )
+
+
+def claim_run(connection: sqlite3.Connection, min_interval: float) -> bool:
+    """
+    Record the start of a run unless another worker started one recently.
+
+    :param connection: connection to the database.
+    :param min_interval: seconds since the last run of any worker
+        below which this run is skipped.
+    :return: whether this worker should run maintenance.
+    """
+    now = time.time()
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        last_run = connection.execute(
+            f"SELECT value FROM {SCHEMA_METADATA_TABLE} WHERE name = ?",
+            (LAST_RUN_KEY,),
+        ).fetchone()
+        if last_run is not None and now - float(last_run[0]) < min_interval:
+            connection.execute("ROLLBACK")
+            return False
+        connection.execute(
+            f"INSERT OR REPLACE INTO {SCHEMA_METADATA_TABLE} VALUES (?, ?)",
+            (LAST_RUN_KEY, str(now)),
+        )
+    except sqlite3.Error:
+        connection.execute("ROLLBACK")
+        raise
+    connection.execute("COMMIT")
+    return True
+
+
+def run_maintenance(
+    location: Union[Path, str],
+    budget: float,
+    min_interval: float = 0,
+) -> Dict[str, Any]:
+    """
+    Run every maintenance step.
+
+    :param location: database file or URI.
+    :param budget: seconds each step may take.
+    :param min_interval: skip the run if any worker started one
+        less than this many seconds ago, 0 always runs.
+    :return: measurements of the steps, empty if the run was skipped.
+    """
+    started = time.perf_counter()
+    connection = connect(location, budget)
+    try:  # noqa: WPS501
+        if min_interval > 0 and not claim_run(connection, min_interval):
+            return {}
+        report = analyze(connection, budget)
+        report.update(incremental_vacuum(connection, budget))
+        report.update(checkpoint(connection, budget))
+    finally:
+        connection.close()
+    report["duration_ms"] = _elapsed_ms(started)
+    return report
@@ -0,0 +1,4 @@
+"""View counts and popular shows."""
+
+# Most viewed shows kept in memory.
+MAX_POPULAR = 100
@@ -0,0 +1,139 @@
+"""
+Write-behind counters of TV show views.
+
+Counting a view with an ``UPDATE`` per request would turn every read into
+a database write holding the write lock. Views are counted in a dict
+instead and added to the database in a single batched upsert every
+``flush_interval`` seconds, or earlier when ``max_pending`` shows have
+views waiting. A crash loses at most the views of one interval. Every
+worker adds its own counts, so totals in the database cover all of them.
+
+The most viewed shows are read back after every flush and served from
+memory.
+"""
+import asyncio
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from tvshow_backend.db.dao.views_dao import TvShowViewsDAO
+from tvshow_backend.services.popularity import MAX_POPULAR
+
+# Called with total views of shows that got new views.
+FlushListener = Callable[[Mapping[int, int]], None]
+
+
+class ViewCounter:  # noqa: WPS230
+    """Counts views in memory and adds them to the database periodically."""
+
+    def __init__(self, flush_interval: float, max_pending: int) -> None:
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.recording = False
+        # Most viewed shows with their views, as of the last flush.
+        self.popular: List[Tuple[int, int]] = []
+        self._pending: Dict[int, int] = {}
+        self._session_factory: Optional["async_sessionmaker[AsyncSession]"] = None
+        self._on_flush: Optional[FlushListener] = None
+        self._wakeup = asyncio.Event()
+        self._closing = False
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    @property
+    def pending(self) -> int:
+        """
+        Views not added to the database yet.
+
+        :return: amount of views.
+        """
+        return sum(self._pending.values())
+
+    def record(self, show_id: int) -> None:
+        """
+        Count a view of a show.
+
+        Views are ignored until the counter is started.
+
+        :param show_id: id of the viewed show.
+        """
+        if not self.recording:
+            return
+        pending = self._pending
+        pending[show_id] = pending.get(show_id, 0) + 1
+        # Only on reaching the limit, so failing flushes don't run in a loop.
+        if len(pending) == self.max_pending:
+            self._wakeup.set()
+
+    async def start(
+        self,
+        session_factory: "async_sessionmaker[AsyncSession]",
+        on_flush: Optional[FlushListener] = None,
+    ) -> None:
+        """
+        Load the most viewed shows and start counting views.
+
+        :param session_factory: factory of database sessions.
+        :param on_flush: function called with new totals after every flush.
+        """
+        self._session_factory = session_factory
+        self._on_flush = on_flush
+        await self.flush()
+        self.recording = True
+        self._closing = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop counting and add the remaining views to the database."""
+        self.recording = False
+        if self._task is None:
+            return
+        self._closing = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+
+    async def flush(self) -> int:  # noqa: WPS210
+        """
+        Add pending views to the database and reload the most viewed shows.
+
+        Views are kept for the next flush if the database can't be written.
+
+        :raises RuntimeError: if the counter was never started.
+        :return: amount of added views.
+        """
+        if self._session_factory is None:
+            raise RuntimeError("View counter is not started.")
+        pending = self._pending
+        self._pending = {}
+        try:
+            async with self._session_factory() as session:
+                dao = TvShowViewsDAO(session)
+                totals = await dao.add_views(pending)
+                popular = await dao.get_most_viewed(MAX_POPULAR)
+                await session.commit()
+        except SQLAlchemyError:
+            for show_id, views in pending.items():
+                self._pending[show_id] = self._pending.get(show_id, 0) + views
+            raise
+        self.popular = popular
+        if totals and self._on_flush is not None:
+            self._on_flush(totals)
+        return sum(pending.values())
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass  # noqa: WPS420
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except SQLAlchemyError as exc:
+                logger.warning(
+                    "Cannot store {} views, keeping them: {}",
+                    self.pending,
+                    exc,
+                )
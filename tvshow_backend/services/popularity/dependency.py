@@ -0,0 +1,21 @@
+from fastapi import HTTPException, status
+from starlette.requests import Request
+
+from tvshow_backend.services.popularity.counter import ViewCounter
+
+
+def get_view_counter(request: Request) -> ViewCounter:
+    """
+    Returns the counter of views.
+
+    :param request: current request.
+    :raises HTTPException: if views are not counted.
+    :return: view counter.
+    """
+    counter = getattr(request.app.state, "view_counter", None)
+    if counter is None or not counter.recording:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Popular shows are not available.",
+        )
+    return counter
@@ -0,0 +1,35 @@
+import functools
+from typing import Mapping
+
+from fastapi import FastAPI
+
+from tvshow_backend.settings import settings
+
+
+def _update_title_index(app: FastAPI, totals: Mapping[int, int]) -> None:
+    replica = app.state.title_replica
+    if replica is not None and replica.current is not None:
+        replica.current.set_popularity(totals)
+
+
+async def init_popularity(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Start counting views of shows.
+
+    :param app: current fastapi application.
+    """
+    if not settings.view_counting:
+        return
+    await app.state.view_counter.start(
+        app.state.db_session_factory,
+        on_flush=functools.partial(_update_title_index, app),
+    )
+
+
+async def shutdown_popularity(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Stop counting views and store the pending ones.
+
+    :param app: current fastapi application.
+    """
+    await app.state.view_counter.stop()
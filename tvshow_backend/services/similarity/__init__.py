@@ -0,0 +1,4 @@
+"""Similar shows recommendations."""
+
+# Maximum amount of similar shows kept for a show.
+MAX_K = 50
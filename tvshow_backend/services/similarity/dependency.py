@@ -0,0 +1,24 @@
+from typing import TYPE_CHECKING
+
+from fastapi import HTTPException, status
+from starlette.requests import Request
+
+if TYPE_CHECKING:
+    from tvshow_backend.services.similarity.model import SimilarityModel
+
+
+def get_similarity_model(request: Request) -> "SimilarityModel":
+    """
+    Returns the current similarity model.
+
+    :param request: current request.
+    :raises HTTPException: if the model is disabled or not built yet.
+    :return: similarity model.
+    """
+    replica = getattr(request.app.state, "similarity_replica", None)
+    if replica is None or replica.current is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Similar shows are not available.",
+        )
+    return replica.current
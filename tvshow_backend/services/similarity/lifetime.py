@@ -0,0 +1,70 @@
+import asyncio
+from functools import partial
+from typing import Any
+
+from fastapi import FastAPI
+from loguru import logger
+
+from tvshow_backend.services.coherence.replica import LocalReplica
+from tvshow_backend.settings import settings
+
+
+async def _refresh_periodically(
+    replica: LocalReplica[Any],
+    interval: float,
+) -> None:  # pragma: no cover
+    while True:  # noqa: WPS457
+        await asyncio.sleep(interval)
+        model = replica.current
+        if model is not None and model.pending_changes:
+            replica.refresh()
+
+
+async def init_similarity(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Start building the similarity model.
+
+    Changes are applied to the model right after commit, the model itself
+    is rebuilt at most once per ``similar_shows_refresh_interval``.
+
+    :param app: current fastapi application.
+    """
+    app.state.similarity_replica = None
+    app.state.similarity_refresher = None
+    if not settings.similar_shows:
+        return
+    try:
+        from tvshow_backend.services.similarity.model import (  # noqa: WPS433
+            SimilarityModel,
+        )
+    except ImportError:
+        logger.warning("NumPy or SciPy is not installed, similar shows are disabled")
+        return
+
+    replica = LocalReplica(
+        "similarity model",
+        settings.db_location,
+        build=partial(
+            SimilarityModel.load,
+            cache_size=settings.similar_shows_cache_size,
+        ),
+        apply=SimilarityModel.apply,
+        min_interval=settings.similar_shows_refresh_interval,
+    )
+    await replica.start(app.state.generation_watcher)
+    app.state.similarity_replica = replica
+    app.state.similarity_refresher = asyncio.create_task(
+        _refresh_periodically(replica, settings.similar_shows_refresh_interval),
+    )
+
+
+async def shutdown_similarity(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Stop updating the similarity model.
+
+    :param app: current fastapi application.
+    """
+    if app.state.similarity_refresher is not None:
+        app.state.similarity_refresher.cancel()
+    if app.state.similarity_replica is not None:
+        await app.state.similarity_replica.stop()
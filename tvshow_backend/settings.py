@@ -1,9 +1,12 @@
 import enum
 from pathlib import Path
+from typing import Union
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from yarl import URL
 
+from tvshow_backend.db.memory import MEMORY_URI
+
 CURRENT_DIR = Path(".")
 
 
@@ -18,6 +21,13 @@ class LogLevel(str, enum.Enum):  # noqa: WPS600
     FATAL = "FATAL"
 
 
+class DbBackend(str, enum.Enum):  # noqa: WPS600
+    """Ways to run database queries of requests."""
+
+    AIOSQLITE = "aiosqlite"
+    THREADPOOL = "threadpool"
+
+
 class Settings(BaseSettings):
     """
     Application settings.
@@ -35,11 +45,126 @@ class Settings(BaseSettings):
 
     # Current environment
     environment: str = "dev"
+    # Serve Swagger UI and ReDoc pages with their static files
+    api_docs: bool = True
+    # Serve bulk update and delete endpoints under /api/admin
+    admin_api: bool = True
 
     log_level: LogLevel = LogLevel.INFO
+    # Write logs as JSON lines instead of text
+    log_json: bool = False
+    # Format and write logs in a background thread instead of the event loop
+    log_enqueue: bool = False
+    # Share of uvicorn access log records to keep, from 0 to 1
+    access_log_sample_rate: float = 1.0
+    # Maximum amount of access log records per second, 0 means unlimited
+    access_log_rate_limit: int = 0
+    # Maximum concurrent requests per route class, 0 disables the limit,
+    # and amount of requests allowed to wait for a slot
+    admission_read_limit: int = 64
+    admission_read_queue: int = 256
+    admission_write_limit: int = 8
+    admission_write_queue: int = 64
+    admission_export_limit: int = 2
+    admission_export_queue: int = 4
+    # Seconds a request may wait in the queue before it is rejected
+    admission_queue_timeout: float = 2.0
+    # Value of the Retry-After header of rejected requests, in seconds
+    admission_retry_after: int = 1
+    # Share one execution between identical concurrent GET requests
+    request_coalescing: bool = True
+    # Seconds list and genre pages may take before they are cancelled and
+    # answered with 504 Gateway Timeout, 0 disables the deadline. They are
+    # cancelled when their client disconnects in any case
+    request_deadline_all: float = 10.0
+    request_deadline_genre: float = 10.0
+    # Bytes of encoded list and genre pages kept in memory, 0 disables the cache
+    response_cache_bytes: int = 16 * 1024 * 1024
+    # Seconds the readiness probe waits for a database query
+    readiness_db_timeout: float = 1.0
+    # Share of database connections (aiosqlite) or of the demand for threads
+    # (threadpool) above which the worker is not ready
+    readiness_max_pool_utilization: float = 0.9
+    # Seconds of event loop lag above which the worker is not ready
+    readiness_max_loop_lag: float = 0.25
+    # Requests running or queued for admission above which the worker is
+    # not ready, 0 disables the check
+    readiness_max_in_flight: int = 200
+    # Seconds between measurements of event loop lag
+    readiness_loop_lag_interval: float = 0.1
+    # Open pooled connections and run every query shape once on startup
+    warmup: bool = True
+    # Read the database file on startup to load it into the OS page cache
+    warmup_page_cache: bool = False
+    # Seconds shutdown waits for requests in flight before closing the database
+    drain_timeout: float = 10
+    # Count views of show details in memory and add them to the database
+    # periodically, required by the list of popular shows
+    view_counting: bool = True
+    # Seconds between writes of counted views, the longest span of views
+    # lost by a crash
+    views_flush_interval: float = 5.0
+    # Shows with views waiting for a write that trigger an early write
+    views_max_pending: int = 10_000
+
     # Variables for the database
     db_file: Path = CURRENT_DIR / "db.sqlite3"
     db_echo: bool = False
+    # Run queries of requests with aiosqlite or on a shared pool of threads
+    db_backend: DbBackend = DbBackend.AIOSQLITE
+    # Threads running queries of the threadpool backend
+    db_threads: int = 4
+    # Serve the database from memory, db_file only keeps its snapshots.
+    # Requires a single worker.
+    db_in_memory: bool = False
+    # Seconds between snapshots of the in-memory database, the longest span
+    # of committed writes lost by a crash. 0 only takes a snapshot on shutdown
+    db_snapshot_interval: float = 1.0
+    # Store TV shows in this many database files next to db_file, chosen by
+    # a hash of show_id, so writes to different files run in parallel.
+    # Not supported with the in-memory database and replicas of the catalog
+    db_shards: int = 1
+    # Skip DDL on startup when the stored schema fingerprint matches
+    db_skip_unchanged_schema: bool = True
+    # Seconds between checks for writes of other workers, 0 disables polling
+    cache_coherence_interval: float = 0.5
+    # Keep a columnar copy of the catalog for analytics, requires NumPy
+    analytics_snapshot: bool = False
+    # Keep an in-memory index of titles for autocomplete
+    autocomplete_index: bool = False
+    # Minimum seconds between rebuilds of the title index after remote writes
+    autocomplete_refresh_interval: float = 30
+    # Serve similar shows from a TF-IDF model, requires NumPy and SciPy
+    similar_shows: bool = False
+    # Maximum amount of shows with cached similar shows
+    similar_shows_cache_size: int = 10_000
+    # Minimum seconds between rebuilds of the similarity model
+    similar_shows_refresh_interval: float = 300
+    # Seconds after which changes superseded by a later change of the same
+    # show are removed from the changelog
+    changelog_compact_after: float = 3600
+    # Seconds changes are kept in the changelog
+    changelog_retention: float = 7 * 24 * 3600
+    # Seconds between compactions of the changelog, 0 disables them
+    changelog_trim_interval: float = 600
+    # Seconds between runs of database maintenance (ANALYZE, incremental
+    # vacuum, WAL checkpoint), 0 disables them
+    maintenance_interval: float = 3600
+    # Requests in flight at most for a moment of low traffic, when due
+    # maintenance starts
+    maintenance_max_in_flight: int = 2
+    # Seconds due maintenance waits for low traffic before it runs anyway
+    maintenance_max_delay: float = 600
+    # Seconds each maintenance step may take before it is interrupted
+    maintenance_step_budget: float = 2.0
+    # Create new databases with incremental auto-vacuum
+    db_incremental_vacuum: bool = True
+    # Background jobs running at the same time, 0 disables background jobs
+    jobs_concurrency: int = 1
+    # Seconds between stores of the progress of running jobs
+    jobs_heartbeat_interval: float = 1.0
+    # Directory for files written by export jobs
+    jobs_export_dir: Path = CURRENT_DIR / "exports"
 
     @property
     def db_url(self) -> URL:
@@ -48,10 +173,37 @@ class Settings(BaseSettings):
 
         :return: database URL.
         """
-        return URL.build(
-            scheme="sqlite+aiosqlite",
-            path=f"///{self.db_file}",
-        )
+        return self._db_url("sqlite+aiosqlite")
+
+    @property
+    def db_sync_url(self) -> URL:
+        """
+        Assemble database URL of the synchronous sqlite3 driver.
+
+        :return: database URL.
+        """
+        return self._db_url("sqlite")
+
+    @property
+    def db_location(self) -> Union[Path, str]:
+        """
+        Database opened by sqlite3 connections with ``uri=True``.
+
+        :return: database file or URI of the in-memory database.
+        """
+        if self.db_in_memory:
+            return MEMORY_URI
+        return self.db_file
+
+    def _db_url(self, scheme: str) -> URL:
+        if self.db_in_memory:
+            path, _, query = MEMORY_URI.partition("?")
+            return URL.build(
+                scheme=scheme,
+                path=f"///{path}",
+                query=f"{query}&uri=true",
+            )
+        return URL.build(scheme=scheme, path=f"///{self.db_file}")
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -0,0 +1,136 @@
+from typing import Any, Dict, List
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from tvshow_backend.db.changes import (
+    UPDATE,
+    TvShowChange,
+    add_change_listener,
+    remove_change_listener,
+)
+from tvshow_backend.db.dao.tvshow_dao import TooManyRowsError, TvShowDAO, TvShowFilter
+
+
+def _show(show_id: int, genre: str, country: str, release_year: int) -> Dict[str, Any]:
+    return {
+        "show_id": show_id,
+        "type": "Movie",
+        "genre": genre,
+        "title": f"Show {show_id}",
+        "director": "Director",
+        "cast": "Cast",
+        "country": country,
+        "date_added": "January 1, 2020",
+        "release_year": release_year,
+        "rating": "PG",
+        "duration": "90 min",
+    }
+
+
+SHOWS = [
+    _show(616161, "Drama, Crime", "United States, India", 2001),
+    _show(616162, "Drama", "India", 2010),
+    _show(616163, "Dramatic Comedy", "France", 2010),
+    _show(616164, "Kids", "Indiana", 2020),
+]
+
+
+@pytest.fixture
+async def shows(dbsession: AsyncSession) -> TvShowDAO:
+    """
+    Create shows used by bulk operations.
+
+    :param dbsession: current session.
+    :return: DAO for tvshow models.
+    """
+    dao = TvShowDAO(dbsession)
+    for show in SHOWS:
+        await dao.create_tv_show_model(**show)
+    await dbsession.commit()
+    return dao
+
+
+async def _ratings(dao: TvShowDAO) -> Dict[int, str]:
+    return {
+        show.show_id: show.rating
+        for show in await dao.filter()
+        if show.show_id in {show["show_id"] for show in SHOWS}
+    }
+
+
+@pytest.mark.anyio
+async def test_bulk_update(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    shows: TvShowDAO,
+) -> None:
+    """Tests dry runs, the row limit and updates of matching shows."""
+    url = fastapi_app.url_path_for("bulk_update_tvshows")
+    request: Dict[str, Any] = {
+        "filter": {"genre": "DRAMA", "release_year_to": 2010},
+        "values": {"rating": "TV-14"},
+    }
+    response = await client.post(url, json={**request, "dry_run": True})
+    assert response.json() == {"matched": 2, "changed": 0, "dry_run": True}
+    later = {**request["filter"], "added_from": "2020-01-02"}
+    response = await client.post(url, json={**request, "filter": later})
+    assert response.json()["matched"] == 0
+
+    response = await client.post(url, json={**request, "max_rows": 1})
+    assert response.status_code == status.HTTP_409_CONFLICT
+    # Shows matching after the count are still limited.
+    with pytest.raises(TooManyRowsError):
+        await shows.bulk_update(TvShowFilter(genre="drama"), {"rating": "R"}, 1)
+    assert set((await _ratings(shows)).values()) == {"PG"}
+
+    received: List[List[TvShowChange]] = []
+    add_change_listener(received.append)
+    try:
+        response = await client.post(url, json=request)
+        await dbsession.commit()
+    finally:
+        remove_change_listener(received.append)
+
+    assert response.json() == {"matched": 2, "changed": 2, "dry_run": False}
+    assert await _ratings(shows) == {
+        616161: "TV-14",
+        616162: "TV-14",
+        616163: "PG",
+        616164: "PG",
+    }
+    assert len(received) == 1
+    assert {change.operation for change in received[0]} == {UPDATE}
+    assert [(change.values or {}).get("rating") for change in received[0]] == [
+        "TV-14",
+        "TV-14",
+    ]
+
+
+@pytest.mark.anyio
+async def test_bulk_delete(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    shows: TvShowDAO,
+) -> None:
+    """Tests deletes and validation of filters."""
+    url = fastapi_app.url_path_for("bulk_delete_tvshows")
+    response = await client.post(url, json={"filter": {}})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    response = await client.post(url, json={"filter": {"country": "Indi%"}})
+    assert response.json()["matched"] == 0
+
+    response = await client.post(url, json={"filter": {"country": "india"}})
+
+    assert response.json() == {"matched": 2, "changed": 2, "dry_run": False}
+    assert set(await _ratings(shows)) == {616163, 616164}
+
+    response = await client.post(
+        fastapi_app.url_path_for("bulk_update_tvshows"),
+        json={"filter": {"type": "movie"}, "values": {"rating": None}},
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from starlette import status
+
+from tvshow_backend.web.admission import (
+    EXPORTS,
+    READS,
+    WRITES,
+    AdmissionLimiter,
+    route_class,
+)
+
+
+def test_route_class() -> None:
+    """Tests classification of requests."""
+    assert route_class("GET", "/api/tvshow/all") == READS
+    assert route_class("PUT", "/api/tvshow/update/1") == WRITES
+    assert route_class("GET", "/api/analytics/counts") == EXPORTS
+    assert route_class("GET", "/api/tvshow/export") == EXPORTS
+    assert route_class("GET", "/api/tvshow/search/exporter") == READS
+    assert route_class("GET", "/api/health") is None
+    assert route_class("GET", "/static/docs/swagger-ui.css") is None
+
+
+@pytest.mark.anyio
+async def test_limiter_queues_and_rejects() -> None:
+    """Tests slot hand-over, queue bound and queue timeout."""
+    limiter = AdmissionLimiter(limit=1, queue_size=1, queue_timeout=0.05)
+    assert await limiter.acquire()
+
+    waiting = asyncio.ensure_future(limiter.acquire())
+    await asyncio.sleep(0)
+    assert limiter.queued == 1
+    assert not await limiter.acquire()
+    assert limiter.rejected == 1
+
+    limiter.release()
+    assert await waiting
+    assert limiter.in_flight == 1
+
+    assert not await limiter.acquire()
+    assert limiter.timed_out == 1
+    limiter.release()
+    assert limiter.stats()["in_flight"] == 0
+
+
+@pytest.mark.anyio
+async def test_saturated_route_class_is_rejected(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+) -> None:
+    """Tests 503 responses and exposed statistics."""
+    limiter = fastapi_app.state.admission_limiters[READS]
+    limiter.queue_size = 0
+    for _ in range(limiter.limit):
+        assert await limiter.acquire()
+
+    response = await client.get(fastapi_app.url_path_for("autocomplete_title"))
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == "1"
+
+    response = await client.get(fastapi_app.url_path_for("admission_stats"))
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()[READS]["rejected"] == 1
+    assert response.json()[READS]["in_flight"] == limiter.limit
@@ -0,0 +1,92 @@
+from typing import Any, Callable
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from starlette import status
+
+from tvshow_backend.db.changes import DELETE, UPDATE, TvShowChange
+
+pytest.importorskip("numpy")
+
+from tvshow_backend.services.analytics.snapshot import CatalogSnapshot  # noqa: E402
+
+ROWS = [
+    (1, "Movie", "Drama, Comedy", "United States", 2010, "PG", "May 1, 2015"),
+    (2, "Movie", "Drama", "India, United States", 2012, "R", "June 2, 2016"),
+    (3, "TV Show", "Comedy", "India", 2012, "PG", "July 3, 2016"),
+    (4, "TV Show", "Documentaries", "", 2020, "TV-MA", ""),
+]
+
+
+def test_snapshot_filters_and_groups() -> None:
+    """Tests vectorized filters and group-by over multi-valued columns."""
+    snapshot = CatalogSnapshot.from_rows(ROWS)
+
+    assert snapshot.select().sum() == 4
+    assert snapshot.select({"genre": ["Drama"]}).sum() == 2
+    assert snapshot.select({"genre": ["Drama"], "type": ["TV Show"]}).sum() == 0
+    assert snapshot.select({"country": ["Unknown"]}).sum() == 0
+    assert snapshot.select(ranges={"release_year": (2011, 2012)}).sum() == 2
+    assert snapshot.select(ranges={"year_added": (None, 2016)}).sum() == 3
+
+    groups = snapshot.group_count(snapshot.select(), ["genre", "country"])
+    assert dict(groups) == {
+        ("Drama", "United States"): 2,
+        ("Comedy", "United States"): 1,
+        ("Drama", "India"): 1,
+        ("Comedy", "India"): 1,
+    }
+    assert snapshot.group_count(snapshot.select(), ["release_year"], limit=1) == [
+        ((2012,), 2),
+    ]
+
+
+def test_snapshot_applies_changes() -> None:
+    """Tests that updates and deletes are applied incrementally."""
+    snapshot = CatalogSnapshot.from_rows(ROWS)
+    changed = dict(zip(("show_id", "type", "genre"), (3, "Movie", "Drama")))
+    snapshot.apply(
+        [
+            TvShowChange(UPDATE, 3, 1, {**changed, "release_year": 2000}),
+            TvShowChange(DELETE, 1, 2),
+        ],
+    )
+
+    assert len(snapshot) == 3
+    assert dict(snapshot.group_count(snapshot.select(), ["genre"])) == {
+        ("Drama",): 2,
+        ("Documentaries",): 1,
+    }
+    snapshot.compact()
+    assert dict(snapshot.group_count(snapshot.select(), ["type", "genre"])) == {
+        ("Movie", "Drama"): 2,
+        ("TV Show", "Documentaries"): 1,
+    }
+
+
+@pytest.mark.anyio
+async def test_counts_endpoint(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    install_replica: Callable[[str, Any], None],
+) -> None:
+    """Tests the analytics endpoint."""
+    url = fastapi_app.url_path_for("count_tvshows")
+    response = await client.get(url)
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+    install_replica("catalog_replica", CatalogSnapshot.from_rows(ROWS))
+    response = await client.get(
+        url,
+        params={"country": "India", "group_by": ["type", "genre"]},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "total": 2,
+        "groups": [
+            {"key": {"type": "Movie", "genre": "Drama"}, "count": 1},
+            {"key": {"type": "TV Show", "genre": "Comedy"}, "count": 1},
+        ],
+    }
@@ -0,0 +1,66 @@
+from typing import Any, Callable
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from starlette import status
+
+from tvshow_backend.db.changes import DELETE, UPDATE, TvShowChange
+from tvshow_backend.services.autocomplete import index as autocomplete
+from tvshow_backend.services.autocomplete.index import POPULAR, TitleIndex, fold
+
+
+def test_fold() -> None:
+    """Tests case and accent folding."""
+    assert fold("Amélie") == fold("AMELIE") == "amelie"
+    assert fold("Straße") == "strasse"
+
+
+def test_search_keeps_top_lists_up_to_date(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests precomputed top lists of large ranges across changes."""
+    monkeypatch.setattr(autocomplete, "SCAN_LIMIT", 2)
+    index = TitleIndex.from_rows(
+        [
+            (1, "Dark River", "January 1, 2010"),
+            (2, "Dark Empire", "2015-05-01"),
+            (3, "Darkest Hour", "March 3, 2012"),
+            (4, "Dune", "June 6, 2021"),
+            (5, "Élite", "July 1, 2018"),
+        ],
+    )
+
+    assert index.search("DAR", limit=2) == [(2, "Dark Empire"), (3, "Darkest Hour")]
+    assert index.search("eli") == [(5, "Élite")]
+
+    index.apply(
+        [
+            TvShowChange(UPDATE, 1, 1, {"title": "Dark River", "date_added": "2020"}),
+            TvShowChange(DELETE, 2, 2),
+        ],
+    )
+    index.upsert(6, "Darling", "2023-01-01")
+    assert [show_id for show_id, _ in index.search("dar")] == [6, 3, 1]
+
+    index.set_popularity({1: 10})
+    assert [show_id for show_id, _ in index.search("d", order=POPULAR)] == [1, 6, 4, 3]
+
+
+@pytest.mark.anyio
+async def test_autocomplete_endpoint(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    install_replica: Callable[[str, Any], None],
+) -> None:
+    """Tests the autocomplete endpoint."""
+    url = fastapi_app.url_path_for("autocomplete_title")
+    response = await client.get(url, params={"prefix": "da"})
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+    install_replica(
+        "title_replica",
+        TitleIndex.from_rows([(1, "Dark", None), (2, "Dune", None)]),
+    )
+    response = await client.get(url, params={"prefix": "DA"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [{"show_id": 1, "title": "Dark"}]
@@ -0,0 +1,87 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tvshow_backend.benchmarks.report import (
+    compare_with_baseline,
+    percentile,
+    summarize,
+)
+from tvshow_backend.benchmarks.runner import run_load
+from tvshow_backend.benchmarks.workload import Workload
+from tvshow_backend.db.dao.tvshow_dao import TvShowDAO
+
+
+def _report(p95_ms: float, throughput: float) -> dict:
+    stats = {
+        "requests": 100,
+        "errors": 0,
+        "throughput": throughput,
+        "p50_ms": 1.0,
+        "p95_ms": p95_ms,
+        "p99_ms": p95_ms,
+    }
+    return {
+        "meta": {"dataset": "10k", "mode": "inprocess", "concurrency": 4},
+        "endpoints": {"detail": stats},
+        "total": stats,
+    }
+
+
+def test_percentile() -> None:
+    """Tests nearest-rank percentile."""
+    values = [float(value) for value in range(1, 101)]
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile(values, 100) == 100
+    assert percentile([], 50) == 0
+
+
+def test_compare_with_baseline() -> None:
+    """Tests that only changes above the threshold are reported."""
+    baseline = _report(p95_ms=10, throughput=1000)
+
+    assert not compare_with_baseline(_report(10.5, 980), baseline, threshold=0.1)
+    assert len(compare_with_baseline(_report(20, 1000), baseline, threshold=0.1)) == 2
+    assert compare_with_baseline(_report(10, 500), baseline, threshold=0.1)
+
+    other_dataset = _report(10, 1000)
+    other_dataset["meta"]["dataset"] = "1m"
+    assert compare_with_baseline(other_dataset, baseline, threshold=0.1)
+
+
+def test_workload_is_deterministic() -> None:
+    """Tests that the same seed produces the same requests."""
+    first = Workload(100, ["Drama"], write_ratio=0.5, seed=1)
+    second = Workload(100, ["Drama"], write_ratio=0.5, seed=1)
+    for _ in range(50):
+        assert first.next_operation() == second.next_operation()
+
+
+@pytest.mark.anyio
+async def test_run_load(client: AsyncClient, dbsession: AsyncSession) -> None:
+    """Tests that every issued request is measured."""
+    # Updates target shows 1 to 10 of the dataset.
+    tvshow_dao = TvShowDAO(dbsession)
+    for show_id in range(1, 11):
+        await tvshow_dao.create_tv_show_model(
+            show_id=show_id,
+            type="TV Show",
+            genre="Drama",
+            title=f"Show {show_id}",
+            director="Director",
+            cast="Actor",
+            country="United States",
+            date_added="2023-01-01",
+            release_year=2023,
+            rating="TV-14",
+            duration="1 season",
+        )
+    workload = Workload(10, ["Drama"], write_ratio=1, seed=1)
+    # Test client shares a single session, so requests must not overlap.
+    samples = await run_load(client, workload, requests=20, concurrency=1)
+    report = summarize(samples, elapsed=1, meta={})
+
+    assert report["total"]["requests"] == 20
+    for name, endpoint in report["endpoints"].items():
+        assert endpoint["errors"] == 0, name
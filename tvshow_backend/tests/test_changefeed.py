@@ -0,0 +1,138 @@
+import asyncio
+import time
+from typing import Any, Dict, Generator
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from tvshow_backend.db.changes import add_change_listener, remove_change_listener
+from tvshow_backend.db.dao.changelog_dao import ChangeLogDAO
+from tvshow_backend.db.dao.tvshow_dao import TvShowDAO
+from tvshow_backend.services.changefeed.notifier import ChangeNotifier
+
+
+def _show(show_id: int, title: str) -> Dict[str, Any]:
+    return {
+        "show_id": show_id,
+        "type": "Movie",
+        "genre": "Drama",
+        "title": title,
+        "director": "Director",
+        "cast": "Cast",
+        "country": "Country",
+        "date_added": "January 1, 2020",
+        "release_year": 2020,
+        "rating": "PG",
+        "duration": "90 min",
+    }
+
+
+@pytest.fixture
+def notifier(fastapi_app: FastAPI) -> Generator[ChangeNotifier, None, None]:
+    """
+    Notify long polls of the app about local commits.
+
+    :param fastapi_app: the application.
+    :yield: change notifier.
+    """
+    change_notifier = ChangeNotifier()
+    fastapi_app.state.change_notifier = change_notifier
+    add_change_listener(change_notifier.notify)
+    try:
+        yield change_notifier
+    finally:
+        remove_change_listener(change_notifier.notify)
+
+
+@pytest.mark.anyio
+async def test_changes_follow_writes(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    notifier: ChangeNotifier,
+) -> None:
+    """Tests that every write is returned once, in order."""
+    url = fastapi_app.url_path_for("retrieve_tvshow_changes")
+    since = (await client.get(url)).json()["next"]
+
+    dao = TvShowDAO(dbsession)
+    await dao.create_tv_show_model(**_show(515151, "First"))
+    await dao.update_tv_show_model(**_show(515151, "Second"))
+    await dao.delete_tv_show_model(515151)
+    await dbsession.commit()
+
+    response = await client.get(url, params={"since": since, "limit": 2})
+    assert response.status_code == status.HTTP_200_OK
+    feed = response.json()
+    assert not feed["reset"]
+    assert [change["operation"] for change in feed["changes"]] == [
+        "create",
+        "update",
+    ]
+    assert feed["changes"][1]["values"]["title"] == "Second"
+    assert feed["next"] == since + 2
+
+    feed = (await client.get(url, params={"since": feed["next"]})).json()
+    assert [change["operation"] for change in feed["changes"]] == ["delete"]
+    assert feed["changes"][0]["values"] is None
+    assert feed["changes"][0]["show_id"] == 515151
+    assert feed["next"] == since + 3
+
+
+@pytest.mark.anyio
+async def test_long_poll(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    notifier: ChangeNotifier,
+) -> None:
+    """Tests that a waiting request returns right after a commit."""
+    url = fastapi_app.url_path_for("retrieve_tvshow_changes")
+    since = (await client.get(url)).json()["next"]
+    response = await client.get(url, params={"since": since, "wait": 0.05})
+    assert response.json() == {"changes": [], "next": since, "reset": False}
+
+    started = time.monotonic()
+    poll = asyncio.ensure_future(client.get(url, params={"since": since, "wait": 10}))
+    await asyncio.sleep(0.1)
+    assert not poll.done()
+    response = await client.post(
+        fastapi_app.url_path_for("create_tvshow"),
+        json=_show(525252, "Waited for"),
+    )
+    assert response.status_code == status.HTTP_200_OK
+    await dbsession.commit()
+
+    feed = (await poll).json()
+    assert time.monotonic() - started < 5
+    assert [change["show_id"] for change in feed["changes"]] == [525252]
+
+
+@pytest.mark.anyio
+async def test_compaction_and_retention(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    notifier: ChangeNotifier,
+) -> None:
+    """Tests that trimming keeps the latest changes and tells clients to reset."""
+    dao = TvShowDAO(dbsession)
+    await dao.create_tv_show_model(**_show(535353, "First"))
+    await dao.update_tv_show_model(**_show(535353, "Second"))
+    await dao.create_tv_show_model(**_show(545454, "Other"))
+    changelog = ChangeLogDAO(dbsession)
+    _, changes = await changelog.get_changes(0, 1000)
+    last_seq = changes[-1].seq
+
+    assert await changelog.compact(time.time() + 1) == 1
+    _, changes = await changelog.get_changes(last_seq - 3, 1000)
+    assert [change.seq for change in changes] == [last_seq - 1, last_seq]
+
+    assert await changelog.prune(time.time() + 1) >= 2
+    assert await changelog.get_floor() == last_seq
+    url = fastapi_app.url_path_for("retrieve_tvshow_changes")
+    feed = (await client.get(url, params={"since": last_seq - 3})).json()
+    assert feed == {"changes": [], "next": last_seq, "reset": True}
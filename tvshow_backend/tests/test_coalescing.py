@@ -0,0 +1,178 @@
+import asyncio
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tvshow_backend.db.dao.tvshow_dao import TvShowDAO
+from tvshow_backend.services.coherence.watcher import GenerationWatcher
+from tvshow_backend.settings import settings
+from tvshow_backend.web.admission import Message, Receive, Scope, Send
+from tvshow_backend.web.api.tvshow.schema import TvShowInputDTO
+from tvshow_backend.web.coalescing import (
+    CoalescingMiddleware,
+    RequestCoalescer,
+    request_key,
+)
+
+
+def _scope(query: bytes = b"") -> Scope:
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": "/api/tvshow/all",
+        "query_string": query,
+        "headers": [],
+    }
+
+
+class SlowApp:
+    """Application counting calls and answering after a release."""
+
+    def __init__(self, fail: bool = False) -> None:
+        self.calls = 0
+        self.fail = fail
+        self.release = asyncio.Event()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Answer a request.
+
+        :param scope: ASGI scope of the request.
+        :param receive: ASGI receive function.
+        :param send: ASGI send function.
+        :raises RuntimeError: if the application is set to fail.
+        """
+        self.calls += 1
+        await self.release.wait()
+        if self.fail:
+            raise RuntimeError("boom")
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"payload"})
+
+
+async def _collect(
+    coalescer: RequestCoalescer,
+    app: SlowApp,
+    epoch: int = 0,
+) -> List[Message]:
+    sent: List[Message] = []
+
+    async def send(message: Message) -> None:  # noqa: WPS430
+        sent.append(message)
+
+    key = request_key(_scope())
+    assert key is not None
+    captured = await coalescer.run(key, app, _scope(), epoch)
+    await captured.replay(send)
+    return sent
+
+
+def test_request_key() -> None:
+    """Tests normalization of keys and excluded requests."""
+    assert request_key(_scope(b"b=2&a=1")) == request_key(_scope(b"a=1&b=2"))
+    assert request_key(_scope(b"a=1")) != request_key(_scope(b"a=2"))
+    assert request_key({**_scope(), "method": "POST"}) is None
+    assert request_key({**_scope(), "path": "/api/tvshow/create"}) is None
+
+
+@pytest.mark.anyio
+async def test_identical_requests_share_one_call() -> None:
+    """Tests that concurrent identical requests run the application once."""
+    coalescer = RequestCoalescer()
+    app = SlowApp()
+    requests = [asyncio.ensure_future(_collect(coalescer, app)) for _ in range(5)]
+    await asyncio.sleep(0.01)
+    app.release.set()
+
+    responses = await asyncio.gather(*requests)
+    assert app.calls == 1
+    assert all(response == responses[0] for response in responses)
+    assert responses[0][1]["body"] == b"payload"
+    assert coalescer.stats() == {"flights": 1, "coalesced": 4, "in_flight": 0}
+
+
+@pytest.mark.anyio
+async def test_errors_are_shared() -> None:
+    """Tests that an error of the application is raised in every waiter."""
+    coalescer = RequestCoalescer()
+    app = SlowApp(fail=True)
+    requests = [asyncio.ensure_future(_collect(coalescer, app)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    app.release.set()
+    for outcome in await asyncio.gather(*requests, return_exceptions=True):
+        assert isinstance(outcome, RuntimeError)
+    assert app.calls == 1
+
+
+@pytest.mark.anyio
+async def test_cancelled_first_request() -> None:
+    """Tests that cancelling the first request does not cancel the flight."""
+    coalescer = RequestCoalescer()
+    app = SlowApp()
+    leader = asyncio.ensure_future(_collect(coalescer, app))
+    await asyncio.sleep(0.01)
+    follower = asyncio.ensure_future(_collect(coalescer, app))
+    await asyncio.sleep(0.01)
+    leader.cancel()
+    await asyncio.sleep(0.01)
+    app.release.set()
+    assert (await follower)[1]["body"] == b"payload"
+    assert app.calls == 1
+
+
+@pytest.mark.anyio
+async def test_requests_after_commit_start_new_flight() -> None:
+    """Tests that a read issued after a write does not join an older flight."""
+    coalescer = RequestCoalescer()
+    app = SlowApp()
+    before_write = asyncio.ensure_future(_collect(coalescer, app, epoch=1))
+    await asyncio.sleep(0.01)
+    after_write = asyncio.ensure_future(_collect(coalescer, app, epoch=2))
+    await asyncio.sleep(0.01)
+    app.release.set()
+
+    await asyncio.gather(before_write, after_write)
+    assert app.calls == 2
+    assert coalescer.stats() == {"flights": 2, "coalesced": 0, "in_flight": 0}
+
+
+@pytest.mark.anyio
+async def test_write_during_flight(
+    dbsession: AsyncSession,
+    new_tvshow_object: TvShowInputDTO,
+) -> None:
+    """Tests that a commit during a flight makes later reads start a new one."""
+    watcher = GenerationWatcher(settings.db_file, 0)
+    await watcher.start()
+    app = SlowApp()
+    middleware = CoalescingMiddleware(app, RequestCoalescer())
+    scope = {
+        **_scope(),
+        "app": SimpleNamespace(state=SimpleNamespace(generation_watcher=watcher)),
+    }
+    sent: List[Message] = []
+
+    async def receive() -> Message:  # noqa: WPS430
+        return {"type": "http.request", "body": b""}
+
+    async def send(message: Message) -> None:  # noqa: WPS430
+        sent.append(message)
+
+    try:
+        before_write = asyncio.ensure_future(middleware(scope, receive, send))
+        await asyncio.sleep(0.01)
+        await TvShowDAO(dbsession).create_tv_show_model(
+            **new_tvshow_object.model_dump(),
+        )
+        await dbsession.commit()
+        after_write = asyncio.ensure_future(middleware(scope, receive, send))
+        await asyncio.sleep(0.01)
+        app.release.set()
+        await asyncio.gather(before_write, after_write)
+    finally:
+        await watcher.stop()
+
+    assert app.calls == 2
+    assert len(sent) == 4
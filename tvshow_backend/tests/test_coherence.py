@@ -0,0 +1,166 @@
+import asyncio
+import multiprocessing
+import time
+from pathlib import Path
+from typing import Any, List, Optional
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from tvshow_backend.db.changes import (
+    CREATE,
+    TvShowChange,
+    add_change_listener,
+    remove_change_listener,
+)
+from tvshow_backend.db.dao.tvshow_dao import TvShowDAO
+from tvshow_backend.db.meta import meta
+from tvshow_backend.db.utils import create_tables
+from tvshow_backend.services.coherence.watcher import GenerationWatcher
+
+INTERVAL = 0.2
+
+
+async def _create_shows(db_file: Path, show_ids: List[int], queue: Any) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_file}")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    committed: List[Any] = []
+    add_change_listener(
+        lambda changes: committed.extend(change.generation for change in changes),
+    )
+    try:
+        for show_id in show_ids:
+            async with session_factory() as session:
+                await TvShowDAO(session).create_tv_show_model(
+                    show_id=show_id,
+                    type="Movie",
+                    genre="Drama",
+                    title=f"Title {show_id}",
+                    director="Director",
+                    cast="Cast",
+                    country="Country",
+                    date_added="January 1, 2020",
+                    release_year=2020,
+                    rating="PG",
+                    duration="90 min",
+                )
+                committing_at = time.monotonic()
+                await session.commit()
+            queue.put((committed[-1], committing_at))
+            await asyncio.sleep(INTERVAL * 3)
+    finally:
+        await engine.dispose()
+
+
+def _worker(db_file: Path, show_ids: List[int], queue: Any) -> None:
+    asyncio.run(_create_shows(db_file, show_ids, queue))
+
+
+@pytest.mark.anyio
+async def test_local_commit_notifies_listeners(dbsession: AsyncSession) -> None:
+    """Tests that committed changes are passed to listeners."""
+    received: List[List[TvShowChange]] = []
+    add_change_listener(received.append)
+    try:
+        dao = TvShowDAO(dbsession)
+        await dao.create_tv_show_model(
+            show_id=987654,
+            type="Movie",
+            genre="Drama",
+            title="Local",
+            director="Director",
+            cast="Cast",
+            country="Country",
+            date_added="January 1, 2020",
+            release_year=2020,
+            rating="PG",
+            duration="90 min",
+        )
+        assert not received
+        await dbsession.commit()
+    finally:
+        remove_change_listener(received.append)
+
+    assert len(received) == 1
+    change = received[0][0]
+    assert change.operation == CREATE
+    assert change.show_id == 987654
+    assert change.values is not None
+    assert change.values["title"] == "Local"
+
+
+@pytest.mark.anyio
+async def test_remote_writes_are_detected(tmp_path: Path) -> None:
+    """Tests that writes of other processes invalidate caches in time."""
+    db_file = tmp_path / "db.sqlite3"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_file}")
+    await create_tables(engine, meta)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    watcher = GenerationWatcher(db_file, INTERVAL)
+    invalidations: List[Optional[List[TvShowChange]]] = []
+    detected: List[float] = []
+
+    def on_invalidate(changes: Optional[List[TvShowChange]]) -> None:
+        invalidations.append(changes)
+        if changes is None:
+            detected.append(time.monotonic())
+
+    watcher.add_listener(on_invalidate)
+    await watcher.start()
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    workers = [
+        context.Process(
+            target=_worker, args=(db_file, [index * 10, index * 10 + 1], queue)
+        )
+        for index in range(1, 3)
+    ]
+    try:
+        # A local write must not be reported as a remote one.
+        async with session_factory() as session:
+            await TvShowDAO(session).create_tv_show_model(
+                show_id=1,
+                type="Movie",
+                genre="Drama",
+                title="Local",
+                director="Director",
+                cast="Cast",
+                country="Country",
+                date_added="January 1, 2020",
+                release_year=2020,
+                rating="PG",
+                duration="90 min",
+            )
+            await session.commit()
+        assert invalidations[-1] is not None
+        await asyncio.sleep(INTERVAL * 2)
+        assert watcher.remote_invalidations == 0
+
+        for process in workers:
+            process.start()
+
+        writes = []
+        for _ in range(4):
+            writes.append(await asyncio.to_thread(queue.get, True, 60))
+        for process in workers:
+            await asyncio.to_thread(process.join, 60)
+        await asyncio.sleep(INTERVAL * 2)
+    finally:
+        for process in workers:
+            if process.is_alive():
+                process.terminate()
+        await watcher.stop()
+        await engine.dispose()
+
+    assert all(process.exitcode == 0 for process in workers)
+    assert watcher.generation == 5
+    # Every remote commit is noticed by the next poll: at most one interval
+    # passes before it and the poll itself may be late by up to another one.
+    for _, committing_at in writes:
+        staleness = min(
+            detected_at - committing_at
+            for detected_at in detected
+            if detected_at >= committing_at
+        )
+        assert staleness < 2 * INTERVAL + 0.1
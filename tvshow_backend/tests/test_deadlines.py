@@ -0,0 +1,172 @@
+import asyncio
+import time
+from pathlib import Path
+from typing import List
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from starlette import status
+
+from tvshow_backend.db.interrupt import interrupts
+from tvshow_backend.db.threaded import ThreadedSessionMaker
+from tvshow_backend.web.admission import Message, Receive, Scope, Send
+from tvshow_backend.web.deadlines import (
+    ALL,
+    GENRE,
+    DeadlineMiddleware,
+    RouteDeadline,
+    deadline_route,
+)
+
+# Counts for minutes unless it is interrupted.
+SLOW_QUERY = text(
+    "WITH RECURSIVE numbers(number) AS (SELECT 1 UNION ALL "
+    + "SELECT number + 1 FROM numbers WHERE number < 1000000000) "
+    + "SELECT count(*) FROM numbers",
+)
+
+
+class SlowApp:
+    """Application answering after a release, remembering its cancellation."""
+
+    def __init__(self) -> None:
+        self.release = asyncio.Event()
+        self.cancelled = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Answer a request.
+
+        :param scope: ASGI scope of the request.
+        :param receive: ASGI receive function.
+        :param send: ASGI send function.
+        """
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"payload"})
+
+
+async def _serve(
+    app: SlowApp,
+    deadline: RouteDeadline,
+    disconnect: bool = False,
+) -> List[Message]:
+    sent: List[Message] = []
+    gone = asyncio.Event()
+    if disconnect:
+        asyncio.get_running_loop().call_later(0.01, gone.set)
+
+    async def receive() -> Message:  # noqa: WPS430
+        await gone.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:  # noqa: WPS430
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/api/tvshow/all"}
+    await DeadlineMiddleware(app, {ALL: deadline})(scope, receive, send)
+    return sent
+
+
+def test_deadline_route() -> None:
+    """Tests which requests have deadlines."""
+    assert deadline_route("GET", "/api/tvshow/all") == ALL
+    assert deadline_route("GET", "/api/tvshow/genre/Drama") == GENRE
+    assert deadline_route("POST", "/api/tvshow/all") is None
+    assert deadline_route("GET", "/api/tvshow/detail/1") is None
+
+
+@pytest.mark.anyio
+async def test_expired_request_is_cancelled() -> None:
+    """Tests that a request past its deadline is cancelled with 504."""
+    app = SlowApp()
+    deadline = RouteDeadline(0.02)
+    sent = await _serve(app, deadline)
+    assert app.cancelled
+    assert sent[0]["status"] == status.HTTP_504_GATEWAY_TIMEOUT
+    assert deadline.stats() == {
+        "deadline": 0.02,
+        "requests": 1,
+        "timed_out": 1,
+        "disconnected": 0,
+    }
+
+    app.release.set()
+    sent = await _serve(app, deadline)
+    assert sent[-1]["body"] == b"payload"
+    assert deadline.timed_out == 1
+
+
+@pytest.mark.anyio
+async def test_abandoned_request_is_cancelled() -> None:
+    """Tests that a request is cancelled silently when its client leaves."""
+    app = SlowApp()
+    deadline = RouteDeadline(0)
+    assert not await _serve(app, deadline, disconnect=True)
+    assert app.cancelled
+    assert deadline.disconnected == 1
+    assert deadline.timed_out == 0
+
+
+async def _cancel_slow_query(session: AsyncSession) -> float:
+    query = asyncio.ensure_future(session.execute(SLOW_QUERY))
+    await asyncio.sleep(0.1)
+    started = time.perf_counter()
+    query.cancel()
+    await asyncio.wait({query})
+    return time.perf_counter() - started
+
+
+@pytest.mark.anyio
+async def test_cancelled_aiosqlite_query_is_interrupted(tmp_path: Path) -> None:
+    """Tests that cancelling a query of aiosqlite releases its connection."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite3'}")
+    sessions = async_sessionmaker(engine)
+    interrupted = interrupts.count
+    try:
+        async with sessions() as session:
+            assert await _cancel_slow_query(session) < 1
+        assert interrupts.count == interrupted + 1
+        async with sessions() as session:
+            assert await session.scalar(text("SELECT 1")) == 1
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.anyio
+async def test_cancelled_threaded_query_is_interrupted(tmp_path: Path) -> None:
+    """Tests that cancelling a query of the threadpool frees its thread."""
+    sessions = ThreadedSessionMaker(f"sqlite:///{tmp_path / 'db.sqlite3'}", 1)
+    interrupted = interrupts.count
+    try:
+        session = sessions()
+        await _cancel_slow_query(session)
+        started = time.perf_counter()
+        assert await session.scalar(text("SELECT 1")) == 1
+        assert time.perf_counter() - started < 1
+        await session.close()
+        assert interrupts.count == interrupted + 1
+    finally:
+        sessions.dispose()
+
+
+@pytest.mark.anyio
+async def test_deadline_stats(fastapi_app: FastAPI, client: AsyncClient) -> None:
+    """Tests that requests of routes with deadlines are counted."""
+    response = await client.get(
+        fastapi_app.url_path_for("retrieve_tvshow_by_genre", genre="Drama"),
+    )
+    assert response.status_code == status.HTTP_200_OK
+    response = await client.get(fastapi_app.url_path_for("request_deadline_stats"))
+    assert response.status_code == status.HTTP_200_OK
+    stats = response.json()
+    assert stats["routes"][GENRE]["requests"] == 1
+    assert stats["routes"][ALL]["requests"] == 0
+    assert stats["interrupted_queries"] == interrupts.count
@@ -0,0 +1,73 @@
+import asyncio
+import sqlite3
+import time
+from typing import Dict
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+from starlette import status
+
+from tvshow_backend.services.health.probe import LoopLagMonitor, ReadinessProbe
+from tvshow_backend.settings import settings
+
+
+@pytest.mark.anyio
+async def test_loop_lag() -> None:
+    """Tests that blocking the event loop is measured."""
+    monitor = LoopLagMonitor(0.01)
+    await monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        assert monitor.lag < 0.05
+        time.sleep(0.1)  # noqa: WPS421
+        await asyncio.sleep(0.02)
+        assert monitor.lag >= 0.05
+    finally:
+        await monitor.stop()
+
+
+@pytest.mark.anyio
+async def test_readiness(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    _engine: AsyncEngine,
+) -> None:
+    """Tests readiness with a locked database and a saturated pool."""
+    url = fastapi_app.url_path_for("readiness_check")
+    response = await client.get(url)
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+    usage: Dict[str, float] = {"pool": 0.5}
+    fastapi_app.state.readiness_probe = ReadinessProbe(
+        session_factory=async_sessionmaker(_engine),
+        pool_usage=lambda: usage["pool"],
+        lag_monitor=None,
+        limiters=fastapi_app.state.admission_limiters,
+        db_timeout=0.2,
+        max_pool_utilization=0.9,
+        max_loop_lag=0.25,
+        max_in_flight=200,
+    )
+    response = await client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["ready"]
+
+    usage["pool"] = 1
+    response = await client.get(url)
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.json()["reasons"] == ["database pool utilization 1.00"]
+    usage["pool"] = 0
+
+    writer = sqlite3.connect(settings.db_file, isolation_level=None)
+    try:
+        writer.execute("BEGIN EXCLUSIVE")
+        response = await client.get(url)
+    finally:
+        writer.close()
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.json()["db_latency_ms"] is None
+    # The stuck query goes on and answers the next check.
+    response = await client.get(url)
+    assert response.json()["db_latency_ms"] >= 200
@@ -0,0 +1,162 @@
+import asyncio
+from pathlib import Path
+from typing import Any, AsyncGenerator, Dict
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+from starlette import status
+
+from tvshow_backend.db.models.job_model import JobModel
+from tvshow_backend.services.jobs import FINISHED, JobStatus
+from tvshow_backend.services.jobs.handlers import HANDLERS
+from tvshow_backend.services.jobs.runner import JobContext, JobRunner
+from tvshow_backend.settings import settings
+
+
+class Gate:
+    """Job handler that runs until it is released."""
+
+    def __init__(self) -> None:
+        self.release = asyncio.Event()
+
+    async def __call__(
+        self,
+        context: JobContext,
+        params: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """
+        Run a job.
+
+        :param context: context of the job.
+        :param params: parameters of the job.
+        :return: parameters of the job.
+        """
+        context.report(1, 2)
+        await self.release.wait()
+        context.report(2)
+        return params
+
+
+@pytest.fixture
+def gate() -> Gate:
+    """
+    Create a job handler waiting for a release.
+
+    :return: job handler.
+    """
+    return Gate()
+
+
+@pytest.fixture
+async def runner(
+    _engine: AsyncEngine,
+    gate: Gate,
+) -> AsyncGenerator[JobRunner, None]:
+    """
+    Create a job runner with a single worker.
+
+    :param _engine: current engine.
+    :param gate: job handler of the gate kind.
+    :yield: started job runner.
+    """
+    job_runner = JobRunner(
+        async_sessionmaker(_engine, expire_on_commit=False),
+        {**HANDLERS, "gate": gate},
+        concurrency=1,
+        heartbeat=0.05,
+    )
+    await job_runner.start()
+    try:
+        yield job_runner
+    finally:
+        gate.release.set()
+        await job_runner.stop()
+
+
+async def _wait_for(runner: JobRunner, job_id: int, *statuses: str) -> JobModel:
+    for _ in range(200):
+        job = await runner.get(job_id)
+        if job.status in statuses:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"Job {job_id} is still {job.status}")
+
+
+@pytest.mark.anyio
+async def test_jobs_run_one_at_a_time(runner: JobRunner, gate: Gate) -> None:
+    """Tests progress, results and bounded concurrency of jobs."""
+    first = await runner.submit("gate", {"name": "first"})
+    second = await runner.submit("gate", {"name": "second"})
+
+    job = await _wait_for(runner, first.id, JobStatus.RUNNING)
+    assert (job.done, job.total) == (1, 2)
+    await asyncio.sleep(0.1)
+    assert (await runner.get(second.id)).status == JobStatus.QUEUED
+
+    gate.release.set()
+    job = await _wait_for(runner, second.id, *FINISHED)
+    assert job.status == JobStatus.SUCCEEDED
+    assert job.result == '{"name":"second"}'
+    job = await runner.get(first.id)
+    assert job.status == JobStatus.SUCCEEDED
+    assert (job.done, job.total) == (2, 2)
+
+
+@pytest.mark.anyio
+async def test_cancel_and_resume(runner: JobRunner, gate: Gate) -> None:
+    """Tests cancellation and jobs interrupted by shutdown."""
+    running = await runner.submit("gate", {})
+    queued = await runner.submit("gate", {})
+    await _wait_for(runner, running.id, JobStatus.RUNNING)
+
+    assert (await runner.cancel(queued.id)).status == JobStatus.CANCELLED
+    assert (await runner.cancel(running.id)).status == JobStatus.CANCELLING
+    job = await _wait_for(runner, running.id, *FINISHED)
+    assert job.status == JobStatus.CANCELLED
+
+    interrupted = await runner.submit("gate", {})
+    await _wait_for(runner, interrupted.id, JobStatus.RUNNING)
+    await runner.stop()
+    assert (await runner.get(interrupted.id)).status == JobStatus.QUEUED
+
+    await runner.start()
+    gate.release.set()
+    job = await _wait_for(runner, interrupted.id, *FINISHED)
+    assert job.status == JobStatus.SUCCEEDED
+
+
+@pytest.mark.anyio
+async def test_jobs_endpoints(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    runner: JobRunner,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Tests submitting and retrieving an export job."""
+    monkeypatch.setattr(settings, "jobs_export_dir", tmp_path)
+    url = fastapi_app.url_path_for("submit_job")
+    response = await client.post(url, json={"kind": "export"})
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+    fastapi_app.state.job_runner = runner
+    response = await client.post(url, json={"kind": "unknown"})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    response = await client.post(url, json={"kind": "export"})
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    job_id = response.json()["id"]
+    assert response.json()["status"] == "queued"
+
+    await _wait_for(runner, job_id, *FINISHED)
+    response = await client.get(fastapi_app.url_path_for("retrieve_job", job_id=job_id))
+    job = response.json()
+    assert job["status"] == "succeeded"
+    assert job["done"] == job["total"] == job["result"]["rows"]
+    lines = Path(job["result"]["path"]).read_text().splitlines()
+    assert lines[0].startswith("show_id,type,genre,title")
+    assert len(lines) == job["total"] + 1
+
+    response = await client.get(fastapi_app.url_path_for("retrieve_job", job_id=0))
+    assert response.status_code == status.HTTP_404_NOT_FOUND
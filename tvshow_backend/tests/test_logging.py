@@ -0,0 +1,119 @@
+import logging
+import queue
+import threading
+from typing import Any, List
+
+import pytest
+import ujson
+from loguru import logger
+
+from tvshow_backend.logging import (
+    AccessLogFilter,
+    InterceptHandler,
+    _json_sink,
+    _QueueSink,
+    _stop_listener,
+    configure_logging,
+)
+from tvshow_backend.settings import settings
+
+
+def _record(message: str = "GET /api/health 200") -> logging.LogRecord:
+    return logging.LogRecord(
+        "uvicorn.access",
+        logging.INFO,
+        "/uvicorn/protocols/http/h11_impl.py",
+        42,
+        message,
+        None,
+        None,
+        func="send",
+    )
+
+
+def test_access_log_sampling() -> None:
+    """Tests that only a share of records passes sampling."""
+    log_filter = AccessLogFilter(sample_rate=0.25)
+    passed = sum(log_filter.filter(_record()) for _ in range(4000))
+
+    assert 800 < passed < 1200
+    assert log_filter.dropped == 4000 - passed
+
+
+def test_access_log_rate_limit() -> None:
+    """Tests that no more than rate_limit records pass per second."""
+    log_filter = AccessLogFilter(rate_limit=10)
+    passed = sum(log_filter.filter(_record()) for _ in range(100))
+
+    assert passed == 10
+    assert log_filter.dropped == 90
+
+
+def test_intercept_handler_uses_record_caller() -> None:
+    """Tests that caller information comes from the LogRecord."""
+    messages: List[Any] = []
+    handler_id = logger.add(messages.append, format="{message}")
+    try:
+        InterceptHandler().handle(_record())
+    finally:
+        logger.remove(handler_id)
+
+    record = messages[0].record
+    assert record["message"] == "GET /api/health 200"
+    assert record["name"] == "uvicorn.access"
+    assert record["function"] == "send"
+    assert record["line"] == 42
+
+
+def test_json_sink(capsys: Any) -> None:
+    """Tests that JSON sink writes one parsable object per line."""
+    handler_id = logger.add(_json_sink, format="{message}")
+    try:
+        logger.bind(request_id="abc").info("hello")
+    finally:
+        logger.remove(handler_id)
+
+    payload = ujson.loads(capsys.readouterr().out.splitlines()[-1])
+    assert payload["message"] == "hello"
+    assert payload["level"] == "INFO"
+    assert payload["extra"] == {"request_id": "abc"}
+
+
+def test_queue_sink_writes_only_in_logging_thread() -> None:
+    """Tests that other threads only put messages into the queue."""
+    log_queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+    written: List[Any] = []
+    sink = _QueueSink(log_queue, written.append)
+    thread = threading.Thread(target=sink, args=("from thread",))
+    sink.thread = thread
+    thread.start()
+    thread.join()
+    assert written == ["from thread"]
+
+    stopped = threading.Event()
+    sink.thread = threading.Thread(target=stopped.wait)
+    sink.thread.start()
+    sink("from caller")
+    stopped.set()
+    sink.thread.join()
+    assert written == ["from thread"]
+    assert log_queue.get_nowait() == "from caller"
+
+
+def test_enqueued_application_logs(
+    capsys: Any,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Tests that loguru messages are written by the logging thread."""
+    monkeypatch.setattr(settings, "log_enqueue", True)
+    monkeypatch.setattr(settings, "log_json", True)
+    configure_logging()
+    try:
+        logger.info("queued")
+    finally:
+        _stop_listener()
+        monkeypatch.undo()
+        configure_logging()
+
+    lines = capsys.readouterr().out.splitlines()
+    assert ujson.loads(lines[0])["message"] == "queued"
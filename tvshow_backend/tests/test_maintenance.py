@@ -0,0 +1,108 @@
+import sqlite3
+import time
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from tvshow_backend.db.meta import meta
+from tvshow_backend.db.utils import create_tables
+from tvshow_backend.services.maintenance.scheduler import MaintenanceScheduler
+from tvshow_backend.services.maintenance.tasks import time_budget
+
+SLOW_QUERY = """
+    WITH RECURSIVE numbers(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM numbers)
+    SELECT count(*) FROM numbers
+"""
+
+
+@pytest.fixture
+async def db_file(tmp_path: Path) -> Path:
+    """
+    Create a database with free pages and a write-ahead log.
+
+    :param tmp_path: temporary directory.
+    :return: path of the database.
+    """
+    path = tmp_path / "db.sqlite3"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    try:
+        await create_tables(engine, meta, incremental_vacuum=True)
+    finally:
+        await engine.dispose()
+    connection = sqlite3.connect(path, isolation_level=None)
+    try:
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("CREATE TABLE filler (value TEXT)")
+        connection.executemany(
+            "INSERT INTO filler VALUES (?)",
+            [("x" * 1000,) for _ in range(1000)],
+        )
+        connection.execute("DELETE FROM filler")
+    finally:
+        connection.close()
+    return path
+
+
+def test_time_budget() -> None:
+    """Tests that statements running past their budget are interrupted."""
+    connection = sqlite3.connect(":memory:")
+    started = time.monotonic()
+    with time_budget(connection, 0.05):
+        with pytest.raises(sqlite3.OperationalError):
+            connection.execute(SLOW_QUERY)
+    assert time.monotonic() - started < 1
+    assert connection.execute("SELECT 1").fetchone() == (1,)
+
+
+@pytest.mark.anyio
+async def test_maintenance(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    db_file: Path,
+) -> None:
+    """Tests a run of every step and its report through monitoring."""
+    url = fastapi_app.url_path_for("maintenance_stats")
+    response = await client.get(url)
+    assert response.json() == {
+        "enabled": False,
+        "runs": 0,
+        "skipped": 0,
+        "failures": 0,
+        "last_run_at": None,
+        "next_run_at": None,
+        "last_report": None,
+    }
+
+    scheduler = MaintenanceScheduler(
+        db_file,
+        interval=60,
+        step_budget=5,
+        is_idle=lambda: True,
+        max_delay=0,
+    )
+    fastapi_app.state.maintenance_scheduler = scheduler
+    report = await scheduler.run_once()
+    assert report is not None
+    assert report["incremental_vacuum"]
+    assert report["free_pages"] > 0
+    assert report["pages_freed"] == report["free_pages"]
+    assert report["wal_pages"] == report["checkpointed_pages"] > 0
+    assert not report["analyze_interrupted"]
+    # Another worker just ran maintenance.
+    assert await scheduler.run_once() is None
+
+    stats = (await client.get(url)).json()
+    assert stats["runs"] == 1
+    assert stats["skipped"] == 1
+    assert stats["last_report"]["pages_freed"] == report["pages_freed"]
+    connection = sqlite3.connect(db_file)
+    try:
+        assert connection.execute("PRAGMA freelist_count").fetchone() == (0,)
+        assert connection.execute("SELECT count(*) FROM sqlite_stat1").fetchone()[0]
+        # The log was truncated.
+        assert db_file.with_name("db.sqlite3-wal").stat().st_size == 0
+    finally:
+        connection.close()
@@ -0,0 +1,112 @@
+import asyncio
+import multiprocessing
+import os
+import sqlite3
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from tvshow_backend.db.dao.tvshow_dao import TvShowDAO
+from tvshow_backend.db.memory import MemoryDatabase
+from tvshow_backend.db.meta import meta
+from tvshow_backend.db.utils import create_tables
+from tvshow_backend.settings import Settings
+
+INTERVAL = 0.2
+CRASH_URI = "file:/crash?vfs=memdb"
+
+
+def _titles(db_file: Path) -> List[Tuple[str]]:
+    connection = sqlite3.connect(db_file)
+    try:
+        return connection.execute("SELECT title FROM show ORDER BY title").fetchall()
+    finally:
+        connection.close()
+
+
+def _write(title: str) -> None:
+    connection = sqlite3.connect(CRASH_URI, uri=True)
+    with connection:
+        connection.execute("INSERT INTO show VALUES (?)", (title,))
+    connection.close()
+
+
+async def _serve_and_crash(db_file: Path) -> None:
+    memory = MemoryDatabase(db_file, INTERVAL, uri=CRASH_URI)
+    await memory.start()
+    _write("saved")
+    while not memory.snapshots:
+        await asyncio.sleep(0.01)
+    # The snapshot task sleeps now, so this write is newer than any snapshot.
+    _write("lost")
+    os._exit(0)  # noqa: WPS437
+
+
+def _crashing_worker(db_file: Path) -> None:
+    asyncio.run(_serve_and_crash(db_file))
+
+
+@pytest.mark.anyio
+async def test_crash_loses_only_recent_writes(tmp_path: Path) -> None:
+    """Tests the loss window and recovery from an interrupted snapshot."""
+    db_file = tmp_path / "db.sqlite3"
+    connection = sqlite3.connect(db_file)
+    connection.execute("CREATE TABLE show (title VARCHAR)")
+    connection.close()
+
+    process = multiprocessing.get_context("spawn").Process(
+        target=_crashing_worker,
+        args=(db_file,),
+    )
+    process.start()
+    await asyncio.to_thread(process.join, 30)
+    assert process.exitcode == 0
+    assert _titles(db_file) == [("saved",)]
+
+    memory = MemoryDatabase(db_file, 0, uri=CRASH_URI)
+    memory.snapshot_file.write_bytes(b"interrupted snapshot")
+    await memory.start()
+    assert not memory.snapshot_file.exists()
+    _write("after restart")
+    await memory.stop()
+    assert _titles(db_file) == [("after restart",), ("saved",)]
+    assert memory.snapshots == 1
+
+
+@pytest.mark.anyio
+async def test_queries_run_in_memory(tmp_path: Path) -> None:
+    """Tests that the application database is served from memory."""
+    memory_settings = Settings(db_in_memory=True, db_file=tmp_path / "db.sqlite3")
+    memory = MemoryDatabase(memory_settings.db_file, 0)
+    await memory.start()
+    engine = create_async_engine(str(memory_settings.db_url))
+    try:
+        await create_tables(engine, meta)
+        async with async_sessionmaker(engine)() as session:
+            await TvShowDAO(session).create_tv_show_model(
+                show_id=1,
+                type="Movie",
+                genre="Drama",
+                title="In memory",
+                director="Director",
+                cast="Cast",
+                country="Country",
+                date_added="January 1, 2020",
+                release_year=2020,
+                rating="PG",
+                duration="90 min",
+            )
+            await session.commit()
+        assert not memory_settings.db_file.exists()
+    finally:
+        await engine.dispose()
+        await memory.stop()
+
+    connection = sqlite3.connect(memory_settings.db_file)
+    try:
+        titles = connection.execute("SELECT title FROM tvshow_model").fetchall()
+    finally:
+        connection.close()
+    assert titles == [("In memory",)]
@@ -0,0 +1,122 @@
+import sqlite3
+from pathlib import Path
+from typing import Any
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from tvshow_backend.db import migrate
+from tvshow_backend.db.meta import meta
+from tvshow_backend.db.migrate import LegacySchemaError, migrate_catalog
+from tvshow_backend.db.models import load_all_models
+from tvshow_backend.db.utils import create_tables
+
+LEGACY_SCHEMA = """
+CREATE TABLE tvshow_model (
+    show_id VARCHAR NOT NULL, type VARCHAR NOT NULL, genre VARCHAR NOT NULL,
+    title VARCHAR NOT NULL, director VARCHAR NOT NULL, "cast" VARCHAR NOT NULL,
+    country VARCHAR NOT NULL, date_added VARCHAR NOT NULL,
+    release_year INTEGER NOT NULL, rating VARCHAR NOT NULL,
+    duration VARCHAR NOT NULL, PRIMARY KEY (show_id)
+);
+CREATE TABLE table_generation (
+    table_name VARCHAR NOT NULL PRIMARY KEY, generation INTEGER NOT NULL
+);
+CREATE TABLE tvshow_changelog (
+    seq INTEGER NOT NULL PRIMARY KEY, operation VARCHAR NOT NULL,
+    show_id INTEGER NOT NULL, "values" VARCHAR, changed_at FLOAT NOT NULL
+);
+INSERT INTO table_generation VALUES ('tvshow_model', 10);
+"""
+
+
+def _write(db_file: Path, show_id: int, date_added: str) -> None:
+    """Write a show like a worker running the previous version."""
+    connection = sqlite3.connect(db_file)
+    with connection:
+        connection.execute(
+            "INSERT OR REPLACE INTO tvshow_model "
+            + "VALUES (?, 'Movie', 'Drama', ?, '', '', '', ?, 2020, 'PG', '')",
+            (show_id, f"Show {show_id}", date_added),
+        )
+        connection.execute(
+            "UPDATE table_generation SET generation = generation + 1",
+        )
+        connection.execute(
+            "INSERT INTO tvshow_changelog SELECT generation, 'update', ?, NULL, 0 "
+            + "FROM table_generation",
+            (show_id,),
+        )
+    connection.close()
+
+
+@pytest.fixture
+def legacy_db(tmp_path: Path) -> Path:
+    """
+    Create a database with untyped show ids and dates.
+
+    :param tmp_path: temporary directory.
+    :return: path to the database.
+    """
+    db_file = tmp_path / "legacy.sqlite3"
+    connection = sqlite3.connect(db_file)
+    connection.executescript(LEGACY_SCHEMA)
+    connection.close()
+    for show_id in range(1, 26):
+        _write(db_file, show_id, f"March {show_id}, 2019")
+    return db_file
+
+
+@pytest.mark.anyio
+async def test_startup_refuses_legacy_schema(legacy_db: Path) -> None:
+    """Tests that tables are not created next to an untyped table."""
+    load_all_models()
+    engine = create_async_engine(f"sqlite+aiosqlite:///{legacy_db}")
+    try:
+        with pytest.raises(LegacySchemaError):
+            await create_tables(engine, meta)
+    finally:
+        await engine.dispose()
+
+
+def test_migration_keeps_concurrent_writes(
+    legacy_db: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Tests that shows written during the copy are migrated too."""
+    copy_all = migrate._copy_all
+
+    def copy_and_write(
+        connection: sqlite3.Connection, *args: Any, **kwargs: Any
+    ) -> None:
+        copy_all(connection, *args, **kwargs)
+        _write(legacy_db, 3, "2021-05-06")
+        _write(legacy_db, 100, "unknown")
+
+    monkeypatch.setattr(migrate, "_copy_all", copy_and_write)
+    assert migrate_catalog(legacy_db, batch_size=10)
+    assert not migrate_catalog(legacy_db)
+
+    connection = sqlite3.connect(legacy_db)
+    try:
+        shows = connection.execute(
+            "SELECT show_id, date_added, added_on FROM tvshow_model "
+            + "WHERE show_id IN (2, 3, 100) ORDER BY show_id",
+        ).fetchall()
+        plan = " ".join(
+            str(row[-1])
+            for row in connection.execute(
+                "EXPLAIN QUERY PLAN SELECT show_id FROM tvshow_model "
+                + "WHERE added_on >= '2019-03-20'",
+            )
+        )
+        count = connection.execute("SELECT COUNT(*) FROM tvshow_model").fetchone()
+    finally:
+        connection.close()
+    assert shows == [
+        (2, "March 2, 2019", "2019-03-02"),
+        (3, "2021-05-06", "2021-05-06"),
+        (100, "unknown", None),
+    ]
+    assert "ix_tvshow_model_added_on" in plan
+    assert count == (26,)
@@ -0,0 +1,84 @@
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from tvshow_backend.db.dao.tvshow_dao import TvShowDAO
+from tvshow_backend.web.api.tvshow.schema import TvShowInputDTO
+from tvshow_backend.web.negotiation import COLUMNS, JSON, MSGPACK, negotiate
+
+msgpack = pytest.importorskip("msgpack")
+
+
+def test_negotiate() -> None:
+    """Tests the choice of the response format."""
+    assert negotiate(None) == JSON
+    assert negotiate("text/html") == JSON
+    assert negotiate("application/x-msgpack") == MSGPACK
+    assert negotiate("*/*, application/msgpack") == MSGPACK
+    assert negotiate("application/msgpack;q=0.5, application/json") == JSON
+    assert negotiate("application/msgpack;q=0") == JSON
+    assert negotiate(f"{COLUMNS}, {MSGPACK}") == COLUMNS
+
+
+@pytest.mark.anyio
+async def test_msgpack_round_trip(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    new_tvshow_object: TvShowInputDTO,
+) -> None:
+    """Tests MessagePack request bodies and responses."""
+    response = await client.post(
+        fastapi_app.url_path_for("create_tvshow"),
+        content=msgpack.packb(new_tvshow_object.model_dump()),
+        headers={"Content-Type": MSGPACK},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert await TvShowDAO(dbsession).filter(show_id=new_tvshow_object.show_id)
+
+    url = fastapi_app.url_path_for(
+        "retrieve_tvshow_by_id",
+        show_id=new_tvshow_object.show_id,
+    )
+    response = await client.get(url, headers={"Accept": MSGPACK})
+    assert response.headers["content-type"] == MSGPACK
+    assert response.headers["vary"] == "Accept"
+    assert msgpack.unpackb(response.content) == (await client.get(url)).json()
+
+    response = await client.post(
+        fastapi_app.url_path_for("create_tvshow"),
+        content=b"\xc1",
+        headers={"Content-Type": MSGPACK},
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.anyio
+async def test_columns(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    new_tvshow_object: TvShowInputDTO,
+) -> None:
+    """Tests lists sent as columns and other responses as plain JSON."""
+    dao = TvShowDAO(dbsession)
+    for show_id in (1, 2):
+        await dao.create_tv_show_model(
+            **{**new_tvshow_object.model_dump(), "show_id": show_id},
+        )
+    headers = {"Accept": COLUMNS}
+    response = await client.get(
+        fastapi_app.url_path_for("retrieve_tvshow"),
+        headers=headers,
+    )
+    assert response.headers["content-type"] == COLUMNS
+    columns = response.json()
+    assert columns["show_id"] == [1, 2]
+    assert set(columns["title"]) == {new_tvshow_object.title}
+
+    url = fastapi_app.url_path_for("retrieve_tvshow_by_id", show_id=1)
+    response = await client.get(url, headers=headers)
+    assert response.headers["content-type"] == JSON
+    assert response.json()["show_id"] == 1
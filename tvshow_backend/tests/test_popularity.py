@@ -0,0 +1,103 @@
+import asyncio
+import sqlite3
+from typing import Dict
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette import status
+
+from tvshow_backend.db.dao.tvshow_dao import TvShowDAO
+from tvshow_backend.services.autocomplete.index import POPULAR, TitleIndex
+from tvshow_backend.services.popularity.counter import ViewCounter
+from tvshow_backend.web.api.tvshow.schema import TvShowInputDTO
+
+
+@pytest.mark.anyio
+async def test_view_counter(dbsession: AsyncSession) -> None:
+    """Tests batched writes of views and early flushes of many shows."""
+    totals: Dict[int, int] = {}
+    counter = ViewCounter(flush_interval=60, max_pending=3)
+    counter.record(1)
+    await counter.start(
+        async_sessionmaker(dbsession.bind, expire_on_commit=False),
+        on_flush=totals.update,
+    )
+    try:
+        for show_id in (1, 1, 2):
+            counter.record(show_id)
+        assert counter.pending == 3
+        assert await counter.flush() == 3
+        assert totals == {1: 2, 2: 1}
+
+        counter.record(1)
+        counter.record(2)
+        assert counter.pending == 2
+        counter.record(3)
+        await asyncio.sleep(0.05)
+        assert counter.pending == 0
+        assert totals == {1: 3, 2: 2, 3: 1}
+        assert counter.popular == [(1, 3), (2, 2), (3, 1)]
+    finally:
+        await counter.stop()
+    counter.record(1)
+    assert counter.pending == 0
+
+
+@pytest.mark.anyio
+async def test_popular(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    new_tvshow_object: TvShowInputDTO,
+) -> None:
+    """Tests that views of show details make the list of popular shows."""
+    url = fastapi_app.url_path_for("retrieve_popular_tvshows")
+    response = await client.get(url)
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+    show_id = new_tvshow_object.show_id
+    await TvShowDAO(dbsession).create_tv_show_model(**new_tvshow_object.model_dump())
+    counter: ViewCounter = fastapi_app.state.view_counter
+    await counter.start(async_sessionmaker(dbsession.bind, expire_on_commit=False))
+    try:
+        for viewed_id in (show_id, show_id, show_id + 1):
+            await client.get(
+                fastapi_app.url_path_for("retrieve_tvshow_by_id", show_id=viewed_id),
+            )
+        # Views of unknown shows are not counted.
+        assert counter.pending == 2
+        response = await client.get(url)
+        assert not response.json()
+
+        await counter.flush()
+        response = await client.get(url)
+    finally:
+        await counter.stop()
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [
+        {"show_id": show_id, "title": new_tvshow_object.title, "views": 2},
+    ]
+
+
+def test_title_index_ranks_by_views() -> None:
+    """Tests that the title index loads views as popularity."""
+    connection = sqlite3.connect(":memory:")
+    connection.executescript(
+        """
+        CREATE TABLE tvshow_model (show_id INTEGER, title TEXT, date_added TEXT);
+        INSERT INTO tvshow_model VALUES (1, 'Dark', '2020'), (2, 'Dune', '2021');
+        """,
+    )
+    index = TitleIndex.load(connection)
+    assert [show_id for show_id, _ in index.search("d", order=POPULAR)] == [2, 1]
+
+    connection.executescript(
+        """
+        CREATE TABLE tvshow_views (show_id INTEGER, views INTEGER);
+        INSERT INTO tvshow_views VALUES (1, 5);
+        """,
+    )
+    index = TitleIndex.load(connection)
+    assert [show_id for show_id, _ in index.search("d", order=POPULAR)] == [1, 2]
@@ -0,0 +1,125 @@
+from typing import Any, AsyncGenerator
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from tvshow_backend.db.dao.tvshow_dao import TvShowDAO
+from tvshow_backend.db.dependencies import get_db_session
+from tvshow_backend.services.coherence.watcher import GenerationWatcher
+from tvshow_backend.settings import settings
+from tvshow_backend.web.admission import Scope
+from tvshow_backend.web.api.tvshow.schema import TvShowInputDTO
+from tvshow_backend.web.coalescing import CapturedResponse
+from tvshow_backend.web.response_cache import ResponseCache, cache_key
+
+
+def _scope(path: str = "/api/tvshow/all", query: bytes = b"") -> Scope:
+    return {"method": "GET", "path": path, "query_string": query, "headers": []}
+
+
+def _response(body: bytes) -> CapturedResponse:
+    response = CapturedResponse()
+    response.start = {"type": "http.response.start", "status": 200, "headers": []}
+    response.body = [body]
+    return response
+
+
+def test_cache_key() -> None:
+    """Tests normalization of parameters and excluded requests."""
+    default = cache_key(_scope())
+    assert default == cache_key(_scope(query=b"offset=0&limit=10"))
+    assert default == cache_key(_scope(query=b"limit=010&unknown=1"))
+    assert default != cache_key(_scope(query=b"limit=20"))
+    assert cache_key(_scope(query=b"limit=ten")) is None
+    genre = "/api/tvshow/genre/Drama"
+    assert cache_key(_scope(genre, b"match=any&limit=20&x=1")) == cache_key(
+        _scope(genre),
+    )
+    assert cache_key(_scope(genre, b"match=all")) != cache_key(_scope(genre))
+    assert cache_key(_scope("/api/tvshow/detail/1")) is None
+    assert cache_key({**_scope(), "method": "POST"}) is None
+
+
+def test_budget_and_epochs() -> None:
+    """Tests eviction of least recently used responses and invalidation."""
+    first, second, third = (
+        cache_key(_scope(query=f"offset={n}".encode())) for n in "123"
+    )
+    assert first and second and third
+    cache = ResponseCache(max_bytes=1000)
+    cache.put(first, _response(b"a" * 200), 0)
+    cache.put(second, _response(b"b" * 200), 0)
+    assert cache.get(first, 0) is not None
+    cache.put(third, _response(b"c" * 200), 0)
+    assert cache.get(second, 0) is None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] <= 1000
+
+    cache.put(second, _response(b"x" * 2000), 0)
+    assert cache.get(second, 0) is None
+    assert cache.get(first, 1) is None
+    cache.put(first, _response(b"stale"), 0)
+    assert cache.get(first, 1) is None
+    assert cache.stats() == {
+        "entries": 0,
+        "bytes": 0,
+        "max_bytes": 1000,
+        "hits": 1,
+        "misses": 4,
+        "hit_ratio": 0.2,
+        "evictions": 1,
+        "invalidations": 1,
+    }
+
+
+@pytest.fixture
+async def watcher(fastapi_app: FastAPI) -> AsyncGenerator[GenerationWatcher, None]:
+    """
+    Start the generation watcher of the application.
+
+    :param fastapi_app: the application.
+    :yield: running watcher.
+    """
+    generation_watcher = GenerationWatcher(settings.db_file, 0)
+    await generation_watcher.start()
+    fastapi_app.state.generation_watcher = generation_watcher
+    try:
+        yield generation_watcher
+    finally:
+        await generation_watcher.stop()
+
+
+@pytest.mark.anyio
+async def test_hits_skip_the_database(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    watcher: GenerationWatcher,
+    new_tvshow_object: TvShowInputDTO,
+) -> None:
+    """Tests that cached pages are served without a session until a write."""
+    dao = TvShowDAO(dbsession)
+    await dao.create_tv_show_model(**new_tvshow_object.model_dump())
+    await dbsession.commit()
+    url = fastapi_app.url_path_for("retrieve_tvshow_by_genre", genre="Test Genre")
+    response = await client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+
+    def no_session() -> Any:
+        raise AssertionError("The database was used")
+
+    fastapi_app.dependency_overrides[get_db_session] = no_session
+    cached = await client.get(url)
+    assert cached.content == response.content
+    assert fastapi_app.state.response_cache.stats()["hits"] == 1
+
+    fastapi_app.dependency_overrides[get_db_session] = lambda: dbsession
+    await dao.update_tv_show_model(
+        **{**new_tvshow_object.model_dump(), "title": "Renamed"},
+    )
+    await dbsession.commit()
+    response = await client.get(url)
+    assert response.json()[0]["title"] == "Renamed"
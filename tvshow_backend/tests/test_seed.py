@@ -0,0 +1,51 @@
+import sqlite3
+from pathlib import Path
+
+from tvshow_backend.db.seed import CatalogGenerator, generate_rows, seed_catalog
+
+
+def test_generator_is_deterministic() -> None:
+    """Tests that chunks depend only on the seed and their position."""
+    first = CatalogGenerator(seed=7).chunk((100, 50))
+    second = CatalogGenerator(seed=7).chunk((100, 50))
+    other = CatalogGenerator(seed=8).chunk((100, 50))
+    appended = CatalogGenerator(seed=7).chunk((150, 50))
+
+    assert first == second
+    assert first != other
+    assert [row[2] for row in first] != [row[2] for row in appended]
+    assert [row[0] for row in first] == list(range(100, 150))
+
+
+def test_multi_valued_cells_are_distinct() -> None:
+    """Tests that multi-valued columns never repeat a value."""
+    for chunk in generate_rows(2000, seed=1):
+        for row in chunk:
+            for cell in (row[2], row[5], row[6]):
+                values = cell.split(", ") if cell else []
+                assert len(values) == len(set(values))
+
+
+def test_seed_catalog(tmp_path: Path) -> None:
+    """Tests bulk loading, appending and the generation bump."""
+    db_file = tmp_path / "seed.sqlite3"
+
+    assert seed_catalog(db_file, rows=1500, seed=1) == 1
+    assert seed_catalog(db_file, rows=500, seed=1) == 1501
+
+    connection = sqlite3.connect(db_file)
+    try:
+        count, max_id = connection.execute(
+            "SELECT COUNT(*), MAX(show_id) FROM tvshow_model",
+        ).fetchone()
+        generations = dict(
+            connection.execute("SELECT table_name, generation FROM table_generation"),
+        )
+    finally:
+        connection.close()
+    assert count == 2000
+    assert max_id == 2000
+    assert generations == {
+        "tvshow_model": 2000,
+        "tvshow_changelog_floor": 2000,
+    }
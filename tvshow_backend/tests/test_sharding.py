@@ -0,0 +1,219 @@
+import sqlite3
+from collections import Counter
+from pathlib import Path
+from typing import Any, AsyncGenerator, Dict
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.exc import NoResultFound
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette import status
+
+from tvshow_backend.db.dao.sharded_tvshow_dao import ShardedTvShowDAO
+from tvshow_backend.db.dao.tvshow_dao import TooManyRowsError, TvShowFilter
+from tvshow_backend.db.meta import meta
+from tvshow_backend.db.models import load_all_models
+from tvshow_backend.db.reshard import reshard_catalog
+from tvshow_backend.db.seed import seed_catalog
+from tvshow_backend.db.sharding import (
+    ShardLayoutError,
+    ShardSet,
+    check_layout,
+    shard_files,
+    shard_of,
+)
+from tvshow_backend.db.utils import create_tables
+
+SHARDS = 3
+
+
+def _show(show_id: int) -> Dict[str, Any]:
+    return {
+        "show_id": show_id,
+        "type": "Movie",
+        "genre": "Drama, Comedy" if show_id % 2 else "Drama",
+        "title": f"Title {show_id % 7}",
+        "director": "Director",
+        "cast": "Cast",
+        "country": "Country",
+        "date_added": "January 1, 2020",
+        "release_year": 2000 + show_id % 5,
+        "rating": "PG",
+        "duration": "90 min",
+    }
+
+
+def _count(path: Path) -> int:
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute("SELECT count(*) FROM tvshow_model").fetchone()[0]
+    finally:
+        connection.close()
+
+
+@pytest.fixture
+async def shards(tmp_path: Path) -> AsyncGenerator[ShardSet, None]:
+    """
+    Create a catalog split into shards.
+
+    :param tmp_path: temporary directory.
+    :yield: shards of the catalog.
+    """
+    shard_set = ShardSet(shard_files(tmp_path / "db.sqlite3", SHARDS))
+    await shard_set.create_tables(meta, load_models=load_all_models)
+    try:
+        yield shard_set
+    finally:
+        await shard_set.dispose()
+
+
+def test_shard_of() -> None:
+    """Tests that shows are spread evenly and always to the same shard."""
+    spread = Counter(shard_of(show_id, 4) for show_id in range(10_000))
+    assert set(spread) == {0, 1, 2, 3}
+    assert min(spread.values()) > 2300
+    assert [shard_of(show_id, 4) for show_id in (1, 2, 3, -1)] == [
+        shard_of(show_id, 4) for show_id in (1, 2, 3, -1)
+    ]
+    assert shard_files(Path("db.sqlite3"), 1) == [Path("db.sqlite3")]
+    assert shard_files(Path("data/db.sqlite3"), 2)[1] == Path(
+        "data/db.shard-1-of-2.sqlite3",
+    )
+
+
+@pytest.mark.anyio
+async def test_scatter_gather(shards: ShardSet) -> None:
+    """Tests that pages merged from shards match pages of a single table."""
+    dao = ShardedTvShowDAO(shards)
+    for show_id in range(1, 41):
+        await dao.create_tv_show_model(**_show(show_id))
+    assert all(_count(path) for path in shards.files)
+    with pytest.raises(ValueError):
+        await dao.create_tv_show_model(**_show(1))
+
+    page = await dao.get_all_tv_shows(limit=10, offset=15)
+    assert [show.show_id for show in page] == list(range(16, 26))
+    with pytest.raises(NoResultFound):
+        await dao.get_all_tv_shows(limit=10, offset=40)
+
+    comedies = await dao.search_tv_show_by_genre(
+        ["comedy"],
+        limit=5,
+        offset=3,
+        sort="title",
+        descending=True,
+    )
+    expected = sorted(
+        (show for show in map(_show, range(1, 41)) if show["show_id"] % 2),
+        key=lambda show: (show["title"], show["show_id"]),
+        reverse=True,
+    )[3:8]
+    assert [show.show_id for show in comedies] == [show["show_id"] for show in expected]
+
+    assert await dao.get_titles([1, 2, 99]) == {1: "Title 1", 2: "Title 2"}
+    assert [show.show_id for show in await dao.filter()] == list(range(1, 41))
+    assert await dao.count_matching(TvShowFilter(genre="Comedy")) == 20
+
+    await dao.update_tv_show_model(**{**_show(3), "title": "Updated"})
+    assert (await dao.get_tv_show_by_id(3)).title == "Updated"
+    await dao.delete_tv_show_model(3)
+    with pytest.raises(NoResultFound):
+        await dao.get_tv_show_by_id(3)
+
+
+@pytest.mark.anyio
+async def test_bulk_writes(shards: ShardSet) -> None:
+    """Tests that bulk writes change every shard or none of them."""
+    dao = ShardedTvShowDAO(shards)
+    for show_id in range(1, 21):
+        await dao.create_tv_show_model(**_show(show_id))
+    show_filter = TvShowFilter(genre="Comedy")
+
+    with pytest.raises(TooManyRowsError):
+        await dao.bulk_update(show_filter, {"rating": "R"}, max_rows=9)
+    assert await dao.count_matching(TvShowFilter(type="Movie")) == 20
+    shows = await dao.filter()
+    assert all(show.rating == "PG" for show in shows)
+
+    assert await dao.bulk_update(show_filter, {"rating": "R"}, max_rows=10) == 10
+    assert await dao.bulk_delete(show_filter, max_rows=10) == 10
+    assert await dao.count_matching(TvShowFilter()) == 10
+
+
+@pytest.mark.anyio
+async def test_sharded_api(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    shards: ShardSet,
+) -> None:
+    """Tests that requests are served from shards when the catalog has them."""
+    fastapi_app.state.db_shards = shards
+    for show_id in (5, 1, 3):
+        response = await client.post(
+            fastapi_app.url_path_for("create_tvshow"),
+            json=_show(show_id),
+        )
+        assert response.status_code == status.HTTP_200_OK
+    response = await client.get(
+        fastapi_app.url_path_for("retrieve_tvshow"),
+        params={"limit": 2, "offset": 1},
+    )
+    assert [show["show_id"] for show in response.json()] == [3, 5]
+    assert sum(map(_count, shards.files)) == 3
+
+
+@pytest.mark.anyio
+async def test_reshard(tmp_path: Path) -> None:
+    """Tests moving a catalog between layouts and refusing other layouts."""
+    db_file = tmp_path / "db.sqlite3"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_file}")
+    try:
+        await create_tables(engine, meta, load_models=load_all_models)
+        seed_catalog(db_file, 200)
+        connection = sqlite3.connect(db_file)
+        with connection:
+            connection.execute("INSERT INTO tvshow_views VALUES (1, 5)")
+        connection.close()
+
+        assert reshard_catalog(db_file, SHARDS, batch_size=30) == 200
+        assert _count(db_file) == 0
+        assert [_count(path) for path in shard_files(db_file, SHARDS)] == [
+            len([1 for show_id in range(1, 201) if shard_of(show_id, SHARDS) == index])
+            for index in range(SHARDS)
+        ]
+        await check_layout(engine, SHARDS)
+        with pytest.raises(ShardLayoutError):
+            await check_layout(engine, 1)
+
+        assert reshard_catalog(db_file, 2) == 200
+        assert not any(path.exists() for path in shard_files(db_file, SHARDS))
+        assert reshard_catalog(db_file, 2) is None
+        assert reshard_catalog(db_file, 1) == 200
+        assert not any(path.exists() for path in shard_files(db_file, 2))
+        await check_layout(engine, 1)
+    finally:
+        await engine.dispose()
+
+    connection = sqlite3.connect(db_file)
+    try:
+        assert _count(db_file) == 200
+        genres = connection.execute("SELECT count(*) FROM tvshow_genre").fetchone()
+        assert genres[0] >= 200
+        views = connection.execute("SELECT * FROM tvshow_views").fetchall()
+        assert views == [(1, 5)]
+    finally:
+        connection.close()
+
+
+@pytest.mark.anyio
+async def test_empty_catalog_is_taken_over(tmp_path: Path) -> None:
+    """Tests that shards can be enabled for a new database."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite3'}")
+    try:
+        await create_tables(engine, meta, load_models=load_all_models)
+        await check_layout(engine, 4)
+        with pytest.raises(ShardLayoutError):
+            await check_layout(engine, 2)
+    finally:
+        await engine.dispose()
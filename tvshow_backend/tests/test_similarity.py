@@ -0,0 +1,102 @@
+from typing import Any, Callable, Dict
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from tvshow_backend.db.changes import CREATE, DELETE, UPDATE, TvShowChange
+from tvshow_backend.db.dao.tvshow_dao import TvShowDAO
+
+pytest.importorskip("scipy")
+
+from tvshow_backend.services.similarity.model import SimilarityModel  # noqa: E402
+
+
+def _show(show_id: int, genre: str, cast: str, country: str = "US") -> Dict[str, Any]:
+    return {
+        "show_id": show_id,
+        "type": "Movie",
+        "genre": genre,
+        "title": f"Show {show_id}",
+        "director": "",
+        "cast": cast,
+        "country": country,
+        "date_added": "May 1, 2020",
+        "release_year": 2020,
+        "rating": "PG",
+        "duration": "90 min",
+    }
+
+
+SHOWS = [
+    _show(1, "Drama, Crime", "Anna Kim, Raj Patel"),
+    _show(2, "Drama, Crime", "Anna Kim"),
+    _show(3, "Drama", "Omar Khan"),
+    _show(4, "Comedy", "Li Chen", "India"),
+]
+
+
+def test_similar_shows_ranking() -> None:
+    """Tests cosine ranking and caching of similar shows."""
+    model = SimilarityModel.from_rows(SHOWS)
+
+    similar = model.similar(1)
+    assert similar is not None
+    assert [show_id for show_id, _ in similar] == [2, 3]
+    assert 0 < similar[1][1] < similar[0][1] <= 1
+    assert model.similar(1, k=1) == similar[:1]
+    assert (model.hits, model.misses) == (1, 1)
+    assert model.similar(100) is None
+
+
+def test_similar_shows_follow_changes() -> None:
+    """Tests that changes are handled before a rebuild and evict stale results."""
+    model = SimilarityModel.from_rows(SHOWS)
+    assert model.similar(1)
+    assert [show_id for show_id, _ in model.similar(4) or []] == []
+
+    model.apply(
+        [
+            TvShowChange(DELETE, 2, 1),
+            TvShowChange(CREATE, 5, 2, _show(5, "Drama, Crime", "Raj Patel")),
+        ],
+    )
+
+    assert [show_id for show_id, _ in model.similar(1) or []] == [5, 3]
+    assert [show_id for show_id, _ in model.similar(5) or []] == [1, 3]
+    assert model.similar(2) is None
+    assert len(model) == 4
+
+    model.apply([TvShowChange(UPDATE, 3, 3, _show(3, "Comedy", "Li Chen", "India"))])
+    assert [show_id for show_id, _ in model.similar(1) or []] == [5]
+    assert [show_id for show_id, _ in model.similar(4) or []] == [3]
+    assert model.hits == 0
+
+
+@pytest.mark.anyio
+async def test_similar_endpoint(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    install_replica: Callable[[str, Any], None],
+) -> None:
+    """Tests the similar shows endpoint."""
+    url = fastapi_app.url_path_for("retrieve_similar_tvshows", show_id=1)
+    response = await client.get(url)
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+    dao = TvShowDAO(dbsession)
+    for show in SHOWS:
+        await dao.create_tv_show_model(**show)
+    install_replica("similarity_replica", SimilarityModel.from_rows(SHOWS))
+
+    response = await client.get(url, params={"k": 1})
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["title"] for item in response.json()] == ["Show 2"]
+
+    response = await client.get(
+        fastapi_app.url_path_for("retrieve_similar_tvshows", show_id=100),
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,72 @@
+from importlib import metadata
+from pathlib import Path
+
+import pytest
+import sqlalchemy as sa
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette import status
+
+from tvshow_backend.db.meta import meta
+from tvshow_backend.db.utils import create_tables, schema_fingerprint
+
+
+@pytest.mark.anyio
+async def test_create_tables_skips_unchanged_schema(tmp_path: Path) -> None:
+    """Tests that DDL runs only when the schema fingerprint changes."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite3'}")
+    try:
+        assert await create_tables(engine, meta)
+        assert not await create_tables(engine, meta)
+
+        changed = sa.MetaData()
+        for table in meta.sorted_tables:
+            table.to_metadata(changed)
+        sa.Table("extra", changed, sa.Column("id", sa.Integer, primary_key=True))
+        assert schema_fingerprint(changed, engine.dialect) != schema_fingerprint(
+            meta,
+            engine.dialect,
+        )
+        assert await create_tables(engine, changed)
+        assert not await create_tables(engine, changed)
+
+        async with engine.connect() as connection:
+            user_version = await connection.exec_driver_sql("PRAGMA user_version")
+            assert user_version.scalar() == 0
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.anyio
+async def test_create_tables_loads_models_on_mismatch(tmp_path: Path) -> None:
+    """Tests that models are loaded only when registered ones don't match."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite3'}")
+    registered = sa.MetaData()
+    tables = meta.sorted_tables
+    tables[0].to_metadata(registered)
+    loads = []
+
+    def load_models() -> None:  # noqa: WPS430
+        loads.append(True)
+        for table in tables[1:]:
+            if table.name not in registered.tables:
+                table.to_metadata(registered)
+
+    try:
+        assert await create_tables(engine, meta)
+        assert not await create_tables(engine, registered, load_models=load_models)
+        assert len(loads) == 1
+        assert len(registered.tables) == len(tables)
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.anyio
+async def test_openapi_version(fastapi_app: FastAPI, client: AsyncClient) -> None:
+    """Tests that application version is resolved lazily for OpenAPI."""
+    assert fastapi_app.openapi_url is not None
+    response = await client.get(fastapi_app.openapi_url)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["info"]["version"] == metadata.version("tvshow_backend")
@@ -0,0 +1,116 @@
+import asyncio
+import threading
+from typing import Any, AsyncGenerator, Callable, List
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette import status
+
+from tvshow_backend.db.changes import (
+    TvShowChange,
+    add_change_listener,
+    remove_change_listener,
+)
+from tvshow_backend.db.dao.tvshow_dao import TooManyRowsError, TvShowDAO, TvShowFilter
+from tvshow_backend.db.dependencies import get_db_session
+from tvshow_backend.db.threaded import ThreadedSession, ThreadedSessionMaker
+from tvshow_backend.settings import settings
+from tvshow_backend.web.api.tvshow.schema import TvShowInputDTO
+
+
+@pytest.fixture
+async def threaded_sessions(
+    _engine: AsyncEngine,
+) -> AsyncGenerator[ThreadedSessionMaker, None]:
+    """
+    Create threaded sessions of the test database.
+
+    :param _engine: current engine, creates tables.
+    :yield: session factory.
+    """
+    sessions = ThreadedSessionMaker(str(settings.db_sync_url), threads=2)
+    try:
+        yield sessions
+    finally:
+        sessions.dispose()
+
+
+@pytest.mark.anyio
+async def test_dao_call_is_one_hop(
+    threaded_sessions: ThreadedSessionMaker,
+    new_tvshow_object: TvShowInputDTO,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Tests batching of DAO calls and dispatch of committed changes."""
+    hops: List[Callable[..., Any]] = []
+    locked = ThreadedSession._locked  # noqa: WPS437
+
+    def count_hops(session: ThreadedSession, function: Any, *args: Any) -> Any:
+        hops.append(function)
+        return locked(session, function, *args)
+
+    monkeypatch.setattr(ThreadedSession, "_locked", count_hops)
+    listener_threads: List[int] = []
+
+    def listener(changes: List[TvShowChange]) -> None:
+        listener_threads.append(threading.get_ident())
+
+    session = threaded_sessions()
+    dao = TvShowDAO(session)
+    show_id = new_tvshow_object.show_id
+    add_change_listener(listener)
+    try:
+        await dao.create_tv_show_model(**new_tvshow_object.model_dump())
+        assert len(hops) == 1
+        await session.commit()
+        assert listener_threads == [threading.get_ident()]
+
+        show = await dao.get_tv_show_by_id(show_id)
+        assert show.title == new_tvshow_object.title
+        assert await dao.get_titles([show_id]) == {show_id: show.title}
+        with pytest.raises(TooManyRowsError):
+            await dao.bulk_update(TvShowFilter(type="Test Type"), {"rating": "R"}, 0)
+        assert (await dao.get_tv_show_by_id(show_id)).rating == "Test Rating"
+        assert len(hops) == 6
+
+        with pytest.raises(RuntimeError):
+            await session.run(asyncio.sleep, 0)  # type: ignore[attr-defined]
+    finally:
+        remove_change_listener(listener)
+        await dao.delete_tv_show_model(show_id)
+        await session.commit()
+        await session.close()
+
+
+@pytest.mark.anyio
+async def test_requests_use_threaded_sessions(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    threaded_sessions: ThreadedSessionMaker,
+    new_tvshow_object: TvShowInputDTO,
+) -> None:
+    """Tests that request sessions come from the threadpool backend."""
+    del fastapi_app.dependency_overrides[get_db_session]
+    fastapi_app.state.db_request_session_factory = threaded_sessions
+    response = await client.post(
+        fastapi_app.url_path_for("create_tvshow"),
+        json=new_tvshow_object.model_dump(),
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    url = fastapi_app.url_path_for(
+        "retrieve_tvshow_by_id",
+        show_id=new_tvshow_object.show_id,
+    )
+    response = await client.get(url)
+    assert response.json()["title"] == new_tvshow_object.title
+
+    response = await client.delete(
+        fastapi_app.url_path_for(
+            "delete_tvshow",
+            show_id=new_tvshow_object.show_id,
+        ),
+    )
+    assert response.status_code == status.HTTP_200_OK
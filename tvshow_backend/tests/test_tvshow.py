@@ -1,3 +1,5 @@
+import datetime
+
 import pytest
 from fastapi import FastAPI
 from httpx import AsyncClient
@@ -24,7 +26,8 @@ async def test_create_tvshow_model(
     assert response.status_code == status.HTTP_200_OK
     tvshow_dao = TvShowDAO(dbsession)
     instances = await tvshow_dao.filter(show_id=new_tvshow_object.show_id)
-    assert int(instances[0].show_id) == new_tvshow_object.show_id
+    assert instances[0].show_id == new_tvshow_object.show_id
+    assert instances[0].added_on == datetime.date(2022, 1, 1)
 
 
 # TEST GET TV SHOW BY TYPE
@@ -178,3 +181,44 @@ async def test_delete_tvshow_model(
 
     # Check that the TV show model was indeed deleted
     assert len(instances) == 0
+
+
+@pytest.mark.anyio
+async def test_browse_genres(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    new_tvshow_object: TvShowInputDTO,
+) -> None:
+    """Tests matching of several genres ignoring case, pages and sorting."""
+    tvshow_dao = TvShowDAO(dbsession)
+    genres = ["Noir, Heist", "noir", "Heist, Kids' TV", "Heist ,NOIR, Noir"]
+    for show_id, genre in enumerate(genres, start=900001):
+        await tvshow_dao.create_tv_show_model(
+            **{
+                **new_tvshow_object.model_dump(),
+                "show_id": show_id,
+                "genre": genre,
+                "title": f"Title {900010 - show_id}",
+            },
+        )
+
+    async def browse(genre: str, **params: str) -> list:  # type: ignore[type-arg]
+        url = fastapi_app.url_path_for("retrieve_tvshow_by_genre", genre=genre)
+        response = await client.get(url, params=params)
+        assert response.status_code == status.HTTP_200_OK
+        return [show["show_id"] for show in response.json()]
+
+    assert await browse("NOIR") == [900001, 900002, 900004]
+    assert await browse("noir,heist") == [900001, 900002, 900003, 900004]
+    assert await browse(" Heist,Noir", match="all") == [900001, 900004]
+    assert await browse("heist", sort="title", limit="2") == [900004, 900003]
+    assert await browse("heist", order="desc", offset="1") == [900003, 900001]
+    assert await browse("Unknown genre") == []
+
+    await tvshow_dao.update_tv_show_model(
+        **{**new_tvshow_object.model_dump(), "show_id": 900002, "genre": "Heist"},
+    )
+    await tvshow_dao.delete_tv_show_model(900004)
+    assert await browse("noir", match="all") == [900001]
+    assert await browse("heist,noir", match="all") == [900001]
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from starlette import status
+
+from tvshow_backend.db.dao.tvshow_dao import TvShowDAO
+from tvshow_backend.web.admission import Receive, Scope, Send
+from tvshow_backend.web.api.tvshow.schema import TvShowInputDTO
+from tvshow_backend.web.drain import DrainMiddleware, RequestDrain
+from tvshow_backend.web.warmup import (
+    WARMUP_SHOW_ID,
+    run_write_shapes,
+    send_requests,
+    warmup_urls,
+)
+
+
+@pytest.mark.anyio
+async def test_write_shapes_are_rolled_back(_engine: AsyncEngine) -> None:
+    """Tests that warmup writes leave no trace."""
+    sessions = async_sessionmaker(_engine)
+    await run_write_shapes(sessions())
+    async with sessions() as session:
+        assert not await TvShowDAO(session).filter(show_id=WARMUP_SHOW_ID)
+
+
+@pytest.mark.anyio
+async def test_warmup_requests(
+    fastapi_app: FastAPI,
+    dbsession: AsyncSession,
+    new_tvshow_object: TvShowInputDTO,
+) -> None:
+    """Tests requests of every read shape."""
+    await TvShowDAO(dbsession).create_tv_show_model(
+        **{**new_tvshow_object.model_dump(), "genre": "Kids' TV, Drama"},
+    )
+    statuses = await send_requests(fastapi_app, await warmup_urls(dbsession))
+    assert len(statuses) == 5
+    assert statuses.pop("/api/tvshow/autocomplete?prefix=T") == 503
+    assert set(statuses.values()) == {status.HTTP_200_OK}
+    assert "/api/tvshow/genre/Kids%27%20TV" in statuses
+
+
+@pytest.mark.anyio
+async def test_drain() -> None:
+    """Tests that draining rejects new requests and waits for running ones."""
+    release = asyncio.Event()
+
+    async def slow_app(scope: Scope, receive: Receive, send: Send) -> None:
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"done"})
+
+    drain = RequestDrain()
+    app = DrainMiddleware(slow_app, drain)
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        running = asyncio.create_task(client.get("/api/tvshow/all"))
+        await asyncio.sleep(0.01)
+        assert not await drain.drain(timeout=0.01)
+        rejected = await client.get("/api/tvshow/all")
+        assert rejected.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert rejected.headers["connection"] == "close"
+
+        release.set()
+        assert await drain.drain(timeout=1)
+        assert (await running).text == "done"
+        assert (await client.get("/api/health")).text == "done"
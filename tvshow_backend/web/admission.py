@@ -0,0 +1,202 @@
+"""
+Admission control for API requests.
+
+Requests are split into route classes (reads, writes and exports), each
+with its own concurrency limit and bounded wait queue. A request that
+finds the queue full, or waits in it for too long, is rejected right away
+with ``503 Service Unavailable`` and a ``Retry-After`` header, so admitted
+requests keep their latency instead of everybody slowing down together.
+"""
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, MutableMapping, Optional
+
+from starlette import status
+from starlette.responses import JSONResponse
+
+from tvshow_backend.settings import Settings
+
+READS = "reads"
+WRITES = "writes"
+EXPORTS = "exports"
+
+# Probes, documentation and metrics are never limited, neither are long
+# polls for changes, which spend nearly all their time waiting.
+EXEMPT_PREFIXES = (
+    "/api/health",
+    "/api/tvshow/changes",
+    "/api/monitoring",
+    "/api/docs",
+    "/api/swagger-redirect",
+    "/api/redoc",
+    "/api/openapi.json",
+)
+# Expensive read-only routes limited separately from regular reads.
+EXPORT_PREFIXES = ("/api/analytics", "/api/tvshow/export")
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+
+def route_class(method: str, path: str) -> Optional[str]:
+    """
+    Classify a request.
+
+    :param method: HTTP method.
+    :param path: request path.
+    :return: route class or None if the request is not limited.
+    """
+    if not path.startswith("/api/") or path.startswith(EXEMPT_PREFIXES):
+        return None
+    if path.startswith(EXPORT_PREFIXES):
+        return EXPORTS
+    if method in {"GET", "HEAD", "OPTIONS"}:
+        return READS
+    return WRITES
+
+
+class AdmissionLimiter:
+    """Concurrency limit with a bounded FIFO queue of waiting requests."""
+
+    def __init__(self, limit: int, queue_size: int, queue_timeout: float) -> None:
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._waiters: Deque["asyncio.Future[bool]"] = deque()
+
+    @property
+    def queued(self) -> int:
+        """
+        Amount of requests waiting for a slot.
+
+        :return: queue depth.
+        """
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Describe the state of the limiter.
+
+        :return: limits, current load and counters.
+        """
+        return {
+            "limit": self.limit,
+            "queue_size": self.queue_size,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+    async def acquire(self) -> bool:
+        """
+        Wait for a free slot.
+
+        :return: whether the request was admitted. A rejected request
+            must not call ``release``.
+        """
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+        if len(self._waiters) >= self.queue_size:
+            self.rejected += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            return False
+        except asyncio.CancelledError:
+            # The slot could have been handed over right before cancellation.
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        return True
+
+    def release(self) -> None:
+        """Free a slot, handing it over to the first waiting request."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(True)
+                self.admitted += 1
+                return
+        self.in_flight -= 1
+
+
+def build_limiters(settings: Settings) -> Dict[str, AdmissionLimiter]:
+    """
+    Create limiters of route classes from settings.
+
+    :param settings: application settings.
+    :return: limiters by route class, classes with zero limit are skipped.
+    """
+    configured = {
+        READS: (settings.admission_read_limit, settings.admission_read_queue),
+        WRITES: (settings.admission_write_limit, settings.admission_write_queue),
+        EXPORTS: (settings.admission_export_limit, settings.admission_export_queue),
+    }
+    return {
+        name: AdmissionLimiter(limit, queue_size, settings.admission_queue_timeout)
+        for name, (limit, queue_size) in configured.items()
+        if limit > 0
+    }
+
+
+class AdmissionMiddleware:
+    """ASGI middleware admitting requests through limiters of their route class."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiters: Dict[str, AdmissionLimiter],
+        retry_after: int,
+    ) -> None:
+        self.app = app
+        self.limiters = limiters
+        self.retry_after = retry_after
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Admit or reject a request.
+
+        :param scope: ASGI scope of the request.
+        :param receive: ASGI receive function.
+        :param send: ASGI send function.
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        name = route_class(scope["method"], scope["path"])
+        limiter = self.limiters.get(name) if name else None
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await limiter.acquire():
+            response = JSONResponse(
+                {"detail": f"Too many concurrent {name}, try again later."},
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
@@ -0,0 +1,4 @@
+"""Administration API."""
+from tvshow_backend.web.api.admin.views import router
+
+__all__ = ["router"]
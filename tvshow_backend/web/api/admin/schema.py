@@ -0,0 +1,107 @@
+import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+# Upper bound of max_rows of a single bulk operation.
+BULK_MAX_ROWS = 100_000
+
+
+class TvShowFilterDTO(BaseModel):
+    """
+    :param genre: Shows having this genre, ignoring case
+    :param type: Shows of this type, ignoring case
+    :param country: Shows produced in this country, ignoring case
+    :param release_year_from: Shows released in this year or later
+    :param release_year_to: Shows released in this year or earlier
+    :param added_from: Shows added on this date or later
+    :param added_to: Shows added on this date or earlier
+    """
+
+    genre: Optional[str] = Field(None, min_length=1)
+    type: Optional[str] = Field(None, min_length=1)
+    country: Optional[str] = Field(None, min_length=1)
+    release_year_from: Optional[int] = None
+    release_year_to: Optional[int] = None
+    added_from: Optional[datetime.date] = None
+    added_to: Optional[datetime.date] = None
+
+    @model_validator(mode="after")
+    def check_not_empty(self) -> "TvShowFilterDTO":
+        """
+        Reject filters matching every show.
+
+        :raises ValueError: if no condition is set.
+        :return: the filter.
+        """
+        if not self.model_dump(exclude_none=True):
+            raise ValueError("At least one condition is required")
+        return self
+
+
+class TvShowPatchDTO(BaseModel):
+    """
+    :param type: New type of the TV shows
+    :param genre: New genres of the TV shows
+    :param director: New director of the TV shows
+    :param cast: New cast of the TV shows
+    :param country: New countries of the TV shows
+    :param date_added: New date when the TV shows were added
+    :param release_year: New release year of the TV shows
+    :param rating: New rating of the TV shows
+    :param duration: New duration of the TV shows
+    """
+
+    type: Optional[str] = None
+    genre: Optional[str] = None
+    director: Optional[str] = None
+    cast: Optional[str] = None
+    country: Optional[str] = None
+    date_added: Optional[str] = None
+    release_year: Optional[int] = None
+    rating: Optional[str] = None
+    duration: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_not_empty(self) -> "TvShowPatchDTO":
+        """
+        Reject updates without any value.
+
+        :raises ValueError: if no value is set.
+        :return: the patch.
+        """
+        if not self.model_dump(exclude_none=True):
+            raise ValueError("At least one value is required")
+        return self
+
+
+class BulkDeleteDTO(BaseModel):
+    """
+    :param filter: Conditions selecting the TV shows
+    :param dry_run: Only count the matching TV shows
+    :param max_rows: Nothing is changed if more TV shows match
+    """
+
+    filter: TvShowFilterDTO
+    dry_run: bool = False
+    max_rows: int = Field(1000, ge=1, le=BULK_MAX_ROWS)
+
+
+class BulkUpdateDTO(BulkDeleteDTO):
+    """
+    :param values: New values, unset ones are left unchanged
+    """
+
+    values: TvShowPatchDTO
+
+
+class BulkResultDTO(BaseModel):
+    """
+    :param matched: Amount of TV shows matching the filter
+    :param changed: Amount of updated or deleted TV shows
+    :param dry_run: Whether the TV shows were only counted
+    """
+
+    matched: int
+    changed: int
+    dry_run: bool
@@ -0,0 +1,78 @@
+from fastapi import APIRouter, HTTPException, status
+from fastapi.param_functions import Depends
+
+from tvshow_backend.db.dao.sharded_tvshow_dao import get_tvshow_dao
+from tvshow_backend.db.dao.tvshow_dao import TooManyRowsError, TvShowDAO, TvShowFilter
+from tvshow_backend.web.api.admin.schema import (
+    BulkDeleteDTO,
+    BulkResultDTO,
+    BulkUpdateDTO,
+)
+from tvshow_backend.web.negotiation import NegotiatedRoute
+
+router = APIRouter(route_class=NegotiatedRoute)
+
+
+def _too_many(error: TooManyRowsError, max_rows: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"{error.matched} TV shows match the filter, more than {max_rows}.",
+    )
+
+
+# Update all TV shows matching a filter.
+@router.post("/tvshow/update", response_model=BulkResultDTO)
+async def bulk_update_tvshows(
+    bulk_update: BulkUpdateDTO,
+    tvshow_dao: TvShowDAO = Depends(get_tvshow_dao),
+) -> BulkResultDTO:
+    """
+    Update all matching TV shows with a single statement.
+
+    :param bulk_update: filter, new values and limits.
+    :param tvshow_dao: DAO for tvshow models.
+    :raises HTTPException: if more shows than max_rows match.
+    :return: amounts of matching and updated shows.
+    """
+    show_filter = TvShowFilter(**bulk_update.filter.model_dump())
+    matched = await tvshow_dao.count_matching(show_filter)
+    if bulk_update.dry_run:
+        return BulkResultDTO(matched=matched, changed=0, dry_run=True)
+    try:
+        if matched > bulk_update.max_rows:
+            raise TooManyRowsError(matched)
+        changed = await tvshow_dao.bulk_update(
+            show_filter,
+            bulk_update.values.model_dump(exclude_none=True),
+            bulk_update.max_rows,
+        )
+    except TooManyRowsError as e:
+        raise _too_many(e, bulk_update.max_rows)
+    return BulkResultDTO(matched=changed, changed=changed, dry_run=False)
+
+
+# Delete all TV shows matching a filter.
+@router.post("/tvshow/delete", response_model=BulkResultDTO)
+async def bulk_delete_tvshows(
+    bulk_delete: BulkDeleteDTO,
+    tvshow_dao: TvShowDAO = Depends(get_tvshow_dao),
+) -> BulkResultDTO:
+    """
+    Delete all matching TV shows with a single statement.
+
+    :param bulk_delete: filter and limits.
+    :param tvshow_dao: DAO for tvshow models.
+    :raises HTTPException: if more shows than max_rows match.
+    :return: amounts of matching and deleted shows.
+    """
+    show_filter = TvShowFilter(**bulk_delete.filter.model_dump())
+    matched = await tvshow_dao.count_matching(show_filter)
+    if bulk_delete.dry_run:
+        return BulkResultDTO(matched=matched, changed=0, dry_run=True)
+    try:
+        if matched > bulk_delete.max_rows:
+            raise TooManyRowsError(matched)
+        changed = await tvshow_dao.bulk_delete(show_filter, bulk_delete.max_rows)
+    except TooManyRowsError as e:
+        raise _too_many(e, bulk_delete.max_rows)
+    return BulkResultDTO(matched=changed, changed=changed, dry_run=False)
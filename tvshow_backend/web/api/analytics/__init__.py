@@ -0,0 +1,4 @@
+"""Analytics API."""
+from tvshow_backend.web.api.analytics.views import router
+
+__all__ = ["router"]
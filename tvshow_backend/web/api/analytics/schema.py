@@ -0,0 +1,35 @@
+import enum
+from typing import Dict, List, Union
+
+from pydantic import BaseModel
+
+
+class Dimension(str, enum.Enum):  # noqa: WPS600
+    """Columns shows can be grouped by."""
+
+    type = "type"
+    rating = "rating"
+    genre = "genre"
+    country = "country"
+    release_year = "release_year"
+    year_added = "year_added"
+
+
+class GroupCountDTO(BaseModel):
+    """
+    :param key: values of grouped columns.
+    :param count: amount of shows in the group.
+    """
+
+    key: Dict[str, Union[int, str]]
+    count: int
+
+
+class CountResultDTO(BaseModel):
+    """
+    :param total: amount of shows matching the filters.
+    :param groups: amounts of matching shows per group, biggest first.
+    """
+
+    total: int
+    groups: List[GroupCountDTO]
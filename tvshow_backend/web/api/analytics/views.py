@@ -0,0 +1,87 @@
+from typing import TYPE_CHECKING, List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.param_functions import Depends
+
+from tvshow_backend.services.analytics.dependency import get_catalog_snapshot
+from tvshow_backend.web.api.analytics.schema import (
+    CountResultDTO,
+    Dimension,
+    GroupCountDTO,
+)
+
+if TYPE_CHECKING:
+    from tvshow_backend.services.analytics.snapshot import CatalogSnapshot
+
+router = APIRouter()
+
+MAX_GROUP_BY = 3
+
+
+# Count TV shows matching filters, optionally grouped.
+@router.get("/counts", response_model=CountResultDTO)
+async def count_tvshows(  # noqa: WPS211
+    type: List[str] = Query([]),
+    genre: List[str] = Query([]),
+    country: List[str] = Query([]),
+    rating: List[str] = Query([]),
+    release_year_from: Optional[int] = None,
+    release_year_to: Optional[int] = None,
+    year_added_from: Optional[int] = None,
+    year_added_to: Optional[int] = None,
+    group_by: List[Dimension] = Query([]),
+    limit: int = Query(100, ge=1, le=10_000),
+    snapshot: "CatalogSnapshot" = Depends(get_catalog_snapshot),
+) -> CountResultDTO:
+    """
+    Count TV shows using the in-memory catalog snapshot.
+
+    Every filter accepts several values and matches shows having any of
+    them. A show with several genres or countries is counted in each
+    of its groups.
+
+    :param type: allowed types.
+    :param genre: allowed genres.
+    :param country: allowed countries.
+    :param rating: allowed ratings.
+    :param release_year_from: minimal release year.
+    :param release_year_to: maximal release year.
+    :param year_added_from: minimal year the show was added.
+    :param year_added_to: maximal year the show was added.
+    :param group_by: columns to group by, at most three.
+    :param limit: maximal amount of returned groups.
+    :param snapshot: catalog snapshot.
+    :raises HTTPException: if too many columns are grouped by.
+    :return: total amount of matching shows and group counts.
+    """
+    if len(group_by) > MAX_GROUP_BY:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {MAX_GROUP_BY} columns can be grouped by.",
+        )
+    filters = {
+        name: allowed
+        for name, allowed in (
+            ("type", type),
+            ("genre", genre),
+            ("country", country),
+            ("rating", rating),
+        )
+        if allowed
+    }
+    mask = snapshot.select(
+        filters,
+        ranges={
+            "release_year": (release_year_from, release_year_to),
+            "year_added": (year_added_from, year_added_to),
+        },
+    )
+    names = [dimension.value for dimension in group_by]
+    groups = snapshot.group_count(mask, names, limit=limit) if names else []
+    return CountResultDTO(
+        total=int(mask.sum()),
+        groups=[
+            GroupCountDTO(key=dict(zip(names, key)), count=count)
+            for key, count in groups
+        ],
+    )
@@ -0,0 +1,4 @@
+"""Background jobs API."""
+from tvshow_backend.web.api.jobs.views import router
+
+__all__ = ["router"]
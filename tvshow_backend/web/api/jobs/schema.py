@@ -0,0 +1,44 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+from tvshow_backend.services.jobs import JobStatus
+
+
+class JobInputDTO(BaseModel):
+    """
+    :param kind: Kind of the job, export or reindex
+    :param params: Parameters of the job
+    """
+
+    kind: str
+    params: Dict[str, Any] = {}
+
+
+class JobDTO(BaseModel):
+    """
+    :param id: Unique identifier of the job
+    :param kind: Kind of the job
+    :param status: Current state of the job
+    :param params: Parameters of the job
+    :param result: Result of a succeeded job
+    :param error: Reason of a failure
+    :param done: Amount of processed items
+    :param total: Amount of items to process, if known
+    :param created_at: When the job was submitted
+    :param started_at: When the job started running
+    :param finished_at: When the job finished
+    """
+
+    id: int
+    kind: str
+    status: JobStatus
+    params: Dict[str, Any]
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    done: int
+    total: Optional[int] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
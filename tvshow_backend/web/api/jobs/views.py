@@ -0,0 +1,104 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+import ujson
+from fastapi import APIRouter, HTTPException, status
+from fastapi.param_functions import Depends
+from sqlalchemy.exc import NoResultFound
+
+from tvshow_backend.db.models.job_model import JobModel
+from tvshow_backend.services.jobs import JobStatus
+from tvshow_backend.services.jobs.dependency import get_job_runner
+from tvshow_backend.services.jobs.runner import JobRunner
+from tvshow_backend.web.api.jobs.schema import JobDTO, JobInputDTO
+
+router = APIRouter()
+
+
+def _datetime(timestamp: Optional[float]) -> Optional[datetime]:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc)
+
+
+def _job_dto(job: JobModel) -> JobDTO:
+    return JobDTO(
+        id=job.id,
+        kind=job.kind,
+        status=JobStatus(job.status),
+        params=ujson.loads(job.params),
+        result=None if job.result is None else ujson.loads(job.result),
+        error=job.error,
+        done=job.done,
+        total=job.total,
+        created_at=datetime.fromtimestamp(job.created_at, timezone.utc),
+        started_at=_datetime(job.started_at),
+        finished_at=_datetime(job.finished_at),
+    )
+
+
+# Queue a background job.
+@router.post("", response_model=JobDTO, status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(
+    new_job: JobInputDTO,
+    runner: JobRunner = Depends(get_job_runner),
+) -> JobDTO:
+    """
+    Queue a job, it runs in the background after the response is sent.
+
+    :param new_job: kind and parameters of the job.
+    :param runner: background job runner.
+    :raises HTTPException: if the kind of the job is unknown.
+    :return: queued job.
+    """
+    try:
+        job = await runner.submit(new_job.kind, new_job.params)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e),
+        )
+    return _job_dto(job)
+
+
+# Retrieve a background job with its progress.
+@router.get("/{job_id}", response_model=JobDTO)
+async def retrieve_job(
+    job_id: int,
+    runner: JobRunner = Depends(get_job_runner),
+) -> JobDTO:
+    """
+    Retrieve a job.
+
+    :param job_id: id of the job.
+    :param runner: background job runner.
+    :raises HTTPException: if there is no such job.
+    :return: job with its status and progress.
+    """
+    try:
+        return _job_dto(await runner.get(job_id))
+    except NoResultFound as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
+# Cancel a background job.
+@router.post("/{job_id}/cancel", response_model=JobDTO)
+async def cancel_job(
+    job_id: int,
+    runner: JobRunner = Depends(get_job_runner),
+) -> JobDTO:
+    """
+    Cancel a job.
+
+    Queued jobs are cancelled right away, running jobs are stopped by the
+    worker executing them and finished jobs are left unchanged.
+
+    :param job_id: id of the job.
+    :param runner: background job runner.
+    :raises HTTPException: if there is no such job.
+    :return: job with its new status.
+    """
+    try:
+        return _job_dto(await runner.cancel(job_id))
+    except NoResultFound as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
@@ -0,0 +1,149 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+class AdmissionStatsDTO(BaseModel):
+    """
+    :param limit: Maximum amount of concurrent requests
+    :param queue_size: Maximum amount of waiting requests
+    :param in_flight: Requests being processed
+    :param queued: Requests waiting for a slot
+    :param admitted: Admitted requests since start
+    :param rejected: Requests rejected because the queue was full
+    :param timed_out: Requests rejected after waiting too long
+    """
+
+    limit: int
+    queue_size: int
+    in_flight: int
+    queued: int
+    admitted: int
+    rejected: int
+    timed_out: int
+
+
+class CoalescingStatsDTO(BaseModel):
+    """
+    :param flights: Requests executed by the application
+    :param coalesced: Requests served by a running identical request
+    :param in_flight: Requests being executed now
+    """
+
+    flights: int
+    coalesced: int
+    in_flight: int
+
+
+class RouteDeadlineStatsDTO(BaseModel):
+    """
+    :param deadline: Seconds requests may take, 0 without a deadline
+    :param requests: Requests of the route since start
+    :param timed_out: Requests cancelled at the deadline
+    :param disconnected: Requests cancelled because the client disconnected
+    """
+
+    deadline: float
+    requests: int
+    timed_out: int
+    disconnected: int
+
+
+class DeadlineStatsDTO(BaseModel):
+    """
+    :param routes: Statistics of routes with deadlines
+    :param interrupted_queries: Queries interrupted because their request was
+        cancelled
+    """
+
+    routes: Dict[str, RouteDeadlineStatsDTO]
+    interrupted_queries: int
+
+
+class ResponseCacheStatsDTO(BaseModel):
+    """
+    :param entries: Cached responses
+    :param bytes: Memory taken by cached responses
+    :param max_bytes: Memory budget of the cache
+    :param hits: Requests answered from the cache
+    :param misses: Cacheable requests answered by the application
+    :param hit_ratio: Share of cacheable requests answered from the cache
+    :param evictions: Responses dropped to stay within the budget
+    :param invalidations: Times every response was dropped after a write
+    """
+
+    entries: int
+    bytes: int
+    max_bytes: int
+    hits: int
+    misses: int
+    hit_ratio: float
+    evictions: int
+    invalidations: int
+
+
+class ReadinessDTO(BaseModel):
+    """
+    :param ready: Whether the worker should get new requests
+    :param reasons: Failed checks, empty when ready
+    :param db_latency_ms: Duration of the database query, null if it timed out
+    :param pool_utilization: Share of database connections or threads in use
+    :param loop_lag_ms: Recent event loop lag
+    :param in_flight: Requests running or queued for admission
+    """
+
+    ready: bool
+    reasons: List[str]
+    db_latency_ms: Optional[float]
+    pool_utilization: float
+    loop_lag_ms: float
+    in_flight: int
+
+
+class MaintenanceReportDTO(BaseModel):
+    """
+    :param duration_ms: Duration of the whole run
+    :param analyze_ms: Duration of ANALYZE
+    :param analyze_interrupted: Whether ANALYZE ran out of its time budget
+    :param incremental_vacuum: Whether the database supports incremental vacuum
+    :param free_pages: Free pages in the database before the run
+    :param pages_freed: Free pages returned to the filesystem
+    :param vacuum_ms: Duration of the incremental vacuum
+    :param wal_pages: Pages in the write-ahead log, null without one
+    :param checkpointed_pages: Pages copied into the database, null without a log
+    :param checkpoint_busy: Whether the checkpoint was blocked by other connections
+    :param checkpoint_ms: Duration of the checkpoint, null without a log
+    """
+
+    duration_ms: float
+    analyze_ms: float
+    analyze_interrupted: bool
+    incremental_vacuum: bool
+    free_pages: int
+    pages_freed: int
+    vacuum_ms: float
+    wal_pages: Optional[int]
+    checkpointed_pages: Optional[int]
+    checkpoint_busy: bool
+    checkpoint_ms: Optional[float]
+
+
+class MaintenanceStatsDTO(BaseModel):
+    """
+    :param enabled: Whether maintenance is scheduled
+    :param runs: Runs of this worker since start
+    :param skipped: Runs skipped because another worker had just run one
+    :param failures: Runs failed with a database error
+    :param last_run_at: End of the last run of this worker
+    :param next_run_at: Time the next run becomes due
+    :param last_report: Measurements of the last run of this worker
+    """
+
+    enabled: bool
+    runs: int = 0
+    skipped: int = 0
+    failures: int = 0
+    last_run_at: Optional[datetime] = None
+    next_run_at: Optional[datetime] = None
+    last_report: Optional[MaintenanceReportDTO] = None
@@ -1,4 +1,18 @@
-from fastapi import APIRouter
+from typing import Dict
+
+from fastapi import APIRouter, Depends, Request, Response, status
+
+from tvshow_backend.services.health.dependency import get_readiness_probe
+from tvshow_backend.services.health.probe import ReadinessProbe
+from tvshow_backend.web.api.monitoring.schema import (
+    AdmissionStatsDTO,
+    CoalescingStatsDTO,
+    DeadlineStatsDTO,
+    MaintenanceStatsDTO,
+    ReadinessDTO,
+    ResponseCacheStatsDTO,
+)
+from tvshow_backend.web.deadlines import deadline_stats
 
 router = APIRouter()
 
@@ -8,5 +22,91 @@ def health_check() -> None:
     """
     Checks the health of a project.
 
-    It returns 200 if the project is healthy.
+    It returns 200 as long as the worker serves requests (liveness).
+    """
+
+
+@router.get(
+    "/health/ready",
+    response_model=ReadinessDTO,
+    responses={status.HTTP_503_SERVICE_UNAVAILABLE: {"model": ReadinessDTO}},
+)
+async def readiness_check(
+    response: Response,
+    probe: ReadinessProbe = Depends(get_readiness_probe),
+) -> ReadinessDTO:
+    """
+    Checks whether the worker should get new requests.
+
+    It returns 503 when the database doesn't answer in time or the worker
+    is saturated, so load balancers send requests to other workers.
+
+    :param response: response of the request.
+    :param probe: readiness probe of the application.
+    :return: readiness and measurements.
+    """
+    readiness = ReadinessDTO(**await probe.check())
+    if not readiness.ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return readiness
+
+
+@router.get("/monitoring/admission", response_model=Dict[str, AdmissionStatsDTO])
+def admission_stats(request: Request) -> Dict[str, AdmissionStatsDTO]:
+    """
+    Reports load and rejections of every route class.
+
+    :param request: current request.
+    :return: admission statistics by route class.
+    """
+    limiters = getattr(request.app.state, "admission_limiters", {})
+    return {
+        name: AdmissionStatsDTO(**limiter.stats()) for name, limiter in limiters.items()
+    }
+
+
+@router.get("/monitoring/coalescing", response_model=CoalescingStatsDTO)
+def coalescing_stats(request: Request) -> CoalescingStatsDTO:
+    """
+    Reports how many requests shared a running identical request.
+
+    :param request: current request.
+    :return: coalescing statistics.
+    """
+    return CoalescingStatsDTO(**request.app.state.request_coalescer.stats())
+
+
+@router.get("/monitoring/deadlines", response_model=DeadlineStatsDTO)
+def request_deadline_stats(request: Request) -> DeadlineStatsDTO:
+    """
+    Reports requests cancelled at their deadline or by their client.
+
+    :param request: current request.
+    :return: deadline statistics.
+    """
+    return DeadlineStatsDTO(**deadline_stats(request.app.state.request_deadlines))
+
+
+@router.get("/monitoring/response-cache", response_model=ResponseCacheStatsDTO)
+def response_cache_stats(request: Request) -> ResponseCacheStatsDTO:
+    """
+    Reports memory used by cached responses and how often they are used.
+
+    :param request: current request.
+    :return: response cache statistics.
+    """
+    return ResponseCacheStatsDTO(**request.app.state.response_cache.stats())
+
+
+@router.get("/monitoring/maintenance", response_model=MaintenanceStatsDTO)
+def maintenance_stats(request: Request) -> MaintenanceStatsDTO:
+    """
+    Reports scheduled database maintenance of this worker.
+
+    :param request: current request.
+    :return: maintenance statistics.
     """
+    scheduler = getattr(request.app.state, "maintenance_scheduler", None)
+    if scheduler is None:
+        return MaintenanceStatsDTO(enabled=False)
+    return MaintenanceStatsDTO(enabled=True, **scheduler.stats())
@@ -1,9 +1,23 @@
 from fastapi.routing import APIRouter
 
-from tvshow_backend.web.api import docs, echo, monitoring, tvshow
+from tvshow_backend.settings import settings
+from tvshow_backend.web.api import (
+    admin,
+    analytics,
+    docs,
+    echo,
+    jobs,
+    monitoring,
+    tvshow,
+)
 
 api_router = APIRouter()
 api_router.include_router(monitoring.router)
-api_router.include_router(docs.router)
+if settings.api_docs:
+    api_router.include_router(docs.router)
 api_router.include_router(echo.router, prefix="/echo", tags=["echo"])
 api_router.include_router(tvshow.router, prefix="/tvshow", tags=["tvshow"])
+api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+if settings.admin_api:
+    api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
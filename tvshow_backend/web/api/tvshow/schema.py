@@ -1,3 +1,7 @@
+import enum
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
 from pydantic import BaseModel
 
 
@@ -53,3 +57,96 @@ class TvShowInputDTO(BaseModel):
     release_year: int
     rating: str
     duration: str
+
+
+class SuggestionOrder(str, enum.Enum):  # noqa: WPS600
+    """Ranking of title suggestions."""
+
+    recent = "recent"
+    popular = "popular"
+
+
+class GenreMatch(str, enum.Enum):  # noqa: WPS600
+    """Whether shows need any or all of the requested genres."""
+
+    any = "any"
+    all = "all"
+
+
+class ShowSort(str, enum.Enum):  # noqa: WPS600
+    """Columns pages of TV shows can be sorted by."""
+
+    show_id = "show_id"
+    title = "title"  # type: ignore[assignment]
+    release_year = "release_year"
+    added_on = "added_on"
+
+
+class SortOrder(str, enum.Enum):  # noqa: WPS600
+    """Direction of sorting."""
+
+    asc = "asc"
+    desc = "desc"
+
+
+class TitleSuggestionDTO(BaseModel):
+    """
+    :param show_id: Unique identifier for the TV show
+    :param title: Title of the TV show
+    """
+
+    show_id: int
+    title: str
+
+
+class SimilarShowDTO(BaseModel):
+    """
+    :param show_id: Unique identifier for the TV show
+    :param title: Title of the TV show
+    :param score: Cosine similarity to the requested show, from 0 to 1
+    """
+
+    show_id: int
+    title: str
+    score: float
+
+
+class PopularShowDTO(BaseModel):
+    """
+    :param show_id: Unique identifier for the TV show
+    :param title: Title of the TV show
+    :param views: Views of the TV show counted so far
+    """
+
+    show_id: int
+    title: str
+    views: int
+
+
+class TvShowChangeDTO(BaseModel):
+    """
+    :param seq: Sequence number of the change
+    :param operation: create, update or delete
+    :param show_id: Unique identifier for the TV show
+    :param values: Column values after the change, null for deletes
+    :param changed_at: When the change was made
+    """
+
+    seq: int
+    operation: str
+    show_id: int
+    values: Optional[Dict[str, Any]] = None
+    changed_at: datetime
+
+
+class TvShowChangesDTO(BaseModel):
+    """
+    :param changes: Changes ordered by sequence number
+    :param next: Value of since for the next request
+    :param reset: Changes after since are no longer available, the whole
+        catalog has to be fetched again before applying these changes
+    """
+
+    changes: List[TvShowChangeDTO]
+    next: int
+    reset: bool
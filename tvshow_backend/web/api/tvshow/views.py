@@ -1,20 +1,57 @@
-from typing import List
+import asyncio
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, List
 
-from fastapi import APIRouter, HTTPException, status
+import ujson
+from fastapi import APIRouter, HTTPException, Query, status
 from fastapi.param_functions import Depends
 from sqlalchemy.exc import NoResultFound
 
+from tvshow_backend.db.dao.changelog_dao import ChangeLogDAO
+from tvshow_backend.db.dao.sharded_tvshow_dao import get_tvshow_dao
 from tvshow_backend.db.dao.tvshow_dao import TvShowDAO
 from tvshow_backend.db.models.tvshow_model import TvShowModel
-from tvshow_backend.web.api.tvshow.schema import TvShowDTO, TvShowInputDTO
+from tvshow_backend.services.autocomplete.dependency import get_title_index
+from tvshow_backend.services.autocomplete.index import MAX_LIMIT, TitleIndex
+from tvshow_backend.services.changefeed.dependency import get_change_notifier
+from tvshow_backend.services.changefeed.notifier import ChangeNotifier
+from tvshow_backend.services.popularity import MAX_POPULAR
+from tvshow_backend.services.popularity.counter import ViewCounter
+from tvshow_backend.services.popularity.dependency import get_view_counter
+from tvshow_backend.services.similarity import MAX_K
+from tvshow_backend.services.similarity.dependency import get_similarity_model
+from tvshow_backend.web.api.tvshow.schema import (
+    GenreMatch,
+    PopularShowDTO,
+    ShowSort,
+    SimilarShowDTO,
+    SortOrder,
+    SuggestionOrder,
+    TitleSuggestionDTO,
+    TvShowChangeDTO,
+    TvShowChangesDTO,
+    TvShowDTO,
+    TvShowInputDTO,
+)
+from tvshow_backend.web.negotiation import NegotiatedRoute
 
-router = APIRouter()
+if TYPE_CHECKING:
+    from tvshow_backend.services.similarity.model import SimilarityModel
+
+router = APIRouter(route_class=NegotiatedRoute)
+
+# Maximum seconds a request for changes waits for new ones.
+MAX_CHANGES_WAIT = 30
+# Maximum shows in a page of a genre.
+MAX_PAGE_SIZE = 100
+# Maximum offset in a genre, skipped shows are still read from the index.
+MAX_GENRE_OFFSET = 10_000
 
 
 @router.post("/create")
 async def create_tvshow(
     new_tvshow_object: TvShowInputDTO,
-    tvshow_dao: TvShowDAO = Depends(),
+    tvshow_dao: TvShowDAO = Depends(get_tvshow_dao),
 ) -> None:
     """
     Creates tvshow in the database.
@@ -50,7 +87,7 @@ async def create_tvshow(
 async def retrieve_tvshow(
     limit: int = 10,
     offset: int = 0,
-    tvshow_dao: TvShowDAO = Depends(),
+    tvshow_dao: TvShowDAO = Depends(get_tvshow_dao),
 ) -> List[TvShowModel]:
     """
     Retrieve all tvshow objects from the database.
@@ -76,7 +113,7 @@ async def retrieve_tvshow(
 @router.get("/detail/{show_id}", response_model=TvShowDTO)
 async def retrieve_tvshow_by_id(
     show_id: int,
-    tvshow_dao: TvShowDAO = Depends(),
+    tvshow_dao: TvShowDAO = Depends(get_tvshow_dao),
 ) -> TvShowModel:
     """
     Retrieve tvshow object from the database.
@@ -99,31 +136,178 @@ async def retrieve_tvshow_by_id(
         )
 
 
-# Search TV show by genre.
+# Browse TV shows by genre.
 @router.get("/genre/{genre}", response_model=List[TvShowDTO])
 async def retrieve_tvshow_by_genre(
     genre: str,
-    tvshow_dao: TvShowDAO = Depends(),
+    match: GenreMatch = GenreMatch.any,
+    sort: ShowSort = ShowSort.show_id,
+    order: SortOrder = SortOrder.asc,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0, le=MAX_GENRE_OFFSET),
+    tvshow_dao: TvShowDAO = Depends(get_tvshow_dao),
 ) -> List[TvShowModel]:
     """
-    Retrieve tvshow objects from the database by genre.
+    Retrieve a page of tvshow objects having any or all of several genres.
+
+    Genres are separated by commas and compared ignoring case.
 
-    :param genre: genre of tvshow object.
+    :param genre: genres of tvshow objects, like ``"Drama,Comedy"``.
+    :param match: whether shows need any or all of the genres.
+    :param sort: column to sort by, ties are broken by show_id.
+    :param order: direction of sorting.
+    :param limit: limit of tvshow objects, defaults to 20.
+    :param offset: offset of tvshow objects, defaults to 0.
     :param tvshow_dao: DAO for tvshow models.
-    :return: list of tvshow objects from database.
+    :return: page of tvshow objects, empty if none match.
     """
     try:
-        return await tvshow_dao.search_tv_show_by_genre(genre=genre)
-    except NoResultFound as e:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=str(e),
+        return await tvshow_dao.search_tv_show_by_genre(
+            genres=genre.split(","),
+            match_all=match == GenreMatch.all,
+            limit=limit,
+            offset=offset,
+            sort=sort.value,
+            descending=order == SortOrder.desc,
         )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Unexpected error occurred while retrieving a TV show: {str(e)}",
+            detail=f"Unexpected error occurred while retrieving TV shows: {str(e)}",
+        )
+
+
+# Suggest titles starting with a prefix.
+@router.get("/autocomplete", response_model=List[TitleSuggestionDTO])
+async def autocomplete_title(
+    prefix: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(10, ge=1, le=MAX_LIMIT),
+    order: SuggestionOrder = SuggestionOrder.recent,
+    title_index: TitleIndex = Depends(get_title_index),
+) -> List[TitleSuggestionDTO]:
+    """
+    Suggest titles for search-as-you-type.
+
+    Matching ignores case and accents.
+
+    :param prefix: beginning of the title.
+    :param limit: maximum amount of suggestions.
+    :param order: ranking of suggestions.
+    :param title_index: in-memory title index.
+    :return: best matching titles.
+    """
+    return [
+        TitleSuggestionDTO(show_id=show_id, title=title)
+        for show_id, title in title_index.search(prefix, limit, order.value)
+    ]
+
+
+# Retrieve the most viewed TV shows.
+@router.get("/popular", response_model=List[PopularShowDTO])
+async def retrieve_popular_tvshows(
+    limit: int = Query(10, ge=1, le=MAX_POPULAR),
+    view_counter: ViewCounter = Depends(get_view_counter),
+    tvshow_dao: TvShowDAO = Depends(get_tvshow_dao),
+) -> List[PopularShowDTO]:
+    """
+    Retrieve the TV shows with the most views.
+
+    Views are added to the ranking every few seconds, not right away.
+
+    :param limit: maximum amount of shows.
+    :param view_counter: counter of views.
+    :param tvshow_dao: DAO for tvshow models.
+    :return: most viewed shows first.
+    """
+    popular = view_counter.popular[:limit]
+    titles = await tvshow_dao.get_titles([show_id for show_id, _ in popular])
+    return [
+        PopularShowDTO(show_id=show_id, title=titles[show_id], views=views)
+        for show_id, views in popular
+        if show_id in titles
+    ]
+
+
+# Retrieve changes made after a known one.
+@router.get("/changes", response_model=TvShowChangesDTO)
+async def retrieve_tvshow_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    wait: float = Query(0, ge=0, le=MAX_CHANGES_WAIT),
+    changelog_dao: ChangeLogDAO = Depends(),
+    notifier: ChangeNotifier = Depends(get_change_notifier),
+) -> TvShowChangesDTO:
+    """
+    Retrieve changes of TV shows for incremental synchronization.
+
+    Clients start with ``since=0`` and pass ``next`` of every response
+    as ``since`` of the next request. With ``wait`` the request waits up to
+    that many seconds until there is a change to return (long polling).
+
+    :param since: sequence number of the last change known to the client.
+    :param limit: maximum amount of changes.
+    :param wait: seconds to wait when there are no changes yet.
+    :param changelog_dao: DAO for the changelog.
+    :param notifier: notifier of committed changes.
+    :return: changes ordered by sequence number.
+    """
+    changed = notifier.changed()
+    floor, changes = await changelog_dao.get_changes(since, limit)
+    if not changes and wait and since >= floor:
+        # Don't keep the read transaction open while waiting.
+        await changelog_dao.session.commit()
+        try:
+            await asyncio.wait_for(changed.wait(), wait)
+        except asyncio.TimeoutError:
+            pass  # noqa: WPS420
+        else:
+            floor, changes = await changelog_dao.get_changes(since, limit)
+    return TvShowChangesDTO(
+        changes=[
+            TvShowChangeDTO(
+                seq=change.seq,
+                operation=change.operation,
+                show_id=change.show_id,
+                values=None if change.values is None else ujson.loads(change.values),
+                changed_at=datetime.fromtimestamp(change.changed_at, timezone.utc),
+            )
+            for change in changes
+        ],
+        next=changes[-1].seq if changes else max(since, floor),
+        reset=since < floor,
+    )
+
+
+# Find TV shows similar to a TV show.
+@router.get("/{show_id}/similar", response_model=List[SimilarShowDTO])
+async def retrieve_similar_tvshows(
+    show_id: int,
+    k: int = Query(10, ge=1, le=MAX_K),
+    similarity_model: "SimilarityModel" = Depends(get_similarity_model),
+    tvshow_dao: TvShowDAO = Depends(get_tvshow_dao),
+) -> List[SimilarShowDTO]:
+    """
+    Retrieve TV shows sharing genres, cast, directors and countries.
+
+    :param show_id: show_id of tvshow object.
+    :param k: amount of similar shows.
+    :param similarity_model: precomputed similarity model.
+    :param tvshow_dao: DAO for tvshow models.
+    :raises HTTPException: if the show is unknown.
+    :return: most similar shows first.
+    """
+    similar = similarity_model.similar(show_id, k)
+    if similar is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No TV show found with ID {show_id}",
         )
+    titles = await tvshow_dao.get_titles([other_id for other_id, _ in similar])
+    return [
+        SimilarShowDTO(show_id=other_id, title=titles[other_id], score=score)
+        for other_id, score in similar
+        if other_id in titles
+    ]
 
 
 # Update an existing TV show.
@@ -131,7 +315,7 @@ async def retrieve_tvshow_by_genre(
 async def update_tvshow(
     show_id: int,
     updated_tvshow_object: TvShowInputDTO,
-    tvshow_dao: TvShowDAO = Depends(),
+    tvshow_dao: TvShowDAO = Depends(get_tvshow_dao),
 ) -> None:
     """
     Update tvshow object in the database.
@@ -171,7 +355,7 @@ async def update_tvshow(
 @router.delete("/delete/{show_id}")
 async def delete_tvshow(
     show_id: int,
-    tvshow_dao: TvShowDAO = Depends(),
+    tvshow_dao: TvShowDAO = Depends(get_tvshow_dao),
 ) -> None:
     """
     Delete tvshow object from the database.
@@ -1,17 +1,54 @@
-from importlib import metadata
+from functools import lru_cache
 from pathlib import Path
+from typing import Any, Dict
 
 from fastapi import FastAPI
 from fastapi.responses import UJSONResponse
-from fastapi.staticfiles import StaticFiles
 
 from tvshow_backend.logging import configure_logging
+from tvshow_backend.services.popularity.counter import ViewCounter
+from tvshow_backend.settings import settings
+from tvshow_backend.web.admission import AdmissionMiddleware, build_limiters
 from tvshow_backend.web.api.router import api_router
-from tvshow_backend.web.lifetime import register_shutdown_event, register_startup_event
+from tvshow_backend.web.coalescing import CoalescingMiddleware, RequestCoalescer
+from tvshow_backend.web.deadlines import DeadlineMiddleware, build_deadlines
+from tvshow_backend.web.drain import DrainMiddleware, RequestDrain
+from tvshow_backend.web.lifetime import (
+    StartupTimer,
+    register_shutdown_event,
+    register_startup_event,
+)
+from tvshow_backend.web.response_cache import ResponseCache, ResponseCacheMiddleware
+from tvshow_backend.web.view_counting import ViewCountingMiddleware
 
 APP_ROOT = Path(__file__).parent.parent
 
 
+@lru_cache(maxsize=1)
+def _app_version() -> str:
+    from importlib import metadata  # noqa: WPS433
+
+    return metadata.version("tvshow_backend")
+
+
+def _lazy_openapi(app: FastAPI) -> None:
+    """
+    Resolve application version only when OpenAPI schema is requested.
+
+    Looking up package metadata scans installed distributions,
+    which is wasted work on every worker start.
+
+    :param app: fastAPI application.
+    """
+
+    def openapi() -> Dict[str, Any]:  # noqa: WPS430
+        if app.openapi_schema is None:
+            app.version = _app_version()
+        return FastAPI.openapi(app)
+
+    app.openapi = openapi  # type: ignore
+
+
 def get_app() -> FastAPI:
     """
     Get FastAPI application.
@@ -20,28 +57,76 @@ def get_app() -> FastAPI:
 
     :return: application.
     """
-    configure_logging()
-    app = FastAPI(
-        title="tvshow_backend",
-        version=metadata.version("tvshow_backend"),
-        docs_url=None,
-        redoc_url=None,
-        openapi_url="/api/openapi.json",
-        default_response_class=UJSONResponse,
-    )
-
-    # Adds startup and shutdown events.
-    register_startup_event(app)
-    register_shutdown_event(app)
-
-    # Main router for the API.
-    app.include_router(router=api_router, prefix="/api")
-    # Adds static directory.
-    # This directory is used to access swagger files.
-    app.mount(
-        "/static",
-        StaticFiles(directory=APP_ROOT / "static"),
-        name="static",
-    )
+    timer = StartupTimer()
+    with timer.phase("configure_logging"):
+        configure_logging()
+    with timer.phase("create_app"):
+        app = FastAPI(
+            title="tvshow_backend",
+            # Real version is resolved on the first OpenAPI request.
+            version="unknown",
+            docs_url=None,
+            redoc_url=None,
+            openapi_url="/api/openapi.json",
+            default_response_class=UJSONResponse,
+        )
+        _lazy_openapi(app)
+        app.state.startup_timer = timer
+
+        # Adds startup and shutdown events.
+        register_startup_event(app)
+        register_shutdown_event(app)
+
+        # Main router for the API.
+        app.include_router(router=api_router, prefix="/api")
+
+        # Sheds load when too many requests of a route class are running.
+        app.state.admission_limiters = build_limiters(settings)
+        app.add_middleware(
+            AdmissionMiddleware,
+            limiters=app.state.admission_limiters,
+            retry_after=settings.admission_retry_after,
+        )
+        # Identical concurrent reads share one execution. Added last, so it
+        # runs first and coalesced requests don't take admission slots.
+        app.state.request_coalescer = RequestCoalescer()
+        if settings.request_coalescing:
+            app.add_middleware(
+                CoalescingMiddleware,
+                coalescer=app.state.request_coalescer,
+            )
+        # Slow pages are cancelled at their deadline or when their client
+        # disconnects. A shared flight is only cancelled with its last request.
+        app.state.request_deadlines = build_deadlines(settings)
+        app.add_middleware(DeadlineMiddleware, deadlines=app.state.request_deadlines)
+        # Views of show details are counted before requests are coalesced.
+        app.state.view_counter = ViewCounter(
+            settings.views_flush_interval,
+            settings.views_max_pending,
+        )
+        if settings.view_counting:
+            app.add_middleware(ViewCountingMiddleware, counter=app.state.view_counter)
+        # Hot list pages are answered from memory before anything else.
+        app.state.response_cache = ResponseCache(settings.response_cache_bytes)
+        if settings.response_cache_bytes > 0:
+            app.add_middleware(
+                ResponseCacheMiddleware,
+                cache=app.state.response_cache,
+            )
+        # Counts every request, so shutdown can wait for them.
+        app.state.request_drain = RequestDrain()
+        app.add_middleware(DrainMiddleware, drain=app.state.request_drain)
+
+    if settings.api_docs:
+        with timer.phase("mount_static"):
+            from fastapi.staticfiles import StaticFiles  # noqa: WPS433
+
+            # Adds static directory.
+            # This directory is used to access swagger files.
+            app.mount(
+                "/static",
+                StaticFiles(directory=APP_ROOT / "static"),
+                name="static",
+            )
 
     return app
@@ -0,0 +1,219 @@
+"""
+Single-flight coalescing of identical concurrent GET requests.
+
+The first request for a key starts a flight: the downstream application
+runs in a separate task and its response is captured. Identical requests
+arriving while the flight is running wait for it and receive a copy of the
+same response instead of running their own queries and serialization.
+
+The flight is not tied to the request that started it: it keeps running
+while any waiter is interested and is cancelled only when all of them are
+gone. Exceptions are re-raised in every waiter.
+
+Requests join only flights started in the current epoch of the generation
+watcher. The epoch changes on every commit of this process, so a read
+issued after a write never gets a response computed before it.
+"""
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from tvshow_backend.web.admission import ASGIApp, Message, Receive, Scope, Send
+
+# Read-only routes whose responses depend only on the key of the request.
+COALESCED_PREFIXES = (
+    "/api/tvshow/all",
+    "/api/tvshow/detail/",
+    "/api/tvshow/genre/",
+    "/api/tvshow/autocomplete",
+    "/api/analytics/",
+)
+# Request headers which can change the response.
+VARY_HEADERS = (b"accept", b"accept-encoding")
+
+Key = Tuple[str, str, Tuple[bytes, ...]]
+
+
+class CapturedResponse:
+    """Response messages of a finished flight."""
+
+    def __init__(self) -> None:
+        self.start: Optional[Message] = None
+        self.body: List[bytes] = []
+
+    async def send(self, message: Message) -> None:
+        """
+        Store a message sent by the application.
+
+        :param message: ASGI message.
+        """
+        if message["type"] == "http.response.start":
+            self.start = message
+        elif message["type"] == "http.response.body":
+            self.body.append(message.get("body", b""))
+
+    async def replay(self, send: Send) -> None:
+        """
+        Send the captured response to a client.
+
+        :param send: ASGI send function of the client.
+        """
+        if self.start is None:
+            return
+        await send(dict(self.start))
+        await send({"type": "http.response.body", "body": b"".join(self.body)})
+
+
+class _Flight:
+    def __init__(self, task: "asyncio.Task[CapturedResponse]", epoch: int) -> None:
+        self.task = task
+        self.epoch = epoch
+        self.waiters = 0
+        # Set when every waiter left and the task was cancelled.
+        self.abandoned = False
+
+
+class RequestCoalescer:
+    """Shares one execution between concurrent requests with the same key."""
+
+    def __init__(self) -> None:
+        self.flights = 0
+        self.coalesced = 0
+        self._running: Dict[Key, _Flight] = {}
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Describe the coalescer.
+
+        :return: counters of flights and coalesced requests.
+        """
+        return {
+            "flights": self.flights,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._running),
+        }
+
+    async def run(
+        self,
+        key: Key,
+        app: ASGIApp,
+        scope: Scope,
+        epoch: int = 0,
+    ) -> CapturedResponse:
+        """
+        Run a request or join a running identical one.
+
+        :param key: key of the request.
+        :param app: downstream application.
+        :param scope: ASGI scope of the request.
+        :param epoch: current epoch, flights of other epochs are not joined.
+        :raises asyncio.CancelledError: if the request was cancelled.
+        :return: captured response.
+        """
+        running = self._running.get(key)
+        if running is None or running.abandoned or running.epoch != epoch:
+            flight = _Flight(
+                asyncio.create_task(self._execute(app, dict(scope))),
+                epoch,
+            )
+            self._running[key] = flight
+            self.flights += 1
+            flight.task.add_done_callback(lambda _: self._finish(key, flight))
+        else:
+            flight = running
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.abandoned = True
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _finish(self, key: Key, flight: _Flight) -> None:
+        if self._running.get(key) is flight:
+            del self._running[key]  # noqa: WPS420
+
+    @staticmethod
+    async def _execute(app: ASGIApp, scope: Scope) -> CapturedResponse:
+        captured = CapturedResponse()
+        disconnected = asyncio.Event()
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive() -> Message:  # noqa: WPS430
+            if messages:
+                return messages.pop()
+            # Nobody disconnects from a shared flight.
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        await app(scope, receive, captured.send)
+        return captured
+
+
+def request_key(scope: Scope) -> Optional[Key]:
+    """
+    Build the coalescing key of a request.
+
+    :param scope: ASGI scope of the request.
+    :return: key or None if the request must not be coalesced.
+    """
+    path: str = scope["path"]
+    if scope["method"] != "GET" or not path.startswith(COALESCED_PREFIXES):
+        return None
+    query = parse_qsl(
+        scope.get("query_string", b"").decode("latin-1"),
+        keep_blank_values=True,
+    )
+    headers = dict(scope.get("headers", []))
+    return (
+        path,
+        urlencode(sorted(query)),
+        tuple(headers.get(name, b"") for name in VARY_HEADERS),
+    )
+
+
+class CoalescingMiddleware:
+    """ASGI middleware coalescing identical concurrent GET requests."""
+
+    def __init__(self, app: ASGIApp, coalescer: RequestCoalescer) -> None:
+        self.app = app
+        self.coalescer = coalescer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Serve a request, sharing the response with identical requests.
+
+        :param scope: ASGI scope of the request.
+        :param receive: ASGI receive function.
+        :param send: ASGI send function.
+        """
+        key = request_key(scope) if scope["type"] == "http" else None
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        captured = await self.coalescer.run(
+            key,
+            self.app,
+            scope,
+            watcher_epoch(scope) or 0,
+        )
+        await captured.replay(send)
+
+
+def watcher_epoch(scope: Scope) -> Optional[int]:
+    """
+    Read the epoch of the generation watcher of the application.
+
+    The watcher is created on startup and bumps its epoch on every commit.
+
+    :param scope: ASGI scope of the request.
+    :return: current epoch or None if the watcher is not running.
+    """
+    app = scope.get("app")
+    watcher = getattr(app.state, "generation_watcher", None) if app else None
+    return watcher.epoch if watcher is not None else None
@@ -0,0 +1,198 @@
+"""
+Deadlines of slow read routes.
+
+Requests of list and genre pages run in a task of their own, which is
+cancelled once the deadline of their route passed or their client
+disconnected, so abandoned requests stop taking a database connection and
+CPU time for their serialization. Queries of the cancelled task are
+interrupted (see ``tvshow_backend.db.interrupt``). A request past its
+deadline is answered with ``504 Gateway Timeout``, unless its response
+already started. Nothing is sent to a disconnected client.
+"""
+import asyncio
+from typing import Any, Dict, Optional
+
+from starlette import status
+from starlette.responses import JSONResponse
+
+from tvshow_backend.db.interrupt import interrupts
+from tvshow_backend.settings import Settings
+from tvshow_backend.web.admission import ASGIApp, Message, Receive, Scope, Send
+
+ALL = "all"
+GENRE = "genre"
+
+# Path prefixes of routes with deadlines.
+DEADLINE_PREFIXES = {
+    ALL: "/api/tvshow/all",
+    GENRE: "/api/tvshow/genre/",
+}
+
+
+def deadline_route(method: str, path: str) -> Optional[str]:
+    """
+    Find the route with a deadline a request belongs to.
+
+    :param method: HTTP method.
+    :param path: request path.
+    :return: name of the route or None if requests have no deadline.
+    """
+    if method != "GET":
+        return None
+    for name, prefix in DEADLINE_PREFIXES.items():
+        if path.startswith(prefix):
+            return name
+    return None
+
+
+class RouteDeadline:
+    """Deadline of a route and the requests cancelled by it."""
+
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+        self.requests = 0
+        self.timed_out = 0
+        self.disconnected = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Describe the deadline.
+
+        :return: deadline and counters of requests.
+        """
+        return {
+            "deadline": self.seconds,
+            "requests": self.requests,
+            "timed_out": self.timed_out,
+            "disconnected": self.disconnected,
+        }
+
+
+def build_deadlines(settings: Settings) -> Dict[str, RouteDeadline]:
+    """
+    Create deadlines of routes from settings.
+
+    :param settings: application settings.
+    :return: deadlines by route name.
+    """
+    return {
+        ALL: RouteDeadline(settings.request_deadline_all),
+        GENRE: RouteDeadline(settings.request_deadline_genre),
+    }
+
+
+def deadline_stats(deadlines: Dict[str, RouteDeadline]) -> Dict[str, Any]:
+    """
+    Describe deadlines of all routes.
+
+    :param deadlines: deadlines by route name.
+    :return: statistics of routes and interrupted queries.
+    """
+    return {
+        "routes": {name: deadline.stats() for name, deadline in deadlines.items()},
+        "interrupted_queries": interrupts.count,
+    }
+
+
+class _WatchedRequest:
+    """Messages of a request, watched for a disconnect of the client."""
+
+    def __init__(self, receive: Receive, send: Send) -> None:
+        self._receive = receive
+        self._send = send
+        self._messages: "asyncio.Queue[Message]" = asyncio.Queue()
+        self.disconnected = asyncio.Event()
+        self.response_started = False
+
+    async def watch(self) -> None:
+        """Pass messages of the client to the application until it disconnects."""
+        while not self.disconnected.is_set():
+            message = await self._receive()
+            self._messages.put_nowait(message)
+            if message["type"] == "http.disconnect":
+                self.disconnected.set()
+
+    async def receive(self) -> Message:
+        """
+        Receive a message of the client.
+
+        :return: ASGI message.
+        """
+        return await self._messages.get()
+
+    async def send(self, message: Message) -> None:
+        """
+        Send a message to the client.
+
+        :param message: ASGI message.
+        """
+        if message["type"] == "http.response.start":
+            self.response_started = True
+        await self._send(message)
+
+    async def serve(self, app: ASGIApp, scope: Scope) -> None:
+        """
+        Run the application for the request.
+
+        :param app: downstream application.
+        :param scope: ASGI scope of the request.
+        """
+        await app(scope, self.receive, self.send)
+
+
+class DeadlineMiddleware:
+    """ASGI middleware cancelling requests past their deadline or abandoned."""
+
+    def __init__(self, app: ASGIApp, deadlines: Dict[str, RouteDeadline]) -> None:
+        self.app = app
+        self.deadlines = deadlines
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Serve a request until it finishes, times out or is abandoned.
+
+        :param scope: ASGI scope of the request.
+        :param receive: ASGI receive function.
+        :param send: ASGI send function.
+        """
+        name = None
+        if scope["type"] == "http":
+            name = deadline_route(scope["method"], scope["path"])
+        deadline = self.deadlines.get(name) if name else None
+        if deadline is None:
+            await self.app(scope, receive, send)
+            return
+
+        deadline.requests += 1
+        request = _WatchedRequest(receive, send)
+        served = asyncio.create_task(request.serve(self.app, scope))
+        watcher = asyncio.create_task(request.watch())
+        disconnected = asyncio.create_task(request.disconnected.wait())
+        try:
+            await asyncio.wait(
+                {served, disconnected},
+                timeout=deadline.seconds or None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+        finally:
+            watcher.cancel()
+            disconnected.cancel()
+            if not served.done():
+                served.cancel()
+                # The task finishes promptly, its queries are interrupted.
+                await asyncio.wait({served})
+        if not served.cancelled():
+            # Raises exceptions of the application.
+            await served
+            return
+
+        if request.disconnected.is_set():
+            deadline.disconnected += 1
+            return
+        deadline.timed_out += 1
+        if not request.response_started:
+            response = JSONResponse(
+                {"detail": f"The request took longer than {deadline.seconds}s."},
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            )
+            await response(scope, receive, send)
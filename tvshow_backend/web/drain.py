@@ -0,0 +1,88 @@
+"""
+Graceful drain of requests on shutdown.
+
+Once draining starts, new requests are answered right away with ``503
+Service Unavailable`` and ``Connection: close``, so clients and load
+balancers retry them on another worker, while requests already in flight
+are awaited before the database is closed. Health probes are still served,
+so the readiness probe can tell that the worker is draining.
+"""
+import asyncio
+from typing import Optional
+
+from starlette import status
+from starlette.responses import JSONResponse
+
+from tvshow_backend.web.admission import ASGIApp, Receive, Scope, Send
+
+# Requests served while draining.
+PROBE_PREFIX = "/api/health"
+
+
+class RequestDrain:
+    """Requests in flight and whether new ones are still admitted."""
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.draining = False
+        self._idle: Optional[asyncio.Event] = None
+
+    def enter(self) -> None:
+        """Count a starting request."""
+        self.in_flight += 1
+
+    def leave(self) -> None:
+        """Count a finished request."""
+        self.in_flight -= 1
+        if not self.in_flight and self._idle is not None:
+            self._idle.set()
+
+    async def drain(self, timeout: float) -> bool:
+        """
+        Stop admitting requests and wait for the ones in flight.
+
+        :param timeout: maximum seconds to wait.
+        :return: whether every request finished in time.
+        """
+        self.draining = True
+        if not self.in_flight:
+            return True
+        self._idle = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
+class DrainMiddleware:
+    """ASGI middleware counting requests and rejecting new ones while draining."""
+
+    def __init__(self, app: ASGIApp, drain: RequestDrain) -> None:
+        self.app = app
+        self.drain = drain
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Serve or reject a request.
+
+        :param scope: ASGI scope of the request.
+        :param receive: ASGI receive function.
+        :param send: ASGI send function.
+        """
+        if scope["type"] != "http" or scope["path"].startswith(PROBE_PREFIX):
+            await self.app(scope, receive, send)
+            return
+        if self.drain.draining:
+            response = JSONResponse(
+                {"detail": "The server is shutting down, try again."},
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": "0", "Connection": "close"},
+            )
+            await response(scope, receive, send)
+            return
+        self.drain.enter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.drain.leave()
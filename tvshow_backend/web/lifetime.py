@@ -1,11 +1,81 @@
-from typing import Awaitable, Callable
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, Iterator
 
 from fastapi import FastAPI
+from loguru import logger
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
+from tvshow_backend.db.memory import MemoryDatabase
 from tvshow_backend.db.meta import meta
 from tvshow_backend.db.models import load_all_models
-from tvshow_backend.settings import settings
+from tvshow_backend.db.sharding import ShardSet, check_layout, shard_files
+from tvshow_backend.db.threaded import ThreadedSessionMaker
+from tvshow_backend.db.utils import create_tables
+from tvshow_backend.services.analytics.lifetime import (
+    init_analytics,
+    shutdown_analytics,
+)
+from tvshow_backend.services.autocomplete.lifetime import (
+    init_autocomplete,
+    shutdown_autocomplete,
+)
+from tvshow_backend.services.changefeed.lifetime import (
+    init_changefeed,
+    shutdown_changefeed,
+)
+from tvshow_backend.services.coherence.lifetime import (
+    init_coherence,
+    shutdown_coherence,
+)
+from tvshow_backend.services.health.lifetime import init_health, shutdown_health
+from tvshow_backend.services.jobs.lifetime import init_jobs, shutdown_jobs
+from tvshow_backend.services.maintenance.lifetime import (
+    init_maintenance,
+    shutdown_maintenance,
+)
+from tvshow_backend.services.popularity.lifetime import (
+    init_popularity,
+    shutdown_popularity,
+)
+from tvshow_backend.services.similarity.lifetime import (
+    init_similarity,
+    shutdown_similarity,
+)
+from tvshow_backend.settings import DbBackend, settings
+from tvshow_backend.web.warmup import warm_up
+
+
+class StartupTimer:
+    """Measures duration of startup phases."""
+
+    def __init__(self) -> None:
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Measure a single phase.
+
+        :param name: name of the phase.
+        :yield: nothing.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = (time.perf_counter() - started) * 1000
+
+    def report(self) -> str:
+        """
+        Describe measured phases.
+
+        :return: total and per-phase durations in milliseconds.
+        """
+        phases = ", ".join(
+            f"{name}={duration:.1f}ms" for name, duration in self.phases.items()
+        )
+        return f"{sum(self.phases.values()):.1f}ms ({phases})"
 
 
 def _setup_db(app: FastAPI) -> None:  # pragma: no cover
@@ -15,6 +85,9 @@ def _setup_db(app: FastAPI) -> None:  # pragma: no cover
     This function creates SQLAlchemy engine instance,
     session_factory for creating sessions
     and stores them in the application's state property.
+    Sessions of requests run on a pool of threads
+    with the threadpool backend. TV shows are accessed
+    through engines of their own when they are sharded.
 
     :param app: fastAPI application.
     """
@@ -25,15 +98,61 @@ def _setup_db(app: FastAPI) -> None:  # pragma: no cover
     )
     app.state.db_engine = engine
     app.state.db_session_factory = session_factory
+    app.state.db_threaded_sessions = None
+    app.state.db_request_session_factory = session_factory
+    if settings.db_backend == DbBackend.THREADPOOL:
+        threaded_sessions = ThreadedSessionMaker(
+            str(settings.db_sync_url),
+            settings.db_threads,
+            echo=settings.db_echo,
+        )
+        app.state.db_threaded_sessions = threaded_sessions
+        app.state.db_request_session_factory = threaded_sessions
+    app.state.db_shards = None
+    if settings.db_shards > 1:
+        app.state.db_shards = ShardSet(
+            shard_files(settings.db_file, settings.db_shards),
+            echo=settings.db_echo,
+        )
+
+
+async def _load_db(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Loads the database into memory when it is served from memory.
 
+    :param app: fastAPI application.
+    """
+    app.state.db_memory = None
+    if not settings.db_in_memory:
+        return
+    memory = MemoryDatabase(settings.db_file, settings.db_snapshot_interval)
+    await memory.start()
+    app.state.db_memory = memory
 
-async def _create_tables() -> None:  # pragma: no cover
-    """Populates tables in the database."""
-    load_all_models()
-    engine = create_async_engine(str(settings.db_url))
-    async with engine.begin() as connection:
-        await connection.run_sync(meta.create_all)
-    await engine.dispose()
+
+async def _create_tables(app: FastAPI) -> bool:  # pragma: no cover
+    """
+    Populates tables in the database and its shards.
+
+    :param app: fastAPI application.
+    :return: whether DDL was executed.
+    """
+    ddl_executed = await create_tables(
+        app.state.db_engine,
+        meta,
+        skip_if_unchanged=settings.db_skip_unchanged_schema,
+        load_models=load_all_models,
+        incremental_vacuum=settings.db_incremental_vacuum,
+    )
+    await check_layout(app.state.db_engine, settings.db_shards)
+    if app.state.db_shards is None:
+        return ddl_executed
+    shards_ddl_executed = await app.state.db_shards.create_tables(
+        meta,
+        load_models=load_all_models,
+        incremental_vacuum=settings.db_incremental_vacuum,
+    )
+    return ddl_executed or shards_ddl_executed
 
 
 def register_startup_event(
@@ -51,11 +170,37 @@ def register_startup_event(
 
     @app.on_event("startup")
     async def _startup() -> None:  # noqa: WPS430
-        app.middleware_stack = None
-        _setup_db(app)
-        await _create_tables()
-        app.middleware_stack = app.build_middleware_stack()
-        pass  # noqa: WPS420
+        timer: StartupTimer = getattr(app.state, "startup_timer", StartupTimer())
+        app.state.startup_timer = timer
+        with timer.phase("setup_db"):
+            _setup_db(app)
+        with timer.phase("load_db"):
+            await _load_db(app)
+        with timer.phase("create_tables"):
+            ddl_executed = await _create_tables(app)
+        with timer.phase("coherence"):
+            await init_coherence(app)
+            await init_changefeed(app)
+        with timer.phase("indexes"):
+            await init_analytics(app)
+            await init_autocomplete(app)
+            await init_similarity(app)
+        with timer.phase("jobs"):
+            await init_jobs(app)
+            await init_maintenance(app)
+        with timer.phase("warmup"):
+            await warm_up(app)
+        # Started after warmup, so its requests are not counted as views.
+        with timer.phase("views"):
+            await init_popularity(app)
+        # Created last, so the worker is not ready until everything started.
+        with timer.phase("health"):
+            await init_health(app)
+        logger.info(
+            "Startup finished in {} (schema {})",
+            timer.report(),
+            "created" if ddl_executed else "unchanged",
+        )
 
     return _startup
 
@@ -72,7 +217,29 @@ def register_shutdown_event(
 
     @app.on_event("shutdown")
     async def _shutdown() -> None:  # noqa: WPS430
+        drain = app.state.request_drain
+        if not await drain.drain(settings.drain_timeout):
+            logger.warning(
+                "{} requests still running after {}s of draining",
+                drain.in_flight,
+                settings.drain_timeout,
+            )
+        await shutdown_health(app)
+        await shutdown_maintenance(app)
+        await shutdown_jobs(app)
+        await shutdown_popularity(app)
+        await shutdown_similarity(app)
+        await shutdown_autocomplete(app)
+        await shutdown_analytics(app)
+        await shutdown_changefeed(app)
+        await shutdown_coherence(app)
         await app.state.db_engine.dispose()
+        if app.state.db_shards is not None:
+            await app.state.db_shards.dispose()
+        if app.state.db_threaded_sessions is not None:
+            app.state.db_threaded_sessions.dispose()
+        if app.state.db_memory is not None:
+            await app.state.db_memory.stop()
 
         pass  # noqa: WPS420
 
@@ -0,0 +1,201 @@
+"""
+Content negotiation of API responses and request bodies.
+
+Routes using ``NegotiatedRoute`` answer in the format preferred by the
+``Accept`` header of the request:
+
+* ``application/json``, the default;
+* ``application/msgpack`` (or ``application/x-msgpack``), if the optional
+  ``msgpack`` package is installed;
+* ``application/vnd.tvshow.columns+json``, which sends lists of objects as
+  one array per field, like ``{"show_id": [1, 2], "title": ["A", "B"]}``.
+  Other responses are sent as plain JSON.
+
+Every format is rendered straight from the validated response content, so
+a MessagePack response costs no JSON encoding. Request bodies sent with
+``Content-Type: application/msgpack`` are accepted wherever JSON is.
+Errors are always sent as JSON.
+"""
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Tuple, Type
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.responses import JSONResponse, UJSONResponse
+from fastapi.routing import APIRoute
+
+try:
+    import msgpack  # noqa: WPS433
+except ImportError:  # pragma: no cover
+    msgpack = None  # noqa: WPS440
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+COLUMNS = "application/vnd.tvshow.columns+json"
+# Names clients use for MessagePack.
+MSGPACK_TYPES = frozenset((MSGPACK, "application/x-msgpack", "application/vnd.msgpack"))
+# Media ranges matching the default format.
+JSON_RANGES = frozenset((JSON, "application/*", "*/*"))
+
+Handler = Callable[[Request], Coroutine[Any, Any, Response]]
+
+
+def _media_type(header: str) -> str:
+    return header.split(";", 1)[0].strip().lower()
+
+
+def _quality(item: str) -> float:
+    for param in item.split(";")[1:]:
+        name, _, value = param.partition("=")
+        if name.strip() == "q":
+            try:
+                return float(value)
+            except ValueError:
+                return 0
+    return 1
+
+
+def _offered(media_type: str) -> Optional[str]:
+    if media_type in MSGPACK_TYPES:
+        return MSGPACK if msgpack is not None else None
+    if media_type == COLUMNS:
+        return COLUMNS
+    return JSON if media_type in JSON_RANGES else None
+
+
+def negotiate(accept: Optional[str]) -> str:  # noqa: WPS210
+    """
+    Pick the response format preferred by a client.
+
+    The format with the highest quality wins. Exact media types win over
+    ranges of the same quality, then the first listed one wins.
+
+    :param accept: value of the Accept header.
+    :return: media type of the format.
+    """
+    best = JSON
+    best_rank: Tuple[float, bool] = (0, False)
+    for item in (accept or "").split(","):
+        media_type = _media_type(item)
+        offered = _offered(media_type)
+        rank = (_quality(item), not media_type.endswith("/*"))
+        if offered is not None and rank[0] > 0 and rank > best_rank:
+            best, best_rank = offered, rank
+    return best
+
+
+def to_columns(content: Any) -> Any:
+    """
+    Turn a list of objects into one list of values per field.
+
+    :param content: response content.
+    :return: columns, or the content itself if it is not a list of objects.
+    """
+    if not isinstance(content, list):
+        return content
+    if not all(isinstance(row, dict) for row in content):
+        return content
+    columns: Dict[str, List[Any]] = {name: [] for name in content[0]} if content else {}
+    for row in content:
+        for name, values in columns.items():
+            values.append(row.get(name))
+    return columns
+
+
+class MsgPackResponse(Response):
+    """Response encoded with MessagePack."""
+
+    media_type = MSGPACK
+
+    def render(self, content: Any) -> bytes:
+        """
+        Encode content.
+
+        :param content: response content.
+        :return: encoded body.
+        """
+        return msgpack.packb(content)
+
+
+class ColumnsResponse(UJSONResponse):
+    """JSON response sending lists of objects as columns."""
+
+    media_type = COLUMNS
+
+    def render(self, content: Any) -> bytes:
+        """
+        Encode content.
+
+        :param content: response content.
+        :return: encoded body.
+        """
+        columns = to_columns(content)
+        if columns is content:
+            # Headers are built after rendering, so this sends plain JSON.
+            self.media_type = JSON  # noqa: WPS601
+        return super().render(columns)
+
+
+class MsgPackRequest(Request):
+    """Request whose MessagePack body is decoded like a JSON one."""
+
+    async def json(self) -> Any:
+        """
+        Decode the body.
+
+        :return: decoded body.
+        """
+        if not hasattr(self, "_json"):  # noqa: WPS421
+            self._json = msgpack.unpackb(await self.body())
+        return self._json
+
+
+def _as_json(request: Request) -> Request:
+    if _media_type(request.headers.get("content-type", "")) not in MSGPACK_TYPES:
+        return request
+    if msgpack is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="MessagePack is not supported",
+        )
+    # FastAPI only decodes bodies of JSON requests, through Request.json().
+    headers = [
+        (name, value)
+        for name, value in request.scope["headers"]
+        if name != b"content-type"
+    ]
+    headers.append((b"content-type", JSON.encode()))
+    return MsgPackRequest({**request.scope, "headers": headers}, request.receive)
+
+
+class NegotiatedRoute(APIRoute):
+    """Route answering in the format preferred by the client."""
+
+    def get_route_handler(self) -> Handler:  # noqa: WPS210
+        """
+        Build a handler per format and dispatch requests between them.
+
+        :return: handler of requests.
+        """
+        default = self.response_class
+        handlers: Dict[str, Handler] = {JSON: super().get_route_handler()}
+        actual = default.value if isinstance(default, DefaultPlaceholder) else default
+        # Routes responding with something else than JSON keep their format.
+        if issubclass(actual, JSONResponse):
+            formats: Dict[str, Type[Response]] = {COLUMNS: ColumnsResponse}
+            if msgpack is not None:
+                formats[MSGPACK] = MsgPackResponse
+            for media_type, response_class in formats.items():
+                self.response_class = response_class
+                handlers[media_type] = super().get_route_handler()
+            self.response_class = default
+
+        async def negotiated(request: Request) -> Response:  # noqa: WPS430
+            handler = handlers.get(
+                negotiate(request.headers.get("accept")),
+                handlers[JSON],
+            )
+            response = await handler(_as_json(request))
+            response.headers.append("vary", "Accept")
+            return response
+
+        return negotiated
@@ -0,0 +1,206 @@
+"""
+Cache of encoded responses of hot list pages.
+
+Pages of ``/api/tvshow/all`` and ``/api/tvshow/genre/{genre}`` are
+requested over and over with the same parameters. The cache keeps their
+final response bodies, so a hit is sent without a database session, ORM
+hydration, validation or JSON encoding.
+
+Entries are kept in least recently used order within a budget of bytes
+counting bodies, headers and keys. They are valid for one epoch of the
+generation watcher, which changes whenever the table generation is bumped
+by a write of this process and when a write of another process is noticed,
+so the first lookup of a new epoch drops every entry. A response is only
+stored if no write was noticed while it was computed.
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from tvshow_backend.web.admission import ASGIApp, Message, Receive, Scope, Send
+from tvshow_backend.web.coalescing import VARY_HEADERS, CapturedResponse, watcher_epoch
+
+# Cached routes with the defaults of their query parameters. Parameters
+# the route doesn't take are ignored, so they are left out of keys too.
+CACHED_ROUTES: Dict[str, Dict[str, str]] = {
+    "/api/tvshow/all": {"limit": "10", "offset": "0"},
+    "/api/tvshow/genre/": {
+        "match": "any",
+        "sort": "show_id",
+        "order": "asc",
+        "limit": "20",
+        "offset": "0",
+    },
+}
+# Estimated bytes of bookkeeping of an entry besides its data.
+ENTRY_OVERHEAD = 200
+
+Key = Tuple[str, str, Tuple[bytes, ...]]
+
+
+def cache_key(scope: Scope) -> Optional[Key]:
+    """
+    Build the normalized key of a request.
+
+    :param scope: ASGI scope of the request.
+    :return: key or None if the response must not be cached.
+    """
+    path: str = scope["path"]
+    if scope["method"] != "GET":
+        return None
+    for prefix, defaults in CACHED_ROUTES.items():
+        if path == prefix or (prefix.endswith("/") and path.startswith(prefix)):
+            break
+    else:
+        return None
+    params = dict(defaults)
+    query = parse_qsl(
+        scope.get("query_string", b"").decode("latin-1"),
+        keep_blank_values=True,
+    )
+    for name, value in query:
+        if name not in defaults:
+            continue
+        if not defaults[name].isdigit():
+            params[name] = value
+            continue
+        try:
+            params[name] = str(int(value))
+        except ValueError:
+            return None
+    headers = dict(scope.get("headers", []))
+    return (
+        path,
+        urlencode(sorted(params.items())),
+        tuple(headers.get(name, b"") for name in VARY_HEADERS),
+    )
+
+
+class ResponseCache:
+    """Responses within a budget of bytes, valid for a single epoch."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._epoch = 0
+        self._entries: "OrderedDict[Key, Tuple[CapturedResponse, int]]" = OrderedDict()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Describe the cache.
+
+        :return: memory accounting and counters of lookups.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def get(self, key: Key, current_epoch: int) -> Optional[CapturedResponse]:
+        """
+        Find a response.
+
+        :param key: key of the request.
+        :param current_epoch: current epoch of the generation watcher.
+        :return: cached response or None.
+        """
+        self._advance(current_epoch)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: Key, response: CapturedResponse, computed_in: int) -> None:
+        """
+        Store a response, evicting the least recently used ones.
+
+        :param key: key of the request.
+        :param response: complete response.
+        :param computed_in: epoch in which the response was computed.
+        """
+        if computed_in < self._epoch:
+            return
+        self._advance(computed_in)
+        size = _size(key, response)
+        if size > self.max_bytes:
+            return
+        self._remove(key)
+        self._entries[key] = (response, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _advance(self, current_epoch: int) -> None:
+        if current_epoch == self._epoch:
+            return
+        self._epoch = current_epoch
+        if self._entries:
+            self.invalidations += 1
+        self._entries.clear()
+        self.bytes = 0
+
+    def _remove(self, key: Key) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[1]
+
+
+def _size(key: Key, response: CapturedResponse) -> int:
+    start = response.start or {}
+    headers = sum(len(name) + len(value) for name, value in start.get("headers", []))
+    keys = len(key[0]) + len(key[1]) + sum(map(len, key[2]))
+    return ENTRY_OVERHEAD + keys + headers + sum(map(len, response.body))
+
+
+class ResponseCacheMiddleware:
+    """ASGI middleware serving cached responses of hot list pages."""
+
+    def __init__(self, app: ASGIApp, cache: ResponseCache) -> None:
+        self.app = app
+        self.cache = cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Serve a request from the cache or store its response.
+
+        :param scope: ASGI scope of the request.
+        :param receive: ASGI receive function.
+        :param send: ASGI send function.
+        """
+        key = cache_key(scope) if scope["type"] == "http" else None
+        started_in = watcher_epoch(scope) if key is not None else None
+        # Without the watcher nothing would ever invalidate the cache.
+        if key is None or started_in is None:
+            await self.app(scope, receive, send)
+            return
+        cached = self.cache.get(key, started_in)
+        if cached is not None:
+            await cached.replay(send)
+            return
+
+        captured = CapturedResponse()
+
+        async def send_and_capture(message: Message) -> None:  # noqa: WPS430
+            await captured.send(message)
+            await send(message)
+
+        await self.app(scope, receive, send_and_capture)
+        status = captured.start["status"] if captured.start else None
+        if status == 200 and watcher_epoch(scope) == started_in:
+            captured.body = [b"".join(captured.body)]
+            self.cache.put(key, captured, started_in)
@@ -0,0 +1,48 @@
+"""
+Counting of TV show views.
+
+Every successful ``GET`` of a show detail counts as a view. The middleware
+runs before request coalescing, so requests sharing one execution are
+still counted one by one.
+"""
+from starlette import status
+
+from tvshow_backend.services.popularity.counter import ViewCounter
+from tvshow_backend.web.admission import ASGIApp, Message, Receive, Scope, Send
+
+DETAIL_PREFIX = "/api/tvshow/detail/"
+
+
+class ViewCountingMiddleware:
+    """ASGI middleware counting views of show details."""
+
+    def __init__(self, app: ASGIApp, counter: ViewCounter) -> None:
+        self.app = app
+        self.counter = counter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Serve a request and count it if it is a view.
+
+        :param scope: ASGI scope of the request.
+        :param receive: ASGI receive function.
+        :param send: ASGI send function.
+        """
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        path: str = scope["path"]
+        show_id = path[len(DETAIL_PREFIX) :]
+        if not path.startswith(DETAIL_PREFIX) or not show_id.isdigit():
+            await self.app(scope, receive, send)
+            return
+
+        async def send_counted(message: Message) -> None:  # noqa: WPS430
+            if (
+                message["type"] == "http.response.start"
+                and message["status"] == status.HTTP_200_OK
+            ):
+                self.counter.record(int(show_id))
+            await send(message)
+
+        await self.app(scope, receive, send_counted)
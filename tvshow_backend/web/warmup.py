@@ -0,0 +1,171 @@
+"""
+Warmup of a worker before it gets traffic.
+
+The first requests of a fresh worker open database connections, compile
+SQL statements, build serializers and read pages of the database file from
+disk. Warmup pays for all of it on startup: it opens the pooled connections,
+runs every write shape of the DAO in a transaction that is rolled back and
+sends a request of every read shape through the application, which also
+fills the response cache with the first pages. The readiness probe reports
+the worker as ready only afterwards.
+"""
+import asyncio
+import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+from urllib.parse import quote
+
+from fastapi import FastAPI
+from httpx import AsyncClient
+from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.pool import QueuePool
+
+from tvshow_backend.db.dao.tvshow_dao import TvShowDAO, TvShowFilter
+from tvshow_backend.db.models.tvshow_model import TvShowModel
+from tvshow_backend.settings import settings
+
+# Show written by warmup transactions, which are always rolled back.
+WARMUP_SHOW_ID = -1
+# Bytes read at once when loading the database file into the page cache.
+READ_CHUNK = 1024 * 1024
+
+
+async def open_connections(engine: AsyncEngine) -> None:
+    """
+    Fill the connection pool of an engine.
+
+    :param engine: engine of database sessions.
+    """
+    pool = engine.pool
+    count = pool.size() if isinstance(pool, QueuePool) else 1
+    # Held together, so each checkout opens a new connection.
+    connections = [await engine.connect() for _ in range(count)]
+    for connection in connections:
+        await connection.close()
+
+
+def read_file(path: Path) -> int:
+    """
+    Read a file, so the OS keeps its pages in memory.
+
+    :param path: file to read.
+    :return: bytes read.
+    """
+    total = 0
+    with open(path, "rb", buffering=0) as db_file:
+        chunk = db_file.read(READ_CHUNK)
+        while chunk:
+            total += len(chunk)
+            chunk = db_file.read(READ_CHUNK)
+    return total
+
+
+async def run_write_shapes(session: AsyncSession) -> None:  # noqa: WPS213, WPS217
+    """
+    Run every write and filter query of the DAO once, then roll back.
+
+    :param session: database session.
+    """
+    dao = TvShowDAO(session)
+    # Matches no show through the index of added dates, so it is cheap.
+    show_filter = TvShowFilter(
+        added_from=datetime.date.min,
+        added_to=datetime.date.min,
+    )
+    show: Dict[str, Any] = {
+        "show_id": WARMUP_SHOW_ID,
+        "type": "Movie",
+        "genre": "Warmup",
+        "title": "Warmup",
+        "director": "",
+        "cast": "",
+        "country": "",
+        "date_added": "January 1, 2020",
+        "release_year": 2020,
+        "rating": "",
+        "duration": "",
+    }
+    try:
+        await dao.create_tv_show_model(**show)
+        await dao.update_tv_show_model(**{**show, "title": "Warmed up"})
+        await dao.filter(show_id=WARMUP_SHOW_ID)
+        await dao.get_titles([WARMUP_SHOW_ID])
+        await dao.count_matching(show_filter)
+        await dao.bulk_update(show_filter, {"rating": ""}, max_rows=1)
+        await dao.delete_tv_show_model(show_id=WARMUP_SHOW_ID)
+        await dao.bulk_delete(show_filter, max_rows=1)
+    finally:
+        await session.rollback()
+        await session.close()
+
+
+async def warmup_urls(session: AsyncSession) -> List[str]:
+    """
+    Build a request of every read shape of the TV show API.
+
+    :param session: database session.
+    :return: paths with query strings.
+    """
+    try:
+        row = (
+            await session.execute(
+                select(TvShowModel.show_id, TvShowModel.genre, TvShowModel.title)
+                .order_by(TvShowModel.show_id)
+                .limit(1),
+            )
+        ).first()
+    finally:
+        await session.close()
+    urls = ["/api/tvshow/all"]
+    if row is not None:
+        show_id, genres, title = row
+        genre = quote(genres.split(",")[0].strip(), safe="")
+        urls += [
+            f"/api/tvshow/detail/{show_id}",
+            f"/api/tvshow/genre/{genre}",
+            f"/api/tvshow/genre/{genre}?match=all&sort=title",
+            f"/api/tvshow/autocomplete?prefix={quote(title[:1], safe='')}",
+        ]
+    return urls
+
+
+async def send_requests(app: FastAPI, urls: List[str]) -> Dict[str, int]:
+    """
+    Request pages through the application without a network connection.
+
+    :param app: the application.
+    :param urls: paths with query strings.
+    :return: status codes by url.
+    """
+    statuses = {}
+    async with AsyncClient(app=app, base_url="http://warmup") as client:
+        for url in urls:
+            statuses[url] = (await client.get(url)).status_code
+    return statuses
+
+
+async def warm_up(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Prepare the worker for its first requests.
+
+    :param app: the application.
+    """
+    if not settings.warmup:
+        return
+    threaded_sessions = app.state.db_threaded_sessions
+    if threaded_sessions is not None:
+        await threaded_sessions.open_connections()
+    else:
+        await open_connections(app.state.db_engine)
+    if settings.warmup_page_cache and not settings.db_in_memory:
+        size = await asyncio.to_thread(read_file, settings.db_file)
+        logger.info("Read {} MiB of the database", size // READ_CHUNK)
+    session_factory = app.state.db_request_session_factory
+    try:
+        await run_write_shapes(session_factory())
+    except Exception as error:
+        logger.warning("Warmup of write queries failed: {}", error)
+    statuses = await send_requests(app, await warmup_urls(session_factory()))
+    logger.debug("Warmup requests: {}", statuses)